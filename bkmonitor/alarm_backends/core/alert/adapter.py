@@ -20,6 +20,7 @@ from alarm_backends.core.cluster import get_cluster
 from alarm_backends.core.control.mixins.double_check import DoubleCheckStrategy
 from alarm_backends.core.control.record_parser import EventIDParser
 from alarm_backends.core.storage.kafka import KafkaQueue
+from alarm_backends.core.storage.kafka_producer import get_event_producer
 from bkmonitor.models import NO_DATA_TAG_DIMENSION, BCSPod
 from bkmonitor.utils.tenant import bk_biz_id_to_bk_tenant_id
 from constants.alert import APMTargetType, EventStatus, EventTargetType, K8STargetType
@@ -35,15 +36,17 @@ class MonitorEventAdapter:
     SPECIAL_ALERT_TAG_KEY_WHITELIST = [DoubleCheckStrategy.DOUBLE_CHECK_CONTEXT_KEY]
 
     @classmethod
-    def push_to_kafka(cls, events: list[dict]):
+    def push_to_kafka(cls, events: list[dict], callback=None):
         """
         将事件推送到 Kafka，提供给故障自愈进行消费
         :param events: 从 Adapter 解析出来的事件对象
+        :param callback: 为空时同步发送，失败抛出异常；
+            否则由异步生产者发送，投递完成后回调 callback(delivered, failed)
         """
-        if not settings.PUSH_MONITOR_EVENT_TO_FTA:
-            # 如果设置被禁用，则不推送
-            return
-        if not events:
+        if not settings.PUSH_MONITOR_EVENT_TO_FTA or not events:
+            # 如果设置被禁用或没有事件，则不推送
+            if callback:
+                callback(0, 0)
             return
         messages = [json.dumps(event).encode("utf-8") for event in events]
         # 默认集群使用默认topic，其他集群使用集群名作为topic后缀
@@ -52,9 +55,19 @@ class MonitorEventAdapter:
         else:
             topic = f"{settings.MONITOR_EVENT_KAFKA_TOPIC}_{get_cluster().name}"
         # 使用专用kafka集群: ALERT_KAFKA_HOST  ALERT_KAFKA_PORT
+        if settings.KAFKA_EVENT_PRODUCER_ENABLED:
+            producer = get_event_producer()
+            if callback:
+                # 由后台线程攒批发送，不阻塞 trigger 的处理流程
+                producer.send(topic, messages, callback=callback)
+            else:
+                producer.send_sync(topic, messages)
+            return
         kafka_queue = KafkaQueue.get_alert_kafka_queue()
         kafka_queue.set_topic(topic)
         kafka_queue.put(value=messages)
+        if callback:
+            callback(len(messages), 0)
 
     def __init__(self, record: dict, strategy: dict):
         """
@@ -19,10 +19,12 @@ from django.utils.translation import gettext as _
 from redis.exceptions import RedisError
 
 from alarm_backends.constants import DEFAULT_DEDUPE_FIELDS, NO_DATA_TAG_DIMENSION
+from alarm_backends.core.alert.codec import AlertCacheCodec
 from alarm_backends.core.alert.event import Event
 from alarm_backends.core.cache.key import (
     ALERT_BUILD_QOS_COUNTER,
     ALERT_DEDUPE_CONTENT_KEY,
+    ALERT_DEDUPE_STATUS_KEY,
     ALERT_SNAPSHOT_KEY,
     ALERT_UUID_SEQUENCE,
     COMPOSITE_QOS_COUNTER,
@@ -30,7 +32,6 @@ from alarm_backends.core.cache.key import (
 from alarm_backends.core.cluster import get_cluster
 from bkmonitor.documents import ActionInstanceDocument, AlertDocument, AlertLog
 from bkmonitor.models import ActionInstance
-from bkmonitor.utils import extended_json
 from bkmonitor.utils.common_utils import count_md5
 from constants.action import ActionSignal, AssignMode
 from constants.alert import EventStatus
@@ -852,7 +853,7 @@ class Alert:
             return None
 
         try:
-            alert_data = json.loads(alert_json)
+            alert_data = AlertCacheCodec.decode(alert_json)
             return cls(alert_data)
         except Exception as e:
             logger.warning("load alert failed: %s, origin data: %s", e, alert_json)
@@ -907,7 +908,7 @@ class Alert:
                 alert_ids_not_found.append(alert_keys[index].alert_id)
                 continue
             try:
-                alert_data = json.loads(alert_json)
+                alert_data = AlertCacheCodec.decode(alert_json)
                 results.append(cls(alert_data))
             except Exception as e:
                 logger.warning("load alert failed: %s, origin data: %s", e, alert_json)
@@ -924,7 +925,7 @@ class Alert:
         保存到redis快照
         """
         key = ALERT_SNAPSHOT_KEY.get_key(strategy_id=self.strategy_id or 0, alert_id=self.id)
-        ALERT_SNAPSHOT_KEY.client.set(key, json.dumps(self.to_dict()), ALERT_SNAPSHOT_KEY.ttl)
+        ALERT_SNAPSHOT_KEY.client.set(key, AlertCacheCodec.encode(self.to_dict()), ALERT_SNAPSHOT_KEY.ttl)
 
     @property
     def key(self) -> AlertKey:
@@ -1134,9 +1135,8 @@ class AlertUIDManager:
 
 
 class AlertCache:
-    # todo 下面两个可以合并
     @staticmethod
-    def save_alert_to_cache(alerts: list[Alert]):
+    def get_latest_alerts(alerts: list[Alert]) -> dict[str, Alert]:
         alerts_to_saved = {}
         for alert in alerts:
             current_alert = alerts_to_saved.get(alert.dedupe_md5)
@@ -1145,74 +1145,85 @@ class AlertCache:
                 # 1. 从未出现过的维度
                 # 2. 维度已经出现过，但告警的创建时间更加新
                 alerts_to_saved[alert.dedupe_md5] = alert
+        return alerts_to_saved
 
-        update_count = 0
-        finished_count = 0
-        # 通过 pipeline 批量更新告警，由于这些告警维度都各不相同，更新的先后顺序就都无所谓了
-        pipeline = ALERT_DEDUPE_CONTENT_KEY.client.pipeline(transaction=False)
-        for alert in alerts_to_saved.values():
-            key = ALERT_DEDUPE_CONTENT_KEY.get_key(strategy_id=alert.strategy_id or 0, dedupe_md5=alert.dedupe_md5)
-            if alert.is_end():
-                # 如果告警已经结束，不做删除，更新告警内容
-                finished_count += 1
-            else:
-                # 如果告警未结束就更新
-                update_count += 1
-            pipeline.set(
-                key, json.dumps(alert.to_dict(), cls=extended_json.ESJSONEncoder), ALERT_DEDUPE_CONTENT_KEY.ttl
-            )
-        pipeline.execute()
-        return update_count, finished_count
+    @staticmethod
+    def get_content_key(alert: Alert):
+        return ALERT_DEDUPE_CONTENT_KEY.get_key(strategy_id=alert.strategy_id or 0, dedupe_md5=alert.dedupe_md5)
 
-    # 仅id一致更新，否则跳过
     @staticmethod
-    def update_alert_to_cache(alerts: list[Alert]):
-        alerts_to_saved = {}
+    def get_status_key(alert: Alert):
+        return ALERT_DEDUPE_STATUS_KEY.get_key(strategy_id=alert.strategy_id or 0, dedupe_md5=alert.dedupe_md5)
+
+    @classmethod
+    def get_cached_status(cls, alerts: list[Alert]) -> dict[str, tuple[str, str]]:
+        """
+        批量获取告警维度当前缓存的告警ID及状态，不需要解析告警内容
+        :return: dedupe_md5 -> (告警ID, 告警状态)，状态缓存不存在的维度不返回
+        """
+        pipeline = ALERT_DEDUPE_STATUS_KEY.client.pipeline(transaction=False)
         for alert in alerts:
-            current_alert = alerts_to_saved.get(alert.dedupe_md5)
-            if not current_alert or alert.create_time > current_alert.create_time:
-                # 哪些告警需要刷新到缓存呢？
-                # 1. 从未出现过的维度
-                # 2. 维度已经出现过，但告警的创建时间更加新
-                alerts_to_saved[alert.dedupe_md5] = alert
+            pipeline.get(cls.get_status_key(alert))
 
-        update_count = 0
-        finished_count = 0
-        skip_count = 0
+        cached_status = {}
+        for alert, value in zip(alerts, pipeline.execute()):
+            if not value:
+                continue
+            alert_id, _, status = value.rpartition("|")
+            cached_status[alert.dedupe_md5] = (alert_id, status)
+        return cached_status
 
-        # 先获取现有缓存中的告警数据，检查ID是否一致
-        cache_keys = []
-        for alert in alerts_to_saved.values():
-            key = ALERT_DEDUPE_CONTENT_KEY.get_key(strategy_id=alert.strategy_id or 0, dedupe_md5=alert.dedupe_md5)
-            cache_keys.append((key, alert))
+    @classmethod
+    def get_cached_alert_ids(cls, alerts: list[Alert]) -> dict[str, str]:
+        """
+        批量获取告警维度当前缓存的告警ID，优先读取状态缓存，不存在时只解析内容缓存的编码头部
+        :return: dedupe_md5 -> 缓存中的告警ID
+        """
+        cached_alert_ids = {md5: alert_id for md5, (alert_id, _) in cls.get_cached_status(alerts).items()}
+        alerts = [alert for alert in alerts if alert.dedupe_md5 not in cached_alert_ids]
+        if not alerts:
+            return cached_alert_ids
+
+        pipeline = ALERT_DEDUPE_CONTENT_KEY.client.pipeline(transaction=False)
+        for alert in alerts:
+            pipeline.get(cls.get_content_key(alert))
 
-        # 批量获取缓存中的数据
-        pipeline_get = ALERT_DEDUPE_CONTENT_KEY.client.pipeline(transaction=False)
-        for key, _value in cache_keys:
-            pipeline_get.get(key)
-        cached_data_list = pipeline_get.execute()
+        for alert, cached_data in zip(alerts, pipeline.execute()):
+            if not cached_data:
+                continue
+            try:
+                cached_alert_ids[alert.dedupe_md5] = AlertCacheCodec.peek_id(cached_data)
+            except Exception as e:
+                # 解析失败时允许更新
+                logger.warning("load alert failed: %s, origin data: %s", e, cached_data)
+        return cached_alert_ids
 
-        # 通过 pipeline 批量更新告警，只更新ID一致的告警
+    @classmethod
+    def save_alerts(
+        cls, alerts: list[Alert], save_content: bool = True, save_snapshot: bool = True, check_id: bool = False
+    ) -> tuple[int, int, int]:
+        """
+        在同一个 pipeline 中写入告警内容缓存及快照，每个告警只序列化一次
+        :param alerts: 告警列表
+        :param save_content: 是否写入告警内容缓存
+        :param save_snapshot: 是否写入告警快照
+        :param check_id: 仅当缓存中的告警ID与当前告警ID一致(或缓存不存在)时才更新告警内容缓存
+        :return: 更新数量，结束数量，快照数量
+        """
+        if not alerts:
+            return 0, 0, 0
+
+        alerts_to_saved = cls.get_latest_alerts(alerts) if save_content else {}
+        cached_alert_ids = cls.get_cached_alert_ids(list(alerts_to_saved.values())) if check_id else {}
+
+        update_count = finished_count = snapshot_count = skip_count = 0
+        encoded_alerts = {}
         pipeline = ALERT_DEDUPE_CONTENT_KEY.client.pipeline(transaction=False)
-        for (key, alert), cached_data in zip(cache_keys, cached_data_list):
-            should_update = True
-
-            if cached_data:
-                try:
-                    cached_alert_data = Alert(data=json.loads(cached_data))
-                    cached_alert_id = cached_alert_data.id
-                    if cached_alert_id and cached_alert_id != alert.id:
-                        # 如果缓存中的告警ID与当前告警ID不一致，跳过更新
-                        should_update = False
-                        skip_count += 1
-                except (json.JSONDecodeError, KeyError) as e:
-                    # 如果解析失败，允许更新
-                    logger.warning("load alert failed: invalid json data: %s, origin data: %s", e, cached_data)
-                except Exception as e:
-                    # 其他异常，记录日志但允许更新
-                    logger.warning("load alert failed: %s, origin data: %s", e, cached_data)
-
-            if not should_update:
+        for alert in alerts_to_saved.values():
+            cached_alert_id = cached_alert_ids.get(alert.dedupe_md5)
+            if cached_alert_id and cached_alert_id != alert.id:
+                # 如果缓存中的告警ID与当前告警ID不一致，跳过更新
+                skip_count += 1
                 continue
 
             if alert.is_end():
@@ -1221,26 +1232,37 @@ class AlertCache:
             else:
                 # 如果告警未结束就更新
                 update_count += 1
-            pipeline.set(key, json.dumps(alert.to_dict()), ALERT_DEDUPE_CONTENT_KEY.ttl)
+            encoded_alerts[id(alert)] = AlertCacheCodec.encode(alert.to_dict())
+            pipeline.set(cls.get_content_key(alert), encoded_alerts[id(alert)], ALERT_DEDUPE_CONTENT_KEY.ttl)
+            # 状态缓存与内容缓存同时写入，只需要判断告警状态时无需解析完整内容
+            pipeline.set(cls.get_status_key(alert), f"{alert.id}|{alert.status}", ALERT_DEDUPE_STATUS_KEY.ttl)
+
+        if save_snapshot:
+            for alert in alerts:
+                # 已经结束的告警保存快照备用
+                value = encoded_alerts.get(id(alert)) or AlertCacheCodec.encode(alert.to_dict())
+                key = ALERT_SNAPSHOT_KEY.get_key(strategy_id=alert.strategy_id or 0, alert_id=alert.id)
+                pipeline.set(key, value, ALERT_SNAPSHOT_KEY.ttl)
+                snapshot_count += 1
 
         pipeline.execute()
-        logger.debug(
-            "update_alert_to_cache: updated=%d, finished=%d, skipped=%d", update_count, finished_count, skip_count
-        )
-        return update_count, finished_count
+        if skip_count:
+            logger.debug("save_alerts: updated=%d, finished=%d, skipped=%d", update_count, finished_count, skip_count)
+        return update_count, finished_count, snapshot_count
 
-    @staticmethod
-    def save_alert_snapshot(alerts: list[Alert]):
-        if not alerts:
-            return 0
+    @classmethod
+    def save_alert_to_cache(cls, alerts: list[Alert]):
+        # 通过 pipeline 批量更新告警，由于这些告警维度都各不相同，更新的先后顺序就都无所谓了
+        update_count, finished_count, _ = cls.save_alerts(alerts, save_snapshot=False)
+        return update_count, finished_count
 
-        pipeline = ALERT_SNAPSHOT_KEY.client.pipeline(transaction=False)
-        snapshot_count = 0
-        for alert in alerts:
-            # 已经结束的告警保存快照备用
-            key = ALERT_SNAPSHOT_KEY.get_key(strategy_id=alert.strategy_id or 0, alert_id=alert.id)
-            pipeline.set(key, json.dumps(alert.to_dict(), cls=extended_json.ESJSONEncoder), ALERT_SNAPSHOT_KEY.ttl)
-            snapshot_count += 1
+    # 仅id一致更新，否则跳过
+    @classmethod
+    def update_alert_to_cache(cls, alerts: list[Alert]):
+        update_count, finished_count, _ = cls.save_alerts(alerts, save_snapshot=False, check_id=True)
+        return update_count, finished_count
 
-        pipeline.execute()
+    @classmethod
+    def save_alert_snapshot(cls, alerts: list[Alert]):
+        _, _, snapshot_count = cls.save_alerts(alerts, save_content=False)
         return snapshot_count
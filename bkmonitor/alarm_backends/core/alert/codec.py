@@ -0,0 +1,89 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import base64
+import json
+import zlib
+
+from django.conf import settings
+
+from bkmonitor.utils import extended_json
+
+
+class AlertCacheCodec:
+    """
+    告警缓存编解码
+
+    编码格式: "@A<版本>|<告警ID>|<编码方式>|<内容>"
+    - 编码方式 j: 内容为原始json
+    - 编码方式 z: 内容为 zlib 压缩后的 base64 字符串(redis 连接按 utf-8 解码，无法直接存储二进制)
+    告警ID放在头部，比较告警ID时无需解码整个告警内容。
+    兼容未带头部的旧版 json 格式。
+    """
+
+    VERSION = 1
+    PREFIX = f"@A{VERSION}|"
+    PLAIN = "j"
+    ZLIB = "z"
+
+    @classmethod
+    def dumps(cls, alert_data: dict) -> str:
+        return json.dumps(alert_data, cls=extended_json.ESJSONEncoder)
+
+    @classmethod
+    def encode(cls, alert_data: dict, content: str | None = None) -> str:
+        """
+        编码告警内容
+        :param alert_data: Alert.to_dict() 结果
+        :param content: 已经序列化好的json，避免重复序列化
+        """
+        if content is None:
+            content = cls.dumps(alert_data)
+        if not settings.ALERT_CACHE_CODEC_ENABLED:
+            return content
+
+        encoding = cls.PLAIN
+        if 0 < settings.ALERT_CACHE_COMPRESS_THRESHOLD <= len(content):
+            encoding = cls.ZLIB
+            content = base64.b64encode(zlib.compress(content.encode("utf-8"), 1)).decode("ascii")
+        return f"{cls.PREFIX}{alert_data.get('id') or ''}|{encoding}|{content}"
+
+    @classmethod
+    def _split(cls, value: str) -> tuple[str, str, str] | None:
+        if not value.startswith(cls.PREFIX):
+            return None
+        alert_id, encoding, content = value[len(cls.PREFIX) :].split("|", 2)
+        return alert_id, encoding, content
+
+    @classmethod
+    def decode(cls, value: str) -> dict:
+        """
+        解码告警内容，返回告警字典
+        """
+        parts = cls._split(value)
+        if parts is None:
+            return json.loads(value)
+
+        _, encoding, content = parts
+        if encoding == cls.ZLIB:
+            content = zlib.decompress(base64.b64decode(content)).decode("utf-8")
+        elif encoding != cls.PLAIN:
+            raise ValueError(f"unknown alert cache encoding: {encoding}")
+        return json.loads(content)
+
+    @classmethod
+    def peek_id(cls, value: str) -> str:
+        """
+        只读取告警ID，旧版格式需要完整解析
+        """
+        parts = cls._split(value)
+        if parts is None:
+            return str(json.loads(value).get("id") or "")
+        return parts[0]
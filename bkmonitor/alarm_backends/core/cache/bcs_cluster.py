@@ -60,6 +60,19 @@ class BcsClusterCacheManager(CacheManager):
         if data:
             return json.loads(data)
 
+    @classmethod
+    def mget(cls, bcs_cluster_ids: list[str]) -> dict[str, dict]:
+        """
+        批量获取集群信息
+        """
+        bcs_cluster_ids = list(set(bcs_cluster_ids))
+        if not bcs_cluster_ids:
+            return {}
+
+        cache_keys = [cls.CACHE_KEY_TEMPLATE.format(bcs_cluster_id) for bcs_cluster_id in bcs_cluster_ids]
+        result = cls.cache.mget(cache_keys)
+        return {bcs_cluster_id: json.loads(data) for bcs_cluster_id, data in zip(bcs_cluster_ids, result) if data}
+
 
 def main():
     BcsClusterCacheManager.refresh()
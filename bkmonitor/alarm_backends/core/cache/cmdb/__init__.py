@@ -15,6 +15,7 @@ from .service_instance import ServiceInstanceManager
 from .service_template import ServiceTemplateManager
 from .set import SetManager
 from .set_template import SetTemplateManager
+from .snapshot import HostSnapshotManager
 from .topo import TopoManager
 
 __all__ = [
@@ -27,4 +28,5 @@ __all__ = [
     "ServiceTemplateManager",
     "SetTemplateManager",
     "HostIPManager",
+    "HostSnapshotManager",
 ]
@@ -37,6 +37,28 @@ class BusinessManager(CMDBCacheManager):
 
         return Business(**business)
 
+    @classmethod
+    def mget(cls, bk_biz_ids: list[int | str]) -> dict[str, Business]:
+        """
+        批量获取业务，返回以字符串业务ID为键的字典
+        """
+        bk_biz_ids = list({str(bk_biz_id) for bk_biz_id in bk_biz_ids})
+        if not bk_biz_ids:
+            return {}
+
+        result: list[str | None] = cast(
+            list[str | None], cls.cache.hmget(cls.get_cache_key(DEFAULT_TENANT_ID), bk_biz_ids)
+        )
+        businesses: dict[str, Business] = {}
+        for bk_biz_id, r in zip(bk_biz_ids, result):
+            if not r:
+                continue
+            business: dict = json.loads(r)
+            if not business.get("bk_tenant_id"):
+                business["bk_tenant_id"] = DEFAULT_TENANT_ID
+            businesses[bk_biz_id] = Business(**business)
+        return businesses
+
     @classmethod
     def keys(cls) -> list[int]:
         """
@@ -11,6 +11,7 @@ specific language governing permissions and limitations under the License.
 import json
 import logging
 from collections import defaultdict
+from itertools import chain
 from typing import cast
 
 from api.cmdb.define import Host, Set, TopoTree
@@ -18,6 +19,7 @@ from bkmonitor.utils.local import local
 from core.drf_resource import api
 
 from .base import CMDBCacheManager
+from .snapshot import HostBrief, HostSnapshotManager
 
 setattr(local, "host_cache", {})
 
@@ -140,8 +142,11 @@ class HostManager(CMDBCacheManager):
         :return: 主机信息
         """
         host_key = cls.get_host_key(ip, bk_cloud_id)
-        cache_key = cls.get_cache_key(bk_tenant_id)
-        host = cast(str | None, cls.cache.hget(cache_key, host_key))
+        snapshot = HostSnapshotManager.get_snapshot(bk_tenant_id)
+        host = snapshot.get(host_key) if snapshot else None
+        if not host:
+            # 快照未命中时回退到redis，以便及时获取新增主机
+            host = cast(str | None, cls.cache.hget(cls.get_cache_key(bk_tenant_id), host_key))
         if not host:
             return None
         return Host(**json.loads(host))
@@ -201,9 +206,21 @@ class HostManager(CMDBCacheManager):
         if not host_keys:
             return {}
 
+        hosts: dict[str, Host] = {}
+        snapshot = HostSnapshotManager.get_snapshot(bk_tenant_id)
+        if snapshot:
+            for host_key in host_keys:
+                host_str = snapshot.get(host_key)
+                if host_str:
+                    hosts[host_key] = Host(**json.loads(host_str))
+            host_keys = [host_key for host_key in host_keys if host_key not in hosts]
+            if not host_keys:
+                return hosts
+
         cache_key = cls.get_cache_key(bk_tenant_id)
         result: list[str | None] = cast(list[str | None], cls.cache.hmget(cache_key, host_keys))
-        return {host_key: Host(**json.loads(r)) for host_key, r in zip(host_keys, result) if r}
+        hosts.update({host_key: Host(**json.loads(r)) for host_key, r in zip(host_keys, result) if r})
+        return hosts
 
     @classmethod
     def get_by_agent_id(cls, *, bk_tenant_id: str, bk_agent_id: str) -> Host | None:
@@ -236,9 +253,12 @@ class HostManager(CMDBCacheManager):
             if host:
                 return host
 
-        # 尝试使用bk_host_id获取主机信息
-        cache_key = cls.get_cache_key(bk_tenant_id)
-        host_str: str | None = cast(str | None, cls.cache.hget(cache_key, bk_host_id))
+        # 尝试使用bk_host_id获取主机信息，优先读取本地快照
+        snapshot = HostSnapshotManager.get_snapshot(bk_tenant_id)
+        host_str: str | None = snapshot.get_by_id(bk_host_id) if snapshot and bk_host_id.isdigit() else None
+        if not host_str:
+            cache_key = cls.get_cache_key(bk_tenant_id)
+            host_str = cast(str | None, cls.cache.hget(cache_key, bk_host_id))
         if not host_str:
             return None
 
@@ -252,6 +272,77 @@ class HostManager(CMDBCacheManager):
 
         return host
 
+    @classmethod
+    def mget_by_id(cls, *, bk_tenant_id: str, bk_host_ids: list[int | str]) -> dict[str, Host]:
+        """
+        根据主机ID批量获取主机信息，返回以字符串主机ID为键的字典
+        """
+        bk_host_ids = list({str(bk_host_id) for bk_host_id in bk_host_ids if bk_host_id})
+        if not bk_host_ids:
+            return {}
+
+        host_strs: dict[str, str] = {}
+        snapshot = HostSnapshotManager.get_snapshot(bk_tenant_id)
+        if snapshot:
+            for bk_host_id in bk_host_ids:
+                host_str = snapshot.get_by_id(bk_host_id) if bk_host_id.isdigit() else None
+                if host_str:
+                    host_strs[bk_host_id] = host_str
+            bk_host_ids = [bk_host_id for bk_host_id in bk_host_ids if bk_host_id not in host_strs]
+
+        if bk_host_ids:
+            cache_key = cls.get_cache_key(bk_tenant_id)
+            result: list[str | None] = cast(list[str | None], cls.cache.hmget(cache_key, bk_host_ids))
+            host_strs.update({bk_host_id: r for bk_host_id, r in zip(bk_host_ids, result) if r})
+
+        hosts: dict[str, Host] = {}
+        for bk_host_id, host_str in host_strs.items():
+            host_dict: dict = json.loads(host_str)
+            host_dict["bk_tenant_id"] = bk_tenant_id
+            hosts[bk_host_id] = Host(**host_dict)
+        return hosts
+
+    @classmethod
+    def get_brief(cls, *, bk_tenant_id: str, ip: str, bk_cloud_id: int | str = 0) -> HostBrief | None:
+        """
+        获取主机精简信息(ip、云区域、拓扑节点)，优先从本地快照读取，无需构造主机对象
+        """
+        if not ip:
+            return None
+
+        snapshot = HostSnapshotManager.get_snapshot(bk_tenant_id)
+        if snapshot:
+            brief = snapshot.get_brief(cls.get_host_key(ip, bk_cloud_id))
+            if brief:
+                return brief
+
+        host = cls.get(bk_tenant_id=bk_tenant_id, ip=ip, bk_cloud_id=bk_cloud_id, using_mem=True)
+        return cls.to_brief(host) if host else None
+
+    @classmethod
+    def get_brief_by_id(cls, *, bk_tenant_id: str, bk_host_id: int | str | None) -> HostBrief | None:
+        """
+        根据主机ID获取主机精简信息
+        """
+        if not bk_host_id:
+            return None
+
+        snapshot = HostSnapshotManager.get_snapshot(bk_tenant_id)
+        if snapshot and str(bk_host_id).isdigit():
+            brief = snapshot.get_brief_by_id(bk_host_id)
+            if brief:
+                return brief
+
+        host = cls.get_by_id(bk_tenant_id=bk_tenant_id, bk_host_id=bk_host_id, using_mem=True)
+        return cls.to_brief(host) if host else None
+
+    @staticmethod
+    def to_brief(host: Host) -> HostBrief:
+        bk_topo_node = []
+        if host.topo_link:
+            bk_topo_node = list({node.id for node in chain(*list(host.topo_link.values()))})
+        return HostBrief(host.bk_host_id, host.ip, host.bk_cloud_id, bk_topo_node)
+
     @classmethod
     def fill_attr_to_hosts(cls, bk_biz_id: int, hosts: list[Host], with_world_ids: bool = False):
         topo_tree: TopoTree = api.cmdb.get_topo_tree(bk_biz_id=bk_biz_id)
@@ -0,0 +1,377 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+import xxhash
+from django.conf import settings
+
+from .base import CMDBCacheManager
+
+logger = logging.getLogger(__name__)
+
+
+class HostBrief(NamedTuple):
+    """
+    主机维度补全所需的精简信息
+    """
+
+    bk_host_id: int
+    ip: str
+    bk_cloud_id: int
+    bk_topo_node: list[str]
+
+
+class HostSnapshot:
+    """
+    主机快照(只读，基于mmap，同一节点的多个进程共享同一份页缓存)
+
+    文件格式(小端):
+    1. 文件头: HEADER
+    2. 主机记录: RECORD_HEAD + 拓扑节点字符串ID列表(uint32) + 主机原始json
+    3. bk_host_id索引: (bk_host_id, 记录偏移) 按 bk_host_id 升序
+    4. ip|cloud索引: (key哈希, key字符串ID, 记录偏移) 按 key哈希 升序
+    5. 字符串表: 偏移数组(uint64, 共 n + 1 个) + utf-8 字符串数据，ip、拓扑节点等重复字符串只保存一份
+    """
+
+    MAGIC = b"BKHS"
+    VERSION = 1
+
+    # magic, version, built_at, 主机记录数, id索引数, key索引数, 字符串数, id索引偏移, key索引偏移, 字符串表偏移
+    HEADER = struct.Struct("<4sHxxdIIIIQQQ")
+    # bk_host_id, bk_cloud_id, ip字符串ID, 拓扑节点数, json长度
+    RECORD_HEAD = struct.Struct("<QiIHI")
+    ID_ENTRY = struct.Struct("<QQ")
+    KEY_ENTRY = struct.Struct("<QQQ")
+    UINT32 = struct.Struct("<I")
+    UINT64 = struct.Struct("<Q")
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            self.built_at,
+            self.record_count,
+            self.id_count,
+            self.key_count,
+            self.string_count,
+            self.id_index_offset,
+            self.key_index_offset,
+            self.string_offset,
+        ) = self.HEADER.unpack_from(self.mm, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.mm.close()
+            raise ValueError(f"invalid host snapshot file: {path}")
+
+        # 字符串数据起始位置
+        self.string_data_offset = self.string_offset + (self.string_count + 1) * self.UINT64.size
+
+    @staticmethod
+    def hash_key(key: str) -> int:
+        return xxhash.xxh64_intdigest(key.encode("utf-8"))
+
+    @classmethod
+    def dump(cls, hosts: dict[str, str], fp) -> None:
+        """
+        将主机缓存(hash field -> 主机json)写入文件
+        :param hosts: 与redis主机缓存结构一致，field为bk_host_id或ip|bk_cloud_id
+        :param fp: 二进制写文件对象
+        """
+        strings: dict[str, int] = {}
+
+        def intern(value: str) -> int:
+            sid = strings.get(value)
+            if sid is None:
+                sid = strings[value] = len(strings)
+            return sid
+
+        records = bytearray()
+        record_offsets: dict[str, int] = {}
+        id_entries: list[tuple[int, int]] = []
+        key_entries: list[tuple[int, int, int]] = []
+
+        for field, host_str in hosts.items():
+            offset = record_offsets.get(host_str)
+            if offset is None:
+                host = json.loads(host_str)
+                topo_node_ids = {
+                    f"{node['bk_obj_id']}|{int(node['bk_inst_id'])}"
+                    for nodes in (host.get("topo_link") or {}).values()
+                    for node in nodes
+                }
+                raw = host_str.encode("utf-8")
+                offset = cls.HEADER.size + len(records)
+                records += cls.RECORD_HEAD.pack(
+                    int(host.get("bk_host_id") or 0),
+                    int(host.get("bk_cloud_id") or 0),
+                    intern(host.get("bk_host_innerip") or ""),
+                    len(topo_node_ids),
+                    len(raw),
+                )
+                for node_id in sorted(topo_node_ids):
+                    records += cls.UINT32.pack(intern(node_id))
+                records += raw
+                record_offsets[host_str] = offset
+
+            if field.isdigit():
+                id_entries.append((int(field), offset))
+            else:
+                key_entries.append((cls.hash_key(field), intern(field), offset))
+
+        id_entries.sort()
+        key_entries.sort()
+
+        id_index_offset = cls.HEADER.size + len(records)
+        key_index_offset = id_index_offset + len(id_entries) * cls.ID_ENTRY.size
+        string_offset = key_index_offset + len(key_entries) * cls.KEY_ENTRY.size
+
+        fp.write(
+            cls.HEADER.pack(
+                cls.MAGIC,
+                cls.VERSION,
+                time.time(),
+                len(record_offsets),
+                len(id_entries),
+                len(key_entries),
+                len(strings),
+                id_index_offset,
+                key_index_offset,
+                string_offset,
+            )
+        )
+        fp.write(records)
+        for entry in id_entries:
+            fp.write(cls.ID_ENTRY.pack(*entry))
+        for entry in key_entries:
+            fp.write(cls.KEY_ENTRY.pack(*entry))
+
+        # 字符串表，dict 保持插入顺序，与字符串ID一一对应
+        encoded = [value.encode("utf-8") for value in strings]
+        position = 0
+        for value in encoded:
+            fp.write(cls.UINT64.pack(position))
+            position += len(value)
+        fp.write(cls.UINT64.pack(position))
+        for value in encoded:
+            fp.write(value)
+
+    def get_string(self, sid: int) -> str:
+        position = self.string_offset + sid * self.UINT64.size
+        start, end = self.UINT64.unpack_from(self.mm, position)[0], self.UINT64.unpack_from(self.mm, position + 8)[0]
+        return self.mm[self.string_data_offset + start : self.string_data_offset + end].decode("utf-8")
+
+    def _lower_bound(self, base: int, count: int, size: int, target: int) -> int:
+        """
+        在按首个uint64字段升序排列的索引中二分查找第一个不小于target的位置
+        """
+        low, high = 0, count
+        unpack_from = self.UINT64.unpack_from
+        while low < high:
+            mid = (low + high) // 2
+            if unpack_from(self.mm, base + mid * size)[0] < target:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _find_by_id(self, bk_host_id: int) -> int | None:
+        index = self._lower_bound(self.id_index_offset, self.id_count, self.ID_ENTRY.size, bk_host_id)
+        if index >= self.id_count:
+            return None
+        host_id, offset = self.ID_ENTRY.unpack_from(self.mm, self.id_index_offset + index * self.ID_ENTRY.size)
+        return offset if host_id == bk_host_id else None
+
+    def _find_by_key(self, host_key: str) -> int | None:
+        key_hash = self.hash_key(host_key)
+        index = self._lower_bound(self.key_index_offset, self.key_count, self.KEY_ENTRY.size, key_hash)
+        # 哈希冲突时逐个比对原始key
+        while index < self.key_count:
+            entry_hash, sid, offset = self.KEY_ENTRY.unpack_from(
+                self.mm, self.key_index_offset + index * self.KEY_ENTRY.size
+            )
+            if entry_hash != key_hash:
+                break
+            if self.get_string(sid) == host_key:
+                return offset
+            index += 1
+        return None
+
+    def _read_json(self, offset: int) -> str:
+        _, _, _, topo_count, json_length = self.RECORD_HEAD.unpack_from(self.mm, offset)
+        start = offset + self.RECORD_HEAD.size + topo_count * self.UINT32.size
+        return self.mm[start : start + json_length].decode("utf-8")
+
+    def _read_brief(self, offset: int) -> HostBrief:
+        bk_host_id, bk_cloud_id, ip_sid, topo_count, _ = self.RECORD_HEAD.unpack_from(self.mm, offset)
+        topo_start = offset + self.RECORD_HEAD.size
+        bk_topo_node = [
+            self.get_string(self.UINT32.unpack_from(self.mm, topo_start + i * self.UINT32.size)[0])
+            for i in range(topo_count)
+        ]
+        return HostBrief(bk_host_id, self.get_string(ip_sid), bk_cloud_id, bk_topo_node)
+
+    def get(self, host_key: str) -> str | None:
+        """
+        根据 ip|bk_cloud_id 获取主机原始json
+        """
+        offset = self._find_by_key(host_key)
+        return None if offset is None else self._read_json(offset)
+
+    def get_by_id(self, bk_host_id: int | str) -> str | None:
+        """
+        根据 bk_host_id 获取主机原始json
+        """
+        offset = self._find_by_id(int(bk_host_id))
+        return None if offset is None else self._read_json(offset)
+
+    def get_brief(self, host_key: str) -> HostBrief | None:
+        offset = self._find_by_key(host_key)
+        return None if offset is None else self._read_brief(offset)
+
+    def get_brief_by_id(self, bk_host_id: int | str) -> HostBrief | None:
+        offset = self._find_by_id(int(bk_host_id))
+        return None if offset is None else self._read_brief(offset)
+
+
+class HostSnapshotManager(CMDBCacheManager):
+    """
+    主机快照管理
+    按租户从redis主机缓存生成本地快照文件，同一节点上由抢到文件锁的进程负责重建，其余进程只读映射。
+    快照过期或缺失时，调用方应回退到redis查询。
+    """
+
+    cache_type = "host"
+
+    _snapshots: dict[str, HostSnapshot] = {}
+    _checked_at: dict[str, float] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_snapshot_path(cls, bk_tenant_id: str) -> str:
+        snapshot_dir = settings.HOST_SNAPSHOT_DIR or os.path.join(tempfile.gettempdir(), "bkmonitor_host_snapshot")
+        return os.path.join(snapshot_dir, f"{cls.get_cache_key(bk_tenant_id)}.snapshot")
+
+    @classmethod
+    def build(cls, bk_tenant_id: str) -> str:
+        """
+        从redis主机缓存生成快照文件，写入临时文件后原子替换
+        """
+        path = cls.get_snapshot_path(bk_tenant_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        hosts: dict[str, str] = dict(cls.cache.hscan_iter(cls.get_cache_key(bk_tenant_id), count=1000))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                HostSnapshot.dump(hosts, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    @classmethod
+    def _try_build(cls, bk_tenant_id: str) -> None:
+        """
+        非阻塞抢占文件锁后重建快照，未抢到锁说明其他进程正在重建
+        """
+        path = cls.get_snapshot_path(bk_tenant_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return
+            try:
+                # 抢到锁后再次确认，避免重复构建
+                if not cls._is_expired(path):
+                    return
+                cls.build(bk_tenant_id)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _is_expired(path: str) -> bool:
+        try:
+            return time.time() - os.stat(path).st_mtime > settings.HOST_SNAPSHOT_TTL
+        except FileNotFoundError:
+            return True
+
+    @classmethod
+    def get_snapshot(cls, bk_tenant_id: str) -> HostSnapshot | None:
+        """
+        获取租户主机快照，按 HOST_SNAPSHOT_CHECK_INTERVAL 节流检查文件是否更新
+        同一时间只有一个线程负责检查及重建，其余线程直接使用当前快照，不阻塞等待
+        """
+        if not settings.HOST_SNAPSHOT_ENABLED:
+            return None
+
+        now = time.time()
+        snapshot = cls._snapshots.get(bk_tenant_id)
+        if now - cls._checked_at.get(bk_tenant_id, 0) < settings.HOST_SNAPSHOT_CHECK_INTERVAL:
+            return snapshot
+
+        if not cls._lock.acquire(blocking=False):
+            # 其他线程正在刷新，先返回旧快照
+            return snapshot
+
+        try:
+            if now - cls._checked_at.get(bk_tenant_id, 0) < settings.HOST_SNAPSHOT_CHECK_INTERVAL:
+                return cls._snapshots.get(bk_tenant_id)
+            cls._checked_at[bk_tenant_id] = now
+
+            path = cls.get_snapshot_path(bk_tenant_id)
+            try:
+                if cls._is_expired(path):
+                    cls._try_build(bk_tenant_id)
+
+                stat = os.stat(path)
+                if snapshot and (snapshot.stat.st_ino, snapshot.stat.st_mtime) == (stat.st_ino, stat.st_mtime):
+                    return snapshot
+
+                # 旧快照不主动关闭，可能仍有其他线程在读取，由引用计数回收
+                snapshot = HostSnapshot(path)
+            except Exception as e:  # noqa
+                logger.warning("[HostSnapshotManager] load host snapshot(%s) failed: %s", bk_tenant_id, e)
+                snapshot = None
+
+            if snapshot is None or time.time() - snapshot.built_at > settings.HOST_SNAPSHOT_TTL * 2:
+                # 快照长时间未能重建，不再使用
+                cls._snapshots.pop(bk_tenant_id, None)
+                return None
+
+            cls._snapshots[bk_tenant_id] = snapshot
+            return snapshot
+        finally:
+            cls._lock.release()
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._snapshots.clear()
+            cls._checked_at.clear()
+
+    @classmethod
+    def get(cls, *, bk_tenant_id: str, **kwargs) -> HostSnapshot | None:
+        return cls.get_snapshot(bk_tenant_id)
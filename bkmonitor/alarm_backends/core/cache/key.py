@@ -226,6 +226,26 @@ NO_DATA_LIST_KEY = register_key_with_config(
     }
 )
 
+NO_DATA_PRESENCE_KEY = register_key_with_config(
+    {
+        "label": "[access]无数据检测维度上报记录(type:Hash)(field: 无数据维度md5, value: 无数据维度)",
+        "key_type": "hash",
+        "key_tpl": "access.nodata.presence.{strategy_id}.{item_id}.{timestamp}",
+        "ttl": 10 * CONST_MINUTES,
+        "backend": "queue",
+    }
+)
+
+NO_DATA_PRESENCE_INDEX_KEY = register_key_with_config(
+    {
+        "label": "[access]无数据检测维度上报时间索引(type:SortedSet)(member/score: 数据时间戳)",
+        "key_type": "sorted_set",
+        "key_tpl": "access.nodata.presence.index.{strategy_id}.{item_id}",
+        "ttl": 10 * CONST_MINUTES,
+        "backend": "queue",
+    }
+)
+
 HISTORY_DATA_KEY = register_key_with_config(
     {
         "label": "[detect]待检测数据对应历史数据",
@@ -237,6 +257,17 @@ HISTORY_DATA_KEY = register_key_with_config(
     }
 )
 
+HISTORY_SERIES_KEY = register_key_with_config(
+    {
+        "label": "[detect]待检测数据对应历史数据(按汇聚周期分桶的列式存储，每个周期一个field)",
+        "key_type": "hash",
+        "key_tpl": "detect.history.series.{strategy_id}.{item_id}.{interval}.{bucket}",
+        "field_tpl": "{dimensions_md5}.{index}",
+        "ttl": 30 * CONST_MINUTES,
+        "backend": "service",
+    }
+)
+
 ANOMALY_LIST_KEY = register_key_with_config(
     {
         "label": "[detect]检测结果详情队列",
@@ -310,6 +341,16 @@ ACCESS_DUPLICATE_KEY = register_key_with_config(
     }
 )
 
+ACCESS_DUPLICATE_FINGERPRINT_KEY = register_key_with_config(
+    {
+        "label": "[access]数据拉取去重(定长指纹拼接)",
+        "key_type": "string",
+        "key_tpl": "access.data.duplicate.fp.strategy_group_{strategy_group_key}.{dt_event_time}",
+        "ttl": 10 * CONST_MINUTES,
+        "backend": "service",
+    }
+)
+
 ACCESS_PRIORITY_KEY = register_key_with_config(
     {
         "label": "[access]数据拉取优先级",
@@ -566,6 +607,16 @@ ALERT_DEDUPE_CONTENT_KEY = register_key_with_config(
     }
 )
 
+ALERT_DEDUPE_STATUS_KEY = register_key_with_config(
+    {
+        "label": "[alert]当前正在产生的告警状态",
+        "key_type": "string",
+        "key_tpl": "alert.builder.{strategy_id}.{dedupe_md5}.status",
+        "ttl": 2 * CONST_ONE_HOUR,
+        "backend": "service",
+    }
+)
+
 ALERT_SNAPSHOT_KEY = register_key_with_config(
     {
         "label": "[alert]告警内容快照",
@@ -576,6 +627,16 @@ ALERT_SNAPSHOT_KEY = register_key_with_config(
     }
 )
 
+ALERT_USER_CHANGE_KEY = register_key_with_config(
+    {
+        "label": "[alert]告警用户字段变更版本",
+        "key_type": "string",
+        "key_tpl": "alert.user_change.{alert_id}",
+        "ttl": CONST_ONE_DAY,
+        "backend": "service",
+    }
+)
+
 EVENT_PULL_LOCKS = register_key_with_config(
     {
         "label": "[alert]事件拉取锁",
@@ -661,6 +722,27 @@ SYNC_ACTION_LOCK_KEY = register_key_with_config(
     }
 )
 
+ACTION_CHANGE_JOURNAL_KEY = register_key_with_config(
+    {
+        "label": "[fta_action]处理记录变更记录(成员为处理记录ID，分值为变更版本)",
+        "key_type": "sorted_set",
+        "key_tpl": "fta_action.sync_action.change_journal",
+        "ttl": CONST_ONE_DAY,
+        "backend": "service",
+        "is_global": True,
+    }
+)
+
+ACTION_SYNC_CONTENT_HASH_KEY = register_key_with_config(
+    {
+        "label": "[fta_action]处理记录最近一次同步至ES的内容摘要",
+        "key_type": "string",
+        "key_tpl": "fta_action.sync_action.content.{action_id}",
+        "ttl": CONST_ONE_DAY,
+        "backend": "service",
+    }
+)
+
 LATEST_TIME_UPDATE_P_ACTION_KEY = register_key_with_config(
     {
         "label": "[fta_action]定期更新主任务状态",
@@ -100,16 +100,28 @@ class ShieldCacheManager(CacheManager):
             }
         ]
         """
-        data = cls.cache.get(cls.CACHE_KEY_TEMPLATE.format(bk_biz_id))
-        if data:
-            data = extended_json.loads(data)
-            for shield in data:
-                shield["begin_time"] = shield["begin_time"].replace(tzinfo=pytz.UTC)
-                shield["end_time"] = shield["end_time"].replace(tzinfo=pytz.UTC)
-                shield["failure_time"] = shield["end_time"].replace(tzinfo=pytz.UTC)
-            return data
-        else:
+        return cls.parse_shields(cls.get_raw_shields_by_biz_id(bk_biz_id))
+
+    @classmethod
+    def get_raw_shields_by_biz_id(cls, bk_biz_id) -> str | None:
+        """
+        按业务ID获取未解析的屏蔽配置缓存，用于判断屏蔽配置是否有变化
+        """
+        return cls.cache.get(cls.CACHE_KEY_TEMPLATE.format(bk_biz_id))
+
+    @staticmethod
+    def parse_shields(data: str | None) -> list:
+        """
+        解析屏蔽配置缓存
+        """
+        if not data:
             return []
+        data = extended_json.loads(data)
+        for shield in data:
+            shield["begin_time"] = shield["begin_time"].replace(tzinfo=pytz.UTC)
+            shield["end_time"] = shield["end_time"].replace(tzinfo=pytz.UTC)
+            shield["failure_time"] = shield["end_time"].replace(tzinfo=pytz.UTC)
+        return data
 
     @classmethod
     def refresh(cls):
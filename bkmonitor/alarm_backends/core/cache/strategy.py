@@ -9,8 +9,10 @@ specific language governing permissions and limitations under the License.
 """
 
 import copy
+import hashlib
 import json
 import logging
+import threading
 import time
 from collections import defaultdict
 from collections.abc import Callable, Iterable
@@ -83,6 +85,10 @@ class StrategyCacheManager(CacheManager):
     STRATEGY_GROUP_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".strategy_group"
     # 最近增量更新时间
     LAST_UPDATED_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".last_updated"
+    # 策略缓存全局版本号，策略详情有变更(新增/修改/删除)时递增
+    VERSION_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".strategy_version"
+    # 策略详情版本，数据结构是hash，field 为策略ID，value 为策略详情的md5
+    VERSIONS_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".strategy_versions"
     # 事件型时序检测周期(默认60s)
     fake_event_agg_interval = 60
     # 实例维度
@@ -610,6 +616,53 @@ class StrategyCacheManager(CacheManager):
         strategy = json.loads(cls.cache.get(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id)) or "null")
         return strategy
 
+    @classmethod
+    def get_strategy_snapshot(cls, strategy_id: int) -> dict:
+        """
+        从进程内快照获取策略详情，快照失效或未开启时回退到 get_strategy_by_id
+        """
+        if not settings.STRATEGY_SNAPSHOT_CACHE_ENABLED:
+            return cls.get_strategy_by_id(strategy_id)
+        return strategy_snapshot_store.get(strategy_id)
+
+    @staticmethod
+    def get_strategy_version(strategy_json: str) -> str:
+        """
+        策略详情版本号
+        """
+        return hashlib.md5(strategy_json.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def delete_strategies(cls, strategy_ids: Iterable[int]):
+        """
+        删除策略详情缓存，并递增全局版本号通知各进程清理快照
+        """
+        strategy_ids = list(strategy_ids)
+        if not strategy_ids:
+            return
+
+        pipeline = cls.cache.pipeline()
+        for strategy_id in strategy_ids:
+            pipeline.delete(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id))
+        pipeline.hdel(cls.VERSIONS_CACHE_KEY, *strategy_ids)
+        pipeline.incr(cls.VERSION_CACHE_KEY)
+        pipeline.expire(cls.VERSION_CACHE_KEY, cls.CACHE_TIMEOUT)
+        pipeline.execute()
+
+    @classmethod
+    def update_strategy(cls, strategy_id: int, strategy: dict):
+        """
+        局部更新单个策略详情缓存，同时更新策略版本并递增全局版本号通知各进程刷新快照
+        """
+        strategy_json = json.dumps(strategy)
+        pipeline = cls.cache.pipeline()
+        pipeline.set(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id), strategy_json, cls.CACHE_TIMEOUT)
+        pipeline.hset(cls.VERSIONS_CACHE_KEY, str(strategy_id), cls.get_strategy_version(strategy_json))
+        pipeline.expire(cls.VERSIONS_CACHE_KEY, cls.CACHE_TIMEOUT)
+        pipeline.incr(cls.VERSION_CACHE_KEY)
+        pipeline.expire(cls.VERSION_CACHE_KEY, cls.CACHE_TIMEOUT)
+        pipeline.execute()
+
     @classmethod
     def get_all_bk_biz_ids(cls) -> list:
         """
@@ -755,12 +808,14 @@ class StrategyCacheManager(CacheManager):
         cls.cache.set(cls.IDS_CACHE_KEY, json.dumps(list(updated_strategy_ids)), cls.CACHE_TIMEOUT)
 
         # 遍历旧的策略ID列表，检查是否有不在新策略列表中的ID。
+        deleted_strategy_ids = []
         for strategy_id in old_strategy_ids:
             # 如果旧列表中的ID在新列表中找不到，则说明该策略已被删除或更改。
             if strategy_id not in updated_strategy_ids:
                 logger.info(f"[smart_strategy_cache]: refresh_strategy_ids delete strategy: {strategy_id}")
-                # 从缓存中删除该策略的相关信息。
-                cls.cache.delete(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id))
+                deleted_strategy_ids.append(strategy_id)
+        # 从缓存中删除该策略的相关信息。
+        cls.delete_strategies(deleted_strategy_ids)
 
     @classmethod
     def refresh_bk_biz_ids(cls, strategies: list[dict], partial=None):
@@ -917,13 +972,17 @@ class StrategyCacheManager(CacheManager):
         # 初始化策略分组缓存结构
         strategy_groups = defaultdict(lambda: defaultdict(list))
 
+        # 策略详情版本，只有版本变化的策略才需要各进程刷新快照
+        old_versions = cls.cache.hgetall(cls.VERSIONS_CACHE_KEY) or {}
+        versions = {}
+
         # 开启缓存pipeline以优化写入性能
         pipeline = cls.cache.pipeline()
         for strategy in strategies:
             # 将策略信息存储到缓存中
-            pipeline.set(
-                cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy["id"]), json.dumps(strategy), cls.CACHE_TIMEOUT
-            )
+            strategy_json = json.dumps(strategy)
+            pipeline.set(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy["id"]), strategy_json, cls.CACHE_TIMEOUT)
+            versions[str(strategy["id"])] = cls.get_strategy_version(strategy_json)
             # 默认周期 50s
             for item in strategy["items"]:
                 if item.get("query_md5"):
@@ -971,6 +1030,14 @@ class StrategyCacheManager(CacheManager):
         # 设置缓存过期时间
         pipeline.expire(cls.STRATEGY_GROUP_CACHE_KEY, cls.CACHE_TIMEOUT)
 
+        # 更新策略版本，存在变更时递增全局版本号
+        if versions:
+            pipeline.hmset(cls.VERSIONS_CACHE_KEY, versions)
+        pipeline.expire(cls.VERSIONS_CACHE_KEY, cls.CACHE_TIMEOUT)
+        if any(old_versions.get(strategy_id) != version for strategy_id, version in versions.items()):
+            pipeline.incr(cls.VERSION_CACHE_KEY)
+        pipeline.expire(cls.VERSION_CACHE_KEY, cls.CACHE_TIMEOUT)
+
         # 执行pipeline中的所有操作
         pipeline.execute()
 
@@ -1142,8 +1209,7 @@ class StrategyCacheManager(CacheManager):
         histories = StrategyHistoryModel.objects.filter(create_time__gt=datetime.fromtimestamp(process_time))
         if histories.exists():
             target_biz_set, to_be_deleted_strategy_ids = cls.handle_history_strategies(histories, with_group_key=False)
-            for strategy_id, _ in to_be_deleted_strategy_ids:
-                cls.cache.delete(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id))
+            cls.delete_strategies([strategy_id for strategy_id, _ in to_be_deleted_strategy_ids])
 
         duration = time.time() - start_time
         metrics.ALARM_CACHE_TASK_TIME.labels("0", "strategy", str(exc)).observe(duration)
@@ -1330,6 +1396,82 @@ class StrategyCacheManager(CacheManager):
                     sync_aiops_strategy_signal("modify", change_record["strategy_id"], changed_time)
 
 
+class StrategySnapshotStore:
+    """
+    进程内策略快照缓存
+
+    按策略ID缓存策略详情原文及其版本(md5)，避免每次实例化 Strategy 都访问 redis。
+    每隔 STRATEGY_SNAPSHOT_CHECK_INTERVAL 秒检查一次全局版本号，版本号变化时批量读取已缓存策略的版本，
+    只清理发生变化的策略。全局版本号不存在时(缓存未按版本刷新)直接读取 redis，不做进程内缓存。
+    """
+
+    def __init__(self):
+        # strategy_id -> (version, strategy_json)
+        self._snapshots: dict[int, tuple[str, str]] = {}
+        self._global_version = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, strategy_id: int) -> dict | None:
+        strategy_id = int(strategy_id)
+        if not self.validate():
+            return StrategyCacheManager.get_strategy_by_id(strategy_id)
+
+        snapshot = self._snapshots.get(strategy_id)
+        if snapshot is None:
+            strategy_json = StrategyCacheManager.cache.get(
+                StrategyCacheManager.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id)
+            )
+            if not strategy_json:
+                return None
+            snapshot = (StrategyCacheManager.get_strategy_version(strategy_json), strategy_json)
+            self._snapshots[strategy_id] = snapshot
+
+        # 调用方可能会修改策略配置，因此每次返回新的对象
+        return json.loads(snapshot[1])
+
+    def validate(self) -> bool:
+        """
+        检查全局版本号，清理发生变化的策略快照
+        :return: 快照是否可用
+        """
+        now = time.time()
+        if now - self._checked_at < settings.STRATEGY_SNAPSHOT_CHECK_INTERVAL:
+            return self._global_version is not None
+
+        with self._lock:
+            if now - self._checked_at < settings.STRATEGY_SNAPSHOT_CHECK_INTERVAL:
+                return self._global_version is not None
+            self._checked_at = now
+
+            global_version = StrategyCacheManager.cache.get(StrategyCacheManager.VERSION_CACHE_KEY)
+            if global_version is None:
+                self.clear()
+                return False
+
+            if global_version != self._global_version:
+                self._invalidate_changed()
+                self._global_version = global_version
+            return True
+
+    def _invalidate_changed(self):
+        strategy_ids = list(self._snapshots.keys())
+        for chunk_ids in chunks(strategy_ids, 1000):
+            versions = StrategyCacheManager.cache.hmget(StrategyCacheManager.VERSIONS_CACHE_KEY, chunk_ids)
+            for strategy_id, version in zip(chunk_ids, versions):
+                snapshot = self._snapshots.get(strategy_id)
+                # 版本中已不存在的策略(已删除)同样清理，避免快照随策略删除无限增长
+                if version is None or (snapshot and snapshot[0] != version):
+                    self._snapshots.pop(strategy_id, None)
+
+    def clear(self):
+        self._snapshots = {}
+        self._global_version = None
+
+
+strategy_snapshot_store = StrategySnapshotStore()
+
+
 class TargetShieldProcessor:
     """
     策略目标抑制处理器
@@ -20,6 +20,7 @@ from alarm_backends.core.control.mixins import CheckMixin, DetectMixin, DoubleCh
 from alarm_backends.core.detect_result import CONST_MAX_LEN_CHECK_RESULT
 from bkmonitor.data_source import load_data_source
 from bkmonitor.data_source.unify_query.query import UnifyQuery
+from bkmonitor.data_source.unify_query.result import ColumnarQueryResult
 from bkmonitor.utils.common_utils import safe_int
 from bkmonitor.utils.range import load_condition_instance
 from bkmonitor.utils.range.target import TargetCondition
@@ -108,8 +109,19 @@ class Item(DetectMixin, CheckMixin, DoubleCheckMixin):
         point_remain = detect_result_point_required(self.strategy.config)
         return point_remain * interval
 
-    def query_record(self, start_time: int, end_time: int) -> list:
-        records = self.query.query_data(start_time * 1000, end_time * 1000)
+    def query_record(self, start_time: int, end_time: int, columnar: bool = False) -> list | ColumnarQueryResult:
+        """
+        查询数据
+        :param columnar: 是否允许返回列式结果(统一查询时生效)，调用方需要兼容 ColumnarQueryResult
+        """
+        if not columnar:
+            records = self.query.query_data(start_time * 1000, end_time * 1000)
+        else:
+            records = self.query.query_data(start_time * 1000, end_time * 1000, columnar=True)
+            if isinstance(records, ColumnarQueryResult):
+                records.map_column("_time_", lambda t: t // 1000)
+                return records
+
         for record in records:
             record["_time_"] //= 1000
         return records
@@ -230,24 +242,22 @@ class Item(DetectMixin, CheckMixin, DoubleCheckMixin):
                     and_cond.append(t)
                 return load_condition_instance([and_cond])
 
+    @cached_property
+    def range_matchers(self) -> list:
+        """
+        编译后的范围匹配函数，按顺序依次为：
+        1. 监控目标
+        2. 监控条件(即where条件)
+        3. 额外的内置监控条件(针对磁盘、网络做的特殊处理)
+        """
+        condition_objs = [self.target_condition_obj, self.agg_condition_obj, self.extra_agg_condition_obj]
+        return [condition_obj.compile() for condition_obj in condition_objs if condition_obj]
+
     def is_range_match(self, dimensions):
-        # 1. 匹配监控目标
-        is_match = True
-        target_condition_obj = self.target_condition_obj
-        if target_condition_obj:
-            is_match = target_condition_obj.is_match(dimensions)
-
-        # 2. 匹配监控条件(即where条件)
-        agg_condition_target_obj = self.agg_condition_obj
-        if agg_condition_target_obj:
-            is_match = is_match and agg_condition_target_obj.is_match(dimensions)
-
-        # 3. 匹配额外的内置监控条件(针对磁盘、网络做的特殊处理)
-        extra_agg_condition_target_obj = self.extra_agg_condition_obj
-        if extra_agg_condition_target_obj:
-            is_match = is_match and extra_agg_condition_target_obj.is_match(dimensions)
-
-        return is_match
+        for matcher in self.range_matchers:
+            if not matcher(dimensions):
+                return False
+        return True
 
     @cached_property
     def use_aiops_sdk(self):
@@ -9,16 +9,18 @@ specific language governing permissions and limitations under the License.
 """
 
 import logging
+import threading
 from collections import OrderedDict, defaultdict
 from typing import TYPE_CHECKING
 
+from django.conf import settings
 from django.utils.module_loading import import_string
 from django.utils.translation import gettext as _
 
 from alarm_backends.constants import LATEST_POINT_WITH_ALL_KEY
 from alarm_backends.core.cache.key import LAST_CHECKPOINTS_CACHE_KEY
 from alarm_backends.core.detect_result import ANOMALY_LABEL, CheckResult
-from bkmonitor.utils.common_utils import chunks
+from bkmonitor.utils.common_utils import chunks, count_md5
 from bkmonitor.utils.text import camel_to_underscore
 from constants.data_source import DataTypeLabel
 
@@ -50,37 +52,103 @@ def load_detector_cls(_type) -> type["BasicAlgorithmsCollection"]:
     return cls
 
 
+def build_detector(detect_config) -> "BasicAlgorithmsCollection":
+    algorithm_type = detect_config["type"]
+    algorithm_unit = detect_config.get("unit_prefix", "")
+    algorithm_config = detect_config.get("config", {})
+    detector_cls = load_detector_cls(algorithm_type)
+
+    # 使用白名单方式提取控制参数
+    # 只提取 EXTRA_CONFIG_KEYS 中定义的参数
+    extra_config = {k: algorithm_config[k] for k in EXTRA_CONFIG_KEYS if k in algorithm_config}
+
+    return detector_cls(algorithm_config, algorithm_unit, extra_config=extra_config)
+
+
+class DetectorPlan:
+    """
+    监控项检测计划: 按告警级别分组的检测器实例及同级别算法连接符
+    检测器在构建时完成配置校验和表达式编译，同一算法配置的多次检测直接复用
+    """
+
+    def __init__(self, item):
+        algorithm_group = defaultdict(list)
+        for _config in item.algorithms:
+            algorithm_group[int(_config["level"])].append(_config)
+
+        # [(level, algorithm_connector, detector_list)]
+        self.levels = [
+            (level, item.algorithm_connectors[level], [build_detector(config) for config in algorithm_group[level]])
+            for level in sorted(algorithm_group.keys())
+        ]
+
+    @staticmethod
+    def get_plan_key(item) -> str:
+        """
+        检测计划版本: 策略更新时间、算法配置及各级别连接符
+        """
+        levels = sorted({int(_config["level"]) for _config in item.algorithms})
+        return count_md5(
+            [
+                item.strategy.config.get("update_time"),
+                item.algorithms,
+                [(level, item.algorithm_connectors.get(level, "and")) for level in levels],
+            ],
+            list_sort=False,
+        )
+
+
+class DetectorPlanCache(threading.local):
+    """
+    进程内检测计划缓存，按 (strategy_id, item_id) 保存最近一次的检测计划
+    检测器实例在检测过程中会保存历史数据等临时状态，因此按线程隔离
+    """
+
+    def __init__(self):
+        self.plans: OrderedDict[tuple[int, int], tuple[str, DetectorPlan]] = OrderedDict()
+
+    def get(self, item) -> DetectorPlan:
+        if not settings.DETECTOR_PLAN_CACHE_SIZE:
+            return DetectorPlan(item)
+
+        cache_key = (item.strategy.id, item.id)
+        plan_key = DetectorPlan.get_plan_key(item)
+        cached = self.plans.get(cache_key)
+        if cached and cached[0] == plan_key:
+            self.plans.move_to_end(cache_key)
+            return cached[1]
+
+        plan = DetectorPlan(item)
+        self.plans[cache_key] = (plan_key, plan)
+        self.plans.move_to_end(cache_key)
+        while len(self.plans) > settings.DETECTOR_PLAN_CACHE_SIZE:
+            self.plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        self.plans.clear()
+
+
+detector_plan_cache = DetectorPlanCache()
+
+
 class DetectMixin:
     def detect(self, data_points):
+        from alarm_backends.service.detect.strategy import filter_batch_candidates
+
         if not data_points:
             return []
 
-        algorithm_group = defaultdict(list)
-        for _config in self.algorithms:
-            level = int(_config["level"])
-            algorithm_group[level].append(_config)
-
-        levels = sorted(algorithm_group.keys())
+        plan = detector_plan_cache.get(self)
 
         # 初始化检测结果
         detected_result_dict = OrderedDict()
 
-        for level in levels:
-            # 同级别算法连接符(and/or)
-            algorithm_connector = self.algorithm_connectors[level]
-
-            detector_list = []
-            for detect_config in algorithm_group[level]:
-                algorithm_type = detect_config["type"]
-                algorithm_unit = detect_config.get("unit_prefix", "")
-                algorithm_config = detect_config.get("config", {})
-                detector_cls = load_detector_cls(algorithm_type)
-
-                # 使用白名单方式提取控制参数
-                # 只提取 EXTRA_CONFIG_KEYS 中定义的参数
-                extra_config = {k: algorithm_config[k] for k in EXTRA_CONFIG_KEYS if k in algorithm_config}
-
-                detector = detector_cls(algorithm_config, algorithm_unit, extra_config=extra_config)
+        # algorithm_connector: 同级别算法连接符(and/or)
+        for level, algorithm_connector, detector_list in plan.levels:
+            for detector in detector_list:
+                # 复用的检测器需要清理上一次检测的临时状态
+                detector.reset_run_state()
 
                 # 判断算法是否需要查询历史数据
                 if hasattr(detector, "history_point_fetcher"):
@@ -94,14 +162,13 @@ class DetectMixin:
                 if hasattr(detector, "pre_detect"):
                     detector.pre_detect(data_points)
 
-                detector_list.append(detector)
-
             if len(detector_list) == 1:
                 anomaly_records = detector_list[0].detect_records(data_points, level)
             else:
                 # 组合策略
                 anomaly_records = []
-                for data_point in data_points:
+                # 批量预筛选，只对可能异常的数据点做逐点组合检测
+                for data_point in filter_batch_candidates(data_points, detector_list, algorithm_connector):
                     ap = None
                     prefix = suffix = ""
                     for d in detector_list:
@@ -136,7 +203,8 @@ class DetectMixin:
                     if ap:
                         ap.anomaly_message = prefix + ap.anomaly_message + suffix
                         logger.info(
-                            f"[detect] strategy({ap.data_point.item.strategy.id}) item({ap.data_point.item.id}) level[{level}] 发现异常点: {ap.__dict__}"
+                            f"[detect] strategy({ap.data_point.item.strategy.id}) item({ap.data_point.item.id}) "
+                            f"level[{level}] 发现异常点: record_id({ap.data_point.record_id}) value({ap.data_point.value})"
                         )
                         anomaly_records.append(ap)
 
@@ -54,7 +54,12 @@ class CheckMixin:
 
         return True
 
-    def check(self, data_points, check_timestamp):
+    def check(self, data_points, check_timestamp, presence=None):
+        """
+        :param data_points: access 推送的待检测数据点
+        :param check_timestamp: 检测时刻
+        :param presence: access 记录的无数据维度上报情况 {dimensions_md5: (最新上报时间, 无数据维度)}
+        """
         scenario_cls = import_string("alarm_backends.service.nodata.scenarios.base.SCENARIO_CLS")
         scenario = self.strategy.scenario
         if scenario not in scenario_cls:
@@ -64,6 +69,8 @@ class CheckMixin:
         no_data_dimensions = scenario_checker.get_no_data_dimensions()
         # 2. 将 access 获取的上报数据按无数据维度和监控目标降维，并加入无数据维度标记
         result = self._process_dimensions(no_data_dimensions, data_points)
+        if presence:
+            self._merge_presence(result, presence)
         data_dimensions = result["data_dimensions"]
         dimensions_md5_timestamp = result["dimensions_md5_timestamp"]
         data_dimensions_mds = result["data_dimensions_mds"]
@@ -92,25 +99,19 @@ class CheckMixin:
 
             # 5. 生成异常记录，生成规则：1）当前监测点无数据 or 2）当前监测点有数据，但是数据上报时间晚于 last_check_point
             anomaly_data = []
-            target_dimensions_md5 = []
-            last_check_cache_key = key.LAST_CHECKPOINTS_CACHE_KEY.get_key(strategy_id=self.strategy.id, item_id=self.id)
-            for target_inst_dms in target_instance_dimensions:
-                target_dms_md5 = count_md5(target_inst_dms)
-                target_dimensions_md5.append(target_dms_md5)
-                # 之前检测的数据最后上报点
-                last_checkpoint_cache_field = key.LAST_CHECKPOINTS_CACHE_KEY.get_field(
-                    dimensions_md5=target_dms_md5,
-                    level=self.no_data_level,
-                )
-                last_point = key.LAST_CHECKPOINTS_CACHE_KEY.client.hget(
-                    last_check_cache_key, last_checkpoint_cache_field
-                )
+            recover_dimensions_md5 = []
+            target_dimensions_md5 = [count_md5(target_inst_dms) for target_inst_dms in target_instance_dimensions]
+            # 之前检测的数据最后上报点，一次批量读取
+            last_points = self._get_last_checkpoints(target_dimensions_md5)
+            for target_inst_dms, target_dms_md5, last_point in zip(
+                target_instance_dimensions, target_dimensions_md5, last_points
+            ):
                 if target_dms_md5 not in dimensions_md5_timestamp or (
                     last_point and dimensions_md5_timestamp[target_dms_md5] < int(last_point)
                 ):
                     # 如果存在主机维度，判断其是否存在于业务中
                     if not self._is_host_dimension_in_business(target_inst_dms):
-                        self.recover(target_dms_md5)
+                        recover_dimensions_md5.append(target_dms_md5)
                         continue
 
                     anomaly_data.append(self._produce_anomaly_info(check_timestamp, target_inst_dms, target_dms_md5))
@@ -121,7 +122,8 @@ class CheckMixin:
                     )
                 else:
                     # recovery 历史告警事件
-                    self.recover(target_dms_md5)
+                    recover_dimensions_md5.append(target_dms_md5)
+            self.recover(*recover_dimensions_md5)
 
             # 6. 如果有不存在的目标实例，生成异常记录
             for missing_target_inst in missing_target_instances:
@@ -145,6 +147,37 @@ class CheckMixin:
         )
         return anomaly_data
 
+    @staticmethod
+    def _merge_presence(result, presence):
+        """
+        :summary: 将 access 记录的无数据维度上报情况合并到降维结果中
+        :param result: _process_dimensions 返回的降维结果
+        :param presence: {dimensions_md5: (最新上报时间, 无数据维度)}
+        """
+        dimensions_md5_timestamp = result["dimensions_md5_timestamp"]
+        for dimensions_md5, (timestamp, dimensions) in presence.items():
+            if dimensions_md5 not in dimensions_md5_timestamp:
+                result["data_dimensions"].append(dimensions)
+                result["data_dimensions_mds"].append(dimensions_md5)
+                dimensions_md5_timestamp[dimensions_md5] = timestamp
+            elif timestamp > dimensions_md5_timestamp[dimensions_md5]:
+                dimensions_md5_timestamp[dimensions_md5] = timestamp
+
+    def _get_last_checkpoints(self, dimensions_md5_list):
+        """
+        :summary: 批量获取维度最后上报点
+        :return: 与 dimensions_md5_list 一一对应的最后上报点，不存在时为 None
+        """
+        if not dimensions_md5_list:
+            return []
+        fields = [
+            key.LAST_CHECKPOINTS_CACHE_KEY.get_field(dimensions_md5=dimensions_md5, level=self.no_data_level)
+            for dimensions_md5 in dimensions_md5_list
+        ]
+        return key.LAST_CHECKPOINTS_CACHE_KEY.client.hmget(
+            key.LAST_CHECKPOINTS_CACHE_KEY.get_key(strategy_id=self.strategy.id, item_id=self.id), fields
+        )
+
     @staticmethod
     def _process_dimensions(no_data_dimensions, data_points):
         # 上报数据维度
@@ -345,10 +378,18 @@ class CheckMixin:
         )
         CheckResult.expire_last_checkpoint_cache(strategy_id=self.strategy.id, item_id=self.id)
 
-    def recover(self, dimensions_md5):
+    def recover(self, *dimensions_md5_list):
+        """
+        :summary: 清理维度的无数据异常检测点，支持批量
+        """
+        if not dimensions_md5_list:
+            return
         key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.client.hdel(
             key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.get_key(),
-            key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.get_field(
-                strategy_id=self.strategy.id, item_id=self.id, dimensions_md5=dimensions_md5
-            ),
+            *[
+                key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.get_field(
+                    strategy_id=self.strategy.id, item_id=self.id, dimensions_md5=dimensions_md5
+                )
+                for dimensions_md5 in dimensions_md5_list
+            ],
         )
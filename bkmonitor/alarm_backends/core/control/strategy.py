@@ -38,7 +38,7 @@ class Strategy:
     @property
     def config(self) -> dict:
         if self._config is None:
-            self._config = StrategyCacheManager.get_strategy_by_id(self.strategy_id) or {}
+            self._config = StrategyCacheManager.get_strategy_snapshot(self.strategy_id) or {}
         return self._config
 
     @property
@@ -0,0 +1,341 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import kafka
+import kafka.errors
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+
+from core.prometheus import metrics
+
+logger = logging.getLogger("core.storage.kafka")
+
+
+class ProducerBackend:
+    """
+    消息发送后端，send 发送失败时抛出异常
+    """
+
+    def __init__(self, hosts: list[str]):
+        self.hosts = hosts
+
+    def send(self, topic: str, messages: list[bytes]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class KafkaProducerBackend(ProducerBackend):
+    """
+    基于 kafka-python KafkaProducer 的发送后端
+    """
+
+    def __init__(self, hosts: list[str]):
+        super().__init__(hosts)
+        self.producer = kafka.KafkaProducer(
+            bootstrap_servers=hosts,
+            compression_type=settings.KAFKA_EVENT_PRODUCER_COMPRESSION or None,
+            retries=3,
+            linger_ms=0,
+        )
+
+    def send(self, topic: str, messages: list[bytes]):
+        futures = [self.producer.send(topic, value=message) for message in messages]
+        self.producer.flush(timeout=settings.KAFKA_EVENT_PRODUCER_FLUSH_TIMEOUT)
+        failed = [future for future in futures if not future.succeeded()]
+        if failed:
+            raise kafka.errors.KafkaError(f"{len(failed)}/{len(futures)} messages failed: {failed[0].exception}")
+
+    def close(self):
+        self.producer.close(timeout=settings.KAFKA_EVENT_PRODUCER_FLUSH_TIMEOUT)
+
+
+class MemoryProducerBackend(ProducerBackend):
+    """
+    进程内发送后端，消息按 topic 保存在内存中，用于单元测试及压测回放
+    """
+
+    def __init__(self, hosts: list[str]):
+        super().__init__(hosts)
+        self.lock = threading.Lock()
+        self.messages = defaultdict(list)
+
+    def send(self, topic: str, messages: list[bytes]):
+        with self.lock:
+            self.messages[topic].extend(messages)
+
+    def pop_messages(self) -> list[tuple[str, bytes]]:
+        """
+        取出并清空已发送的消息
+        """
+        with self.lock:
+            messages = [(topic, message) for topic, values in self.messages.items() for message in values]
+            self.messages.clear()
+        return messages
+
+
+PRODUCER_BACKENDS = {
+    "kafka": KafkaProducerBackend,
+    "memory": MemoryProducerBackend,
+}
+
+
+class DeliveryReport:
+    """
+    单次 send 调用的投递结果，所有消息处理完成后回调 callback(delivered, failed)
+    """
+
+    __slots__ = ("remaining", "delivered", "failed", "callback", "lock")
+
+    def __init__(self, count, callback):
+        self.remaining = count
+        self.delivered = 0
+        self.failed = 0
+        self.callback = callback
+        # 队列满时调用方线程与后台线程可能同时更新
+        self.lock = threading.Lock()
+
+    def done(self, success):
+        with self.lock:
+            if success:
+                self.delivered += 1
+            else:
+                self.failed += 1
+            self.remaining -= 1
+            finished = self.remaining == 0
+        if finished and self.callback:
+            try:
+                self.callback(self.delivered, self.failed)
+            except Exception as e:
+                logger.exception("[kafka producer] delivery callback error: %s", e)
+
+
+class AsyncEventProducer:
+    """
+    后台批量发送消息的生产者
+    - 调用方只把消息放入有界队列，由后台线程按数量(batch_size)或时间(linger_seconds)攒批后发送
+    - 发送失败时按 retry_backoff 指数退避重试 retries 次，最终失败通过 callback 的 failed 通知调用方
+    - 队列已满时最多等待 block_timeout 秒，仍然放不进去则由调用方线程同步发送，最终失败时抛出异常
+    - 进程退出时(atexit/celery worker_process_shutdown)会尽量把队列中的消息发送完
+    """
+
+    def __init__(self, name: str, backend: ProducerBackend):
+        self.name = name
+        self.backend = backend
+        self.batch_size = settings.KAFKA_EVENT_PRODUCER_BATCH_SIZE
+        self.linger_seconds = settings.KAFKA_EVENT_PRODUCER_LINGER_SECONDS
+        self.block_timeout = settings.KAFKA_EVENT_PRODUCER_BLOCK_TIMEOUT
+        self.retries = settings.KAFKA_EVENT_PRODUCER_RETRIES
+        self.retry_backoff = settings.KAFKA_EVENT_PRODUCER_RETRY_BACKOFF
+        self.queue = queue.Queue(maxsize=settings.KAFKA_EVENT_PRODUCER_QUEUE_SIZE)
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, name=f"kafka-producer-{self.name}", daemon=True)
+            self.thread.start()
+
+    def send(self, topic: str, messages: list[bytes], callback=None):
+        """
+        异步发送消息
+        :param callback: 本次所有消息处理完成后回调 callback(delivered, failed)
+        """
+        if not messages:
+            return
+        self.start()
+        report = DeliveryReport(len(messages), callback)
+        for index, message in enumerate(messages):
+            try:
+                self.queue.put((topic, message, report), timeout=self.block_timeout)
+            except queue.Full:
+                # 后台发送跟不上时由调用方同步发送剩余消息，把背压传递给上游
+                metrics.KAFKA_PRODUCER_BACKPRESSURE_COUNT.labels(producer=self.name).inc()
+                logger.warning("[kafka producer] producer(%s) queue is full, send synchronously", self.name)
+                self.deliver(topic, [(message, report) for message in messages[index:]], raise_exception=True)
+                break
+        metrics.KAFKA_PRODUCER_QUEUE_SIZE.labels(producer=self.name).set(self.queue.qsize())
+
+    def send_sync(self, topic: str, messages: list[bytes]):
+        """
+        在调用方线程同步发送消息，重试后仍然失败时抛出异常
+        """
+        if not messages:
+            return
+        report = DeliveryReport(len(messages), None)
+        self.deliver(topic, [(message, report) for message in messages], raise_exception=True)
+
+    def run(self):
+        while not (self.stopped.is_set() and self.queue.empty()):
+            batch = self.collect()
+            if not batch:
+                continue
+
+            batches = defaultdict(list)
+            for topic, message, report in batch:
+                batches[topic].append((message, report))
+            for topic, items in batches.items():
+                self.deliver(topic, items)
+            for _ in batch:
+                self.queue.task_done()
+            metrics.KAFKA_PRODUCER_QUEUE_SIZE.labels(producer=self.name).set(self.queue.qsize())
+
+    def collect(self):
+        """
+        从队列中攒批，达到 batch_size 或等待超过 linger_seconds 即返回
+        """
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.time() + self.linger_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0 and not self.stopped.is_set():
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def deliver(self, topic, items, raise_exception=False):
+        """
+        发送一批消息，失败时指数退避重试
+        :param raise_exception: 重试后仍然失败时是否抛出异常
+        """
+        start = time.time()
+        messages = [message for message, _ in items]
+        error = None
+        for retry in range(self.retries + 1):
+            if retry:
+                time.sleep(self.retry_backoff * 2 ** (retry - 1))
+            try:
+                self.backend.send(topic, messages)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                logger.warning(
+                    "[kafka producer] producer(%s) send %s messages to topic(%s) error(retry %s): %s",
+                    self.name,
+                    len(items),
+                    topic,
+                    retry,
+                    e,
+                )
+
+        success = error is None
+        if not success:
+            logger.error(
+                "[kafka producer] producer(%s) drop %s messages to topic(%s) after %s retries: %s",
+                self.name,
+                len(items),
+                topic,
+                self.retries,
+                error,
+            )
+
+        status = metrics.StatusEnum.SUCCESS if success else metrics.StatusEnum.FAILED
+        metrics.KAFKA_PRODUCER_SEND_COUNT.labels(producer=self.name, topic=topic, status=status).inc(len(items))
+        metrics.KAFKA_PRODUCER_SEND_LATENCY.labels(producer=self.name).observe(time.time() - start)
+        for _, report in items:
+            report.done(success)
+        if error is not None and raise_exception:
+            raise error
+
+    def flush(self, timeout=None) -> bool:
+        """
+        等待队列中的消息处理完成，超时返回 False
+        """
+        if timeout is None:
+            timeout = settings.KAFKA_EVENT_PRODUCER_FLUSH_TIMEOUT
+        deadline = time.time() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """
+        发送完队列中的消息后停止后台线程
+        """
+        if timeout is None:
+            timeout = settings.KAFKA_EVENT_PRODUCER_FLUSH_TIMEOUT
+        if not self.flush(timeout):
+            logger.warning("[kafka producer] producer(%s) close with %s messages left", self.name, self.queue.qsize())
+        self.stopped.set()
+        if self.thread:
+            self.thread.join(timeout)
+        self.backend.close()
+
+
+_producers = {}
+_producers_lock = threading.Lock()
+
+
+def get_event_producer() -> AsyncEventProducer:
+    """
+    获取当前进程共享的生产者(使用告警专用 kafka 集群 ALERT_KAFKA_HOST)，fork 出的子进程会重新创建
+    """
+    name = "alert"
+    backend_type = settings.KAFKA_EVENT_PRODUCER_BACKEND
+    producer_key = (name, backend_type)
+    producer = _producers.get(producer_key)
+    if producer and producer.pid == os.getpid():
+        return producer
+
+    with _producers_lock:
+        producer = _producers.get(producer_key)
+        if producer and producer.pid == os.getpid():
+            return producer
+
+        hosts = [f"{settings.ALERT_KAFKA_HOST[0]}:{settings.ALERT_KAFKA_PORT}"]
+        producer = AsyncEventProducer(name, PRODUCER_BACKENDS[backend_type](hosts))
+        _producers[producer_key] = producer
+    return producer
+
+
+def close_event_producers(**kwargs):
+    """
+    进程退出前发送完所有生产者队列中的消息
+    """
+    pid = os.getpid()
+    for producer_key, producer in list(_producers.items()):
+        if producer.pid != pid:
+            continue
+        try:
+            producer.close()
+        except Exception as e:
+            logger.exception("[kafka producer] close producer(%s) error: %s", producer.name, e)
+        _producers.pop(producer_key, None)
+
+
+atexit.register(close_event_producers)
+# celery 子进程退出时不会执行 atexit
+worker_process_shutdown.connect(close_event_producers, weak=False)
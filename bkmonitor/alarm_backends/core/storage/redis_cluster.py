@@ -8,10 +8,21 @@ Unless required by applicable law or agreed to in writing, software distributed
 an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
+import logging
+import os
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
 from alarm_backends.core.cluster import get_cluster
 from alarm_backends.core.storage.redis import CACHE_BACKEND_CONF_MAP, Cache
 from bkmonitor.models import CacheNode, CacheRouter
 
+logger = logging.getLogger("core.storage.redis")
+
 
 class RedisNode(object):
     redis_type = "RedisCache"
@@ -122,22 +133,32 @@ class RedisProxy(KeyRouterMixin):
 
         return self._client_pool[node.id]
 
+    def execute_on_node(self, strategy_id, name, *args, **kwargs):
+        exception = None
+        cache_node = get_node_by_strategy_id(strategy_id)
+        client = self.get_client(cache_node)
+        command = getattr(client, name)
+
+        for _ in range(3):
+            try:
+                return command(*args, **kwargs)
+            except ConnectionError as err:
+                exception = err
+                client.refresh_instance()
+        if exception:
+            raise exception
+
+    def eval(self, script, numkeys, *keys_and_args):
+        """
+        lua 脚本按第一个 key 路由，脚本中的所有 key 需要属于同一个策略
+        """
+        strategy_id = self.strategy_id_from_key(keys_and_args[0]) if numkeys else 0
+        return self.execute_on_node(strategy_id, "eval", script, numkeys, *keys_and_args)
+
     def __getattr__(self, name):
         def handle(*args, **kwargs):
-            exception = None
             strategy_id = self.strategy_id_from_command(*args, **kwargs)
-            cache_node = get_node_by_strategy_id(strategy_id)
-            client = self.get_client(cache_node)
-            command = getattr(client, name)
-
-            for _ in range(3):
-                try:
-                    return command(*args, **kwargs)
-                except ConnectionError as err:
-                    exception = err
-                    client.refresh_instance()
-            if exception:
-                raise exception
+            return self.execute_on_node(strategy_id, name, *args, **kwargs)
 
         return handle
 
@@ -162,8 +183,26 @@ class PipelineProxy(KeyRouterMixin):
     def execute(self):
         p_result = {}
         result = []
-        for node_id, pipeline_instance in self._pipeline_pool.items():
-            p_result[node_id] = list(reversed(getattr(pipeline_instance, "execute")()))
+        pipelines = list(self._pipeline_pool.items())
+        executor = get_pipeline_executor() if len(pipelines) > 1 else None
+        if executor is None:
+            for node_id, pipeline_instance in pipelines:
+                p_result[node_id] = list(reversed(getattr(pipeline_instance, "execute")()))
+        else:
+            # 多节点并发执行，耗时取决于最慢的节点，而不是所有节点耗时之和
+            futures = {
+                node_id: executor.submit(getattr(pipeline_instance, "execute"))
+                for node_id, pipeline_instance in pipelines
+            }
+            errors = []
+            for node_id, future in futures.items():
+                try:
+                    p_result[node_id] = list(reversed(future.result()))
+                except Exception as err:
+                    errors.append(err)
+            if errors:
+                self.command_stack = []
+                raise errors[0]
         for cmd in self.command_stack:
             resp = p_result[cmd].pop() if p_result[cmd] else None
             result.append(resp)
@@ -187,39 +226,107 @@ class PipelineProxy(KeyRouterMixin):
         return handle
 
 
-STRATEGY_ROUTER_CACHE = None
-STRATEGY_NODE_MAP = {}
-DEFAULT_NODE = None
+PIPELINE_EXECUTOR = None
+PIPELINE_EXECUTOR_PID = None
+PIPELINE_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_pipeline_executor():
+    """
+    获取多节点 pipeline 并发执行线程池，未开启时返回 None
+    """
+    global PIPELINE_EXECUTOR, PIPELINE_EXECUTOR_PID
+
+    max_workers = settings.REDIS_PIPELINE_PARALLEL_WORKERS
+    if max_workers <= 1:
+        return None
+
+    # 进程 fork 后线程池不可用，需要重新创建
+    pid = os.getpid()
+    if PIPELINE_EXECUTOR is None or PIPELINE_EXECUTOR_PID != pid:
+        with PIPELINE_EXECUTOR_LOCK:
+            # 加锁后再次检查，避免多个线程同时创建线程池
+            if PIPELINE_EXECUTOR is None or PIPELINE_EXECUTOR_PID != pid:
+                PIPELINE_EXECUTOR = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="redis_pipeline")
+                PIPELINE_EXECUTOR_PID = pid
+    return PIPELINE_EXECUTOR
+
+
+class StrategyRouterTable:
+    """
+    策略路由表
+    路由分界点、路由记录及策略节点缓存属于同一个路由版本，整体替换，避免并发读取到不同版本的中间状态
+    """
+
+    __slots__ = ("version", "scores", "routers", "node_map", "default_node")
+
+    def __init__(self, routers):
+        self.routers = tuple(routers)
+        # 路由表分界点(strategy_score)，与 routers 一一对应，用于二分查找
+        self.scores = tuple(router.strategy_score for router in self.routers)
+        # 路由表版本，由路由记录(id, strategy_score, node_id)组成，变化时重建路由
+        self.version = tuple((router.id, router.strategy_score, router.node_id) for router in self.routers)
+        # 策略ID -> 节点，仅属于当前路由版本
+        self.node_map = {}
+        self.default_node = None
+
+
+STRATEGY_ROUTER = None
+STRATEGY_ROUTER_CHECK_TIME = 0
+
+
+def refresh_strategy_router(force: bool = False):
+    """
+    刷新路由表
+    每隔 CACHE_ROUTER_CHECK_INTERVAL 秒检查一次路由记录，路由版本变化时重建路由，无需重启进程
+    """
+    global STRATEGY_ROUTER, STRATEGY_ROUTER_CHECK_TIME
+
+    now = time.time()
+    check_interval = settings.CACHE_ROUTER_CHECK_INTERVAL
+    if not force and STRATEGY_ROUTER and STRATEGY_ROUTER.routers:
+        # 未开启定期检查，或未到检查时间
+        if check_interval <= 0 or now - STRATEGY_ROUTER_CHECK_TIME < check_interval:
+            return STRATEGY_ROUTER
+
+    STRATEGY_ROUTER_CHECK_TIME = now
+    router_table = StrategyRouterTable(
+        CacheRouter.objects.filter(cluster_name=get_cluster().name).select_related("node").order_by("strategy_score")
+    )
+    if STRATEGY_ROUTER is not None and router_table.version == STRATEGY_ROUTER.version:
+        return STRATEGY_ROUTER
+
+    if STRATEGY_ROUTER is not None:
+        logger.info("[redis_cluster] cache router changed, reload %s routers", len(router_table.routers))
+
+    # 单次赋值发布新路由表，读取方持有的始终是同一版本的完整路由
+    STRATEGY_ROUTER = router_table
+    return router_table
 
 
 def get_node_by_strategy_id(strategy_id: int):
     from django.utils.translation import gettext as _
 
-    global STRATEGY_ROUTER_CACHE, DEFAULT_NODE, STRATEGY_NODE_MAP
-
-    # 获取路由表
-    if not STRATEGY_ROUTER_CACHE:
-        STRATEGY_ROUTER_CACHE = list(
-            CacheRouter.objects.filter(cluster_name=get_cluster().name)
-            .select_related("node")
-            .order_by("strategy_score")
-        )
+    # 获取路由表，本次查询只使用同一个路由版本
+    router_table = refresh_strategy_router()
 
     # 优先从缓存中获取
-    if STRATEGY_NODE_MAP.get(strategy_id):
-        return STRATEGY_NODE_MAP[strategy_id]
+    node = router_table.node_map.get(strategy_id)
+    if node:
+        return node
 
     # 如果策略ID为0，则返回默认节点
     if strategy_id == 0:
-        if not DEFAULT_NODE:
-            DEFAULT_NODE = CacheNode.default_node()
-        return DEFAULT_NODE
-
-    # 根据策略ID获取对应的节点
-    for router in STRATEGY_ROUTER_CACHE:
-        if router.strategy_score > strategy_id:
-            STRATEGY_NODE_MAP[strategy_id] = router.node
-            return router.node
+        if not router_table.default_node:
+            router_table.default_node = CacheNode.default_node()
+        return router_table.default_node
+
+    # 根据策略ID获取对应的节点: 第一个 strategy_score 大于策略ID的路由
+    index = bisect_right(router_table.scores, strategy_id)
+    if index < len(router_table.routers):
+        node = router_table.routers[index].node
+        router_table.node_map[strategy_id] = node
+        return node
 
     # 如果策略ID超过了设置的默认上限，则抛出异常
     raise Exception(_("策略ID超过设置的默认上限"))
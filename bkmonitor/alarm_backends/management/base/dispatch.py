@@ -11,7 +11,7 @@ specific language governing permissions and limitations under the License.
 
 
 from alarm_backends.management.base.protocol import AbstractDispatchMixin
-from alarm_backends.management.hashring import HashRing
+from alarm_backends.management.hashring import get_hash_ring
 
 
 class DefaultDispatchMixin(AbstractDispatchMixin):
@@ -23,10 +23,11 @@ class DefaultDispatchMixin(AbstractDispatchMixin):
 
         host_targets_dict = {host: list() for host in hosts}
         if targets:
-            host_ring = HashRing(hosts)
+            # 哈希环按成员缓存，主机变化时只有少量目标迁移
+            # 各主机独立查询目标后自行分配，目标的归属只能取决于主机成员，不能取决于目标集合
+            host_ring = get_hash_ring(hosts)
             for target in targets:
-                host = host_ring.get_node(target)
-                host_targets_dict[host].append(target)
+                host_targets_dict[host_ring.get_node(target)].append(target)
 
         return targets, host_targets_dict
 
@@ -46,10 +47,9 @@ class DefaultDispatchMixin(AbstractDispatchMixin):
             targets = self.query_instance_targets(host_targets)
 
             if targets:
-                index = instances.index(target_instance)
-                for i, target in enumerate(targets):
-                    if (i % len(instances)) == index:
-                        instance_targets.append(target)
+                # 实例之间同样按一致性哈希分配，实例变化时只有少量目标迁移，避免全部重新分配
+                instance_ring = get_hash_ring(instances)
+                instance_targets = [target for target in targets if instance_ring.get_node(target) == target_instance]
 
         return host_targets, instance_targets
 
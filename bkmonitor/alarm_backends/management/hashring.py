@@ -10,10 +10,13 @@ specific language governing permissions and limitations under the License.
 """
 
 
+import math
 from bisect import bisect_left
+from collections import defaultdict
 from hashlib import md5
 
 import six
+import xxhash
 from six.moves import range
 
 
@@ -44,3 +47,93 @@ class HashRing(object):
         h = self._hash(key)
         n = bisect_left(self.ring, h) % self.vnodes
         return self.hash2node[self.ring[n]]
+
+
+class ConsistentHashRing(object):
+    """
+    一致性哈希环
+    - 使用 xxhash 计算哈希，每个节点按权重生成虚拟节点
+    - assign 支持有界负载分配：每个节点最多分配 ceil(负载系数 * 目标数 * 节点权重 / 总权重) 个目标，
+      超出容量时顺时针分配给下一个仍有余量的节点，成员变化时只有少量目标会迁移
+    """
+
+    VNODES_PER_WEIGHT = 160
+
+    def __init__(self, nodes, vnodes_per_weight=VNODES_PER_WEIGHT):
+        self.nodes = {node: weight for node, weight in six.iteritems(nodes) if weight > 0}
+
+        points = []
+        for node, weight in six.iteritems(self.nodes):
+            for i in range(max(int(weight * vnodes_per_weight), 1)):
+                points.append((self._hash("{}#{}".format(node, i)), str(node), node))
+        # 哈希冲突时按节点名排序，保证不同进程构建的哈希环一致
+        points.sort(key=lambda point: point[:2])
+
+        self.ring = [point[0] for point in points]
+        self.ring_nodes = [point[2] for point in points]
+
+    @staticmethod
+    def _hash(key):
+        return xxhash.xxh3_64_intdigest(str(key).encode("utf-8"))
+
+    def get_node(self, key):
+        if not self.ring:
+            return None
+        index = bisect_left(self.ring, self._hash(key)) % len(self.ring)
+        return self.ring_nodes[index]
+
+    def assign(self, keys, load_factor=None):
+        """
+        批量分配目标
+        :param keys: 目标列表
+        :param load_factor: 负载系数(不小于1)，为空时不限制节点负载
+        :return: {目标: 节点}
+        """
+        keys = set(keys)
+        if not self.ring or not keys:
+            return {}
+        if not load_factor:
+            return {key: self.get_node(key) for key in keys}
+
+        load_factor = max(load_factor, 1)
+        total_weight = sum(self.nodes.values())
+        capacity = {
+            node: math.ceil(load_factor * len(keys) * weight / total_weight)
+            for node, weight in six.iteritems(self.nodes)
+        }
+        loads = defaultdict(int)
+        ring_size = len(self.ring)
+
+        # 按目标的哈希值顺序分配，保证分配结果只取决于节点及目标集合
+        assignment = {}
+        hashed_keys = sorted(((self._hash(key), str(key), key) for key in keys), key=lambda item: item[:2])
+        for key_hash, __, key in hashed_keys:
+            index = bisect_left(self.ring, key_hash)
+            for offset in range(ring_size):
+                node = self.ring_nodes[(index + offset) % ring_size]
+                if loads[node] < capacity[node]:
+                    break
+            loads[node] += 1
+            assignment[key] = node
+        return assignment
+
+
+_RING_CACHE_SIZE = 32
+_ring_cache = {}
+
+
+def get_hash_ring(nodes):
+    """
+    获取一致性哈希环，按成员(节点及权重)缓存，成员不变时复用已构建的哈希环
+    :param nodes: 节点列表或 {节点: 权重}
+    """
+    if isinstance(nodes, (list, tuple, set)):
+        nodes = {node: 1 for node in nodes}
+
+    fingerprint = frozenset(six.iteritems(nodes))
+    ring = _ring_cache.get(fingerprint)
+    if ring is None:
+        if len(_ring_cache) >= _RING_CACHE_SIZE:
+            _ring_cache.clear()
+        ring = _ring_cache[fingerprint] = ConsistentHashRing(nodes)
+    return ring
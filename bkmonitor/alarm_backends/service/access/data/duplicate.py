@@ -8,29 +8,51 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import time as time_module
 from collections import defaultdict
 
+import xxhash
+from django.conf import settings
+
 from alarm_backends.core.cache import key
+from bkmonitor.data_source.unify_query.result import ColumnarQueryResult
 
 
 class Duplicate:
+    """
+    数据拉取去重(redis集合，成员为完整的 record_id)
+    """
+
+    dup_key_config = key.ACCESS_DUPLICATE_KEY
+
     def __init__(self, strategy_group_key, strategy_id=None, ttl=None):
         self.strategy_group_key = strategy_group_key
         self.record_ids_cache = {}
         self.pending_to_add = {}
         self.strategy_id = strategy_id
-        self.ttl = ttl if ttl is not None else key.ACCESS_DUPLICATE_KEY.ttl
+        self.ttl = ttl if ttl is not None else self.dup_key_config.ttl
 
-        self.client = key.ACCESS_DUPLICATE_KEY.client
+        self.client = self.dup_key_config.client
+
+    def get_dup_key(self, time):
+        dup_key = self.dup_key_config.get_key(strategy_group_key=self.strategy_group_key, dt_event_time=time)
+        if self.strategy_id is not None:
+            # Q：strategy_id setter 的作用是？
+            # A:Redis 路由分片 - alarm_backends/core/storage/redis_cluster.py
+            dup_key.strategy_id = self.strategy_id
+        return dup_key
+
+    @staticmethod
+    def to_member(record_id) -> str:
+        """
+        record_id 转换为去重集合中的成员
+        """
+        return str(record_id)
 
     def get_record_ids(self, time):
         # 保证每个时间点仅调用一次redis， 即使无数据也缓存下来。
-        dup_key = key.ACCESS_DUPLICATE_KEY.get_key(strategy_group_key=self.strategy_group_key, dt_event_time=time)
+        dup_key = self.get_dup_key(time)
         if dup_key not in self.record_ids_cache:
-            if self.strategy_id is not None:
-                # Q：strategy_id setter 的作用是？
-                # A:Redis 路由分片 - alarm_backends/core/storage/redis_cluster.py
-                dup_key.strategy_id = self.strategy_id
             self.record_ids_cache[dup_key] = self.client.smembers(dup_key)
 
         return self.record_ids_cache[dup_key]
@@ -41,19 +63,18 @@ class Duplicate:
         采用redis的集合功能。以分钟+维度作为key，值为record_id的集合
         """
         record_ids = self.get_record_ids(record.time)
-        return str(record.record_id) in record_ids
+        return self.to_member(record.record_id) in record_ids
 
     def add_record(self, record):
         # 原方案，将需要新增的点和已经存在的点放一起。然后再批量刷进redis。
         # 优化：仅把新增的点，单独列出（后续推到redis）。
         # 同步更新新的record到内存record_ids_cache中（但不再将缓存的所有点全推给redis）
-        dup_key = key.ACCESS_DUPLICATE_KEY.get_key(
-            strategy_group_key=self.strategy_group_key, dt_event_time=record.time
-        )
-        self.record_ids_cache.setdefault(dup_key, set()).add(record.record_id)
-        self.pending_to_add.setdefault(dup_key, set()).add(record.record_id)
+        dup_key = self.get_dup_key(record.time)
+        member = self.to_member(record.record_id)
+        self.record_ids_cache.setdefault(dup_key, set()).add(member)
+        self.pending_to_add.setdefault(dup_key, set()).add(member)
 
-    def preload_duplicate_cache(self, points: list[dict]) -> None:
+    def preload_duplicate_cache(self, points: list[dict] | ColumnarQueryResult) -> None:
         """
         预加载所有时间点的去重缓存
 
@@ -61,29 +82,34 @@ class Duplicate:
         避免后续逐个时间点查询 Redis。
 
         Args:
-            points: 原始数据点列表
+            points: 原始数据点列表，或统一查询列式结果
         """
         # 1. 提取所有唯一时间点
         unique_times = set()
-        for point in points:
-            t = point.get("_time_") or point.get("time")
-            if t is not None:
-                unique_times.add(t)
+        if isinstance(points, ColumnarQueryResult):
+            # 列式结果直接读取时间列，无需构造行数据
+            unique_times.update(t for t in points.iter_times() if t is not None)
+        else:
+            for point in points:
+                t = point.get("_time_") or point.get("time")
+                if t is not None:
+                    unique_times.add(t)
 
         if not unique_times:
             return
 
-        # 2. 批量构建 dup_key 并查询 Redis
+        self.preload_times(unique_times)
+
+    def preload_times(self, times) -> None:
+        # 批量构建 dup_key 并查询 Redis
         pipeline = self.client.pipeline(transaction=False)
         dup_keys = []
-        for t in unique_times:
-            dup_key = key.ACCESS_DUPLICATE_KEY.get_key(strategy_group_key=self.strategy_group_key, dt_event_time=t)
-            if self.strategy_id is not None:
-                dup_key.strategy_id = self.strategy_id
+        for t in times:
+            dup_key = self.get_dup_key(t)
             pipeline.smembers(dup_key)
             dup_keys.append(dup_key)
 
-        # 3. 执行并缓存结果
+        # 执行并缓存结果
         results = pipeline.execute()
         for dup_key, record_ids in zip(dup_keys, results):
             self.record_ids_cache[dup_key] = record_ids
@@ -100,7 +126,7 @@ class Duplicate:
             bool: 是否重复
         """
         record_ids = self.get_record_ids(time)
-        return str(record_id) in record_ids
+        return self.to_member(record_id) in record_ids
 
     def add_record_by_id(self, record_id: str, time: int) -> None:
         """
@@ -110,11 +136,10 @@ class Duplicate:
             record_id: 记录 ID
             time: 时间戳
         """
-        dup_key = key.ACCESS_DUPLICATE_KEY.get_key(strategy_group_key=self.strategy_group_key, dt_event_time=time)
-        if self.strategy_id is not None:
-            dup_key.strategy_id = self.strategy_id
-        self.record_ids_cache.setdefault(dup_key, set()).add(record_id)
-        self.pending_to_add.setdefault(dup_key, set()).add(record_id)
+        dup_key = self.get_dup_key(time)
+        member = self.to_member(record_id)
+        self.record_ids_cache.setdefault(dup_key, set()).add(member)
+        self.pending_to_add.setdefault(dup_key, set()).add(member)
 
     def add_records_batch(self, records: list) -> None:
         """
@@ -128,13 +153,11 @@ class Duplicate:
         # 按时间点分组
         time_to_record_ids = defaultdict(list)
         for record in records:
-            time_to_record_ids[record.time].append(record.record_id)
+            time_to_record_ids[record.time].append(self.to_member(record.record_id))
 
         # 批量更新内存缓存
         for t, record_ids in time_to_record_ids.items():
-            dup_key = key.ACCESS_DUPLICATE_KEY.get_key(strategy_group_key=self.strategy_group_key, dt_event_time=t)
-            if self.strategy_id is not None:
-                dup_key.strategy_id = self.strategy_id
+            dup_key = self.get_dup_key(t)
             self.record_ids_cache.setdefault(dup_key, set()).update(record_ids)
             self.pending_to_add.setdefault(dup_key, set()).update(record_ids)
 
@@ -154,3 +177,127 @@ class Duplicate:
             ttl_dup_key.strategy_id = self.strategy_id
             pipeline.expire(ttl_dup_key, self.ttl)
         pipeline.execute()
+
+
+class FingerprintDuplicate(Duplicate):
+    """
+    数据拉取去重(定长指纹)
+    每个 record_id 转换为 64 位 xxhash 指纹(16位十六进制)，同一时间点的指纹以 APPEND 方式拼接在一个 redis 字符串中，
+    相比集合存储完整 md5 大幅降低 redis 内存占用。
+    进程内维护滑动窗口，记录每个时间点已读取的指纹及字符串长度，拉取窗口重叠时只需 GETRANGE 读取增量部分。
+    """
+
+    dup_key_config = key.ACCESS_DUPLICATE_FINGERPRINT_KEY
+    FINGERPRINT_WIDTH = 16
+
+    # 进程内滑动窗口: dup_key -> [指纹集合, 已读取长度, 过期时间]
+    local_window: dict[str, list] = {}
+
+    @staticmethod
+    def to_member(record_id) -> str:
+        return xxhash.xxh3_64_hexdigest(str(record_id))
+
+    @classmethod
+    def split_fingerprints(cls, value: str | None) -> set[str]:
+        if not value:
+            return set()
+        width = cls.FINGERPRINT_WIDTH
+        return {value[i : i + width] for i in range(0, len(value) - len(value) % width, width)}
+
+    def _touch_window(self, dup_key, fingerprints: set[str], length: int) -> None:
+        self.local_window[str(dup_key)] = [fingerprints, length, time_module.time() + self.ttl // 2]
+
+    def get_record_ids(self, time):
+        dup_key = self.get_dup_key(time)
+        if dup_key not in self.record_ids_cache:
+            self.preload_times([time])
+        return self.record_ids_cache[dup_key]
+
+    def preload_times(self, times) -> None:
+        """
+        批量加载时间点的指纹，本地窗口已有的时间点只读取增量
+        """
+        dup_keys = [self.get_dup_key(t) for t in times]
+
+        now = time_module.time()
+        pipeline = self.client.pipeline(transaction=False)
+        windows = []
+        for dup_key in dup_keys:
+            window = self.local_window.get(str(dup_key))
+            if window and window[2] < now:
+                window = None
+            windows.append(window)
+            if window:
+                pipeline.strlen(dup_key)
+                pipeline.getrange(dup_key, window[1], -1)
+            else:
+                pipeline.get(dup_key)
+        results = iter(pipeline.execute())
+
+        # 本地窗口失效(redis key 过期后被重建)的时间点需要全量重新读取
+        reload_keys = []
+        for dup_key, window in zip(dup_keys, windows):
+            if not window:
+                value = next(results) or ""
+                fingerprints = self.split_fingerprints(value)
+                self._touch_window(dup_key, fingerprints, len(value))
+            else:
+                length, delta = next(results), next(results) or ""
+                if length < window[1]:
+                    reload_keys.append(dup_key)
+                    continue
+                fingerprints = window[0]
+                fingerprints.update(self.split_fingerprints(delta))
+                window[1] += len(delta)
+            self.record_ids_cache[dup_key] = set(fingerprints)
+
+        if reload_keys:
+            pipeline = self.client.pipeline(transaction=False)
+            for dup_key in reload_keys:
+                pipeline.get(dup_key)
+            for dup_key, value in zip(reload_keys, pipeline.execute()):
+                value = value or ""
+                fingerprints = self.split_fingerprints(value)
+                self._touch_window(dup_key, fingerprints, len(value))
+                self.record_ids_cache[dup_key] = set(fingerprints)
+
+    def refresh_cache(self):
+        pipeline = self.client.pipeline(transaction=False)
+        dup_keys = []
+        for dup_key, fingerprints in self.pending_to_add.items():
+            if self.strategy_id is not None:
+                dup_key.strategy_id = self.strategy_id
+            value = "".join(fingerprints)
+            pipeline.append(dup_key, value)
+            dup_keys.append((dup_key, fingerprints, len(value)))
+
+        for ttl_dup_key in self.record_ids_cache:
+            ttl_dup_key.strategy_id = self.strategy_id
+            pipeline.expire(ttl_dup_key, self.ttl)
+        results = pipeline.execute()
+
+        # 同步本地窗口，若期间有其他进程追加了数据，则保持已读长度不变，下次读取增量时补齐
+        for (dup_key, fingerprints, value_length), new_length in zip(dup_keys, results):
+            window = self.local_window.get(str(dup_key))
+            if not window:
+                continue
+            window[0].update(fingerprints)
+            if new_length == window[1] + value_length:
+                window[1] = new_length
+
+        self.clean_local_window()
+
+    @classmethod
+    def clean_local_window(cls):
+        now = time_module.time()
+        for dup_key in [dup_key for dup_key, window in cls.local_window.items() if window[2] < now]:
+            cls.local_window.pop(dup_key, None)
+
+
+def get_duplicate(strategy_group_key, strategy_id=None, ttl=None) -> Duplicate:
+    """
+    根据配置获取去重后端，切换后端时两种存储互不可见，会有一个 ttl 周期的重复数据
+    """
+    if settings.ACCESS_DUPLICATE_BACKEND == "fingerprint":
+        return FingerprintDuplicate(strategy_group_key, strategy_id=strategy_id, ttl=ttl)
+    return Duplicate(strategy_group_key, strategy_id=strategy_id, ttl=ttl)
@@ -55,7 +55,7 @@ class TopoNodeFuller(Fuller):
         # 按主机ID补全维度
         bk_host_id = dimensions.get("bk_host_id")
         if bk_host_id:
-            host = HostManager.get_by_id(bk_tenant_id=bk_tenant_id, bk_host_id=bk_host_id)
+            host = HostManager.get_brief_by_id(bk_tenant_id=bk_tenant_id, bk_host_id=bk_host_id)
             if host:
                 dimensions["bk_target_ip"] = host.ip
                 dimensions["bk_target_cloud_id"] = str(host.bk_cloud_id)
@@ -81,16 +81,11 @@ class TopoNodeFuller(Fuller):
             return
 
         bk_target_cloud_id = dimensions.get("bk_target_cloud_id", "0") or dimensions.get("bk_cloud_id", "0")
-        host = HostManager.get(
-            bk_tenant_id=bk_tenant_id, ip=bk_target_ip, bk_cloud_id=bk_target_cloud_id, using_mem=True
-        )
+        host = HostManager.get_brief(bk_tenant_id=bk_tenant_id, ip=bk_target_ip, bk_cloud_id=bk_target_cloud_id)
         if not host:
             return
 
-        bk_topo_node = []
-        if host.topo_link:
-            bk_topo_node = list({node.id for node in chain(*list(host.topo_link.values()))})
-        dimensions["bk_topo_node"] = bk_topo_node
+        dimensions["bk_topo_node"] = host.bk_topo_node
         if "bk_host_id" not in dimensions:
             # 主机对象获取到后，必定补上bk_host_id。 后续模块基于bk_host_id即可确认唯一主机
             dimensions["bk_host_id"] = host.bk_host_id
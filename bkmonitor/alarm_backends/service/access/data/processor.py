@@ -39,16 +39,22 @@ from alarm_backends.core.storage.redis import Cache
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
 from alarm_backends.management.hashring import HashRing
 from alarm_backends.service.access import base
-from alarm_backends.service.access.data.duplicate import Duplicate
+from alarm_backends.service.access.data.duplicate import get_duplicate
 from alarm_backends.service.access.data.filters import (
     ExpireFilter,
     HostStatusFilter,
     RangeFilter,
 )
 from alarm_backends.service.access.data.fullers import TopoNodeFuller
-from alarm_backends.service.access.data.records import DataRecord, calculate_record_id, get_value_from_raw_data
+from alarm_backends.service.access.data.records import (
+    DataRecord,
+    calculate_dimensions_md5,
+    calculate_record_id,
+    get_value_from_raw_data,
+)
 from alarm_backends.service.access.priority import PriorityChecker
 from alarm_backends.core.circuit_breaking.manager import AccessDataCircuitBreakingManager
+from bkmonitor.data_source.unify_query.result import ColumnarQueryResult
 from bkmonitor.utils.common_utils import count_md5, get_local_ip
 from bkmonitor.utils.consul import BKConsul
 from bkmonitor.utils.local import local
@@ -242,6 +248,67 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
                 "count": len(record_list),
             }
 
+    def _push_nodata(self, item, record_list, output_client=None):
+        """
+        :summary: 推送无数据待检测数据，开启维度上报记录时只记录按无数据维度降维后的维度集合
+        """
+        if settings.NODATA_PRESENCE_TRACKER_ENABLED:
+            self._push_nodata_presence(item, record_list, output_client)
+        else:
+            self._push(item, record_list, output_client, key.NO_DATA_LIST_KEY)
+
+    def _push_nodata_presence(self, item, record_list, output_client=None):
+        """
+        :summary: 按数据时间记录无数据维度的上报情况，每个(item, 时间点)只写入一次
+        无数据检测只需要知道哪些维度在哪个时间点有上报，不需要完整的数据记录
+        """
+        no_data_dimensions = item.no_data_config.get("agg_dimension") or []
+        presence: dict[int, dict[str, str]] = defaultdict(dict)
+        for record in record_list:
+            dimensions = record.data["dimensions"]
+            # 数据中缺少无数据维度，无法参与无数据检测
+            if any(dimension not in dimensions for dimension in no_data_dimensions):
+                continue
+            no_data_dimension_values = {dimension: dimensions[dimension] for dimension in no_data_dimensions}
+            no_data_dimension_values[constants.NO_DATA_TAG_DIMENSION] = True
+            presence[record.data["time"]].setdefault(
+                count_md5(no_data_dimension_values), json.dumps(no_data_dimension_values)
+            )
+
+        if not presence:
+            return
+
+        client = output_client or key.NO_DATA_PRESENCE_KEY.client
+        index_key = key.NO_DATA_PRESENCE_INDEX_KEY.get_key(strategy_id=item.strategy.strategy_id, item_id=item.id)
+        # 避免监控周期大于默认key过期时间，引起数据丢失
+        agg_interval = min(query_config["agg_interval"] for query_config in item.query_configs)
+        ttl = max([key.NO_DATA_PRESENCE_KEY.ttl, agg_interval * 5])
+
+        pipeline = client.pipeline(transaction=False)
+        for timestamp, dimensions_mapping in presence.items():
+            presence_key = key.NO_DATA_PRESENCE_KEY.get_key(
+                strategy_id=item.strategy.strategy_id, item_id=item.id, timestamp=timestamp
+            )
+            pipeline.hset(presence_key, mapping=dimensions_mapping)
+            pipeline.expire(presence_key, ttl)
+        pipeline.zadd(index_key, {timestamp: timestamp for timestamp in presence})
+        pipeline.expire(index_key, ttl)
+        pipeline.execute()
+
+        dimension_count = sum(len(dimensions_mapping) for dimensions_mapping in presence.values())
+        if not self.sub_task_id:
+            logger.info(
+                f"output_key({index_key}) "
+                f"strategy({item.strategy.strategy_id}), item({item.id}), "
+                f"push nodata presence timestamps({len(presence)}) dimensions({dimension_count})."
+            )
+        else:
+            self.process_counts.setdefault("push_nodata_presence", {})
+            self.process_counts["push_nodata_presence"][str(item.id)] = {
+                "output_key": index_key,
+                "count": dimension_count,
+            }
+
     def push(self, records: list | None = None, output_client=None):
         """
         推送格式化后的数据到 detect 和 nodata 中(按单个策略，单个item项，写入不同的队列)
@@ -290,7 +357,7 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
             )
             # 推送无数据处理
             if item.no_data_config["is_enabled"]:
-                self._push(item, records, output_client, key.NO_DATA_LIST_KEY)
+                self._push_nodata(item, records, output_client)
 
         # 推送数据处理信号
         if records:
@@ -449,8 +516,11 @@ class AccessDataProcess(BaseAccessDataProcess):
                 bkdata_tmp_advance_where = first_item.data_sources[0]._advance_where.copy()
                 first_item.data_sources[0]._advance_where = []
 
+        # 列式查询结果: 计算平台数据源需要逐行剔除 localTime 字段，不使用列式结果
+        columnar = settings.ACCESS_DATA_COLUMNAR_QUERY and DataSourceLabel.BK_DATA not in first_item.data_source_labels
+
         try:
-            points = first_item.query_record(self.from_timestamp, self.until_timestamp)
+            points = first_item.query_record(self.from_timestamp, self.until_timestamp, columnar=columnar)
             # 判定is_partial
             if first_item.query.is_partial:
                 logger.info(
@@ -638,14 +708,43 @@ class AccessDataProcess(BaseAccessDataProcess):
 
         return first_batch_points
 
-    def filter_duplicates(self, points: list[dict]):
+    @staticmethod
+    def iter_columnar_points(points: ColumnarQueryResult, item: Item):
+        """
+        倒序遍历列式结果(与 reversed(list) 顺序一致)，返回 (行数据, 值, 维度md5)
+        值为空的数据点不构造行数据；维度均来自时序标签时，同一时序只计算一次维度md5
+        """
+        if item.query.metrics[0].get("method", "").upper() == "REAL_TIME":
+            value_field = item.query.metrics[0]["field"]
+        else:
+            value_field = "_result_"
+
+        for series in reversed(points.series):
+            values = series.get_column(value_field)
+            constant_value = series.dimensions.get(value_field) if values is None else None
+
+            dimensions_md5 = None
+            cache_md5 = item.query.dimensions is not None and not set(item.query.dimensions) & set(series.columns)
+
+            for index in range(len(series) - 1, -1, -1):
+                value = constant_value if values is None else values[index]
+                if value is None:
+                    yield None, None, None
+                    continue
+
+                record = series.get_row(index)
+                if cache_md5 and dimensions_md5 is None:
+                    dimensions_md5 = calculate_dimensions_md5(record, item)
+                yield record, value, dimensions_md5
+
+    def filter_duplicates(self, points: list[dict] | ColumnarQueryResult):
         """
         过滤重复数据并实例化
         """
         first_item = self.items[0]
         max_agg_interval = max(query_config["agg_interval"] for query_config in first_item.query_configs)
         records = []
-        dup_obj = Duplicate(self.strategy_group_key, strategy_id=first_item.strategy.id, ttl=max_agg_interval * 10)
+        dup_obj = get_duplicate(self.strategy_group_key, strategy_id=first_item.strategy.id, ttl=max_agg_interval * 10)
         duplicate_counts = none_point_counts = 0
 
         # 预加载去重缓存
@@ -665,15 +764,19 @@ class AccessDataProcess(BaseAccessDataProcess):
 
         non_duplicate_records = []
 
-        for record in reversed(points):
+        if isinstance(points, ColumnarQueryResult):
+            candidates = self.iter_columnar_points(points, first_item)
+        else:
+            candidates = ((record, get_value_from_raw_data(record, first_item), None) for record in reversed(points))
+
+        for record, value, dimensions_md5 in candidates:
             # 先进行轻量级 value 检查
-            value = get_value_from_raw_data(record, first_item)
             if value is None:
                 none_point_counts += 1
                 continue
 
             # 计算 record_id 用于去重判断
-            record_id, record_time = calculate_record_id(record, first_item)
+            record_id, record_time = calculate_record_id(record, first_item, dimensions_md5)
 
             # 记录所有数据的最大时间点（不管是否重复）
             if record_time > max_queried_data_time:
@@ -936,7 +1039,7 @@ class AccessDataProcess(BaseAccessDataProcess):
             # 推送无数据检测数据（如果启用）
             # 无数据检测需要知道有哪些维度有数据上报，用于判断哪些维度无数据
             if item.no_data_config.get("is_enabled"):
-                self._push(item, records, output_client, key.NO_DATA_LIST_KEY)
+                self._push_nodata(item, records, output_client)
 
             # 推送降噪数据
             if valid_records:
@@ -1030,16 +1133,9 @@ class AccessDataProcess(BaseAccessDataProcess):
         # 确保只有被处理的数据才会被标记为"已见过"
         dup_obj = getattr(self, "dup_obj", None)
         if dup_obj and discarded_times:
-            # 提前获取 strategy_id，避免循环内重复检查
-            strategy_id = dup_obj.strategy_id
-
             # 从 record_ids_cache 和 pending_to_add 中移除被丢弃时间点的 key
             for discarded_time in discarded_times:
-                dup_key = key.ACCESS_DUPLICATE_KEY.get_key(
-                    strategy_group_key=self.strategy_group_key, dt_event_time=discarded_time
-                )
-                if strategy_id is not None:
-                    dup_key.strategy_id = strategy_id
+                dup_key = dup_obj.get_dup_key(discarded_time)
 
                 # 使用 pop 方法更安全，避免 KeyError 和并发问题
                 dup_obj.record_ids_cache.pop(dup_key, None)
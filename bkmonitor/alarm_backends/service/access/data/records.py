@@ -40,13 +40,14 @@ def _is_proc_port_value_exist(value) -> bool:
     return True
 
 
-def calculate_record_id(raw_data: dict, item: "Item") -> tuple[str, int]:
+def calculate_record_id(raw_data: dict, item: "Item", dimensions_md5: str | None = None) -> tuple[str, int]:
     """
     根据原始数据计算 record_id
 
     Args:
         raw_data: 原始数据 dict
         item: Item 对象，用于获取维度信息
+        dimensions_md5: 已计算好的维度 md5，同一时序的数据点维度一致时可复用
 
     Returns:
         tuple[str, int]: (record_id, time)
@@ -54,6 +55,17 @@ def calculate_record_id(raw_data: dict, item: "Item") -> tuple[str, int]:
     # 获取时间
     record_time = raw_data.get("_time_") or raw_data.get("time")
 
+    if dimensions_md5 is None:
+        dimensions_md5 = calculate_dimensions_md5(raw_data, item)
+    record_id = f"{dimensions_md5}.{record_time}"
+
+    return record_id, record_time
+
+
+def calculate_dimensions_md5(raw_data: dict, item: "Item") -> str:
+    """
+    计算原始数据的维度 md5
+    """
     # 提取原始维度
     dimensions = {}
     if item.query.dimensions is None:
@@ -77,10 +89,7 @@ def calculate_record_id(raw_data: dict, item: "Item") -> tuple[str, int]:
         }
 
     # 计算 MD5
-    md5_dimension = count_md5(dimensions)
-    record_id = f"{md5_dimension}.{record_time}"
-
-    return record_id, record_time
+    return count_md5(dimensions)
 
 
 def get_value_from_raw_data(raw_data: dict, item: "Item"):
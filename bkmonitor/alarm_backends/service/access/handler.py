@@ -79,7 +79,7 @@ class AccessBeater(MonitorBeater):
             _interval_list = []
             _is_qos = False
             for s_id in s_ids:
-                strategy = StrategyCacheManager.get_strategy_by_id(s_id)
+                strategy = StrategyCacheManager.get_strategy_snapshot(s_id)
                 if strategy is None:
                     continue
                 for item in strategy["items"]:
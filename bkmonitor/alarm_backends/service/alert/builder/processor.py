@@ -10,7 +10,10 @@ specific language governing permissions and limitations under the License.
 
 import logging
 import time
+import zlib
+from collections import defaultdict
 
+from django.conf import settings
 from django.utils.translation import gettext as _
 from elasticsearch.helpers import BulkIndexError
 
@@ -31,12 +34,27 @@ from constants.alert import EventStatus
 from core.prometheus import metrics
 
 
+def get_alert_partition(dedupe_md5: str) -> int | None:
+    """
+    按 dedupe_md5 计算告警所属分区，未开启分区模式时返回 None
+    """
+    if settings.ALERT_BUILDER_PARTITION_COUNT <= 0:
+        return None
+    return zlib.crc32(dedupe_md5.encode()) % settings.ALERT_BUILDER_PARTITION_COUNT
+
+
+def get_partition_queue(partition: int) -> str:
+    return f"{settings.ALERT_BUILDER_PARTITION_QUEUE_PREFIX}{partition}"
+
+
 class AlertBuilder(BaseAlertProcessor):
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger("alert.builder")
         circuit_breaking_manager = AlertBuilderCircuitBreakingManager()
         self.circuit_breaking_manager = circuit_breaking_manager
+        # 分区模式下最近一次处理中加锁失败的事件，由 dedupe_partition_events 原地重试
+        self.locked_events: list[Event] = []
 
     def get_unexpired_events(self, events: list[Event]):
         """
@@ -73,9 +91,31 @@ class AlertBuilder(BaseAlertProcessor):
         cached_alerts = self.list_alerts_content_from_cache(events)
         return {alert.dedupe_md5: alert for alert in cached_alerts}
 
-    def dedupe_events_to_alerts(self, events: list[Event]):
+    def dispatch_partitions(self, events: list[Event]):
+        """
+        分区模式: 事件按 dedupe_md5 分配到固定的分区队列，每个分区队列只由一个并发为1的 worker 消费，
+        同一告警的事件总是在同一个 worker 内按投递顺序处理，builder 之间不再需要竞争告警更新锁
+        """
+        from alarm_backends.service.alert.builder.tasks import dedupe_events_partition
+
+        partition_events = defaultdict(list)
+        for event in events:
+            partition_events[get_alert_partition(event.dedupe_md5)].append(event)
+
+        for partition, events_in_partition in partition_events.items():
+            dedupe_events_partition.apply_async(
+                args=(partition, events_in_partition), queue=get_partition_queue(partition)
+            )
+        self.logger.info(
+            "[alert.builder partition] dispatch %s events to partitions: %s",
+            len(events),
+            {partition: len(events_in_partition) for partition, events_in_partition in partition_events.items()},
+        )
+
+    def dedupe_events_to_alerts(self, events: list[Event], partition: int = None):
         """
         将事件进行去重，生成告警并保存
+        :param partition: 分区模式下事件所在的分区
         """
 
         def _report_latency(report_events):
@@ -126,15 +166,16 @@ class AlertBuilder(BaseAlertProcessor):
             # 对加锁成功的告警才能进行操作
             alerts = self.build_alerts(success_locked_events)
             alerts = self.enrich_alerts(alerts)
-            update_count, finished_count = self.update_alert_cache(alerts)
+            update_count, finished_count, snapshot_count = self.update_alert_cache_and_snapshot(alerts)
             self.logger.info(
                 "[alert.builder update alert cache]: updated(%s), finished(%s)", update_count, finished_count
             )
-
-            snapshot_count = self.update_alert_snapshot(alerts)
             self.logger.info("[alert.builder update alert snapshot]: %s", snapshot_count)
 
-            if fail_locked_events:
+            if partition is not None:
+                # 分区模式下加锁失败的事件不放回队列，由 dedupe_partition_events 在本 worker 内重试
+                self.locked_events = fail_locked_events
+            elif fail_locked_events:
                 from alarm_backends.service.alert.builder.tasks import (
                     dedupe_events_to_alerts,
                 )
@@ -171,6 +212,32 @@ class AlertBuilder(BaseAlertProcessor):
 
         return alerts
 
+    def dedupe_partition_events(self, events: list[Event], partition: int):
+        """
+        分区模式下处理单个分区的事件
+        加锁失败只可能是 alert.manager 等模块正在更新告警，此时在当前 worker 内等待后重试，
+        重试成功前不消费分区内后续的事件，保证同一告警的事件严格按投递顺序处理。
+        告警更新锁有过期时间，等待时间不会超过锁的 ttl
+        """
+        alerts = []
+        retries = 0
+        while events:
+            alerts.extend(self.dedupe_events_to_alerts(events, partition=partition))
+            events, self.locked_events = self.locked_events, []
+            if not events:
+                break
+            retries += 1
+            self.logger.info(
+                "[alert.builder partition(%s) locked] %s alerts is locked, retry(%s) in %ss: %s",
+                partition,
+                len(events),
+                retries,
+                settings.ALERT_BUILDER_PARTITION_RETRY_COUNTDOWN,
+                ",".join([event.dedupe_md5 for event in events]),
+            )
+            time.sleep(settings.ALERT_BUILDER_PARTITION_RETRY_COUNTDOWN)
+        return alerts
+
     def handle(self, events: list[Event]):
         """
         事件处理逻辑
@@ -179,6 +246,10 @@ class AlertBuilder(BaseAlertProcessor):
         """
         events = self.enrich_events(events)
         events = self.save_events(events)
+        if settings.ALERT_BUILDER_PARTITION_COUNT > 0:
+            # 分区模式下告警生成交给事件所属分区的 worker 处理
+            self.dispatch_partitions(events)
+            return []
         alerts = self.dedupe_events_to_alerts(events)
         return alerts
 
@@ -61,3 +61,17 @@ def dedupe_events_to_alerts(events: List[Event]):
         builder.logger.exception("[alert.builder dedupe_events_to_alerts] failed detail: %s", e)
 
     metrics.report_all()
+
+
+@app.task(ignore_result=True, queue="celery_alert_builder")
+def dedupe_events_partition(partition: int, events: List[Event]):
+    """
+    分区模式下处理单个分区的事件，投递时会指定分区队列
+    """
+    builder = AlertBuilder()
+    try:
+        builder.dedupe_partition_events(events, partition)
+    except Exception as e:
+        builder.logger.exception("[alert.builder dedupe_events_partition(%s)] failed detail: %s", partition, e)
+
+    metrics.report_all()
@@ -26,6 +26,7 @@ from alarm_backends.service.alert.enricher import (
     Event,
 )
 from alarm_backends.service.alert.enricher.translator import TranslatorFactory
+from alarm_backends.service.alert.enricher.translator.base import TranslationCache
 from constants.alert import EventTargetType
 
 logger = logging.getLogger("alert.enricher")
@@ -111,6 +112,31 @@ class MonitorTranslateEnricher(BaseAlertEnricher):
     监控专用维度翻译
     """
 
+    def __init__(self, alerts: list[Alert]):
+        super().__init__(alerts)
+
+        # 先收集整批告警翻译需要的缓存键，批量查询后再逐个翻译
+        self.cache = TranslationCache()
+        self.translators: dict[str, TranslatorFactory] = {}
+        for alert in self.alerts:
+            if not alert.is_new():
+                continue
+            try:
+                strategy = alert.get_extra_info("strategy")
+                if not strategy:
+                    continue
+                translator = TranslatorFactory(strategy, cache=self.cache)
+                translator.prepare(self.get_dimensions(alert))
+                self.translators[alert.id] = translator
+            except Exception as e:
+                logger.exception("[MonitorTranslateEnricher] prepare alert(%s) error: %s", alert.id, e)
+        self.cache.fetch()
+
+    @staticmethod
+    def get_dimensions(alert: Alert) -> dict:
+        origin_alarm = alert.get_extra_info("origin_alarm") or {}
+        return origin_alarm.get("data", {}).get("dimensions", {})
+
     def enrich_alert(self, alert: Alert):
         strategy = alert.get_extra_info("strategy")
 
@@ -119,7 +145,7 @@ class MonitorTranslateEnricher(BaseAlertEnricher):
 
         origin_alarm = alert.get_extra_info("origin_alarm") or {}
         dimensions = origin_alarm.get("data", {}).get("dimensions", {})
-        translator = TranslatorFactory(strategy)
+        translator = self.translators.get(alert.id) or TranslatorFactory(strategy, cache=self.cache)
         dimension_translation = translator.translate(dimensions)
 
         for dimension in alert.dimensions:
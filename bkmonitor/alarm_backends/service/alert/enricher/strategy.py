@@ -33,7 +33,7 @@ class StrategySnapshotEnricher(BaseAlertEnricher):
 
         if not strategy:
             # 如果没有，则从缓存中获取
-            strategy = StrategyCacheManager.get_strategy_by_id(int(alert.strategy_id))
+            strategy = StrategyCacheManager.get_strategy_snapshot(int(alert.strategy_id))
 
         if not strategy and alert.strategy_id:
             raise StrategyNotExist("strategy(%s) not exist", alert.strategy_id)
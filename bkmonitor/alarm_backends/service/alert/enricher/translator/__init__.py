@@ -11,7 +11,10 @@ specific language governing permissions and limitations under the License.
 import copy
 import logging
 
-from alarm_backends.service.alert.enricher.translator.base import TranslationField
+from alarm_backends.service.alert.enricher.translator.base import (
+    TranslationCache,
+    TranslationField,
+)
 from alarm_backends.service.alert.enricher.translator.bcs_cluster import (
     BcsClusterTranslator,
 )
@@ -55,8 +58,9 @@ INSTALLED_TRANSLATORS = (
 
 
 class TranslatorFactory:
-    def __init__(self, strategy):
+    def __init__(self, strategy, cache: TranslationCache | None = None):
         self.strategy = strategy
+        self.cache = cache
         self.translators = []
 
         for item in strategy["items"]:
@@ -72,8 +76,23 @@ class TranslatorFactory:
                 strategy=self.strategy,
             )
             if translator.is_enabled():
+                translator.cache = self.cache
                 self.translators.append(translator)
 
+    def prepare(self, data):
+        """
+        批量翻译的第一阶段，收集各翻译器需要预取的缓存键
+        """
+        if self.cache is None:
+            return
+
+        fields = {name: TranslationField(name, value) for name, value in data.items()}
+        for translator in self.translators:
+            try:
+                translator.prepare(fields)
+            except Exception as e:
+                logger.exception(f"dimension translate prepare error, reason: {e}. origin data: {data}")
+
     def translate(self, data):
         data = copy.deepcopy(data)
         translated_data = {}
@@ -9,9 +9,13 @@ specific language governing permissions and limitations under the License.
 """
 
 import abc
+import logging
+from collections import defaultdict
 
 from bkmonitor.utils.tenant import bk_biz_id_to_bk_tenant_id
 
+logger = logging.getLogger("alert.enricher")
+
 
 class TranslationField:
     def __init__(self, name, value, display_name=None, display_value=None):
@@ -31,6 +35,65 @@ class TranslationField:
         return f"<TranslationField {self.name}({self.display_name}): {self.value}({self.display_value})>"
 
 
+class TranslationCache:
+    """
+    翻译数据批量预取
+    第一阶段各翻译器通过 add 声明整批告警需要的缓存键，随后 fetch 对每类缓存按租户各执行一次批量查询，
+    第二阶段翻译时通过 get 读取预取结果，未预取的键由翻译器自行单独查询
+    """
+
+    def __init__(self):
+        # (缓存类型, 租户ID) -> 待查询的键
+        self.keys: dict[tuple[str, str], set] = defaultdict(set)
+        # (缓存类型, 租户ID) -> {键: 查询结果}
+        self.results: dict[tuple[str, str], dict] = {}
+
+    def add(self, cache_type: str, bk_tenant_id: str, key):
+        if key in (None, ""):
+            return
+        self.keys[(cache_type, bk_tenant_id)].add(key)
+
+    def fetch(self):
+        """
+        批量查询已声明的缓存键，查询失败的缓存类型不记录结果，翻译时回退为单独查询
+        """
+        from alarm_backends.core.cache.bcs_cluster import BcsClusterCacheManager
+        from alarm_backends.core.cache.cmdb import (
+            BusinessManager,
+            HostManager,
+            ServiceInstanceManager,
+            TopoManager,
+        )
+
+        fetchers = {
+            "host": lambda bk_tenant_id, keys: HostManager.mget_by_id(bk_tenant_id=bk_tenant_id, bk_host_ids=keys),
+            "topo": lambda bk_tenant_id, keys: TopoManager.mget(bk_tenant_id=bk_tenant_id, topo_nodes=keys),
+            "service_instance": lambda bk_tenant_id, keys: ServiceInstanceManager.mget(
+                bk_tenant_id=bk_tenant_id, service_instance_ids=keys
+            ),
+            "bcs_cluster": lambda bk_tenant_id, keys: BcsClusterCacheManager.mget(keys),
+            "business": lambda bk_tenant_id, keys: BusinessManager.mget(keys),
+        }
+
+        for (cache_type, bk_tenant_id), keys in self.keys.items():
+            if (cache_type, bk_tenant_id) in self.results:
+                continue
+            try:
+                self.results[(cache_type, bk_tenant_id)] = fetchers[cache_type](bk_tenant_id, list(keys))
+            except Exception as e:
+                logger.exception("[translation cache] fetch %s(%s) error: %s", cache_type, bk_tenant_id, e)
+
+    def get(self, cache_type: str, bk_tenant_id: str, key) -> tuple[bool, object]:
+        """
+        获取预取结果
+        :return: (是否已预取, 查询结果)
+        """
+        results = self.results.get((cache_type, bk_tenant_id))
+        if results is None or key not in self.keys[(cache_type, bk_tenant_id)]:
+            return False, None
+        return True, results.get(key)
+
+
 class BaseTranslator:
     """
     字段翻译类
@@ -45,6 +108,9 @@ class BaseTranslator:
         self.data_type_label = item["query_configs"][0]["data_type_label"]
         self.result_table_id = item["query_configs"][0].get("result_table_id", "")
 
+        # 批量预取的翻译数据，为空时翻译器单独查询
+        self.cache: TranslationCache | None = None
+
     @abc.abstractmethod
     def is_enabled(self):
         """
@@ -52,6 +118,22 @@ class BaseTranslator:
         """
         raise NotImplementedError
 
+    def prepare(self, data):
+        """
+        声明翻译需要的缓存键，在批量翻译时先于 translate 调用
+        :param dict[str,TranslationField] data: 翻译数据
+        """
+
+    def get_cached(self, cache_type: str, key, getter):
+        """
+        优先读取预取结果，未预取时使用 getter 单独查询
+        """
+        if self.cache is not None:
+            is_fetched, value = self.cache.get(cache_type, self.bk_tenant_id, key)
+            if is_fetched:
+                return value
+        return getter()
+
     @abc.abstractmethod
     def translate(self, data):
         """
@@ -20,12 +20,19 @@ class BcsClusterTranslator(BaseTranslator):
     def is_enabled(self) -> bool:
         return True
 
+    def prepare(self, data: dict):
+        field = data.get("bcs_cluster_id")
+        if field and self.cache is not None:
+            self.cache.add("bcs_cluster", self.bk_tenant_id, field.value)
+
     def translate(self, data: dict) -> dict:
         field = data.get("bcs_cluster_id")
         if not field:
             return data
         bcs_cluster_id = field.value
-        cluster_info = BcsClusterCacheManager.get(bcs_cluster_id)
+        cluster_info = self.get_cached(
+            "bcs_cluster", bcs_cluster_id, lambda: BcsClusterCacheManager.get(bcs_cluster_id)
+        )
         if not cluster_info:
             return data
         # 修改集群ID的值，包含集群名称
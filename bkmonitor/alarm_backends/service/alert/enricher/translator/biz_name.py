@@ -21,11 +21,16 @@ class BizNameTranslator(BaseTranslator):
     def is_enabled(self):
         return True
 
+    def prepare(self, data):
+        field = data.get("bk_biz_id")
+        if field and self.cache is not None:
+            self.cache.add("business", self.bk_tenant_id, str(field.value))
+
     def translate(self, data):
         field = data.get("bk_biz_id")
         if not field:
             return data
-        business = BusinessManager.get(field.value)
+        business = self.get_cached("business", str(field.value), lambda: BusinessManager.get(field.value))
         if not business:
             return data
         field.display_name = business.bk_biz_name
@@ -23,12 +23,21 @@ class ServiceInstanceTranslator(BaseTranslator):
     def is_enabled(self):
         return self.data_source_label == DataSourceLabel.BK_MONITOR_COLLECTOR
 
+    def prepare(self, data):
+        field = data.get("bk_target_service_instance_id")
+        if field and self.cache is not None and str(field.value).isdigit():
+            self.cache.add("service_instance", self.bk_tenant_id, int(field.value))
+
     def translate(self, data):
         field = data.get("bk_target_service_instance_id")
         if not field:
             return data
         instance_id = field.value
-        instance = ServiceInstanceManager.get(bk_tenant_id=self.bk_tenant_id, service_instance_id=instance_id)
+        instance = self.get_cached(
+            "service_instance",
+            int(instance_id) if str(instance_id).isdigit() else instance_id,
+            lambda: ServiceInstanceManager.get(bk_tenant_id=self.bk_tenant_id, service_instance_id=instance_id),
+        )
         if not instance:
             field.display_name = _("服务实例ID")
         else:
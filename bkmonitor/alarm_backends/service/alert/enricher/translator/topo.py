@@ -22,6 +22,22 @@ class TopoNodeTranslator(BaseTranslator):
     def is_enabled(self):
         return True
 
+    def prepare(self, data):
+        if self.cache is None:
+            return
+
+        bk_host_id = data.get("bk_host_id")
+        if bk_host_id and bk_host_id.value:
+            self.cache.add("host", self.bk_tenant_id, str(bk_host_id.value))
+
+        if "bk_obj_id" in data and "bk_inst_id" in data:
+            self.cache.add("topo", self.bk_tenant_id, (data["bk_obj_id"].value, int(data["bk_inst_id"].value)))
+
+        if "bk_topo_node" in data:
+            for node in data["bk_topo_node"].value or []:
+                bk_obj_id, bk_inst_id = node.split("|")
+                self.cache.add("topo", self.bk_tenant_id, (bk_obj_id, int(bk_inst_id)))
+
     def translate(self, data):
         data = self.translate_inst_id(data)
         data = self.translate_topo_node(data)
@@ -34,7 +50,11 @@ class TopoNodeTranslator(BaseTranslator):
         if not bk_host_id:
             return data
 
-        host = HostManager.get_by_id(bk_tenant_id=self.bk_tenant_id, bk_host_id=bk_host_id.value)
+        host = self.get_cached(
+            "host",
+            str(bk_host_id.value),
+            lambda: HostManager.get_by_id(bk_tenant_id=self.bk_tenant_id, bk_host_id=bk_host_id.value),
+        )
         if not host:
             return data
 
@@ -82,7 +102,17 @@ class TopoNodeTranslator(BaseTranslator):
             field.display_value = []
             return data
 
-        node_infos = TopoManager.mget(bk_tenant_id=self.bk_tenant_id, topo_nodes=keys)
+        # 优先使用预取结果，缺失的节点再批量查询
+        node_infos = {}
+        missing_keys = []
+        for key in keys:
+            is_fetched, node_info = self.cache.get("topo", self.bk_tenant_id, key) if self.cache else (False, None)
+            if is_fetched:
+                node_infos[key] = node_info
+            else:
+                missing_keys.append(key)
+        if missing_keys:
+            node_infos.update(TopoManager.mget(bk_tenant_id=self.bk_tenant_id, topo_nodes=missing_keys))
 
         for bk_obj_id, bk_inst_id in keys:
             node_info = node_infos.get((bk_obj_id, bk_inst_id))
@@ -109,8 +139,12 @@ class TopoNodeTranslator(BaseTranslator):
         bk_obj_id = data["bk_obj_id"]
         bk_inst_id = data["bk_inst_id"]
 
-        node = TopoManager.get(
-            bk_tenant_id=self.bk_tenant_id, bk_obj_id=bk_obj_id.value, bk_inst_id=int(bk_inst_id.value)
+        node = self.get_cached(
+            "topo",
+            (bk_obj_id.value, int(bk_inst_id.value)),
+            lambda: TopoManager.get(
+                bk_tenant_id=self.bk_tenant_id, bk_obj_id=bk_obj_id.value, bk_inst_id=int(bk_inst_id.value)
+            ),
         )
 
         bk_obj_id.display_name = _("模型名称")
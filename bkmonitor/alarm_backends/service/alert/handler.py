@@ -24,7 +24,7 @@ from alarm_backends.core.cache.key import (
 )
 from alarm_backends.core.cluster import get_cluster
 from alarm_backends.core.handlers import base
-from alarm_backends.management.hashring import HashRing
+from alarm_backends.management.hashring import get_hash_ring
 from alarm_backends.management.utils import get_host_addr
 from alarm_backends.service.alert.builder.tasks import run_alert_builder
 from bkmonitor.models import EventPluginInstance
@@ -220,12 +220,15 @@ class AlertHandler(base.BaseHandler):
                     # 一般没有获取到hosts， 可能是consul服务有问题, 暂时等待一下
                     time.sleep(15)
                 else:
-                    hash_ring = HashRing({host: 1 for host in hosts})
+                    partition_infos = {
+                        f"{data_id}|{partition_info['partition']}": partition_info
+                        for data_id, kfk_info in plugin_kafka_configs.items()
+                        for partition_info in kfk_info
+                    }
+                    assignment = get_hash_ring(hosts).assign(partition_infos, settings.HASH_RING_LOAD_FACTOR)
                     host_kfk_info = defaultdict(list)
-                    for data_id, kfk_info in plugin_kafka_configs.items():
-                        for partition_info in kfk_info:
-                            host = hash_ring.get_node(f"{data_id}|{partition_info['partition']}")
-                            host_kfk_info[host].append(partition_info)
+                    for partition_key, partition_info in partition_infos.items():
+                        host_kfk_info[assignment[partition_key]].append(partition_info)
 
                     # 将data_id分配信息写入redis
                     pipeline = self.redis_client.pipeline()
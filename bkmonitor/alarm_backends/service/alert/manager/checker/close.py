@@ -8,7 +8,6 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-import json
 import logging
 import time
 
@@ -17,6 +16,7 @@ from django.utils.translation import gettext as _
 
 from alarm_backends.constants import CONST_MINUTES
 from alarm_backends.core.alert import Alert
+from alarm_backends.core.alert.codec import AlertCacheCodec
 from alarm_backends.core.cache.cmdb import HostManager, ServiceInstanceManager
 from alarm_backends.core.circuit_breaking.manager import AlertManagerCircuitBreakingManager
 from alarm_backends.core.cache.key import (
@@ -227,19 +227,19 @@ class CloseStatusChecker(BaseChecker):
             ALERT_DEDUPE_CONTENT_KEY.get_key(strategy_id=alert.strategy_id or 0, dedupe_md5=alert.dedupe_md5)
         )
         try:
-            current_alert = json.loads(current_alert_data)
-            current_alert = Alert(current_alert)
+            # 只需比较告警ID，无需解码完整告警内容
+            current_alert_id = AlertCacheCodec.peek_id(current_alert_data)
         except Exception:
             # 如果从缓存中获取不到告警，表示当前告警应该为最新的告警信息，默认不做关闭
             return False
 
-        if current_alert and current_alert.id != alert.id:
+        if current_alert_id and current_alert_id != alert.id:
             # 如果从缓存中获取到了数据信息，并且缓存中的告警ID与当前告警ID不一致，则认为是存在更新的告警
             # 如果正在发生的事件ID与当前事件ID不一致，则说明事件已经过期，直接关闭
             logger.info(
-                f"[close 处理结果] (closed) alert({alert.id}), strategy({alert.strategy_id}) 当前维度存在更新的告警事件({current_alert.id})，告警已失效"
+                f"[close 处理结果] (closed) alert({alert.id}), strategy({alert.strategy_id}) 当前维度存在更新的告警事件({current_alert_id})，告警已失效"
             )
-            self.close(alert, _("当前维度存在更新的告警事件({})，告警已失效").format(current_alert.id))
+            self.close(alert, _("当前维度存在更新的告警事件({})，告警已失效").format(current_alert_id))
             return True
         # 如果一致的话，表示是同一个告警，则认为告警在持续
         return False
@@ -59,7 +59,7 @@ class RecoverStatusChecker(BaseChecker):
             self.check_no_data(alert)
             return
 
-        strategy = StrategyCacheManager.get_strategy_by_id(int(alert.strategy_id))
+        strategy = StrategyCacheManager.get_strategy_snapshot(int(alert.strategy_id))
         if not strategy:
             strategy = alert.get_extra_info("strategy")
 
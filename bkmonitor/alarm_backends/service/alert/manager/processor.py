@@ -8,13 +8,21 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-import json
 import logging
+import time
 
-from alarm_backends.core.alert import Alert, Event
-from alarm_backends.core.alert.alert import AlertKey
+from django.conf import settings
+
+from alarm_backends.constants import CONST_MINUTES
+from alarm_backends.core.alert import Alert
+from alarm_backends.core.alert.alert import AlertCache, AlertKey
+from alarm_backends.core.alert.codec import AlertCacheCodec
 from alarm_backends.core.cache import clear_mem_cache
-from alarm_backends.core.cache.key import ALERT_DEDUPE_CONTENT_KEY, ALERT_UPDATE_LOCK
+from alarm_backends.core.cache.key import (
+    ALERT_DEDUPE_CONTENT_KEY,
+    ALERT_UPDATE_LOCK,
+    ALERT_USER_CHANGE_KEY,
+)
 from alarm_backends.core.lock.service_lock import multi_service_lock
 from alarm_backends.service.alert.manager.checker.ack import AckChecker
 from alarm_backends.service.alert.manager.checker.action import ActionHandleChecker
@@ -26,6 +34,7 @@ from alarm_backends.service.alert.manager.checker.upgrade import UpgradeChecker
 from alarm_backends.service.alert.processor import BaseAlertProcessor
 from bkmonitor.documents import AlertDocument
 from bkmonitor.documents.base import BulkActionType
+from constants.alert import EventStatus
 from core.prometheus import metrics
 
 INSTALLED_CHECKERS = (
@@ -38,40 +47,45 @@ INSTALLED_CHECKERS = (
     ActionHandleChecker,
 )
 
+# 变更版本未被再次修改时才删除，避免覆盖同步期间产生的新变更
+CLEAR_USER_CHANGE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
 
 class AlertManager(BaseAlertProcessor):
+    # 用户修改字段，这些字段只有在ES是最准的，需要刷进去
+    USER_FIELDS = ["id"] + list(AlertDocument.USER_FIELDS)
+
     def __init__(self, alert_keys: list[AlertKey]):
         super().__init__()
         self.logger = logging.getLogger("alert.manager")
         self.alert_keys = alert_keys
+        # 本轮已从 ES 同步用户字段的告警及其变更版本
+        self.user_change_versions: dict[str, str] = {}
 
     def fetch_alerts(self) -> list[Alert]:
         # 1. 根据告警ID，从ES拉出数据
         alerts = Alert.mget(self.alert_keys)
 
-        # 2. 补充用户修改字段，这些字段只有在ES是最准的，需要刷进去
-        fields = [
-            "id",
-            "assignee",
-            "is_handled",
-            "handle_stage",
-            "is_ack",
-            "is_ack_noticed",
-            "ack_operator",
-            "appointee",
-            "supervisor",
-            "extra_info",
-        ]
+        # 2. 补充用户修改字段，只同步有变更记录的告警
+        alerts_to_sync = self.get_user_changed_alerts(alerts)
+        if not alerts_to_sync:
+            return alerts
+
         alert_docs = {
             alert_doc.id: alert_doc
             for alert_doc in AlertDocument.mget(
-                ids=[alert.id for alert in alerts],
-                fields=fields,
+                ids=[alert.id for alert in alerts_to_sync],
+                fields=self.USER_FIELDS,
             )
         }
-        for alert in alerts:
+        for alert in alerts_to_sync:
             if alert.id in alert_docs:
-                for field in fields:
+                for field in self.USER_FIELDS:
                     if field == "extra_info":
                         # 以DB为主，同时合并check阶段新增内容
                         extra_info = getattr(alert_docs[alert.id], field, None)
@@ -79,8 +93,54 @@ class AlertManager(BaseAlertProcessor):
                         alert.data[field].update(extra_info.to_dict() if extra_info else {})
                     else:
                         alert.data[field] = getattr(alert_docs[alert.id], field, None)
+        self.user_change_versions = {
+            alert_id: version for alert_id, version in self.user_change_versions.items() if alert_id in alert_docs
+        }
         return alerts
 
+    def get_user_changed_alerts(self, alerts: list[Alert]) -> list[Alert]:
+        """
+        获取用户字段有变更版本的告警，变更版本读取失败或到达全量同步周期时同步全部告警
+        """
+        if not alerts or not settings.ALERT_USER_CHANGE_JOURNAL_ENABLED:
+            return alerts
+
+        try:
+            versions = ALERT_USER_CHANGE_KEY.client.mget(
+                [ALERT_USER_CHANGE_KEY.get_key(alert_id=alert.id) for alert in alerts]
+            )
+        except Exception as e:
+            self.logger.warning("[manager] load alert user change failed, sync all alerts: %s", e)
+            return alerts
+
+        self.user_change_versions = {alert.id: version for alert, version in zip(alerts, versions) if version}
+
+        # 定期全量同步，兜底滚动升级期间旧版本写入、变更版本写入失败等未记录的修改
+        if (int(time.time()) // CONST_MINUTES) % max(settings.ALERT_USER_CHANGE_FULL_SYNC_CYCLES, 1) == 0:
+            return alerts
+        return [alert for alert in alerts if alert.id in self.user_change_versions]
+
+    def clear_user_changes(self, alerts: list[Alert]):
+        """
+        用户字段已同步并写入告警缓存后，清理对应的变更版本，同步期间版本有变化的保留到下一轮
+        """
+        alert_ids = [alert.id for alert in alerts if alert.id in self.user_change_versions]
+        if not alert_ids:
+            return
+
+        try:
+            pipeline = ALERT_USER_CHANGE_KEY.client.pipeline(transaction=False)
+            for alert_id in alert_ids:
+                pipeline.eval(
+                    CLEAR_USER_CHANGE_SCRIPT,
+                    1,
+                    ALERT_USER_CHANGE_KEY.get_key(alert_id=alert_id),
+                    self.user_change_versions[alert_id],
+                )
+            pipeline.execute()
+        except Exception as e:
+            self.logger.warning("[manager] clear alert user change failed: %s", e)
+
     def filter_alerts(self, alerts: list[Alert]) -> list[Alert]:
         """
         过滤不需要处理的告警
@@ -88,33 +148,37 @@ class AlertManager(BaseAlertProcessor):
         :return:
         """
         # 1. 已关闭的告警 在ES拉取后到加锁处理前刚好被关闭了，此时拿到的这批alerts部分告警在redis已经是关闭状态了
+        fetched_alert_ids = set([alert.id for alert in alerts])
+
+        # 优先使用状态缓存判断，不需要解析完整的告警内容
+        current_status_mapping = {
+            dedupe_md5: status for dedupe_md5, (_, status) in AlertCache.get_cached_status(alerts).items()
+        }
+        alerts_without_status = [alert for alert in alerts if alert.dedupe_md5 not in current_status_mapping]
         alert_dedupe_keys = [
             ALERT_DEDUPE_CONTENT_KEY.get_key(strategy_id=alert.strategy_id, dedupe_md5=alert.dedupe_md5)
-            for alert in alerts
+            for alert in alerts_without_status
         ]
-        fetched_alert_ids = set([alert.id for alert in alerts])
 
-        alert_data = ALERT_DEDUPE_CONTENT_KEY.client.mget(alert_dedupe_keys)
-        current_alerts_mapping = {}
+        alert_data = ALERT_DEDUPE_CONTENT_KEY.client.mget(alert_dedupe_keys) if alert_dedupe_keys else []
         for current_alert_data in alert_data:
             if not current_alert_data:
                 # 如果从缓存中获取不到告警，表示当前告警应该为最新的告警信息，跳过过滤
                 continue
             try:
-                current_alert = json.loads(current_alert_data)
+                current_alert = AlertCacheCodec.decode(current_alert_data)
                 current_alert = Alert(current_alert)
             except Exception:
                 # 如果从缓存中获取不到告警，表示当前告警应该为最新的告警信息，跳过过滤
                 self.logger.warning("Failed to parse alert from cache: %s", current_alert_data)
                 continue
             # 构造mapping，方便后续过滤
-            current_alerts_mapping[current_alert.dedupe_md5] = current_alert
+            current_status_mapping[current_alert.dedupe_md5] = current_alert.status
         new_alerts = []
         for alert in alerts:
-            if alert.dedupe_md5 in current_alerts_mapping:
+            if alert.dedupe_md5 in current_status_mapping:
                 # 如果缓存中存在当前告警，则使用缓存中的告警状态进行判断
-                cache_alert = current_alerts_mapping.get(alert.dedupe_md5)
-                if cache_alert and not cache_alert.is_abnormal():
+                if current_status_mapping[alert.dedupe_md5] != EventStatus.ABNORMAL:
                     # 如果缓存二次确认状态不为异常则过滤掉，拉取的都是异常告警，若不一致说明此时告警可能已经被关闭或者恢复
                     continue
             # 其他情况正常进行处理
@@ -157,6 +221,8 @@ class AlertManager(BaseAlertProcessor):
                     alerts_to_update_directly.append(alert)
 
             alerts_to_check = self.handle(alerts_to_check)
+            # 同步后的用户字段已写入缓存，后续从缓存保存告警不会再覆盖用户的修改
+            self.clear_user_changes(alerts_to_check)
 
             if fail_locked_alert_ids:
                 # 对加锁失败的告警，不进行操作，等下一轮的周期检测即可
@@ -197,20 +263,9 @@ class AlertManager(BaseAlertProcessor):
             checker.check_all()
 
         # 3. 更新缓存，只更新当前dedupe_md5的alert_id和需要更新的alert_id一致的部分，或者cache不存在的部分
-        active_alerts = self.list_alerts_content_from_cache(
-            [Event(data=alert.top_event, do_clean=False) for alert in alerts]
-        )
-        active_alerts_mapping = {alert.dedupe_md5: alert.id for alert in active_alerts}
-        update_count, finished_count = self.update_alert_cache(
-            [
-                alert
-                for alert in alerts
-                if alert.dedupe_md5 not in active_alerts_mapping or active_alerts_mapping[alert.dedupe_md5] == alert.id
-            ]
-        )
+        # 4. 再把最新的内容刷回快照，两者在同一个 pipeline 中写入
+        update_count, finished_count, snapshot_count = self.update_alert_cache_and_snapshot(alerts, check_id=True)
         self.logger.info("[alert.manager update alert cache]: updated(%s), finished(%s)", update_count, finished_count)
-        # 4. 再把最新的内容刷回快照
-        snapshot_count = self.update_alert_snapshot(alerts)
         self.logger.info("[alert.manager update alert snapshot]: %s", snapshot_count)
 
         return alerts
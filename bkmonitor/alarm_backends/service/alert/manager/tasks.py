@@ -171,7 +171,7 @@ def check_blocked_alert_finished(alert_keys):
             closed_alerts.append(alert.id)
     if alert_documents:
         try:
-            AlertDocument.bulk_create(alert_documents, action=BulkActionType.UPSERT)
+            AlertDocument.bulk_create(alert_documents, action=BulkActionType.UPSERT, record_user_change=False)
         except BulkIndexError as e:
             logger.error(
                 "[check_blocked_alert_finished] save blocked alert document failed, total count(%s), "
@@ -182,8 +182,7 @@ def check_blocked_alert_finished(alert_keys):
             )
             return
     if updated_alert_snaps:
-        AlertCache.save_alert_to_cache(updated_alert_snaps)
-        AlertCache.save_alert_snapshot(updated_alert_snaps)
+        AlertCache.save_alerts(updated_alert_snaps)
 
     if alert_logs:
         try:
@@ -8,17 +8,21 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-import json
 import logging
 import time
 from collections import defaultdict
 
+from django.conf import settings
 from elasticsearch.helpers import BulkIndexError
 
 from alarm_backends.core.alert import Alert, Event
 from alarm_backends.core.alert.alert import AlertCache
+from alarm_backends.core.alert.codec import AlertCacheCodec
 from alarm_backends.core.cache.key import ALERT_DEDUPE_CONTENT_KEY
-from alarm_backends.service.composite.tasks import check_action_and_composite
+from alarm_backends.service.composite.tasks import (
+    check_action_and_composite,
+    check_action_and_composite_batch,
+)
 from bkmonitor.documents import AlertDocument, AlertLog
 from bkmonitor.documents.base import BulkActionType
 
@@ -63,7 +67,7 @@ class BaseAlertProcessor:
             if not alert:
                 continue
             try:
-                alert = json.loads(alert)
+                alert = AlertCacheCodec.decode(alert)
                 alerts.append(Alert(alert))
             except Exception as e:
                 dedupe_md5 = cache_keys[index]
@@ -88,6 +92,17 @@ class BaseAlertProcessor:
         snapshot_count = AlertCache.save_alert_snapshot(alerts)
         return snapshot_count
 
+    @staticmethod
+    def update_alert_cache_and_snapshot(alerts: list[Alert], check_id: bool = False) -> tuple[int, int, int]:
+        """
+        在同一次 redis pipeline 中更新告警缓存及快照
+        :param check_id: 是否仅更新缓存中告警ID一致(或缓存不存在)的告警
+        :return: 更新数量，结束数量，快照数量
+        """
+        if not alerts:
+            return 0, 0, 0
+        return AlertCache.save_alerts(alerts, check_id=check_id)
+
     @staticmethod
     def save_alerts(alerts: list[Alert], action=BulkActionType.INDEX, force_save=False) -> list[Alert]:
         """
@@ -108,7 +123,7 @@ class BaseAlertProcessor:
         start_time = time.time()
         errors = []
         try:
-            AlertDocument.bulk_create(alert_documents, action=action)
+            AlertDocument.bulk_create(alert_documents, action=action, record_user_change=False)
         except BulkIndexError as e:
             logger.error("save alert document error: %s", e.errors)
             errors = e.errors
@@ -159,11 +174,26 @@ class BaseAlertProcessor:
             return
 
         blocked = 0
+        alerts_to_send = []
         for alert in alerts:
             if alert.is_blocked:
                 blocked += 1
                 # 如果告警被熔断，不发送composite事件
                 continue
-            check_action_and_composite.delay(alert_key=alert.key, alert_status=alert.status)
+            alerts_to_send.append(alert)
+
+        batch_size = settings.COMPOSITE_BATCH_SIZE
+        if batch_size > 0:
+            # 批量模式下，每个任务检测一批告警
+            for index in range(0, len(alerts_to_send), batch_size):
+                check_action_and_composite_batch.delay(
+                    alerts=[
+                        {"alert_key": alert.key, "alert_status": alert.status}
+                        for alert in alerts_to_send[index : index + batch_size]
+                    ]
+                )
+        else:
+            for alert in alerts_to_send:
+                check_action_and_composite.delay(alert_key=alert.key, alert_status=alert.status)
 
         logger.info("[send alert signals to composite]: send(%d), blocked(%s)", len(alerts) - blocked, blocked)
@@ -30,7 +30,7 @@ from alarm_backends.core.cache.key import (
 from alarm_backends.core.cache.strategy import StrategyCacheManager
 from alarm_backends.core.control.item import gen_condition_matcher
 from alarm_backends.core.control.strategy import Strategy
-from alarm_backends.core.lock.service_lock import service_lock
+from alarm_backends.core.lock.service_lock import multi_service_lock, service_lock
 from alarm_backends.service.fta_action.tasks import create_actions
 from bkmonitor.documents import AlertLog
 from bkmonitor.utils.common_utils import count_md5
@@ -627,12 +627,93 @@ class CompositeProcessor:
         if keys:
             COMPOSITE_CHECK_RESULT.client.delete(*keys)
 
+    def need_single_detect(self) -> bool:
+        """
+        是否需要进行单告警检测，没有策略也没有适配规则的告警直接跳过
+        """
+        return bool(self.alert.strategy_id or self.alert.get_extra_info("matched_rule_info"))
+
+    def get_check_handle_record_key(self):
+        """
+        判断是否已发送过处理信号时使用的首次处理记录，只有已有检测结果的异常告警才需要
+        """
+        check_signal = ActionSignal.NO_DATA if self.alert.is_no_data() else ActionSignal.ABNORMAL
+        return ALERT_FIRST_HANDLE_RECORD.get_key(
+            strategy_id=self.alert.strategy_id, alert_id=self.alert.id, signal=check_signal
+        )
+
+    def decide_signal(self, cached_result, is_send_handle_signal=None):
+        """
+        根据上一次的检测结果，判断当前告警需要发送的信号
+        :param cached_result: 上一次的检测结果(告警级别)
+        :param is_send_handle_signal: 是否已发送过处理信号，为 None 时按需从缓存中获取
+        """
+        signal = None
+
+        if cached_result and not self.alert_status == EventStatus.ABNORMAL:
+            # 当前有异常，但告警已经是非异常状态，需要发信号
+            if self.alert_status == EventStatus.RECOVERED:
+                signal = ActionSignal.RECOVERED
+            else:
+                signal = ActionSignal.CLOSED
+        elif not cached_result and self.alert_status == EventStatus.ABNORMAL:
+            # 当前无异常，但告警是异常状态，需要发信号
+            if self.alert.is_no_data():
+                # 无数据告警
+                signal = ActionSignal.NO_DATA
+            else:
+                signal = ActionSignal.ABNORMAL
+        elif cached_result and self.alert_status == EventStatus.ABNORMAL and self.alert.is_ack_signal:
+            # 如果缓存中存在告警，且当前的告警已经确认并没有发送通知，则属于告警确认的情况，需要发一个确认任务信号
+            signal = ActionSignal.ACK
+        elif cached_result and self.alert_status == EventStatus.ABNORMAL and self.alert.severity < int(cached_result):
+            # 如果缓存中存在告警，且当前的告警级别比缓存中的级别要高，则属于告警升级的情况，需要发一个异常信号
+            signal = ActionSignal.ABNORMAL
+        elif cached_result and self.alert_status == EventStatus.ABNORMAL:
+            # 如果当前缓存已经存在，但是并没有处理过的情况下， 需要重新发送执行信号
+            check_signal = ActionSignal.NO_DATA if self.alert.is_no_data() else ActionSignal.ABNORMAL
+            if is_send_handle_signal is None:
+                is_send_handle_signal = ALERT_FIRST_HANDLE_RECORD.client.get(self.get_check_handle_record_key())
+            if not (self.alert.is_handled or is_send_handle_signal):
+                # 如果没有处理过或者已经发送了处理信号，直接忽略
+                if int(time.time()) - self.alert.create_time >= settings.QOS_DROP_ACTION_WINDOW:
+                    # 这类没有处理过的数据，一般有可能是因为QOS引起的，所以可以延迟一点再发送, 否则相同的周期内，会有重复的自增记录
+                    signal = check_signal
+
+        return signal
+
+    def should_push_signal(self, signal) -> bool:
+        if signal != ActionSignal.ABNORMAL and not self.alert.strategy_id:
+            # 如果是第三方分派的情况下，忽略非异常信号的通知
+            logger.info(
+                "[composite ignore] alert(%s) signal(%s) source(%s), no strategy_id",
+                signal,
+                self.alert.id,
+                self.alert.top_event.get("plugin_id", ""),
+            )
+            return False
+        return True
+
+    def get_first_handle_key(self, signal):
+        return ALERT_FIRST_HANDLE_RECORD.get_key(
+            strategy_id=self.alert.strategy_id or 0, alert_id=self.alert.id, signal=signal
+        )
+
+    def add_signal_action(self, signal):
+        self.add_action(
+            strategy_id=self.alert.strategy_id,
+            signal=signal,
+            alert_ids=[self.alert.id],
+            severity=self.alert.severity,
+            dimensions=self.alert.dimensions,
+        )
+        return self.actions[-1]
+
     def process_single_strategy(self):
         """
         单告警策略（监控特有）
         """
-        strategy_id = self.alert.strategy_id
-        if not (strategy_id or self.alert.get_extra_info("matched_rule_info")):
+        if not self.need_single_detect():
             # 没有策略也没有适配规则，直接返回
             return
 
@@ -641,76 +722,17 @@ class CompositeProcessor:
                 cache_key = ALERT_DETECT_RESULT.get_key(alert_id=self.alert.id)
                 cached_result = ALERT_DETECT_RESULT.client.get(cache_key)
 
-                signal = None
-
-                if cached_result and not self.alert_status == EventStatus.ABNORMAL:
-                    # 当前有异常，但告警已经是非异常状态，需要发信号
-                    if self.alert_status == EventStatus.RECOVERED:
-                        signal = ActionSignal.RECOVERED
-                    else:
-                        signal = ActionSignal.CLOSED
-                elif not cached_result and self.alert_status == EventStatus.ABNORMAL:
-                    # 当前无异常，但告警是异常状态，需要发信号
-                    if self.alert.is_no_data():
-                        # 无数据告警
-                        signal = ActionSignal.NO_DATA
-                    else:
-                        signal = ActionSignal.ABNORMAL
-                elif cached_result and self.alert_status == EventStatus.ABNORMAL and self.alert.is_ack_signal:
-                    # 如果缓存中存在告警，且当前的告警已经确认并没有发送通知，则属于告警确认的情况，需要发一个确认任务信号
-                    signal = ActionSignal.ACK
-                elif (
-                    cached_result
-                    and self.alert_status == EventStatus.ABNORMAL
-                    and self.alert.severity < int(cached_result)
-                ):
-                    # 如果缓存中存在告警，且当前的告警级别比缓存中的级别要高，则属于告警升级的情况，需要发一个异常信号
-                    signal = ActionSignal.ABNORMAL
-                elif cached_result and self.alert_status == EventStatus.ABNORMAL:
-                    # 如果当前缓存已经存在，但是并没有处理过的情况下， 需要重新发送执行信号
-                    check_signal = ActionSignal.NO_DATA if self.alert.is_no_data() else ActionSignal.ABNORMAL
-                    is_send_handle_signal = ALERT_FIRST_HANDLE_RECORD.client.get(
-                        ALERT_FIRST_HANDLE_RECORD.get_key(
-                            strategy_id=strategy_id, alert_id=self.alert.id, signal=check_signal
-                        )
-                    )
-                    if not (self.alert.is_handled or is_send_handle_signal):
-                        # 如果没有处理过或者已经发送了处理信号，直接忽略
-                        if int(time.time()) - self.alert.create_time >= settings.QOS_DROP_ACTION_WINDOW:
-                            # 这类没有处理过的数据，一般有可能是因为QOS引起的，所以可以延迟一点再发送, 否则相同的周期内，会有重复的自增记录
-                            signal = check_signal
+                signal = self.decide_signal(cached_result)
 
                 action = None
-                if signal:
-                    # 推送动作信号
-                    if signal != ActionSignal.ABNORMAL and not strategy_id:
-                        # 如果是第三方分派的情况下，忽略非异常信号的通知
-                        logger.info(
-                            "[composite ignore] alert(%s) signal(%s) source(%s), no strategy_id",
-                            signal,
-                            self.alert.id,
-                            self.alert.top_event.get("plugin_id", ""),
-                        )
-                    else:
-                        first_handle_key = ALERT_FIRST_HANDLE_RECORD.get_key(
-                            strategy_id=self.alert.strategy_id or 0, alert_id=self.alert.id, signal=signal
-                        )
-                        if ALERT_FIRST_HANDLE_RECORD.client.set(
-                            first_handle_key, 1, nx=True, ex=ALERT_FIRST_HANDLE_RECORD.ttl
-                        ):
-                            # 只有第一次设置成功，才可以进行消息推送
-                            # todo 优化
-                            self.add_action(
-                                strategy_id=strategy_id,
-                                signal=signal,
-                                alert_ids=[self.alert.id],
-                                severity=self.alert.severity,
-                                dimensions=self.alert.dimensions,
-                            )
-                            # 这里没必要再执行一次，因为已经设置成功了
-                            # ALERT_FIRST_HANDLE_RECORD.client.expire(first_handle_key, ALERT_FIRST_HANDLE_RECORD.ttl)
-                            action = self.actions[-1]
-                        self.push_actions()
+                # 推送动作信号
+                if signal and self.should_push_signal(signal):
+                    if ALERT_FIRST_HANDLE_RECORD.client.set(
+                        self.get_first_handle_key(signal), 1, nx=True, ex=ALERT_FIRST_HANDLE_RECORD.ttl
+                    ):
+                        # 只有第一次设置成功，才可以进行消息推送
+                        action = self.add_signal_action(signal)
+                    self.push_actions()
 
                 # 推送动作成功后，将本次结果写入缓存
                 if self.alert_status == EventStatus.ABNORMAL:
@@ -752,7 +774,9 @@ class CompositeProcessor:
 
     def process(self):
         self.process_single_strategy()
+        self.process_composite_strategies()
 
+    def process_composite_strategies(self):
         # 1. 如果告警本身就是由关联告警策略产生的，则不再进行关联检测
         # 2. 如果告警是无数据告警，则不参与关联检测
         if not self.is_composite_strategy() and not self.alert.is_no_data():
@@ -764,3 +788,206 @@ class CompositeProcessor:
                     logger.info("[composite] strategy(%s) not in alarm time: %s, skipped", strategy["id"], message)
                     continue
                 self.process_composite_strategy(strategy)
+
+
+# 单告警检测结果的批量比较并设置脚本
+# KEYS: 检测结果 key；ARGV: 过期时间, 之后每个 key 依次为 期望的当前值, 新值(空字符串表示删除)
+# 返回每个 key 是否设置成功，当前值与期望值不一致(已被其他任务修改)的 key 不做修改
+DETECT_RESULT_CAS_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+local result = {}
+for i, key in ipairs(KEYS) do
+    local expected = ARGV[i * 2]
+    local value = ARGV[i * 2 + 1]
+    local current = redis.call("GET", key) or ""
+    if current == expected then
+        if value == "" then
+            redis.call("DEL", key)
+        else
+            redis.call("SET", key, value, "EX", ttl)
+        end
+        result[i] = 1
+    else
+        result[i] = 0
+    end
+end
+return result
+"""
+
+
+class CompositeBatchProcessor:
+    """
+    批量告警检测
+
+    单告警检测的检测结果及首次处理记录按批次通过 pipeline 读写:
+    - 优先通过 lua 脚本对检测结果做比较并设置，检测结果迁移成功的告警才推送信号，无需逐个告警加锁
+    - 关闭比较并设置或 redis 不支持 lua 脚本时，回退为批量加锁
+    检测结果已被其他任务修改或加锁失败的告警，重新发布批量任务
+    关联告警检测仍按告警逐个进行
+    """
+
+    def __init__(self, processors: list[CompositeProcessor], retry_times: int = 0):
+        self.processors = processors
+        self.retry_times = retry_times
+        self.retry_processors: list[CompositeProcessor] = []
+
+    def process(self):
+        self.process_single_strategies()
+        for processor in self.processors:
+            try:
+                processor.process_composite_strategies()
+            except Exception as e:
+                logger.exception(
+                    "[composite ERROR] alert(%s) strategy(%s) detail: %s",
+                    processor.alert.id,
+                    processor.alert.strategy_id,
+                    e,
+                )
+
+    def process_single_strategies(self) -> dict:
+        """
+        批量单告警检测
+        :return: 告警ID -> 推送的动作
+        """
+        processors = [processor for processor in self.processors if processor.need_single_detect()]
+        if not processors:
+            return {}
+
+        actions = None
+        if settings.COMPOSITE_DETECT_CAS_ENABLED:
+            cached_results, signals = self.fetch_signals(processors)
+            try:
+                committed = self.compare_and_set_detect_results(processors, cached_results)
+            except Exception as e:
+                # redis 不支持 lua 脚本时回退为批量加锁
+                logger.info("[composite batch] compare and set detect result failed, fallback to lock: %s", e)
+            else:
+                pairs = []
+                for processor, signal, is_committed in zip(processors, signals, committed):
+                    if is_committed:
+                        pairs.append((processor, signal))
+                    else:
+                        self.retry_processors.append(processor)
+                actions = self.push_signals(pairs)
+                self.clear_closed_detect_cache([processor for processor, __ in pairs])
+
+        if actions is None:
+            actions = self.process_with_lock(processors)
+
+        self.retry()
+        return actions
+
+    def process_with_lock(self, processors: list[CompositeProcessor]) -> dict:
+        lock_keys = [ALERT_DETECT_KEY_LOCK.get_key(alert_id=processor.alert.id) for processor in processors]
+        with multi_service_lock(ALERT_DETECT_KEY_LOCK, lock_keys) as lock:
+            locked_processors = []
+            for processor, lock_key in zip(processors, lock_keys):
+                if lock.is_locked(lock_key):
+                    locked_processors.append(processor)
+                else:
+                    self.retry_processors.append(processor)
+
+            if not locked_processors:
+                return {}
+
+            __, signals = self.fetch_signals(locked_processors)
+            actions = self.push_signals(list(zip(locked_processors, signals)))
+
+            # 推送动作成功后，将本次结果写入缓存
+            pipeline = ALERT_DETECT_RESULT.client.pipeline(transaction=False)
+            for processor in locked_processors:
+                cache_key = ALERT_DETECT_RESULT.get_key(alert_id=processor.alert.id)
+                if processor.alert_status == EventStatus.ABNORMAL:
+                    pipeline.set(cache_key, processor.alert.severity, ALERT_DETECT_RESULT.ttl)
+                else:
+                    pipeline.delete(cache_key)
+            pipeline.execute()
+            self.clear_closed_detect_cache(locked_processors)
+            return actions
+
+    @staticmethod
+    def fetch_signals(processors: list[CompositeProcessor]) -> tuple[list, list]:
+        """
+        批量获取上一次的检测结果及首次处理记录，并判断每个告警需要发送的信号
+        :return: 上一次的检测结果列表, 信号列表
+        """
+        pipeline = ALERT_DETECT_RESULT.client.pipeline(transaction=False)
+        for processor in processors:
+            pipeline.get(ALERT_DETECT_RESULT.get_key(alert_id=processor.alert.id))
+            pipeline.get(processor.get_check_handle_record_key())
+        results = pipeline.execute()
+
+        cached_results = results[0::2]
+        signals = [
+            processor.decide_signal(cached_result, bool(handle_record))
+            for processor, cached_result, handle_record in zip(processors, cached_results, results[1::2])
+        ]
+        return cached_results, signals
+
+    @staticmethod
+    def compare_and_set_detect_results(processors: list[CompositeProcessor], cached_results: list) -> list[bool]:
+        """
+        以检测时读取的结果作为期望值，批量写入本次检测结果
+        """
+        keys = []
+        args = [ALERT_DETECT_RESULT.ttl]
+        for processor, cached_result in zip(processors, cached_results):
+            keys.append(ALERT_DETECT_RESULT.get_key(alert_id=processor.alert.id))
+            new_value = processor.alert.severity if processor.alert_status == EventStatus.ABNORMAL else ""
+            args.extend([cached_result or "", new_value])
+        results = ALERT_DETECT_RESULT.client.eval(DETECT_RESULT_CAS_SCRIPT, len(keys), *keys, *args)
+        return [bool(result) for result in results]
+
+    @staticmethod
+    def push_signals(pairs: list[tuple[CompositeProcessor, str]]) -> dict:
+        """
+        批量设置首次处理记录，只有第一次设置成功的信号才推送动作
+        """
+        pairs = [(processor, signal) for processor, signal in pairs if signal and processor.should_push_signal(signal)]
+        if not pairs:
+            return {}
+
+        pipeline = ALERT_FIRST_HANDLE_RECORD.client.pipeline(transaction=False)
+        for processor, signal in pairs:
+            pipeline.set(processor.get_first_handle_key(signal), 1, nx=True, ex=ALERT_FIRST_HANDLE_RECORD.ttl)
+        results = pipeline.execute()
+
+        actions = {}
+        for (processor, signal), is_first in zip(pairs, results):
+            if is_first:
+                actions[processor.alert.id] = processor.add_signal_action(signal)
+            processor.push_actions()
+        return actions
+
+    @staticmethod
+    def clear_closed_detect_cache(processors: list[CompositeProcessor]):
+        for processor in processors:
+            if processor.alert_status != EventStatus.ABNORMAL:
+                processor.clear_composite_detect_cache()
+
+    def retry(self):
+        """
+        检测结果已被其他任务修改或加锁失败的告警，重新发布批量任务
+        """
+        if not self.retry_processors:
+            return
+
+        from alarm_backends.service.composite.tasks import (
+            check_action_and_composite_batch,
+        )
+
+        logger.info(
+            "[composite batch] alerts(%s) are being processed by other tasks, will process later",
+            ",".join(str(processor.alert.id) for processor in self.retry_processors),
+        )
+        check_action_and_composite_batch.apply_async(
+            kwargs={
+                "alerts": [
+                    {"alert_key": processor.alert.key, "alert_status": processor.alert_status}
+                    for processor in self.retry_processors
+                ],
+                "retry_times": self.retry_times + 2,
+            },
+            countdown=1,
+        )
+        self.retry_processors = []
@@ -2,7 +2,10 @@ import logging
 
 from alarm_backends.core.alert import Alert
 from alarm_backends.core.alert.alert import AlertKey
-from alarm_backends.service.composite.processor import CompositeProcessor
+from alarm_backends.service.composite.processor import (
+    CompositeBatchProcessor,
+    CompositeProcessor,
+)
 from alarm_backends.service.scheduler.app import app
 from constants.action import ActionSignal
 from core.errors.alert import AlertNotFoundError
@@ -80,6 +83,75 @@ def check_action_and_composite(
     metrics.report_all()
 
 
+@app.task(ignore_result=True, queue="celery_composite")
+def check_action_and_composite_batch(alerts: list[dict], retry_times: int = 0):
+    """
+    批量检测告警
+    :param alerts: 待检测告警列表 [{"alert_key": 告警标识, "alert_status": 告警状态}]
+    :param retry_times: 重试次数，最大为2
+    """
+    if retry_times > 2:
+        logger.info(
+            "[composite batch] alerts(%s) retry times exceed 2, skip it",
+            ",".join(str(item["alert_key"].alert_id) for item in alerts),
+        )
+        return
+
+    # 同一个告警只保留最后一次的状态
+    alert_status = {}
+    alert_keys = {}
+    for item in alerts:
+        alert_id = str(item["alert_key"].alert_id)
+        alert_keys[alert_id] = item["alert_key"]
+        alert_status[alert_id] = item["alert_status"]
+
+    logger.info("[composite batch] begin: alerts(%s)", len(alert_keys))
+
+    processors = []
+    for alert in Alert.mget(list(alert_keys.values())):
+        alert_id = str(alert.id)
+        if alert_id not in alert_keys:
+            continue
+        alert_keys.pop(alert_id)
+        if not alert.bk_biz_id:
+            logger.info("[composite] alert(%s) bk_biz_id is empty, skip it", alert.id)
+            continue
+        processors.append(
+            CompositeProcessor(alert=alert, alert_status=alert_status[alert_id], retry_times=retry_times)
+        )
+
+    if alert_keys and retry_times <= 2:
+        # 如果从redis和ES都找不到告警，可以推迟5s之后再次检测
+        logger.info("[composite batch] alerts(%s) not found, retry in 5s", ",".join(alert_keys))
+        check_action_and_composite_batch.apply_async(
+            kwargs={
+                "alerts": [
+                    {"alert_key": alert_key, "alert_status": alert_status[alert_id]}
+                    for alert_id, alert_key in alert_keys.items()
+                ],
+                "retry_times": retry_times + 1,
+            },
+            countdown=5,
+        )
+
+    if not processors:
+        return
+
+    exc = None
+
+    try:
+        with metrics.COMPOSITE_PROCESS_TIME.labels(strategy_id=metrics.TOTAL_TAG).time():
+            CompositeBatchProcessor(processors, retry_times=retry_times).process()
+    except Exception as e:
+        exc = e
+        logger.exception("[composite batch ERROR] alerts(%s) detail: %s", len(processors), e)
+
+    metrics.COMPOSITE_PROCESS_COUNT.labels(
+        strategy_id=metrics.TOTAL_TAG, status=metrics.StatusEnum.from_exc(exc), exception=exc
+    ).inc()
+    metrics.report_all()
+
+
 @app.task(ignore_result=True, queue="celery_composite")
 def check_incident_action_and_composite(incident_id: int, incident_stage: str, incident_actions: list = None, **kwargs):
     """
@@ -13,6 +13,7 @@ import json
 import logging
 
 import arrow
+from django.conf import settings
 
 from alarm_backends.constants import CONST_MINUTES
 from alarm_backends.core.cache.key import (
@@ -30,6 +31,40 @@ from constants.action import (
 
 logger = logging.getLogger("fta_action.converge")
 
+# 收敛维度计算脚本
+# KEYS: 按维度分组排列的维度集合 key；ARGV: 开始时间, 结束时间, 各维度的集合数量
+# 同一维度的集合取并集，不同维度之间取交集，只返回时间窗口内命中所有维度的成员
+CONVERGE_INTERSECT_SCRIPT = """
+local start_score, end_score = ARGV[1], ARGV[2]
+local group_count = #ARGV - 2
+local hits = {}
+local index = 1
+for group = 1, group_count do
+    local size = tonumber(ARGV[group + 2])
+    local matched = 0
+    for i = index, index + size - 1 do
+        local members = redis.call("ZRANGEBYSCORE", KEYS[i], start_score, end_score)
+        for _, member in ipairs(members) do
+            if (hits[member] or 0) == group - 1 then
+                hits[member] = group
+                matched = matched + 1
+            end
+        end
+    end
+    if matched == 0 then
+        return {}
+    end
+    index = index + size
+end
+local result = {}
+for member, hit in pairs(hits) do
+    if hit == group_count then
+        table.insert(result, member)
+    end
+end
+return result
+"""
+
 
 class DimensionHandler(object):
     def __init__(
@@ -67,23 +102,50 @@ class DimensionHandler(object):
         if self.instance_type == ConvergeType.CONVERGE:
             # 如果是二级收敛，获取方法不一致
             keys_length, pipeline_results = self.get_sub_converge_instances()
-        else:
-            pipeline = FTA_CONVERGE_DIMENSION_KEY.client.pipeline()
-            for key, values in self.condition.items():
-                set_keys = self.get_set_keys(key, values)
-                keys_length[key] = len(set_keys)
-                for set_key in set_keys:
-                    # 获取并集
-                    pipeline.zrangebyscore(set_key, self.start_timestamp, self.end_timestamp, withscores=True)
-            pipeline_results = pipeline.execute()
+            return self.calc_converge_results(keys_length, pipeline_results)
+
+        key_groups = [list(self.get_set_keys(key, values)) for key, values in self.condition.items()]
+        if settings.CONVERGE_DIMENSION_SERVER_SIDE_ENABLED and key_groups:
+            try:
+                return self.get_by_condition_in_redis(key_groups)
+            except Exception as e:
+                # redis 不支持 lua 脚本(如本地测试替身)时，回退到进程内计算
+                logger.info("$%s calc converge dimension in redis failed, fallback: %s", self.instance_id, e)
+
+        pipeline = FTA_CONVERGE_DIMENSION_KEY.client.pipeline()
+        for key, set_keys in zip(self.condition.keys(), key_groups):
+            keys_length[key] = len(set_keys)
+            for set_key in set_keys:
+                # 获取并集
+                pipeline.zrangebyscore(set_key, self.start_timestamp, self.end_timestamp, withscores=True)
+        pipeline_results = pipeline.execute()
         return self.calc_converge_results(keys_length, pipeline_results)
 
+    def get_by_condition_in_redis(self, key_groups):
+        """
+        在 redis 中完成时间窗口内的维度并集与交集计算，只返回命中的关联ID
+        所有维度集合的 key 都带有相同的策略ID，会路由到同一个 redis 节点
+        """
+        keys = [set_key for set_keys in key_groups for set_key in set_keys]
+        args = [self.start_timestamp, self.end_timestamp] + [len(set_keys) for set_keys in key_groups]
+        result_list = set(FTA_CONVERGE_DIMENSION_KEY.client.eval(CONVERGE_INTERSECT_SCRIPT, len(keys), *keys, *args))
+
+        logger.info(
+            "$%s dimension_key %s len:%s filter:%s-%s (redis)",
+            self.instance_id,
+            self.dimension,
+            len(result_list),
+            self.start_timestamp,
+            self.end_timestamp,
+        )
+        return result_list
+
     def calc_converge_results(self, keys_length, converge_results):
         index = 0
         all_key_results = []
         for length in keys_length.values():
             all_key_results.append(converge_results[index : index + length])
-            index += 1
+            index += length
 
         if not all_key_results:
             return []
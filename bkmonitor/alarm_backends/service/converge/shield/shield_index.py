@@ -0,0 +1,149 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import logging
+import time
+
+import arrow
+from django.conf import settings
+
+from alarm_backends.core.cache.shield import ShieldCacheManager
+from alarm_backends.service.converge.shield.shield_obj import AlertShieldObj
+from bkmonitor.documents.alert import AlertDocument
+from bkmonitor.utils.range.conditions import AndCondition, EqualCondition, OrCondition
+from bkmonitor.utils.range.index import ConditionFieldIndex
+
+logger = logging.getLogger("fta_action.shield")
+
+# 优先作为索引的维度，按策略屏蔽的配置大多带有策略ID
+PREFERRED_INDEX_KEYS = ("strategy_id",)
+
+
+class ShieldIndex(ConditionFieldIndex):
+    """
+    屏蔽配置索引
+
+    屏蔽配置在构建时统一解析为 AlertShieldObj(维度条件已预编译)，以屏蔽配置下标为条目位置建立维度条件倒排。
+    匹配时先按时间过滤生效中的屏蔽配置，再只对维度值命中的候选屏蔽配置执行完整的维度匹配，结果与逐条匹配一致
+    """
+
+    def __init__(self, configs: list[dict]):
+        super().__init__()
+        self.configs = configs
+        self.shield_objs: list[AlertShieldObj] = []
+        self.shield_objs_by_id: dict[str, AlertShieldObj] = {}
+        # 时间匹配结果按秒缓存
+        self._time_match_second = None
+        self._time_match_result = {}
+
+        for config in configs:
+            try:
+                shield_obj = AlertShieldObj(config)
+            except Exception as e:
+                logger.exception("[shield index] load shield(%s) error: %s", config.get("id"), e)
+                continue
+            self.add(shield_obj)
+
+    def __len__(self):
+        return len(self.shield_objs)
+
+    def add(self, shield_obj: AlertShieldObj):
+        position = len(self.shield_objs)
+        self.shield_objs.append(shield_obj)
+        self.shield_objs_by_id[str(shield_obj.id)] = shield_obj
+
+        condition = self.choose_index_condition(shield_obj)
+        self.index_field(position, condition.cond_field if condition else None)
+
+    @classmethod
+    def choose_index_condition(cls, shield_obj: AlertShieldObj) -> EqualCondition | None:
+        """
+        选择用于建立索引的维度条件，条件必须是所有匹配分支都要满足的精确匹配
+        """
+        conditions = []
+        for condition in shield_obj.dimension_check.conditions:
+            if isinstance(condition, OrCondition) and len(condition.conditions) == 1:
+                condition = condition.conditions[0]
+            if isinstance(condition, AndCondition):
+                conditions.extend(condition.conditions)
+            else:
+                conditions.append(condition)
+
+        candidates = []
+        for condition in conditions:
+            # NotEqualCondition 继承自 EqualCondition，需要严格判断类型
+            if type(condition) is not EqualCondition or condition.default_value_if_not_exists:
+                continue
+            try:
+                values = set(condition.cond_field.to_str_list())
+            except Exception:
+                continue
+            candidates.append((condition.cond_field.name not in PREFERRED_INDEX_KEYS, len(values), condition))
+
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: c[:2])[2]
+
+    def is_time_match(self, position, source_time) -> bool:
+        second = int(source_time.float_timestamp)
+        if second != self._time_match_second:
+            self._time_match_second = second
+            self._time_match_result = {}
+        result = self._time_match_result.get(position)
+        if result is None:
+            result = self._time_match_result[position] = self.shield_objs[position].time_check.is_match(source_time)
+        return result
+
+    def match(self, alert: AlertDocument) -> list[AlertShieldObj]:
+        """
+        获取告警命中的屏蔽配置，顺序与屏蔽配置顺序一致
+        """
+        if not self.shield_objs:
+            return []
+
+        source_time = arrow.now()
+        active_positions = {
+            position for position in range(len(self.shield_objs)) if self.is_time_match(position, source_time)
+        }
+        if not active_positions:
+            return []
+
+        dimension = self.shield_objs[0].get_dimension(alert)
+        candidates = self.get_candidates(dimension)
+
+        matched = []
+        for position in sorted(candidates & active_positions):
+            shield_obj = self.shield_objs[position]
+            if shield_obj.dimension_matcher(dimension):
+                matched.append(shield_obj)
+        return matched
+
+
+_index_cache = {}
+
+
+def get_shield_index(bk_biz_id) -> ShieldIndex:
+    """
+    获取业务的屏蔽配置索引
+    缓存的屏蔽配置没有变化时复用进程内的索引，超过 SHIELD_INDEX_MAX_AGE 秒后重建，以刷新动态分组等外部数据
+    """
+    raw = ShieldCacheManager.get_raw_shields_by_biz_id(bk_biz_id)
+    now = time.time()
+    cached = _index_cache.get(bk_biz_id)
+    if cached and cached[0] == raw and now - cached[1] < settings.SHIELD_INDEX_MAX_AGE:
+        return cached[2]
+
+    index = ShieldIndex(ShieldCacheManager.parse_shields(raw))
+    _index_cache[bk_biz_id] = (raw, now, index)
+    return index
+
+
+def clear_shield_index():
+    _index_cache.clear()
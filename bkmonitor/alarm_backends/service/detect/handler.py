@@ -11,13 +11,15 @@ specific language governing permissions and limitations under the License.
 
 
 import logging
+from collections import defaultdict
 
+from django.conf import settings
 from django.core.cache import caches
 
 from alarm_backends.core.cache import key
 from alarm_backends.core.control.strategy import Strategy
 from alarm_backends.core.handlers import base
-from alarm_backends.service.detect.tasks import run_detect, run_detect_with_sdk
+from alarm_backends.service.detect.tasks import run_detect, run_detect_batch, run_detect_with_sdk
 
 logger = logging.getLogger("detect")
 mem_cache = caches["locmem"]
@@ -42,39 +44,77 @@ class DetectCeleryHandler(DetectHandler):
     max_input_count = 100
 
     def handle(self):
-        strategy_ids = set()
-        while len(strategy_ids) <= self.max_input_count:
-            strategy_id = self.client.rpop(self.data_signal_key)
-            if strategy_id is None:
-                # 当前队列无待处理数据
-                if len(strategy_ids) > 0:
-                    # 已经拉到部分, 直接开始处理
-                    break
-                else:
-                    # 阻塞等待新数据
-                    ret = self.client.brpop(self.data_signal_key, 5)
-                    if ret:
-                        strategy_id = ret[1]
-
-            if strategy_id:
-                strategy_ids.add(strategy_id)
-                continue
-
-            break
+        strategy_ids = self.pull_strategy_ids()
+        if not strategy_ids:
+            logger.debug("未拉取到待处理的策略项")
+            return
 
         aiops_strategy_ids = set()
+        slot_strategy_ids = defaultdict(list)
         # 根据策略检测算法及是否启用sdk检测，决定推送不同的处理队列
         for strategy_id in strategy_ids:
             if self.use_aiops_sdk(strategy_id):
                 run_detect_with_sdk.apply_async(args=(strategy_id,))
                 aiops_strategy_ids.add(strategy_id)
                 continue
-            run_detect.apply_async(args=(strategy_id,))
+            slot_strategy_ids[self.get_slot(strategy_id)].append(strategy_id)
+
+        for slot, slot_ids in slot_strategy_ids.items():
+            self.dispatch(slot, slot_ids)
 
         logger.info("[detect] total published {} strategy_ids: {}".format(len(strategy_ids), strategy_ids))
         if aiops_strategy_ids:
             logger.info("[detect] published aiops_strategy_ids: {}".format(aiops_strategy_ids))
 
+    def pop_signals(self, count):
+        """
+        通过 pipeline 一次往返弹出多个信号，兼容不支持 RPOP count 参数的 redis 版本
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for _ in range(count):
+            pipeline.rpop(self.data_signal_key)
+        return [strategy_id for strategy_id in pipeline.execute() if strategy_id is not None]
+
+    def pull_strategy_ids(self):
+        """
+        批量拉取待检测策略，同一策略的重复信号只保留一个
+        """
+        batch_size = max(settings.DETECT_SIGNAL_BATCH_SIZE, 1)
+        strategy_ids = {}
+        while len(strategy_ids) <= self.max_input_count:
+            signals = self.pop_signals(batch_size)
+            if not signals and not strategy_ids:
+                # 阻塞等待新数据，拿到后继续批量拉取同一时刻到达的信号
+                ret = self.client.brpop(self.data_signal_key, 5)
+                if not ret:
+                    break
+                signals = [ret[1]] + self.pop_signals(batch_size - 1)
+
+            strategy_ids.update(dict.fromkeys(signals))
+            if len(signals) < batch_size:
+                # 当前队列已拉空
+                break
+        return list(strategy_ids)
+
+    @staticmethod
+    def get_slot(strategy_id):
+        """
+        策略固定分配到同一槽位，未开启槽位时返回 None
+        槽位只有投递到独立队列时才能保持缓存亲和，未配置队列前缀时不开启，避免策略挤在少量任务中降低检测并发
+        """
+        if settings.DETECT_SIGNAL_SLOTS <= 0 or not settings.DETECT_SIGNAL_SLOT_QUEUE_PREFIX:
+            return None
+        return int(strategy_id) % settings.DETECT_SIGNAL_SLOTS
+
+    @staticmethod
+    def dispatch(slot, strategy_ids):
+        if slot is None:
+            for strategy_id in strategy_ids:
+                run_detect.apply_async(args=(strategy_id,))
+            return
+
+        run_detect_batch.apply_async(args=(strategy_ids,), queue=f"{settings.DETECT_SIGNAL_SLOT_QUEUE_PREFIX}{slot}")
+
     @classmethod
     def use_aiops_sdk(cls, strategy_id):
         # 内存
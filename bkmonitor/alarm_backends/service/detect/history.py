@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import math
+import time
+
+from django.conf import settings
+
+from alarm_backends.core.cache import key
+
+# 单个分桶最多容纳的周期数及最大时间跨度(秒)
+BUCKET_MAX_POINTS = 60
+BUCKET_MAX_SPAN = 60 * 60
+# 分桶内记录已查询过的周期的字段前缀，维度md5不会与之冲突
+COVERED_FIELD = "__covered__"
+
+
+class HistorySeriesStore:
+    """
+    同环比类算法的历史数据列式缓存
+
+    同一监控项的历史数据按监控周期对齐后分桶保存在 HISTORY_SERIES_KEY 中，每个周期单独一个 field:
+    - "{维度md5}.{桶内下标}" 为该维度在对应周期的值(json，区分整数与浮点数)，缺失的周期没有 field
+    - "__covered__.{桶内下标}" 表示该周期已经从数据源查询过，即使没有数据也不再重复查询。
+      查询没有返回数据的周期，只有超过数据源入库延迟后才会标记，避免迟到的数据不再被查询
+    一次检测内同一分桶只读取一次，写入时只更新有变化的周期
+    key 中包含汇聚周期，修改周期后不会沿用旧周期的分桶及已查询标记
+    """
+
+    def __init__(self, item):
+        self.item = item
+        self.interval = int(item.query_configs[0]["agg_interval"]) or 60
+        self.bucket_points = max(1, min(BUCKET_MAX_POINTS, BUCKET_MAX_SPAN // self.interval))
+        self.bucket_span = self.interval * self.bucket_points
+        self.ttl = max(key.HISTORY_SERIES_KEY.ttl, self.bucket_span * 2)
+        self.client = key.HISTORY_SERIES_KEY.client
+        # 早于该时间的周期视为数据已完整入库
+        self.settled_until = (
+            int(time.time()) - settings.ACCESS_DATA_TIME_DELAY - (getattr(item, "time_delay", 0) or 0) - self.interval
+        )
+        # 本批次需要检测的维度，读取分桶时只取这些维度
+        self.dimensions_md5s = set()
+        # bucket -> {dimensions_md5: [values, int_mask]}
+        self.series = {}
+        # bucket -> 已读取的维度
+        self.loaded = {}
+        # bucket -> 已查询周期位图
+        self.covered = {}
+
+    def get_key(self, bucket):
+        return key.HISTORY_SERIES_KEY.get_key(
+            strategy_id=self.item.strategy.id, item_id=self.item.id, interval=self.interval, bucket=bucket
+        )
+
+    def locate(self, timestamp):
+        """
+        返回时间点所在分桶的起始时间及桶内下标
+        """
+        index = int(timestamp) // self.interval
+        return index // self.bucket_points * self.bucket_span, index % self.bucket_points
+
+    def timestamps(self, from_timestamp, until_timestamp):
+        return range(from_timestamp, until_timestamp, self.interval)
+
+    def buckets(self, from_timestamp, until_timestamp):
+        return {self.locate(timestamp)[0] for timestamp in self.timestamps(from_timestamp, until_timestamp)}
+
+    def bucket_end(self, timestamp):
+        return self.locate(timestamp)[0] + self.bucket_span
+
+    def load(self, buckets, dimensions_md5s=()):
+        """
+        批量读取分桶，已读取过的 (分桶, 维度) 不再重复读取
+        """
+        self.dimensions_md5s.update(dimensions_md5s)
+        self._load_pairs(
+            {
+                bucket: [md5 for md5 in self.dimensions_md5s if md5 not in self.loaded.get(bucket, ())]
+                for bucket in buckets
+            }
+        )
+
+    def get(self, dimensions_md5, timestamp):
+        """
+        获取维度在指定时间点的值，不存在时返回 None
+        """
+        bucket, index = self.locate(timestamp)
+        if dimensions_md5 not in self.loaded.get(bucket, ()):
+            self.load([bucket], [dimensions_md5])
+        series = self.series[bucket].get(dimensions_md5)
+        if not series or math.isnan(series[0][index]):
+            return None
+        value = series[0][index]
+        return int(value) if series[1] >> index & 1 else value
+
+    def is_ready(self, from_timestamp, until_timestamp):
+        """
+        时间范围内的每个周期要么已经查询过，要么本批次所有维度都已经有值
+        """
+        for timestamp in self.timestamps(from_timestamp, until_timestamp):
+            bucket, index = self.locate(timestamp)
+            if self.covered[bucket] >> index & 1:
+                continue
+            bucket_series = self.series[bucket]
+            for md5 in self.dimensions_md5s:
+                series = bucket_series.get(md5)
+                if not series or math.isnan(series[0][index]):
+                    return False
+        return True
+
+    def publish(self, points, covered_timestamps=()):
+        """
+        写入数据点并标记已查询的周期，只写入值有变化的周期
+        :param points: [(dimensions_md5, timestamp, value)]
+        :param covered_timestamps: 已经从数据源查询过的周期，查询结果中有数据或已超过入库延迟的周期才会被标记
+        """
+        mappings = {}
+        point_timestamps = set()
+        for md5, timestamp, value in points:
+            if value is None:
+                continue
+            point_timestamps.add(timestamp)
+            bucket, index = self.locate(timestamp)
+            value = value if isinstance(value, int) else float(value)
+            series = self.series.setdefault(bucket, {}).setdefault(md5, [[math.nan] * self.bucket_points, 0])
+            is_int = isinstance(value, int)
+            if series[0][index] == value and bool(series[1] >> index & 1) == is_int:
+                continue
+            series[0][index] = float(value)
+            if is_int:
+                series[1] |= 1 << index
+            else:
+                series[1] &= ~(1 << index)
+            mappings.setdefault(bucket, {})[f"{md5}.{index}"] = json.dumps(value)
+
+        for timestamp in covered_timestamps:
+            if timestamp not in point_timestamps and timestamp > self.settled_until:
+                # 查询没有返回数据且未超过入库延迟，数据可能尚未落地，后续周期仍需查询
+                continue
+            bucket, index = self.locate(timestamp)
+            covered = self.covered.get(bucket, 0)
+            if covered >> index & 1:
+                continue
+            self.covered[bucket] = covered | 1 << index
+            mappings.setdefault(bucket, {})[f"{COVERED_FIELD}.{index}"] = 1
+
+        if not mappings:
+            return
+
+        pipeline = self.client.pipeline(transaction=False)
+        for bucket, mapping in mappings.items():
+            history_key = self.get_key(bucket)
+            pipeline.hset(history_key, mapping=mapping)
+            pipeline.expire(history_key, self.ttl)
+        pipeline.execute()
+
+    def _load_pairs(self, pending):
+        """
+        按分桶读取指定维度
+        """
+        requests = [(bucket, md5s) for bucket, md5s in pending.items() if md5s or bucket not in self.covered]
+        if not requests:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for bucket, md5s in requests:
+            fields = [f"{COVERED_FIELD}.{index}" for index in range(self.bucket_points)]
+            for md5 in md5s:
+                fields.extend(f"{md5}.{index}" for index in range(self.bucket_points))
+            pipeline.hmget(self.get_key(bucket), fields)
+        for (bucket, md5s), result in zip(requests, pipeline.execute()):
+            covered = self.covered.get(bucket, 0)
+            for index, flag in enumerate(result[: self.bucket_points]):
+                if flag:
+                    covered |= 1 << index
+            self.covered[bucket] = covered
+
+            bucket_series = self.series.setdefault(bucket, {})
+            for offset, md5 in enumerate(md5s, start=1):
+                raw_values = result[offset * self.bucket_points : (offset + 1) * self.bucket_points]
+                if not any(raw_values):
+                    continue
+                series = bucket_series.setdefault(md5, [[math.nan] * self.bucket_points, 0])
+                for index, raw in enumerate(raw_values):
+                    if not raw:
+                        continue
+                    try:
+                        value = json.loads(raw)
+                    except ValueError:
+                        continue
+                    series[0][index] = float(value)
+                    if isinstance(value, int):
+                        series[1] |= 1 << index
+            self.loaded.setdefault(bucket, set()).update(md5s)
@@ -60,9 +60,11 @@ class DetectProcess(BaseAbnormalPushProcessor):
         data_channel = key.DATA_LIST_KEY.get_key(strategy_id=self.strategy_id, item_id=item.id)
         client = key.DATA_LIST_KEY.client
 
-        total_points = client.llen(data_channel)
         assert settings.SQL_MAX_LIMIT > 0, "SQL_MAX_LIMIT should bigger than zero"
-        offset = min([total_points, settings.SQL_MAX_LIMIT])
+        # 直接从队尾取最多 SQL_MAX_LIMIT 条，按实际取到的条数裁剪，无需先查询队列长度
+        # 队列左进右出且同一策略由服务锁保证单消费者，裁剪时不会误删新写入的数据
+        records = client.lrange(data_channel, -settings.SQL_MAX_LIMIT, -1)
+        offset = len(records)
         if offset == 0:
             logger.info(f"[detect] strategy({self.strategy_id}) item({item.id}) 暂无待检测数据")
             return
@@ -73,8 +75,6 @@ class DetectProcess(BaseAbnormalPushProcessor):
                 f"(SQL_MAX_LIMIT){settings.SQL_MAX_LIMIT}，部分数据可能存在处理延时"
             )
 
-        records = client.lrange(data_channel, -offset, -1)
-
         # 上报detect拉取数据量
         metrics.DETECT_PROCESS_DATA_COUNT.labels(strategy_id=metrics.TOTAL_TAG, type="pull").inc(len(records))
 
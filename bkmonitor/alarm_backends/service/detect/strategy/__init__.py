@@ -14,6 +14,7 @@ import functools
 import inspect
 import json
 import logging
+import operator
 import time
 from collections import Counter
 
@@ -24,6 +25,7 @@ from django.utils.translation import gettext as _
 from alarm_backends.core.cache import key
 from alarm_backends.service.access.data.records import DataRecord
 from alarm_backends.service.detect import AnomalyDataPoint, DataPoint
+from alarm_backends.service.detect.history import HistorySeriesStore
 from alarm_backends.templatetags.unit import unit_auto_convert, unit_convert_min
 from constants.aiops import SDKDetectStatus
 from core.errors.alarm_backends.detect import (
@@ -37,22 +39,148 @@ from core.unit import load_unit
 logger = logging.getLogger("detect")
 
 
+@functools.lru_cache(maxsize=1024)
+def compile_template(template_text: str) -> Template:
+    """
+    按模板文本缓存编译后的异常描述模板
+    """
+    # 这里的模板固定可控，但是安全扫描提示风险，因此添加忽略
+    return Template(template_text)  # nosec
+
+
+# 批量检测支持的比较运算符
+BATCH_COMPARE_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
 class DetectContext(dict):
     def __getattr__(self, item):
         return self.__getitem__(item)
 
 
+class BatchDetectContext:
+    """
+    批量检测上下文
+    按列保存整批数据点的检测变量(当前值、单位换算后的值)，避免逐点构造 DetectContext 和 eval 表达式
+    同一批数据点必须属于同一个监控项
+    """
+
+    def __init__(self, data_points):
+        self.data_points = data_points
+        self.unit = data_points[0].unit
+        self._unit = load_unit(self.unit)
+        self.raw_values = [getattr(data_point, "value", None) for data_point in data_points]
+        self.values = self.convert(self.raw_values)
+        # debug 数据点需要输出检测过程日志，强制走逐点检测
+        self.forced = ["__debug__" in data_point.as_dict() for data_point in data_points]
+
+    def __len__(self):
+        return len(self.data_points)
+
+    def convert(self, values):
+        """
+        批量单位换算，等价于逐个调用 unit_convert_min(value, unit)，换算失败的值置为 None
+        """
+        result = []
+        for value in values:
+            if value is None:
+                result.append(None)
+                continue
+            try:
+                result.append(self._unit.convert_to_max(value, None, decimal=settings.POINT_PRECISION)[0])
+            except Exception:
+                result.append(None)
+        return result
+
+
+def batch_compare(compare, left, right):
+    """
+    批量检测中的单值比较，无法判定的情况返回 True，交由逐点检测处理
+    """
+    if left is None or right is None:
+        return True
+    try:
+        return bool(compare(left, right))
+    except Exception:
+        return True
+
+
+def filter_batch_candidates(data_points, detectors, connector="and"):
+    """
+    批量预筛选：对整批数据点做数值比较，只返回可能异常的数据点，其余数据点无需逐点检测
+    :param data_points: 同一监控项的待检测数据点
+    :param detectors: 同级别的检测算法列表
+    :param connector: 同级别算法连接符(and/or)
+    :return: 候选数据点列表(保持原有顺序)
+    """
+    if not settings.DETECT_BATCH_ENABLED or not data_points:
+        return data_points
+
+    batchable = [detector.batch_detectable for detector in detectors]
+    if not any(batchable) or (connector == "or" and not all(batchable)):
+        return data_points
+
+    try:
+        batch_context = BatchDetectContext(data_points)
+    except Exception as e:
+        logger.warning(f"init batch detect context error: {e}")
+        return data_points
+
+    masks = []
+    for detector in detectors:
+        mask = None
+        if detector.batch_detectable:
+            try:
+                mask = detector.batch_detect_mask(batch_context)
+            except Exception as e:
+                logger.warning(f"batch detect error({detector.__class__.__name__}): {e}")
+
+        if mask is None:
+            # or 连接时任一算法无法批量判定，则所有数据点都需要逐点检测；and 连接时跳过该算法即可
+            if connector == "or":
+                return data_points
+            continue
+        masks.append(mask)
+
+    if not masks:
+        return data_points
+
+    combine = any if connector == "or" else all
+    return [
+        data_point
+        for data_point, forced, *flags in zip(data_points, batch_context.forced, *masks)
+        if forced or combine(flags)
+    ]
+
+
 class Algorithms:
     """
     检测算法基类，定义一个算法对象。
     """
 
     desc_tpl = ""
+    # 是否支持批量检测，支持时需实现 batch_detect_mask
+    batch_detectable = False
+    # 单次检测过程中产生的临时状态(历史数据、预检测结果等)，检测器复用前需要清理
+    run_state_attrs = ("_local_history_storage", "_local_history_series", "_default", "_local_pre_detect_results")
 
     def __init__(self):
         self.expr = self.gen_expr()
         self.byte_code = compile(self.expr, "<string>", "eval")
 
+    def reset_run_state(self):
+        """
+        清理上一次检测的临时状态，使复用的检测器与新建的检测器行为一致
+        """
+        for attr in self.run_state_attrs:
+            self.__dict__.pop(attr, None)
+
     def extra_context(self, context):
         """
         To be implemented
@@ -102,6 +230,15 @@ class Algorithms:
                 f"detect datapoint with \nexpr: \t{self.expr}\ncontext:\n{context_debug}\n[detect result]: \t{ret}\n"
             )
 
+    def batch_detect_mask(self, batch_context):
+        """
+        批量检测，返回与数据点等长的候选标记列表，标记为 True 的数据点才需要逐点检测
+        注意：只能多报不能漏报，无法判定的数据点应标记为 True
+        :param batch_context: BatchDetectContext
+        :return: list[bool] / None(不支持批量检测)
+        """
+        return None
+
     def detect(self, data_point):
         """
         返回异常数据点对象
@@ -121,9 +258,7 @@ class Algorithms:
         """
         if not self.desc_tpl:
             return ""
-        context = Context(self.get_context(data_point))
-        # 这里的模板固定可控，但是安全扫描提示风险，因此添加忽略
-        return Template(self.desc_tpl).render(context)  # nosec
+        return compile_template(str(self.desc_tpl)).render(Context(self.get_context(data_point)))
 
     def detect_records(self, data_points, level):
         """
@@ -132,7 +267,7 @@ class Algorithms:
         if isinstance(data_points, DataPoint):
             data_points = [data_points]
         anomaly_points = []
-        for data_point in data_points:
+        for data_point in filter_batch_candidates(data_points, [self]):
             try:
                 check_result = self.detect(data_point)
             except Exception as e:
@@ -142,7 +277,8 @@ class Algorithms:
             if check_result:
                 ap = self.gen_anomaly_point(data_point, check_result, level)
                 logger.info(
-                    f"[detect] strategy({ap.data_point.item.strategy.id}) item({ap.data_point.item.id}) level[{level}] 发现异常点: {ap.__dict__}"
+                    f"[detect] strategy({ap.data_point.item.strategy.id}) item({ap.data_point.item.id}) "
+                    f"level[{level}] 发现异常点: record_id({ap.data_point.record_id}) value({ap.data_point.value})"
                 )
                 anomaly_points.append(ap)
 
@@ -286,6 +422,20 @@ class BasicAlgorithmsCollection(Algorithms):
 
         return anomaly
 
+    def batch_detect_mask(self, batch_context):
+        # 默认按表达式连接符组合子算法的批量检测结果
+        masks = []
+        for detector in self.detectors:
+            mask = detector.batch_detect_mask(batch_context)
+            if mask is None:
+                return None
+            masks.append(mask)
+
+        if not masks:
+            return None
+        combine = all if self.expr_op == "and" else any
+        return [combine(flags) for flags in zip(*masks)]
+
     def get_context(self, data_point):
         context = super().get_context(data_point)
         context.update(
@@ -295,10 +445,25 @@ class BasicAlgorithmsCollection(Algorithms):
 
 
 class HistoryPointFetcher:
+    # 是否使用列式历史数据缓存(HISTORY_SERIES_KEY)，自行维护历史数据的算法需要关闭
+    history_series_enabled = True
+
     def set_default(self, value: int):
         self._default = value
 
+    def use_history_series(self):
+        return self.history_series_enabled and settings.DETECT_HISTORY_SERIES_ENABLED
+
+    def get_history_series(self, item):
+        history_series = getattr(self, "_local_history_series", None)
+        if history_series is None or history_series.item is not item:
+            history_series = self._local_history_series = HistorySeriesStore(item)
+        return history_series
+
     def query_history_points(self, data_points):
+        if self.use_history_series():
+            return self._query_history_series(data_points)
+
         item = data_points[0].item
         # 按时间从小到大排序
         sorted_data_points = sorted(data_points, key=lambda x: x.timestamp)
@@ -355,6 +520,73 @@ class HistoryPointFetcher:
             self._local_history_storage = {}
             self._publish_history_points(item, records)
 
+    def _query_history_series(self, data_points):
+        """
+        基于列式缓存预取历史数据
+        1. 一次读取本批次维度在所有历史窗口分桶内的数据
+        2. 窗口内仍有缺失的周期才查询数据源，久远的窗口直接查到分桶结束，后续周期可直接命中缓存
+        3. 当前数据点追加写入缓存，供后续周期的环比直接使用
+        """
+        item = data_points[0].item
+        interval = item.query_configs[0]["agg_interval"]
+        sorted_data_points = sorted(data_points, key=lambda x: x.timestamp)
+        history_series = self.get_history_series(item)
+
+        windows = []
+        publish_current = False
+        for offset in self.get_history_offsets(item):
+            if isinstance(offset, tuple):
+                start, end = offset
+            else:
+                start = end = offset
+
+            if end == 0:
+                publish_current = True
+                continue
+
+            windows.append(
+                (sorted_data_points[0].timestamp - end, sorted_data_points[-1].timestamp - start + interval)
+            )
+
+        buckets = set()
+        for from_timestamp, until_timestamp in windows:
+            buckets.update(history_series.buckets(from_timestamp, until_timestamp))
+        history_series.load(buckets, {point.record_id.split(".")[0] for point in data_points})
+
+        for from_timestamp, until_timestamp in windows:
+            if history_series.is_ready(from_timestamp, until_timestamp):
+                continue
+
+            # 早于本批次最早数据点的数据视为已完整落地，可以补齐到分桶结束
+            query_until = max(
+                until_timestamp,
+                min(history_series.bucket_end(until_timestamp - interval), sorted_data_points[0].timestamp),
+            )
+            item_records = item.query_record(from_timestamp, query_until)
+            if item.query.is_partial:
+                # 查询结果不完整时不写入缓存，下个周期重新查询，说明见 query_history_points
+                logger.warning(
+                    "strategy(%s) item(%s) history query is partial, skip cache writing, time_range(%s, %s)",
+                    item.strategy.id,
+                    item.id,
+                    from_timestamp,
+                    query_until,
+                )
+                continue
+
+            points = []
+            for record in item_records:
+                point = DataRecord(item, record)
+                if point.value:
+                    point = adapter_data_access_2_detect(point, item)
+                    points.append((point.record_id.split(".")[0], point.timestamp, point.value))
+            history_series.publish(points, history_series.timestamps(from_timestamp, query_until))
+
+        history_series.publish(
+            [(point.record_id.split(".")[0], point.timestamp, point.value) for point in data_points],
+            {point.timestamp for point in data_points} if publish_current else (),
+        )
+
     def _check_history_points(self, item, history_timestamp):
         """
         检查历史时刻的数据是否已经拉取过，如果存在，则更新过期时间。
@@ -391,6 +623,23 @@ class HistoryPointFetcher:
         """
         获取当前数据点对应的历史数据点
         """
+        if self.use_history_series():
+            dimensions_md5 = point.record_id.split(".")[0]
+            value = self.get_history_series(item).get(dimensions_md5, history_timestamp)
+            if value is None:
+                if getattr(self, "_default", None) is not None:
+                    return DataPoint({"value": self._default, "time": history_timestamp}, item)
+                return
+            return DataPoint(
+                {
+                    "record_id": f"{dimensions_md5}.{history_timestamp}",
+                    "value": value,
+                    "time": history_timestamp,
+                    "dimensions": getattr(point, "dimensions", {}),
+                },
+                item,
+            )
+
         client = key.HISTORY_DATA_KEY.client
         history_key = key.HISTORY_DATA_KEY.get_key(
             strategy_id=item.strategy.id, item_id=item.id, timestamp=history_timestamp
@@ -464,6 +713,39 @@ class RangeRatioAlgorithmsCollection(BasicAlgorithmsCollection, HistoryPointFetc
         env.update(self.validated_config)
         return env
 
+    def batch_detect_mask(self, batch_context):
+        """
+        批量计算 floor/ceil 表达式，与 gen_expr 中的表达式保持一致
+        """
+        history_values = []
+        history_missing = []
+        for data_point in batch_context.data_points:
+            history_data_point = self.history_point_fetcher(data_point)
+            history_missing.append(history_data_point is None)
+            history_values.append(None if history_data_point is None else history_data_point.value)
+        history_values = batch_context.convert(history_values)
+
+        floor = self.validated_config["floor"]
+        ceil = self.validated_config["ceil"]
+
+        def _check(value, history_value):
+            if value is None or history_value is None:
+                return True
+            try:
+                if floor and (value or history_value) and value <= history_value * (100 - floor) * 0.01:
+                    return True
+                if ceil and (value or history_value) and value >= history_value * (100 + ceil) * 0.01:
+                    return True
+            except Exception:
+                return True
+            return False
+
+        # 历史数据不存在时逐点检测会抛出 HistoryDataNotExists，直接判定为非异常
+        return [
+            not missing and _check(value, history_value)
+            for value, history_value, missing in zip(batch_context.values, history_values, history_missing)
+        ]
+
     def history_point_fetcher(self, data_point, **kwargs):
         """
         同比环比类算法特有方法，获取历史数据。
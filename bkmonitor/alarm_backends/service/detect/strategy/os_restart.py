@@ -48,6 +48,9 @@ class OsRestart(SimpleRingRatio):
     expr_op = "and"
     desc_tpl = _("当前服务器在{{data_point.value}}秒前发生系统重启事件")
     config_serializer = None
+    batch_detectable = False
+    # 历史数据由 query_history_points 自行预取到 _local_history_storage，不使用列式缓存
+    history_series_enabled = False
 
     def gen_expr(self):
         # 主机运行时长在0到600秒之间
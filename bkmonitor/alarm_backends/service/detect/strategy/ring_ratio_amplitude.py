@@ -19,11 +19,13 @@ from django.utils.translation import gettext_lazy as _
 
 from alarm_backends.service.detect.strategy import ExprDetectAlgorithms
 from alarm_backends.service.detect.strategy.simple_ring_ratio import SimpleRingRatio
+from alarm_backends.templatetags.unit import unit_convert_min
 
 
 class RingRatioAmplitude(SimpleRingRatio):
     config_serializer = RingRatioAmplitudeSerializer
     expr_op = "and"
+    batch_detectable = True
     desc_tpl = _(
         "{% load unit %} - 前一时刻值{{history_data_point.value|auto_unit:unit}}的绝对值 >= "
         "前一时刻值{{history_data_point.value|auto_unit:unit}} * {{ratio}} + {{shock}}{{unit|unit_suffix:algorithm_unit}}"
@@ -41,6 +43,45 @@ class RingRatioAmplitude(SimpleRingRatio):
             "",
         )
 
+    def batch_detect_mask(self, batch_context):
+        """
+        批量计算振幅表达式，与 gen_expr 中的表达式保持一致
+        """
+        unit = batch_context.unit
+        threshold = self.validated_config["threshold"]
+        ratio = self.validated_config["ratio"]
+        value_threshold = unit_convert_min(threshold, self.unit)
+        history_threshold = unit_convert_min(threshold, unit, self.unit)
+        shock = unit_convert_min(self.validated_config["shock"], unit, self.unit)
+
+        raw_history_values = []
+        for data_point in batch_context.data_points:
+            history_data_point = self.history_point_fetcher(data_point)
+            raw_history_values.append(None if history_data_point is None else history_data_point.value)
+        history_values = batch_context.convert(raw_history_values)
+
+        mask = []
+        for raw_value, value, raw_history_value, history_value in zip(
+            batch_context.raw_values, batch_context.values, raw_history_values, history_values
+        ):
+            if raw_history_value is None:
+                # 历史数据不存在，逐点检测会抛出 HistoryDataNotExists
+                mask.append(False)
+                continue
+            if value is None or history_value is None:
+                mask.append(True)
+                continue
+            try:
+                amplitude = batch_context.convert([abs(raw_history_value - raw_value)])[0]
+                mask.append(
+                    value >= value_threshold
+                    and history_value >= history_threshold
+                    and amplitude >= history_value * ratio + shock
+                )
+            except Exception:
+                mask.append(True)
+        return mask
+
     def gen_anomaly_point(self, data_point, detect_result, level, auto_format=True):
         ap = super().gen_anomaly_point(data_point, detect_result, level)
         if auto_format:
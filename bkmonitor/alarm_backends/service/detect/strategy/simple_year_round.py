@@ -28,6 +28,7 @@ logger = logging.getLogger("detect")
 
 class SimpleYearRound(RangeRatioAlgorithmsCollection):
     config_serializer = SimpleYearRoundSerializer
+    batch_detectable = True
     expr_op = "or"
 
     floor_desc_tpl = _("{% load unit %}较上周同一时刻({{history_data_point.value|auto_unit:unit}})下降超过{{floor}}%")
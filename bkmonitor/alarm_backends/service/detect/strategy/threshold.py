@@ -19,7 +19,13 @@ import logging
 from bk_monitor_base.strategy import THRESHOLD_ALLOWED_METHODS, ThresholdSerializer
 from django.utils.safestring import mark_safe
 
-from alarm_backends.service.detect.strategy import BasicAlgorithmsCollection, ExprDetectAlgorithms
+from alarm_backends.service.detect.strategy import (
+    BATCH_COMPARE_OPERATORS,
+    BasicAlgorithmsCollection,
+    ExprDetectAlgorithms,
+    batch_compare,
+)
+from alarm_backends.templatetags.unit import unit_convert_min
 from core.errors.alarm_backends.detect import InvalidThresholdConfig
 
 logger = logging.getLogger("detect")
@@ -36,6 +42,7 @@ class AlgorithmsAST(ast.NodeTransformer):
 class AndThreshold(BasicAlgorithmsCollection):
     config_serializer = ThresholdSerializer.AndSerializer
     expr_op = "and"
+    batch_detectable = True
 
     desc_tpl = "{{% load unit %}} {method_desc} {threshold}{{{{unit|unit_suffix:algorithm_unit}}}}"
 
@@ -58,6 +65,16 @@ class AndThreshold(BasicAlgorithmsCollection):
         for args in zip(expr_list, tpl_list):
             yield ExprDetectAlgorithms(*args)
 
+    def batch_detect_mask(self, batch_context):
+        mask = [True] * len(batch_context)
+        for t_config in self.validated_config:
+            compare = BATCH_COMPARE_OPERATORS.get(THRESHOLD_ALLOWED_METHODS[t_config["method"]])
+            if compare is None:
+                return None
+            threshold = unit_convert_min(t_config["threshold"], batch_context.unit, self.unit)
+            mask = [flag and batch_compare(compare, value, threshold) for flag, value in zip(mask, batch_context.values)]
+        return mask
+
 
 class Threshold(AndThreshold):
     config_serializer = ThresholdSerializer
@@ -66,3 +83,6 @@ class Threshold(AndThreshold):
     def gen_expr(self):
         for t_config in self.validated_config:
             yield AndThreshold(t_config, self.unit)
+
+    def batch_detect_mask(self, batch_context):
+        return BasicAlgorithmsCollection.batch_detect_mask(self, batch_context)
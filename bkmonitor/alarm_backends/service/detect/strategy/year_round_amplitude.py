@@ -19,12 +19,18 @@ from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 
 from alarm_backends.constants import CONST_ONE_DAY
-from alarm_backends.service.detect.strategy import ExprDetectAlgorithms, RangeRatioAlgorithmsCollection
+from alarm_backends.service.detect.strategy import (
+    BATCH_COMPARE_OPERATORS,
+    ExprDetectAlgorithms,
+    RangeRatioAlgorithmsCollection,
+)
+from alarm_backends.templatetags.unit import unit_convert_min
 
 
 class YearRoundAmplitude(RangeRatioAlgorithmsCollection):
     config_serializer = YearRoundAmplitudeSerializer
     expr_op = "or"
+    batch_detectable = True
 
     def gen_expr(self):
         comp = YEAR_ROUND_ALLOWED_METHODS[self.validated_config["method"]]
@@ -51,6 +57,46 @@ class YearRoundAmplitude(RangeRatioAlgorithmsCollection):
         env.update(self.validated_config)
         return env
 
+    def batch_detect_mask(self, batch_context):
+        """
+        批量计算振幅表达式，与 gen_expr 中的表达式保持一致：按天顺序判断，任意一天满足即为候选
+        """
+        compare = BATCH_COMPARE_OPERATORS.get(YEAR_ROUND_ALLOWED_METHODS[self.validated_config["method"]])
+        if compare is None:
+            return None
+        ratio = self.validated_config["ratio"]
+        shock = unit_convert_min(self.validated_config["shock"], batch_context.unit, self.unit)
+
+        def _diff(pair):
+            return batch_context.convert([abs(pair[0].value - pair[1].value)])[0]
+
+        mask = []
+        for data_point in batch_context.data_points:
+            diffs = self.history_point_fetcher(data_point)
+            if diffs[0][0] is None or diffs[0][1] is None:
+                # 逐点检测时 extra_context 会因缺少前一时刻数据抛出异常
+                mask.append(False)
+                continue
+
+            try:
+                current_diff = _diff(diffs[0])
+                matched = False
+                for pair in diffs[1:]:
+                    if pair[0] is None or pair[1] is None:
+                        # 逐点检测在此处抛出异常，后续天数不再判断
+                        break
+                    history_diff = _diff(pair)
+                    if current_diff is None or history_diff is None:
+                        matched = True
+                        break
+                    if compare(current_diff, history_diff * ratio + shock):
+                        matched = True
+                        break
+                mask.append(matched)
+            except Exception:
+                mask.append(True)
+        return mask
+
     def get_history_offsets(self, item):
         agg_interval = item.query_configs[0]["agg_interval"]
         return [(i * CONST_ONE_DAY, i * CONST_ONE_DAY + agg_interval) for i in range(self.validated_config["days"] + 1)]
@@ -20,8 +20,7 @@ from core.prometheus import metrics
 logger = logging.getLogger("detect")
 
 
-@app.task(ignore_result=True, queue="celery_service")
-def run_detect(strategy_id):
+def detect_strategy(strategy_id):
     client = key.DATA_SIGNAL_KEY.client
     data_signal_key = key.DATA_SIGNAL_KEY.get_key()
     exc = None
@@ -37,13 +36,36 @@ def run_detect(strategy_id):
     else:
         # 当前策略待检测数据过多
         if processor.is_busy:
-            run_detect.apply_async(args=(strategy_id,))
+            redispatch_strategy(strategy_id)
             logger.info(f"detect processor is busy with strategy({strategy_id})")
 
     metrics.DETECT_PROCESS_COUNT.labels(
         strategy_id=metrics.TOTAL_TAG, status=metrics.StatusEnum.from_exc(exc), exception=exc
     ).inc()
 
+
+def redispatch_strategy(strategy_id):
+    """
+    重新下发检测任务，开启槽位时投递回策略所在的槽位队列，保持缓存亲和
+    """
+    from alarm_backends.service.detect.handler import DetectCeleryHandler
+
+    DetectCeleryHandler.dispatch(DetectCeleryHandler.get_slot(strategy_id), [strategy_id])
+
+
+@app.task(ignore_result=True, queue="celery_service")
+def run_detect(strategy_id):
+    detect_strategy(strategy_id)
+    metrics.report_all()
+
+
+@app.task(ignore_result=True, queue="celery_service")
+def run_detect_batch(strategy_ids):
+    """
+    同一槽位的策略在一个任务中依次检测，减少任务调度开销
+    """
+    for strategy_id in strategy_ids:
+        detect_strategy(strategy_id)
     metrics.report_all()
 
 
@@ -26,6 +26,7 @@ from alarm_backends.core.lock.service_lock import service_lock
 from alarm_backends.service.fta_action import ActionAlreadyFinishedError
 from alarm_backends.service.fta_action.common import BaseActionProcessor
 from bkmonitor.models import ActionInstance
+from bkmonitor.models.fta.action import record_action_changes
 from bkmonitor.utils.send import Sender, BlockedError
 from constants.action import (
     ActionSignal,
@@ -352,6 +353,9 @@ class ActionProcessor(BaseActionProcessor):
                 }
             )
 
+        # 批量更新不会触发保存信号，需要主动记录变更
+        record_action_changes(succeed_actions + failed_actions + blocked_actions)
+
     def replay_blocked_notice(self):
         """
         重新发送被熔断的通知
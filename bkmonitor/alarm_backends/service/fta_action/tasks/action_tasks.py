@@ -15,6 +15,7 @@ import time
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
+from django.conf import settings
 from django.db import router
 from django.db.models import Q
 from django.utils.translation import gettext as _
@@ -22,6 +23,8 @@ from django.utils.translation import gettext as _
 from alarm_backends.constants import CONST_MINUTES
 from alarm_backends.core.cache.action_config import ActionConfigCacheManager
 from alarm_backends.core.cache.key import (
+    ACTION_CHANGE_JOURNAL_KEY,
+    ACTION_SYNC_CONTENT_HASH_KEY,
     DEMO_ACTION_KEY_LOCK,
     LATEST_TIME_OF_SYNC_ACTION_KEY,
     SYNC_ACTION_LOCK_KEY,
@@ -40,7 +43,9 @@ from bkmonitor.action.serializers import DutyRuleDetailSlz
 from bkmonitor.documents import ActionInstanceDocument, AlertDocument
 from bkmonitor.documents.base import BulkActionType
 from bkmonitor.models import ActionInstance, ConvergeRelation
+from bkmonitor.models.fta.action import record_action_changes
 from bkmonitor.models.strategy import DutyRule, DutyRuleRelation, UserGroup
+from bkmonitor.utils.common_utils import count_md5
 from constants.action import ActionPluginType, ActionSignal, ActionStatus, ConvergeType, FailureType
 from core.errors.alarm_backends import LockError
 from core.prometheus import metrics
@@ -71,6 +76,7 @@ def run_action(action_type, action_info):
         ActionInstance.objects.filter(id=action_info["id"]).update(
             status=ActionStatus.FAILURE, failure_type=FailureType.FRAMEWORK_CODE, end_time=datetime.now(timezone.utc)
         )
+        record_action_changes([action_info["id"]])
         return
 
     exc = None
@@ -110,6 +116,7 @@ def run_action(action_type, action_info):
             end_time=datetime.now(timezone.utc),
             ex_data={"message": str(error)},
         )
+        record_action_changes([action_info["id"]])
         is_finished = True
         exc = error
 
@@ -225,15 +232,29 @@ def sync_action_instances():
         sync_action_instances_every_10_secs.apply_async(countdown=interval * 10, expires=120)
 
 
+# 需要同步至ES的处理记录：汇总并且处于休眠期的内容、刚接收到的处理记录及demo任务都不做同步
+SYNC_ACTION_FILTER = Q(signal__in=ActionSignal.NORMAL_SIGNAL, status__in=ActionStatus.CAN_SYNC_STATUS) | Q(
+    signal=ActionSignal.COLLECT, status__in=ActionStatus.COLLECT_SYNC_STATUS
+)
+
+
 @app.task(ignore_result=True, queue="celery_action_cron")
 def sync_action_instances_every_10_secs(last_sync_time=None):
     """
     每隔十秒同步任务
+    开启按变更同步时，每次同步变更记录中的处理记录，按更新时间的扫描降为 ACTION_SYNC_FULL_SCAN_INTERVAL 秒一次的兜底
     :param last_sync_time:
     :return:
     """
     try:
         with service_lock(SYNC_ACTION_LOCK_KEY):
+            if settings.ACTION_SYNC_JOURNAL_ENABLED:
+                try:
+                    sync_changed_action_instances()
+                except Exception as e:
+                    # 按变更同步失败时保留未同步的变更记录，下次重新同步，不影响兜底扫描
+                    logger.exception("[sync_action_instances] sync changed actions error: %s", e)
+
             current_sync_time = datetime.now(timezone.utc)
             redis_client = LATEST_TIME_OF_SYNC_ACTION_KEY.client
             cache_key = LATEST_TIME_OF_SYNC_ACTION_KEY.get_key()
@@ -247,11 +268,14 @@ def sync_action_instances_every_10_secs(last_sync_time=None):
                 # 如果获取缓存记录异常，表示要全库更新或者指定变量，这种可能性很小，但是无法保证redis一直正常运行
                 one_hour_ago = current_sync_time - timedelta(hours=1)
                 last_sync_time = last_sync_time or int(one_hour_ago.timestamp())
+            else:
+                if (
+                    settings.ACTION_SYNC_JOURNAL_ENABLED
+                    and current_sync_time.timestamp() - last_sync_time < settings.ACTION_SYNC_FULL_SCAN_INTERVAL
+                ):
+                    return
 
             # 同步逻辑： 如果不存在最近更新时间的缓存key， 直接更新全表， 如果有，则更新对应时间范围内的数据即可
-            # 汇总并且处于休眠期的内容不做同步
-            # 刚接收到的处理记录也不做同步
-            # demo任务也不同步到ES库
             updated_action_instances = ActionInstance.objects.filter(update_time__lte=current_sync_time)
 
             if last_sync_time:
@@ -261,10 +285,7 @@ def sync_action_instances_every_10_secs(last_sync_time=None):
                     update_time__gte=datetime.fromtimestamp(last_sync_time)
                 )
 
-            updated_action_instances = updated_action_instances.filter(
-                Q(signal__in=ActionSignal.NORMAL_SIGNAL, status__in=ActionStatus.CAN_SYNC_STATUS)
-                | Q(signal=ActionSignal.COLLECT, status__in=ActionStatus.COLLECT_SYNC_STATUS)
-            ).order_by("update_time")
+            updated_action_instances = updated_action_instances.filter(SYNC_ACTION_FILTER).order_by("update_time")
 
             logger.info("start sync_action_instances from time %s", last_sync_time)
 
@@ -281,6 +302,40 @@ def sync_action_instances_every_10_secs(last_sync_time=None):
         return
 
 
+# 变更版本未变化时才删除变更记录，同步期间再次变更的处理记录保留到下次同步
+CLEAR_ACTION_CHANGES_SCRIPT = """
+local removed = 0
+for i = 1, #ARGV, 2 do
+    local version = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if version and tonumber(version) == tonumber(ARGV[i + 1]) then
+        removed = removed + redis.call('ZREM', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+
+def sync_changed_action_instances():
+    """
+    按变更记录同步处理记录
+    读取变更记录，每批同步成功后只删除本批读取的变更记录，同步失败时下次重新同步
+    """
+    client = ACTION_CHANGE_JOURNAL_KEY.client
+    journal_key = ACTION_CHANGE_JOURNAL_KEY.get_key()
+
+    changes = client.zrange(journal_key, 0, -1, withscores=True)
+
+    batch_size = settings.ACTION_SYNC_BATCH_SIZE
+    for index in range(0, len(changes), batch_size):
+        batch = changes[index : index + batch_size]
+        sync_actions([int(action_id) for action_id, _version in batch], skip_unchanged=True)
+        args = []
+        for action_id, version in batch:
+            args.extend([action_id, repr(version)])
+        client.eval(CLEAR_ACTION_CHANGES_SCRIPT, 1, journal_key, *args)
+    logger.info("[sync_action_instances] sync (%s) changed actions", len(changes))
+
+
 @app.task(ignore_result=True, queue="celery_action_cron")
 def sync_actions_sharding_task(action_ids):
     """
@@ -288,6 +343,15 @@ def sync_actions_sharding_task(action_ids):
     :param action_ids:
     :return:
     """
+    sync_actions(action_ids, skip_unchanged=settings.ACTION_SYNC_JOURNAL_ENABLED)
+
+
+def sync_actions(action_ids, skip_unchanged=False):
+    """
+    同步处理记录至ES
+    :param action_ids: 处理记录ID列表
+    :param skip_unchanged: 是否跳过内容与上次同步一致的处理记录，跳过时以增量更新的方式写入
+    """
     action_documents = []
     current_sync_time = datetime.now(timezone.utc)
     converge_relations = {
@@ -298,10 +362,10 @@ def sync_actions_sharding_task(action_ids):
     }
     all_actions = []
     all_alerts = []
-    for instance in ActionInstance.objects.filter(id__in=action_ids):
+    for instance in ActionInstance.objects.filter(id__in=action_ids).filter(SYNC_ACTION_FILTER):
         all_alerts.extend(instance.alerts)
         all_actions.append(instance)
-    all_alert_docs = {alert.id: alert for alert in AlertDocument.mget(ids=all_alerts)}
+    all_alert_docs = {alert.id: alert for alert in AlertDocument.mget(ids=all_alerts)} if all_alerts else {}
     # 记录需要更新的主任务
     updated_parent_actions = {}
     for instance in all_actions:
@@ -319,12 +383,50 @@ def sync_actions_sharding_task(action_ids):
                 error,
                 "{}{}".format(instance.id, instance.action_config.get("name", "")),
             )
-    ActionInstanceDocument.bulk_create(action_documents, action=BulkActionType.INDEX)
+
+    if skip_unchanged:
+        action_documents, content_hashes = filter_unchanged_action_documents(action_documents)
+        if action_documents:
+            ActionInstanceDocument.bulk_create(action_documents, action=BulkActionType.UPSERT)
+            # 写入成功后才记录内容摘要
+            pipeline = ACTION_SYNC_CONTENT_HASH_KEY.client.pipeline(transaction=False)
+            for action_id, content_hash in content_hashes.items():
+                pipeline.set(
+                    ACTION_SYNC_CONTENT_HASH_KEY.get_key(action_id=action_id),
+                    content_hash,
+                    ACTION_SYNC_CONTENT_HASH_KEY.ttl,
+                )
+            pipeline.execute()
+    else:
+        ActionInstanceDocument.bulk_create(action_documents, action=BulkActionType.INDEX)
 
     # 涉及到相关的主任务也进行一次同步
     sync_updated_parent_actions(updated_parent_actions, all_alert_docs, current_sync_time)
 
 
+def filter_unchanged_action_documents(action_documents):
+    """
+    过滤掉内容与上次同步一致的处理记录文档
+    :return: 需要写入的文档列表, {处理记录ID: 内容摘要}
+    """
+    if not action_documents:
+        return [], {}
+
+    content_hashes = {document.raw_id: count_md5(document.to_dict()) for document in action_documents}
+    cached_hashes = ACTION_SYNC_CONTENT_HASH_KEY.client.mget(
+        [ACTION_SYNC_CONTENT_HASH_KEY.get_key(action_id=action_id) for action_id in content_hashes]
+    )
+    changed_documents = []
+    changed_hashes = {}
+    for document, cached_hash in zip(action_documents, cached_hashes):
+        content_hash = content_hashes[document.raw_id]
+        if content_hash == cached_hash:
+            continue
+        changed_documents.append(document)
+        changed_hashes[document.raw_id] = content_hash
+    return changed_documents, changed_hashes
+
+
 def sync_updated_parent_actions(updated_parent_actions, alert_docs, current_sync_time):
     """
     同步需要更新的主任务状态
@@ -412,6 +514,12 @@ def sync_updated_parent_actions(updated_parent_actions, alert_docs, current_sync
     # 使用 INDEX 操作确保文档被正确创建或更新
     ActionInstanceDocument.bulk_create(action_documents, action=BulkActionType.INDEX)
 
+    if settings.ACTION_SYNC_JOURNAL_ENABLED and action_documents:
+        # 主任务状态由子任务决定，与主任务自身同步的内容不同，需要清除内容摘要，保证主任务下次同步时会写入
+        ACTION_SYNC_CONTENT_HASH_KEY.client.delete(
+            *[ACTION_SYNC_CONTENT_HASH_KEY.get_key(action_id=document.raw_id) for document in action_documents]
+        )
+
 
 def check_timeout_actions():
     """
@@ -453,6 +561,7 @@ def check_timeout_actions():
                             )
                         ),
                     )
+                    record_action_changes(timeout_actions[idx : idx + step])
                 logger.info("setting actions(%s) to failure because of timeout", len(timeout_actions))
     except LockError:
         # 加锁失败
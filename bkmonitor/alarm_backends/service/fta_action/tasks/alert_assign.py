@@ -18,16 +18,47 @@ from alarm_backends.core.context import ActionContext
 from alarm_backends.service.fta_action import AlertAssignee
 from bkmonitor.action.alert_assign import (
     AlertAssignMatchManager,
+    AssignRuleIndex,
     AssignRuleMatch,
     UpgradeRuleMatch,
 )
 from bkmonitor.documents import AlertDocument
-from bkmonitor.utils.range import load_condition_instance
+from bkmonitor.utils.common_utils import count_md5
+from bkmonitor.utils.local import local
+from bkmonitor.utils.range import load_condition_matcher
 from constants.action import ActionNoticeType, AssignMode, UserGroupType, NoticeWay
 
 logger = logging.getLogger("fta_action.run")
 
 
+# 业务ID -> (规则配置md5, 分派规则索引)
+_assign_rule_indexes = {}
+
+
+def get_assign_rule_index(bk_biz_id) -> AssignRuleIndex:
+    """
+    获取业务的分派规则索引，规则配置没有变化时复用进程内已构建的索引
+    同一批次(AssignCacheManager.clear 之前)内只计算一次规则配置md5
+    """
+    cache_key = f"assign_rule_index_{bk_biz_id}"
+    if cache_key in local.assign_cache:
+        return local.assign_cache[cache_key]
+
+    priority_rules = []
+    for priority_id in AssignCacheManager.get_assign_priority_by_biz_id(bk_biz_id):
+        rules = []
+        for group_id in AssignCacheManager.get_assign_groups_by_priority(bk_biz_id, priority_id):
+            rules.extend(AssignCacheManager.get_assign_rules_by_group(bk_biz_id, group_id))
+        priority_rules.append(rules)
+
+    rules_md5 = count_md5(priority_rules, list_sort=False)
+    cached = _assign_rule_indexes.get(bk_biz_id)
+    if not cached or cached[0] != rules_md5:
+        cached = _assign_rule_indexes[bk_biz_id] = (rules_md5, AssignRuleIndex(priority_rules))
+    local.assign_cache[cache_key] = cached[1]
+    return cached[1]
+
+
 class BackendAssignMatchManager(AlertAssignMatchManager):
     """
     后台告警分派管理
@@ -60,13 +91,12 @@ class BackendAssignMatchManager(AlertAssignMatchManager):
         if self.assign_mode is None or AssignMode.BY_RULE not in self.assign_mode:
             # 如果没有分派规则或者当前配置不需要分派的情况下，不做分派适配
             return matched_rules
-        for priority_id in AssignCacheManager.get_assign_priority_by_biz_id(self.bk_biz_id):
-            groups = AssignCacheManager.get_assign_groups_by_priority(self.bk_biz_id, priority_id)
-            group_rules = []
-            for group_id in groups:
-                group_rules.extend(AssignCacheManager.get_assign_rules_by_group(self.bk_biz_id, group_id))
+        # 只匹配索引筛选出的候选规则
+        rule_index = get_assign_rule_index(self.bk_biz_id)
+        for group_rules in rule_index.get_candidate_rules(self.dimensions, self.rule_snaps.keys()):
             for rule in group_rules:
-                rule_match_obj = AssignRuleMatch(rule, self.rule_snaps.get(str(rule["id"])), self.alert)
+                # 索引中的规则在进程内共享，升级时会修改规则内容，需要复制
+                rule_match_obj = AssignRuleMatch(dict(rule), self.rule_snaps.get(str(rule["id"])), self.alert)
                 if rule_match_obj.is_matched(dimensions=self.dimensions):
                     matched_rules.append(rule_match_obj)
             if matched_rules:
@@ -304,8 +334,8 @@ class AlertAssigneeManager:
             or_conditions.append(and_conditions)
 
         # 使用分派的条件匹配器
-        condition_matcher = load_condition_instance(or_conditions, False)
-        return condition_matcher.is_match(dimensions)
+        condition_matcher = load_condition_matcher(or_conditions, False)
+        return condition_matcher(dimensions)
 
     def get_appointee_notify_info(self, notify_configs=None):
         """
@@ -895,8 +895,7 @@ class CreateActionProcessor:
                 setattr(alert, key, value)
             update_alerts.append(AlertDocument(**update_data))
         cached_alerts = [Alert(data=alert.to_dict()) for alert in self.alerts]
-        AlertCache.update_alert_to_cache(cached_alerts)
-        AlertCache.save_alert_snapshot(cached_alerts)
+        AlertCache.save_alerts(cached_alerts, check_id=True)
         retry_times = 0
         while retry_times < 3:
             # 更新alert 的时候，可能会有版本冲突，所以需要做重试处理，最多3次
@@ -54,7 +54,8 @@ def _update_strategy_cache_issue_config(strategy_id: int) -> bool:
         if cfg
         else None
     )
-    StrategyCacheManager.cache.set(cache_key, json.dumps(strategy_dict), StrategyCacheManager.CACHE_TIMEOUT)
+    # 通过缓存管理器写入，同步更新策略版本，各进程的策略快照才会刷新
+    StrategyCacheManager.update_strategy(strategy_id, strategy_dict)
     return True
 
 
@@ -32,6 +32,7 @@ class CheckProcessor(BaseAbnormalPushProcessor):
     def __init__(self, strategy_id):
         self.strategy_id = strategy_id
         self.inputs = {}
+        self.presences = {}
         self.outputs = {}
         self.strategy = Strategy(strategy_id)
         i18n.set_biz(self.strategy.bk_biz_id)
@@ -54,16 +55,22 @@ class CheckProcessor(BaseAbnormalPushProcessor):
         }
         """
         self.inputs[item.id] = []
+        self.presences[item.id] = {}
         if inputs is not None:
             # for debug
             self.inputs[item.id].extend(inputs)
             return
-        # pull data
+        # 拉取维度上报记录
+        self.pull_presence(item, check_timestamp)
+
+        # pull data(兼容未开启维度上报记录时推送的待检测队列)
         data_channel = key.NO_DATA_LIST_KEY.get_key(strategy_id=self.strategy_id, item_id=item.id)
         client = key.NO_DATA_LIST_KEY.client
 
         total_points = client.llen(data_channel)
         if total_points == 0:
+            if self.presences[item.id]:
+                return
             logger.info(
                 "[nodata] strategy({}) item({}) check_timestamp({}) 无待检测数据，可能触发无数据告警".format(
                     self.strategy_id, item.id, check_timestamp
@@ -147,10 +154,62 @@ class CheckProcessor(BaseAbnormalPushProcessor):
                 )
             )
 
+    def pull_presence(self, item, check_timestamp):
+        """
+        :summary: 拉取 access 记录的无数据维度上报情况，只消费检测点及之前的时间点
+        当前检测点之前无数据，但是未来有数据时，取未来最早一个时间点
+        :return: {dimensions_md5: (最新上报时间, 无数据维度)}
+        """
+        presence = self.presences.setdefault(item.id, {})
+        index_key = key.NO_DATA_PRESENCE_INDEX_KEY.get_key(strategy_id=self.strategy_id, item_id=item.id)
+        client = key.NO_DATA_PRESENCE_INDEX_KEY.client
+        timestamps = client.zrangebyscore(index_key, "-inf", check_timestamp)
+        if not timestamps:
+            timestamps = client.zrangebyscore(index_key, f"({check_timestamp}", "+inf", start=0, num=1)
+        if not timestamps:
+            return presence
+
+        presence_keys = [
+            key.NO_DATA_PRESENCE_KEY.get_key(strategy_id=self.strategy_id, item_id=item.id, timestamp=timestamp)
+            for timestamp in timestamps
+        ]
+        # 读取并清理已消费的时间点，未来的时间点保留等待后续检测
+        pipeline = client.pipeline(transaction=False)
+        for presence_key in presence_keys:
+            pipeline.hgetall(presence_key)
+        pipeline.delete(*presence_keys)
+        pipeline.zrem(index_key, *timestamps)
+        results = pipeline.execute()[: len(presence_keys)]
+
+        unexpected_record_count = 0
+        for timestamp, dimensions_mapping in zip(timestamps, results):
+            timestamp = int(float(timestamp))
+            for dimensions_md5, dimensions in dimensions_mapping.items():
+                if dimensions_md5 in presence and presence[dimensions_md5][0] >= timestamp:
+                    continue
+                try:
+                    presence[dimensions_md5] = (timestamp, json.loads(dimensions))
+                except ValueError:
+                    unexpected_record_count += 1
+
+        metrics.NODATA_PROCESS_PULL_DATA_COUNT.labels(strategy_id=metrics.TOTAL_TAG).inc(len(presence))
+        if unexpected_record_count > 0:
+            logger.error(
+                "[nodata] strategy({}) item({}) check_timestamp({}) 发现非期望格式的维度上报记录{}条".format(
+                    self.strategy_id, item.id, check_timestamp, unexpected_record_count
+                )
+            )
+        logger.info(
+            "[nodata] strategy({}) item({}) check_timestamp({}) 拉取维度上报记录: 时间点({}) 维度({})".format(
+                self.strategy_id, item.id, check_timestamp, ",".join(map(str, timestamps)), len(presence)
+            )
+        )
+        return presence
+
     def handle_data(self, item, check_timestamp):
         # check no data
         data_points = self.inputs[item.id]
-        self.outputs[item.id] = item.check(data_points, check_timestamp)
+        self.outputs[item.id] = item.check(data_points, check_timestamp, presence=self.presences.get(item.id))
 
     def push_data(self):
         """
@@ -160,7 +219,7 @@ class CheckProcessor(BaseAbnormalPushProcessor):
         anomaly_signal_list = []
         anomaly_count = self.push_abnormal_data(self.outputs, self.strategy_id, anomaly_signal_list)
         metrics.NODATA_PROCESS_PUSH_DATA_COUNT.labels(strategy_id=metrics.TOTAL_TAG).inc(len(anomaly_signal_list))
-        if any(self.inputs.values()):
+        if any(self.inputs.values()) or any(self.presences.values()):
             logger.info("[nodata] strategy({}) 无数据检测完成: 无数据异常记录数({})".format(self.strategy_id, anomaly_count))
 
     def process(self, now_timestamp):
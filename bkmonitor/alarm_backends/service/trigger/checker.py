@@ -54,6 +54,8 @@ class AnomalyChecker(object):
         # shortcut
         self.dimensions_md5 = self.record_parser.dimensions_md5
         self.source_time = self.record_parser.source_time
+        # 预先拉取的检测窗口数据 {level: [(label, score), ...]}，由 BatchAnomalyChecker 填充
+        self.check_results = {}
 
     @staticmethod
     def is_no_data_point(point):
@@ -165,14 +167,14 @@ class AnomalyChecker(object):
                 anomaly_level = level
         return anomaly_level, anomaly_timestamps
 
-    def _check_anomaly_by_level(self, level):
+    def get_trigger_config(self, level):
         """
-        检测某个级别的异常点是否满足触发条件
+        获取某个级别的触发配置
         :param str level: 告警级别
-        :return: 二元组：是否被触发，异常次数
+        :return: 触发配置，该级别及兜底配置都不存在时返回 None
         """
         try:
-            trigger_config = self.trigger_configs[level]
+            return self.trigger_configs[level]
         except KeyError:
             trigger_configs = self.trigger_configs.values()
             if not trigger_configs:
@@ -182,11 +184,16 @@ class AnomalyChecker(object):
                         self.strategy_id, self.item_id, level
                     )
                 )
-                return False, []
+                return None
 
             # 默认兜底，trigger 配置当前所有告警级别默认一致
-            trigger_config = list(trigger_configs)[0]
+            return list(trigger_configs)[0]
 
+    def get_check_window(self, level, trigger_config):
+        """
+        获取检测窗口
+        :return: 三元组：检测结果缓存key，窗口起始时间，窗口结束时间
+        """
         check_cache_key = CHECK_RESULT_CACHE_KEY.get_key(
             strategy_id=self.strategy_id,
             item_id=self.item_id,
@@ -195,9 +202,34 @@ class AnomalyChecker(object):
         )
         # 在对应的打点队列中取出打点信息。时间范围为source_time前后的一个窗口偏移量
         check_window_offset = trigger_config["check_window_size"] * self.check_window_unit - 1
-        check_results = CHECK_RESULT_CACHE_KEY.client.zrangebyscore(
-            name=check_cache_key, min=self.source_time - check_window_offset, max=self.source_time, withscores=True
-        )
+        return check_cache_key, self.source_time - check_window_offset, self.source_time
+
+    def _check_anomaly_by_level(self, level):
+        """
+        检测某个级别的异常点是否满足触发条件
+        :param str level: 告警级别
+        :return: 二元组：是否被触发，异常次数
+        """
+        trigger_config = self.get_trigger_config(level)
+        if trigger_config is None:
+            return False, []
+
+        if level in self.check_results:
+            check_results = self.check_results[level]
+        else:
+            check_cache_key, min_score, max_score = self.get_check_window(level, trigger_config)
+            check_results = CHECK_RESULT_CACHE_KEY.client.zrangebyscore(
+                name=check_cache_key, min=min_score, max=max_score, withscores=True
+            )
+        return self.evaluate_check_results(trigger_config, check_results)
+
+    def evaluate_check_results(self, trigger_config, check_results):
+        """
+        根据检测窗口内的检测结果判断是否满足触发条件
+        :param trigger_config: 触发配置
+        :param check_results: 检测窗口内的检测结果 [(label, score), ...]
+        :return: 二元组：是否被触发，异常次数
+        """
         # 统计包含异常标记的key的数量，并与trigger_count进行比较
         anomaly_timestamps = []
         for label, score in check_results:
@@ -217,3 +249,52 @@ class AnomalyChecker(object):
             )
 
         return is_triggered, anomaly_timestamps
+
+
+class BatchAnomalyChecker(object):
+    """
+    批量拉取检测窗口
+    同一批次的异常点按 维度+级别 分组，每组只拉取一次覆盖所有异常点窗口的检测结果，
+    所有分组通过一次 pipeline 完成，再在内存中按各异常点的窗口切分，避免逐点逐级别请求 redis
+    """
+
+    def __init__(self, checkers):
+        """
+        :param list[AnomalyChecker] checkers: 同一策略监控项下的异常检测器
+        """
+        self.checkers = checkers
+
+    def prefetch(self):
+        # 检测结果缓存key -> [窗口起始时间, 窗口结束时间]
+        windows = {}
+        requests = []
+        for checker in self.checkers:
+            if not checker.trigger_configs:
+                continue
+            for level in checker.point["anomaly"]:
+                level = str(int(level))
+                trigger_config = checker.get_trigger_config(level)
+                check_cache_key, min_score, max_score = checker.get_check_window(level, trigger_config)
+                requests.append((checker, level, check_cache_key, min_score, max_score))
+
+                window = windows.get(check_cache_key)
+                if window is None:
+                    windows[check_cache_key] = [min_score, max_score]
+                else:
+                    window[0] = min(window[0], min_score)
+                    window[1] = max(window[1], max_score)
+
+        if not windows:
+            return
+
+        check_cache_keys = list(windows.keys())
+        pipeline = CHECK_RESULT_CACHE_KEY.client.pipeline(transaction=False)
+        for check_cache_key in check_cache_keys:
+            min_score, max_score = windows[check_cache_key]
+            pipeline.zrangebyscore(name=check_cache_key, min=min_score, max=max_score, withscores=True)
+        results = dict(zip(check_cache_keys, pipeline.execute()))
+
+        for checker, level, check_cache_key, min_score, max_score in requests:
+            checker.check_results[level] = [
+                (label, score) for label, score in results[check_cache_key] or [] if min_score <= score <= max_score
+            ]
@@ -16,7 +16,7 @@ from alarm_backends.core.alert.adapter import MonitorEventAdapter
 from alarm_backends.core.cache.key import ANOMALY_LIST_KEY, ANOMALY_SIGNAL_KEY, TRIGGER_EVENT_RATE_LIMIT_KEY
 from alarm_backends.core.control.strategy import Strategy
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
-from alarm_backends.service.trigger.checker import AnomalyChecker
+from alarm_backends.service.trigger.checker import AnomalyChecker, BatchAnomalyChecker
 from core.errors.alarm_backends import StrategyNotFound
 from core.prometheus import metrics
 
@@ -231,8 +231,17 @@ class TriggerProcessor:
             ).observe(max_latency)
 
         # step3: 发送到 Kafka；成功后再提交计数，避免失败时额度被静默消耗
-        MonitorEventAdapter.push_to_kafka(events=events)
-        self._commit_rate_limit_counts(batch_counts, ts_keys)
+        def on_delivered(delivered, failed):
+            if failed:
+                logger.warning(
+                    "[trigger rate limit] strategy(%s) %s events push failed, skip committing counts",
+                    self.strategy_id,
+                    failed,
+                )
+                return
+            self._commit_rate_limit_counts(batch_counts, ts_keys)
+
+        MonitorEventAdapter.push_to_kafka(events=events, callback=on_delivered)
 
         if len(events) > 1000:
             # 获取 Redis 节点信息（带异常处理）
@@ -271,19 +280,46 @@ class TriggerProcessor:
         if not in_alarm_time:
             logger.info("[trigger] strategy(%s) not in alarm time: %s, skipped", self.strategy_id, message)
         else:
-            for point in self.anomaly_points:
-                try:
-                    self.process_point(point)
-                except Exception as e:
-                    error_message = f"[process error] strategy({self.strategy_id}), item({self.item_id}) reason: {e} \norigin data: {point}"
-                    logger.exception(error_message)
+            self.process_points(self.anomaly_points)
 
         self.push()
 
-    def process_point(self, point):
+    def process_points(self, points):
+        """
+        批量处理异常点：先统一拉取所有异常点的检测窗口，再逐点判断是否触发
+        """
+        checkers = []
+        for point in points:
+            try:
+                checkers.append(self.get_checker(point))
+            except Exception as e:
+                error_message = f"[process error] strategy({self.strategy_id}), item({self.item_id}) reason: {e} \norigin data: {point}"
+                logger.exception(error_message)
+
+        try:
+            BatchAnomalyChecker(checkers).prefetch()
+        except Exception as e:
+            # 批量拉取失败时，由各异常点单独查询检测窗口
+            logger.exception(
+                f"[trigger] strategy({self.strategy_id}), item({self.item_id}) prefetch check results error: {e}"
+            )
+
+        for checker in checkers:
+            try:
+                self.check_point(checker)
+            except Exception as e:
+                error_message = f"[process error] strategy({self.strategy_id}), item({self.item_id}) reason: {e} \norigin data: {checker.point}"
+                logger.exception(error_message)
+
+    def get_checker(self, point):
         point = json.loads(point)
         strategy = self.get_strategy_snapshot(point["strategy_snapshot_key"])
-        checker = AnomalyChecker(point, strategy, self.item_id)
+        return AnomalyChecker(point, strategy, self.item_id)
+
+    def process_point(self, point):
+        self.check_point(self.get_checker(point))
+
+    def check_point(self, checker):
         anomaly_records, event_record = checker.check()
 
         # 暂存结果，最后批量保存
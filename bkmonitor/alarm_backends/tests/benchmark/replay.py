@@ -0,0 +1,457 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+告警链路回放压测: access -> detect -> trigger -> alert.builder
+
+- UnifyQuery: 按查询时间范围生成合成数据，或回放录制的统一查询返回值(时间戳平移到当前查询窗口)
+- Redis: 使用测试环境的 fakeredis，按阶段统计命令数及网络往返次数
+- Kafka: trigger 推送的事件经异步生产者写入进程内后端(memory)，再交给 alert.builder 消费
+- ES: 使用测试环境的 FakeElasticsearchBucket
+
+用法(环境变量控制规模):
+    BKM_BENCHMARK_STRATEGIES=50 BKM_BENCHMARK_DIMENSIONS=200 BKM_BENCHMARK_LEVELS=3 \
+    pytest alarm_backends/tests/benchmark -s
+录制数据: BKM_BENCHMARK_RECORDED=/path/to/unify_query_response.json (内容为 api.unify_query.query_data 返回值)
+"""
+
+import json
+import logging
+import math
+import os
+import resource
+import time
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+import redis
+from django.test import override_settings
+
+from alarm_backends.core.alert import Event
+from alarm_backends.core.cache import key
+from alarm_backends.core.storage.kafka_producer import get_event_producer
+from alarm_backends.service.access.data import AccessDataProcess
+from alarm_backends.service.alert.builder.processor import AlertBuilder
+from alarm_backends.service.detect.process import DetectProcess
+from alarm_backends.service.trigger.processor import TriggerProcessor
+from bkmonitor.data_source.unify_query.query import UnifyQuery
+
+logger = logging.getLogger("benchmark")
+
+STAGES = ["access", "detect", "trigger", "alert.builder"]
+
+
+class BenchmarkConfig:
+    """
+    压测规模配置
+    """
+
+    def __init__(
+        self,
+        strategy_count: int = 2,
+        dimension_count: int = 10,
+        level_count: int = 3,
+        anomaly_ratio: float = 0.2,
+        agg_interval: int = 60,
+        builder_batch_size: int = 1000,
+        recorded_path: str = "",
+    ):
+        self.strategy_count = strategy_count
+        self.dimension_count = dimension_count
+        self.level_count = max(1, min(level_count, 3))
+        self.anomaly_ratio = anomaly_ratio
+        self.agg_interval = agg_interval
+        self.builder_batch_size = builder_batch_size
+        self.recorded_path = recorded_path
+
+    @classmethod
+    def from_env(cls, **defaults):
+        env = os.environ
+        return cls(
+            strategy_count=int(env.get("BKM_BENCHMARK_STRATEGIES", defaults.get("strategy_count", 2))),
+            dimension_count=int(env.get("BKM_BENCHMARK_DIMENSIONS", defaults.get("dimension_count", 10))),
+            level_count=int(env.get("BKM_BENCHMARK_LEVELS", defaults.get("level_count", 3))),
+            anomaly_ratio=float(env.get("BKM_BENCHMARK_ANOMALY_RATIO", defaults.get("anomaly_ratio", 0.2))),
+            builder_batch_size=int(env.get("BKM_BENCHMARK_BUILDER_BATCH", defaults.get("builder_batch_size", 1000))),
+            recorded_path=env.get("BKM_BENCHMARK_RECORDED", defaults.get("recorded_path", "")),
+        )
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def build_strategy_config(strategy_id: int, config: BenchmarkConfig) -> dict:
+    """
+    生成压测策略: 单监控项，每个级别一个静态阈值，级别越高(数值越小)阈值越高
+    """
+    algorithms = []
+    detects = []
+    for level in range(1, config.level_count + 1):
+        threshold = round(100 * (1 - config.anomaly_ratio / level), 2)
+        algorithms.append(
+            {"config": [{"threshold": threshold, "method": "gte"}], "level": level, "type": "Threshold", "id": level}
+        )
+        detects.append(
+            {
+                "level": level,
+                "expression": "",
+                "trigger_config": {"count": 1, "check_window": 5},
+                "recovery_config": {"check_window": 5},
+                "connector": "and",
+            }
+        )
+
+    return {
+        "id": strategy_id,
+        "type": "monitor",
+        "bk_biz_id": 2,
+        "scenario": "os",
+        "name": f"benchmark-{strategy_id}",
+        "labels": [],
+        "is_enabled": True,
+        "update_time": 1569044491,
+        "items": [
+            {
+                "id": strategy_id,
+                "name": "load5",
+                "query_configs": [
+                    {
+                        "id": strategy_id,
+                        "metric_field": "load5",
+                        "agg_dimension": ["bk_target_ip", "bk_target_cloud_id"],
+                        "unit_conversion": 1.0,
+                        "agg_method": "AVG",
+                        "agg_condition": [],
+                        "agg_interval": config.agg_interval,
+                        "result_table_id": "system.cpu_load",
+                        "unit": "",
+                        "data_source_label": "bk_monitor",
+                        "data_type_label": "time_series",
+                        "metric_id": "bk_monitor.system.cpu_load.load5",
+                    }
+                ],
+                "algorithms": algorithms,
+                "no_data_config": {"is_enabled": False, "continuous": 5},
+                "create_time": 1569044491,
+                "update_time": 1569044491,
+            }
+        ],
+        "detects": detects,
+        "notice": {
+            "id": strategy_id,
+            "config_id": 0,
+            "user_groups": [],
+            "signal": ["abnormal", "recovered"],
+            "options": {"start_time": "00:00:00", "end_time": "23:59:59"},
+            "config": {"interval_notify_mode": "standard", "notify_interval": 7200, "template": []},
+        },
+        "actions": [],
+    }
+
+
+class UnifyQueryReplayer:
+    """
+    统一查询回放: 替代 api.unify_query.query_data
+    """
+
+    def __init__(self, config: BenchmarkConfig):
+        self.config = config
+        self.recorded = None
+        if config.recorded_path:
+            with open(config.recorded_path) as f:
+                self.recorded = json.load(f)
+
+    @staticmethod
+    def get_unify_query_params(query: UnifyQuery, start_time, end_time, *args, **kwargs):
+        # 跳过结果表/空间元数据查询，只保留回放需要的参数
+        return {
+            "query_list": [{"reference_name": "a"}],
+            "metric_merge": "a",
+            "step": "60s",
+            "start_time": str(start_time // 1000),
+            "end_time": str(end_time // 1000),
+        }
+
+    @staticmethod
+    def point_value(index: int, timestamp: int) -> float:
+        # 确定性的伪随机取值，范围 [0, 100)
+        return (index * 7919 + timestamp // 60 * 104729) % 10000 / 100
+
+    def query_data(self, **params):
+        step = self.config.agg_interval
+        start_time = int(params["start_time"]) // step * step
+        end_time = int(params["end_time"])
+        if self.recorded is not None:
+            return self.shift_recorded(end_time - step)
+
+        timestamps = list(range(start_time, end_time, step))
+        series = []
+        for index in range(self.config.dimension_count):
+            series.append(
+                {
+                    "columns": ["_time", "_value"],
+                    "types": ["float", "float"],
+                    "group_keys": ["bk_target_ip", "bk_target_cloud_id"],
+                    "group_values": [f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}", "0"],
+                    "values": [[t * 1000, self.point_value(index, t)] for t in timestamps],
+                }
+            )
+        return {"series": series, "is_partial": False}
+
+    def shift_recorded(self, latest_time: int):
+        """
+        录制数据的时间戳整体平移，使最新的数据点落在当前查询窗口内
+        """
+        data = json.loads(json.dumps(self.recorded))
+        times = [value[0] for row in data.get("series") or [] for value in row["values"]]
+        if not times:
+            return data
+
+        offset = latest_time * 1000 - max(times)
+        for row in data["series"]:
+            for value in row["values"]:
+                value[0] += offset
+        return data
+
+
+class RedisCommandCounter:
+    """
+    统计 redis 命令数及网络往返次数(pipeline 执行一次记为一次往返)
+    """
+
+    def __init__(self):
+        self.commands = Counter()
+        self.round_trips = 0
+        self._patchers = []
+
+    def __enter__(self):
+        counter = self
+        origin_execute_command = redis.client.Redis.execute_command
+        origin_pipeline_execute = redis.client.Pipeline.execute
+
+        def execute_command(client, *args, **options):
+            counter.commands[str(args[0]).upper()] += 1
+            counter.round_trips += 1
+            return origin_execute_command(client, *args, **options)
+
+        def pipeline_execute(pipeline, *args, **kwargs):
+            for command_args, _ in pipeline.command_stack:
+                counter.commands[str(command_args[0]).upper()] += 1
+            if pipeline.command_stack:
+                counter.round_trips += 1
+            return origin_pipeline_execute(pipeline, *args, **kwargs)
+
+        self._patchers = [
+            mock.patch.object(redis.client.Redis, "execute_command", execute_command),
+            mock.patch.object(redis.client.Pipeline, "execute", pipeline_execute),
+        ]
+        for patcher in self._patchers:
+            patcher.start()
+        return self
+
+    def __exit__(self, *args):
+        for patcher in reversed(self._patchers):
+            patcher.stop()
+        self._patchers = []
+
+    def snapshot(self):
+        return Counter(self.commands), self.round_trips
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0
+    values = sorted(values)
+    # nearest-rank
+    index = min(len(values) - 1, max(0, math.ceil(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.records = 0
+        self.errors = 0
+        self.redis_commands = Counter()
+        self.redis_round_trips = 0
+
+    def to_dict(self):
+        seconds = sum(self.latencies)
+        return {
+            "calls": len(self.latencies),
+            "records": self.records,
+            "errors": self.errors,
+            "seconds": round(seconds, 4),
+            "records_per_second": round(self.records / seconds, 2) if seconds else 0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 3),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 3),
+            "redis_commands": sum(self.redis_commands.values()),
+            "redis_round_trips": self.redis_round_trips,
+            "top_redis_commands": dict(self.redis_commands.most_common(5)),
+        }
+
+
+def mocked_delay(self, cmd, queue, *values, **option):
+    # 延时队列直接写入
+    getattr(self, cmd)(queue, *values)
+
+
+class PipelineReplayBenchmark:
+    """
+    告警链路回放压测
+    """
+
+    def __init__(self, config: BenchmarkConfig):
+        self.config = config
+        self.strategies = {
+            strategy_id: build_strategy_config(strategy_id, config)
+            for strategy_id in range(1, config.strategy_count + 1)
+        }
+        self.replayer = UnifyQueryReplayer(config)
+        self.counter = RedisCommandCounter()
+        self.stats = {stage: StageStats(stage) for stage in STAGES}
+
+    @staticmethod
+    def strategy_group_key(strategy_id: int) -> str:
+        return f"benchmark.{strategy_id}"
+
+    def get_strategy_by_id(self, strategy_id, *args, **kwargs):
+        return self.strategies.get(int(strategy_id))
+
+    def get_strategy_group_detail(self, strategy_group_key, *args, **kwargs):
+        strategy_id = int(strategy_group_key.split(".")[-1])
+        return {str(strategy_id): [strategy_id]}
+
+    def patchers(self):
+        strategy_cache = "alarm_backends.core.cache.strategy.StrategyCacheManager"
+        return [
+            mock.patch(f"{strategy_cache}.get_strategy_by_id", side_effect=self.get_strategy_by_id),
+            mock.patch(f"{strategy_cache}.get_strategy_group_detail", side_effect=self.get_strategy_group_detail),
+            mock.patch.object(UnifyQuery, "use_unify_query", return_value=True),
+            mock.patch.object(
+                UnifyQuery, "get_unify_query_params", autospec=True, side_effect=self.replayer.get_unify_query_params
+            ),
+            mock.patch(
+                "bkmonitor.data_source.unify_query.query.api.unify_query.query_data",
+                side_effect=self.replayer.query_data,
+            ),
+            mock.patch(
+                "alarm_backends.core.storage.redis.BaseRedisCache.delay", autospec=True, side_effect=mocked_delay
+            ),
+            mock.patch("core.prometheus.metrics.report_all"),
+            # 异步任务只投递不执行
+            mock.patch("alarm_backends.service.access.tasks.run_access_batch_data"),
+            mock.patch("alarm_backends.service.alert.manager.tasks.handle_alerts.apply_async"),
+            mock.patch("alarm_backends.service.alert.builder.tasks.dedupe_events_to_alerts.apply_async"),
+            mock.patch("alarm_backends.service.composite.tasks.check_action_and_composite.delay"),
+        ]
+
+    def measure(self, stage: str, func, *args):
+        """
+        执行单次阶段处理，记录耗时及 redis 命令数，返回处理结果
+        """
+        stats = self.stats[stage]
+        commands, round_trips = self.counter.snapshot()
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            logger.exception("[benchmark] stage(%s) error: %s", stage, e)
+            stats.errors += 1
+            result = None
+        stats.latencies.append(time.perf_counter() - start)
+        stats.redis_commands += self.counter.commands - commands
+        stats.redis_round_trips += self.counter.round_trips - round_trips
+        return result
+
+    def run_access(self, strategy_id: int):
+        processor = AccessDataProcess(self.strategy_group_key(strategy_id))
+        exc = processor.process()
+        if exc:
+            raise exc
+        return len(processor.record_list)
+
+    def run_detect(self, strategy_id: int):
+        processor = DetectProcess(str(strategy_id))
+        processor.process()
+        return sum(len(points) for points in processor.inputs.values())
+
+    def run_trigger(self, strategy_id: int):
+        anomaly_list_key = key.ANOMALY_LIST_KEY.get_key(strategy_id=strategy_id, item_id=strategy_id)
+        count = key.ANOMALY_LIST_KEY.client.llen(anomaly_list_key)
+        TriggerProcessor(strategy_id, strategy_id).process()
+        return count
+
+    def run_alert_builder(self, messages: list):
+        events = []
+        for message in messages:
+            value = json.loads(message.value)
+            value.update({"data_id": 0, "topic": message.topic})
+            events.append(Event(value))
+        AlertBuilder().process(events)
+        return len(events)
+
+    def run(self) -> dict:
+        patchers = self.patchers()
+        for patcher in patchers:
+            patcher.start()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        try:
+            with (
+                override_settings(PUSH_MONITOR_EVENT_TO_FTA=True, KAFKA_EVENT_PRODUCER_BACKEND="memory"),
+                self.counter,
+            ):
+                for strategy_id in self.strategies:
+                    self.stats["access"].records += self.measure("access", self.run_access, strategy_id) or 0
+                for strategy_id in self.strategies:
+                    self.stats["detect"].records += self.measure("detect", self.run_detect, strategy_id) or 0
+                for strategy_id in self.strategies:
+                    self.stats["trigger"].records += self.measure("trigger", self.run_trigger, strategy_id) or 0
+
+                # 按 kafka 拉取批次交给 alert.builder 处理
+                producer = get_event_producer()
+                producer.flush()
+                messages = [
+                    SimpleNamespace(topic=topic, value=value) for topic, value in producer.backend.pop_messages()
+                ]
+                batch_size = self.config.builder_batch_size
+                for index in range(0, len(messages), batch_size):
+                    batch = messages[index : index + batch_size]
+                    self.stats["alert.builder"].records += (
+                        self.measure("alert.builder", self.run_alert_builder, batch) or 0
+                    )
+        finally:
+            for patcher in reversed(patchers):
+                patcher.stop()
+
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {
+            "config": self.config.to_dict(),
+            "stages": {stage: stats.to_dict() for stage, stats in self.stats.items()},
+            # linux 下 ru_maxrss 单位为 KB，为进程级峰值
+            "peak_rss_kb": rss_after,
+            "peak_rss_growth_kb": rss_after - rss_before,
+        }
+
+
+def format_report(report: dict) -> str:
+    lines = [f"[benchmark] config: {json.dumps(report['config'])}"]
+    lines.append(
+        f"{'stage':<14}{'calls':>7}{'records':>10}{'rec/s':>12}{'p50(ms)':>10}{'p99(ms)':>10}{'redis':>9}{'rtt':>7}"
+    )
+    for stage, stats in report["stages"].items():
+        lines.append(
+            f"{stage:<14}{stats['calls']:>7}{stats['records']:>10}{stats['records_per_second']:>12}"
+            f"{stats['p50_ms']:>10}{stats['p99_ms']:>10}{stats['redis_commands']:>9}{stats['redis_round_trips']:>7}"
+        )
+        if stats["errors"]:
+            lines.append(f"{'':<14}errors: {stats['errors']}")
+    lines.append(f"peak rss: {report['peak_rss_kb']} KB (+{report['peak_rss_growth_kb']} KB)")
+    return "\n".join(lines)
@@ -0,0 +1,66 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import logging
+
+import pytest
+from django.test import TestCase
+
+from alarm_backends.core.alert.alert import AlertUIDManager
+from alarm_backends.core.cache import key
+from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
+from alarm_backends.tests.benchmark.replay import (
+    STAGES,
+    BenchmarkConfig,
+    PipelineReplayBenchmark,
+    format_report,
+    percentile,
+)
+from bkmonitor.models import CacheNode
+
+logger = logging.getLogger("benchmark")
+
+pytestmark = pytest.mark.django_db
+
+
+class TestPipelineReplayBenchmark(TestCase):
+    databases = {"monitor_api", "default"}
+
+    def setUp(self):
+        get_node_by_strategy_id(0)
+        CacheNode.refresh_from_settings()
+        key.DATA_LIST_KEY.client.flushall()
+        AlertUIDManager.clear_pool()
+
+    def tearDown(self):
+        key.DATA_LIST_KEY.client.flushall()
+        AlertUIDManager.clear_pool()
+
+    def test_percentile(self):
+        self.assertEqual(percentile([], 99), 0)
+        self.assertEqual(percentile([3, 1, 2], 50), 2)
+        self.assertEqual(percentile(list(range(1, 101)), 99), 99)
+
+    def test_replay(self):
+        # 默认规模较小，作为冒烟测试；通过环境变量放大规模进行压测
+        config = BenchmarkConfig.from_env()
+        report = PipelineReplayBenchmark(config).run()
+        logger.info("[benchmark] pipeline replay report:\n%s", format_report(report))
+
+        self.assertListEqual(list(report["stages"]), STAGES)
+        # 阶段处理的异常会被 measure 捕获并计数，每个阶段都需要无异常且有处理数据
+        for stage, stats in report["stages"].items():
+            self.assertEqual(stats["errors"], 0, stage)
+            self.assertGreater(stats["records"], 0, stage)
+        access = report["stages"]["access"]
+        self.assertEqual(access["calls"], config.strategy_count)
+        self.assertGreater(access["redis_commands"], 0)
+        self.assertEqual(report["stages"]["detect"]["records"], access["records"])
+        self.assertGreater(report["peak_rss_kb"], 0)
@@ -9,14 +9,17 @@ specific language governing permissions and limitations under the License.
 """
 
 import json
+import shutil
+import tempfile
 from unittest import mock
 
 from django.core.cache import caches
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from alarm_backends.core.cache.cmdb import (
     BusinessManager,
     HostManager,
+    HostSnapshotManager,
     ModuleManager,
     ServiceInstanceManager,
     SetManager,
@@ -119,6 +122,17 @@ class TestBusinessManager(TestCase):
         # 测试获取不存在的业务
         self.assertIsNone(BusinessManager.get(999))
 
+    def test_mget(self):
+        """测试批量获取业务信息"""
+        # 批量查询只执行一次 hmget，不再逐个 hget
+        with mock.patch.object(BusinessManager.cache, "hget", side_effect=AssertionError("unexpected hget")):
+            businesses = BusinessManager.mget([2, "3", 4, 999, 2])
+        self.assertSetEqual(set(businesses), {"2", "3", "4"})
+        self.assertEqual(businesses["2"].bk_biz_name, "蓝鲸")
+        self.assertEqual(businesses["3"].bk_tenant_id, "test")
+        self.assertEqual(businesses["4"].bk_tenant_id, DEFAULT_TENANT_ID)
+        self.assertEqual(BusinessManager.mget([]), {})
+
     def test_keys(self):
         """测试获取业务ID列表"""
         biz_ids = BusinessManager.keys()
@@ -282,6 +296,100 @@ class TestHostManager(TestCase):
         self.assertTrue(f"{DEFAULT_TENANT_ID}.{HostManager.get_host_key(ip, bk_cloud_id)}" in local.host_cache)
 
 
+class TestHostSnapshotManager(TestCase):
+    topo_link = {
+        "module|6": [
+            {"bk_obj_id": "module", "bk_inst_id": 6},
+            {"bk_obj_id": "set", "bk_inst_id": 3},
+            {"bk_obj_id": "biz", "bk_inst_id": 2},
+        ]
+    }
+    test_hosts = [
+        dict(
+            bk_host_innerip="127.0.0.1",
+            bk_cloud_id=0,
+            bk_host_id=1,
+            bk_biz_id=2,
+            bk_host_name="h1",
+            topo_link=topo_link,
+        ),
+        dict(bk_host_innerip="10.0.0.1", bk_cloud_id=1, bk_host_id=2, bk_biz_id=2, bk_host_name="h2"),
+    ]
+
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        HostSnapshotManager.clear()
+        local.host_cache = {}
+        hosts = {}
+        for host in self.test_hosts:
+            host_str = json.dumps(host)
+            hosts[HostManager.get_host_key(host["bk_host_innerip"], host["bk_cloud_id"])] = host_str
+            hosts[str(host["bk_host_id"])] = host_str
+        HostManager.cache.hmset(HostManager.get_cache_key(DEFAULT_TENANT_ID), hosts)
+
+    def tearDown(self):
+        HostManager.cache.delete(HostManager.get_cache_key(DEFAULT_TENANT_ID))
+        HostSnapshotManager.clear()
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+    def test_snapshot_lookup(self):
+        with override_settings(HOST_SNAPSHOT_ENABLED=True, HOST_SNAPSHOT_DIR=self.snapshot_dir):
+            snapshot = HostSnapshotManager.get_snapshot(DEFAULT_TENANT_ID)
+            self.assertIsNotNone(snapshot)
+            self.assertEqual(snapshot.record_count, 2)
+
+            # 快照生成后删除redis缓存，查询仍可命中快照
+            HostManager.cache.delete(HostManager.get_cache_key(DEFAULT_TENANT_ID))
+
+            host = HostManager.get(bk_tenant_id=DEFAULT_TENANT_ID, ip="127.0.0.1", bk_cloud_id=0)
+            self.assertEqual(host.bk_host_name, "h1")
+            host = HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=2)
+            self.assertEqual(host.bk_host_name, "h2")
+            hosts = HostManager.mget(bk_tenant_id=DEFAULT_TENANT_ID, host_keys=["10.0.0.1|1", "1|1"])
+            self.assertEqual(set(hosts), {"10.0.0.1|1"})
+            self.assertIsNone(HostManager.get(bk_tenant_id=DEFAULT_TENANT_ID, ip="127.0.0.1", bk_cloud_id=1))
+
+            brief = HostManager.get_brief_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id="1")
+            self.assertEqual((brief.ip, brief.bk_cloud_id, brief.bk_host_id), ("127.0.0.1", 0, 1))
+            self.assertEqual(sorted(brief.bk_topo_node), ["biz|2", "module|6", "set|3"])
+            brief = HostManager.get_brief(bk_tenant_id=DEFAULT_TENANT_ID, ip="10.0.0.1", bk_cloud_id="1")
+            self.assertEqual((brief.bk_host_id, brief.bk_topo_node), (2, []))
+
+    def test_mget_by_id(self):
+        for enabled in [False, True]:
+            HostSnapshotManager.clear()
+            with override_settings(HOST_SNAPSHOT_ENABLED=enabled, HOST_SNAPSHOT_DIR=self.snapshot_dir):
+                # 批量查询只读取快照或执行一次 hmget，不再逐个 hget
+                with mock.patch.object(HostManager.cache, "hget", side_effect=AssertionError("unexpected hget")):
+                    hosts = HostManager.mget_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_ids=[1, "2", 3, None])
+                self.assertEqual({key: host.bk_host_name for key, host in hosts.items()}, {"1": "h1", "2": "h2"})
+                self.assertEqual(hosts["1"].bk_tenant_id, DEFAULT_TENANT_ID)
+                self.assertEqual(HostManager.mget_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_ids=[None]), {})
+
+    def test_snapshot_refreshing(self):
+        with override_settings(HOST_SNAPSHOT_ENABLED=True, HOST_SNAPSHOT_DIR=self.snapshot_dir):
+            snapshot = HostSnapshotManager.get_snapshot(DEFAULT_TENANT_ID)
+            self.assertIsNotNone(snapshot)
+
+            # 检查间隔已过，但其他线程正在刷新，直接返回旧快照且不重建
+            HostSnapshotManager._checked_at[DEFAULT_TENANT_ID] = 0
+            with mock.patch.object(HostSnapshotManager, "_try_build") as try_build:
+                with HostSnapshotManager._lock:
+                    self.assertIs(HostSnapshotManager.get_snapshot(DEFAULT_TENANT_ID), snapshot)
+                try_build.assert_not_called()
+                self.assertEqual(HostSnapshotManager._checked_at[DEFAULT_TENANT_ID], 0)
+
+                # 刷新结束后由下一个线程负责检查
+                self.assertIs(HostSnapshotManager.get_snapshot(DEFAULT_TENANT_ID), snapshot)
+                self.assertNotEqual(HostSnapshotManager._checked_at[DEFAULT_TENANT_ID], 0)
+
+    def test_snapshot_disabled(self):
+        with override_settings(HOST_SNAPSHOT_ENABLED=False, HOST_SNAPSHOT_DIR=self.snapshot_dir):
+            self.assertIsNone(HostSnapshotManager.get_snapshot(DEFAULT_TENANT_ID))
+            brief = HostManager.get_brief(bk_tenant_id=DEFAULT_TENANT_ID, ip="127.0.0.1", bk_cloud_id=0)
+            self.assertEqual(sorted(brief.bk_topo_node), ["biz|2", "module|6", "set|3"])
+
+
 class TestModuleManager(TestCase):
     test_modules = {
         DEFAULT_TENANT_ID: {
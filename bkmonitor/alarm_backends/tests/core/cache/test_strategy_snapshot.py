@@ -0,0 +1,98 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+
+import pytest
+
+from alarm_backends.core.cache.strategy import (
+    StrategyCacheManager,
+    StrategySnapshotStore,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def gen_strategy(strategy_id, name):
+    return {"id": strategy_id, "bk_biz_id": 2, "name": name, "items": []}
+
+
+class TestStrategySnapshotStore:
+    def setup_method(self):
+        StrategyCacheManager.cache.delete(
+            StrategyCacheManager.VERSION_CACHE_KEY,
+            StrategyCacheManager.VERSIONS_CACHE_KEY,
+            StrategyCacheManager.CACHE_KEY_TEMPLATE.format(strategy_id=1),
+            StrategyCacheManager.CACHE_KEY_TEMPLATE.format(strategy_id=2),
+        )
+
+    def test_without_version(self, settings):
+        settings.STRATEGY_SNAPSHOT_CHECK_INTERVAL = 0
+        StrategyCacheManager.cache.set(
+            StrategyCacheManager.CACHE_KEY_TEMPLATE.format(strategy_id=1), json.dumps(gen_strategy(1, "a"))
+        )
+
+        store = StrategySnapshotStore()
+        assert store.get(1)["name"] == "a"
+        # 全局版本号不存在时不做进程内缓存
+        assert not store._snapshots
+
+    def test_invalidate_changed(self, settings):
+        settings.STRATEGY_SNAPSHOT_CHECK_INTERVAL = 0
+        StrategyCacheManager.refresh_strategy([gen_strategy(1, "a"), gen_strategy(2, "b")], old_groups=[])
+
+        store = StrategySnapshotStore()
+        assert store.get(1)["name"] == "a"
+        assert store.get(2)["name"] == "b"
+        assert set(store._snapshots) == {1, 2}
+
+        # 返回的策略配置相互独立
+        store.get(1)["name"] = "x"
+        assert store.get(1)["name"] == "a"
+
+        # 内容未变化时，全局版本号不变
+        global_version = StrategyCacheManager.cache.get(StrategyCacheManager.VERSION_CACHE_KEY)
+        StrategyCacheManager.refresh_strategy([gen_strategy(1, "a")], old_groups=[])
+        assert StrategyCacheManager.cache.get(StrategyCacheManager.VERSION_CACHE_KEY) == global_version
+
+        # 只清理发生变化的策略
+        StrategyCacheManager.refresh_strategy([gen_strategy(1, "c")], old_groups=[])
+        assert store.get(2)["name"] == "b"
+        assert set(store._snapshots) == {2}
+        assert store.get(1)["name"] == "c"
+
+    def test_delete_strategies(self, settings):
+        settings.STRATEGY_SNAPSHOT_CHECK_INTERVAL = 0
+        StrategyCacheManager.refresh_strategy([gen_strategy(1, "a"), gen_strategy(2, "b")], old_groups=[])
+
+        store = StrategySnapshotStore()
+        assert store.get(1)["name"] == "a"
+        assert store.get(2)["name"] == "b"
+
+        StrategyCacheManager.delete_strategies([1])
+        assert store.get(1) is None
+        assert store.get(2)["name"] == "b"
+        # 已删除的策略不再保留快照
+        assert set(store._snapshots) == {2}
+
+    def test_update_strategy(self, settings):
+        settings.STRATEGY_SNAPSHOT_CHECK_INTERVAL = 0
+        StrategyCacheManager.refresh_strategy([gen_strategy(1, "a"), gen_strategy(2, "b")], old_groups=[])
+
+        store = StrategySnapshotStore()
+        assert store.get(1)["name"] == "a"
+        assert store.get(2)["name"] == "b"
+
+        # 局部更新单个策略后，各进程的快照随全局版本号刷新
+        strategy = gen_strategy(1, "a")
+        strategy["issue_config"] = {"is_enabled": True}
+        StrategyCacheManager.update_strategy(1, strategy)
+        assert store.get(1)["issue_config"] == {"is_enabled": True}
+        assert store.get(2)["name"] == "b"
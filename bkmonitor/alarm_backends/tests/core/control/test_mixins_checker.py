@@ -354,3 +354,36 @@ class TestChecker(TestCase):
         data_points = [DataPoint(record, self.item) for record in RECORDS]
         # 127.0.0.3 不在HostManager缓存中
         self.assertEqual(self.item.check(data_points, check_timestamp), ANOMALY_INFO[1:2])
+
+    @patch(
+        "alarm_backends.service.nodata.scenarios.base.BaseScenario.get_target_instances_dimensions",
+        MagicMock(return_value=(TARGET_INSTANCE_DIMENSIONS, [])),
+    )
+    @patch("alarm_backends.core.control.mixins.nodata.CheckMixin._produce_anomaly_info", mock_anomaly_info)
+    @patch("alarm_backends.core.control.mixins.nodata.CheckMixin._is_host_dimension_in_business", lambda x, y: True)
+    def test_check__presence(self):
+        check_timestamp = 10000
+        mock_last_check_key(self, 9940)
+        presence = {}
+        for record in RECORDS:
+            dimensions = dict(record["dimensions"], **{NO_DATA_TAG_DIMENSION: True})
+            presence[count_md5(dimensions)] = (record["time"], dimensions)
+        recovered_md5 = count_md5(TARGET_INSTANCE_DIMENSIONS[0])
+        anomaly_checkpoint_field = key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.get_field(
+            strategy_id=self.item.strategy.id, item_id=self.item.id, dimensions_md5=recovered_md5
+        )
+        key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.client.hset(
+            key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.get_key(), anomaly_checkpoint_field, 9000
+        )
+
+        # 只有维度上报记录，没有完整数据点
+        self.assertEqual(self.item.check([], check_timestamp, presence=presence), [ANOMALY_INFO[0]])
+        # 有上报的维度已批量恢复
+        self.assertIsNone(
+            key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.client.hget(
+                key.NO_DATA_LAST_ANOMALY_CHECKPOINTS_CACHE_KEY.get_key(), anomaly_checkpoint_field
+            )
+        )
+        # 上报维度的最后上报点已更新
+        last_points = self.item._get_last_checkpoints(list(presence.keys()))
+        self.assertEqual([int(last_point) for last_point in last_points], [1583896800, 1583896800])
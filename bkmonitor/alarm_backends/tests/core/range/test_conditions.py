@@ -10,6 +10,7 @@ specific language governing permissions and limitations under the License.
 """
 
 
+from bkmonitor.utils.range import load_condition_matcher
 from bkmonitor.utils.range.conditions import (
     AndCondition,
     EqualCondition,
@@ -211,3 +212,43 @@ class TestCondition(object):
         and_condition.add(condition3)
         assert not and_condition.is_match({"key": "123"})
         assert and_condition.is_match({"key": "1234235678"})
+
+    def test_compile(self):
+        and_condition = AndCondition()
+        and_condition.add(EqualCondition(DimensionField("key", ["value", "v"])))
+        and_condition.add(RegularCondition(DimensionField("key2", [r"1234\d+5678", r"123\d+5678"])))
+        or_condition = OrCondition()
+        or_condition.add(and_condition)
+        or_condition.add(GreaterCondition(DimensionField("key3", 101)))
+
+        matcher = or_condition.compile()
+        for data in [
+            {"key": "value", "key2": "12345678"},
+            {"key": "v", "key2": "128"},
+            {"key": "value1", "key2": "12345678"},
+            {"key": "value1", "key3": 102},
+            {"key": "value1", "key3": [99, 102]},
+            {},
+        ]:
+            assert matcher(data) == or_condition.is_match(data)
+
+    def test_compile_empty(self):
+        assert OrCondition().compile()({"key": "value"})
+        assert AndCondition().compile()({"key": "value"})
+
+        # 条件值为空时无法预处理，退化为逐次匹配
+        condition = GreaterCondition(DimensionField("key", []), default_value_if_not_exists=True)
+        assert condition.compile()({"other": 1})
+
+    def test_load_condition_matcher(self):
+        conditions_config = [
+            [{"field": "key", "method": "eq", "value": ["value"]}],
+            [{"field": "key", "method": "reg", "value": r"^v\d"}],
+        ]
+        matcher = load_condition_matcher(conditions_config)
+        assert matcher({"key": "value"})
+        assert matcher({"key": "v1"})
+        assert not matcher({"key": "x1"})
+        assert matcher({"other": "x1"})
+        assert load_condition_matcher(conditions_config) is matcher
+        assert not load_condition_matcher(conditions_config, False)({"other": "x1"})
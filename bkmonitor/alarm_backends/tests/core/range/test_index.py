@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from bkmonitor.utils.range.fields import DimensionField
+from bkmonitor.utils.range.index import ConditionFieldIndex
+
+
+class TestConditionFieldIndex:
+    def test_get_candidates(self):
+        index = ConditionFieldIndex()
+        index.index_field(0, DimensionField("strategy_id", ["1", "2"]))
+        index.index_field(1, DimensionField("strategy_id", "3"))
+        index.index_field(2, DimensionField("device", ["eth0"]))
+        index.index_field(3)
+
+        # 同名同类型的字段共用一个索引键，只需从数据中取一次值
+        assert len(index.probes) == 2
+        assert index.unindexed == [3]
+
+        assert index.get_candidates({"strategy_id": "2", "device": "eth0"}) == {0, 2, 3}
+        assert index.get_candidates({"strategy_id": 3}) == {1, 3}
+        assert index.get_candidates({}) == {3}
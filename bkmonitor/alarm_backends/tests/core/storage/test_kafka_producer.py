@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+import time
+from unittest import TestCase
+
+from django.test import override_settings
+
+from alarm_backends.core.storage.kafka_producer import (
+    AsyncEventProducer,
+    MemoryProducerBackend,
+)
+
+
+class BlockingBackend(MemoryProducerBackend):
+    """
+    发送前等待放行，模拟 kafka 发送阻塞
+    """
+
+    def __init__(self, hosts):
+        super().__init__(hosts)
+        self.released = threading.Event()
+
+    def send(self, topic, messages):
+        self.released.wait(5)
+        super().send(topic, messages)
+
+
+class FlakyBackend(MemoryProducerBackend):
+    """
+    前 failures 次发送失败
+    """
+
+    def __init__(self, hosts, failures):
+        super().__init__(hosts)
+        self.failures = failures
+        self.attempts = 0
+
+    def send(self, topic, messages):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("kafka unavailable")
+        super().send(topic, messages)
+
+
+class TestAsyncEventProducer(TestCase):
+    @override_settings(KAFKA_EVENT_PRODUCER_BATCH_SIZE=2, KAFKA_EVENT_PRODUCER_LINGER_SECONDS=0)
+    def test_send(self):
+        producer = AsyncEventProducer("test", MemoryProducerBackend([]))
+        reports = []
+
+        def callback(delivered, failed):
+            reports.append((delivered, failed))
+
+        producer.send("topic_a", [b"1", b"2", b"3"], callback=callback)
+        producer.send("topic_b", [b"4"])
+        producer.close()
+
+        self.assertEqual(reports, [(3, 0)])
+        self.assertEqual(
+            producer.backend.pop_messages(),
+            [("topic_a", b"1"), ("topic_a", b"2"), ("topic_a", b"3"), ("topic_b", b"4")],
+        )
+        self.assertFalse(producer.thread.is_alive())
+
+    @override_settings(
+        KAFKA_EVENT_PRODUCER_QUEUE_SIZE=1,
+        KAFKA_EVENT_PRODUCER_BLOCK_TIMEOUT=0.01,
+        KAFKA_EVENT_PRODUCER_LINGER_SECONDS=0,
+    )
+    def test_send__backpressure(self):
+        backend = BlockingBackend([])
+        producer = AsyncEventProducer("test", backend)
+        producer.send("topic", [b"1"])
+        while not producer.queue.empty():
+            time.sleep(0.01)
+        producer.send("topic", [b"2"])
+        # 后台线程阻塞在第一批消息上，队列已满时剩余消息由调用方同步发送
+        sync_send = threading.Thread(target=producer.send, args=("topic", [b"3", b"4"]))
+        sync_send.start()
+        sync_send.join(0.2)
+        self.assertTrue(sync_send.is_alive())
+        backend.released.set()
+        sync_send.join(5)
+        producer.close()
+
+        self.assertEqual(sorted(message for _, message in backend.pop_messages()), [b"1", b"2", b"3", b"4"])
+        self.assertFalse(sync_send.is_alive())
+
+    @override_settings(KAFKA_EVENT_PRODUCER_RETRIES=2, KAFKA_EVENT_PRODUCER_RETRY_BACKOFF=0)
+    def test_send_sync__retry(self):
+        producer = AsyncEventProducer("test", FlakyBackend([], failures=2))
+        producer.send_sync("topic", [b"1"])
+        self.assertEqual(producer.backend.attempts, 3)
+        self.assertEqual(producer.backend.pop_messages(), [("topic", b"1")])
+
+        # 重试后仍然失败时抛出异常
+        producer = AsyncEventProducer("test", FlakyBackend([], failures=3))
+        with self.assertRaises(ConnectionError):
+            producer.send_sync("topic", [b"1"])
+        self.assertEqual(producer.backend.pop_messages(), [])
+
+    @override_settings(
+        KAFKA_EVENT_PRODUCER_RETRIES=1,
+        KAFKA_EVENT_PRODUCER_RETRY_BACKOFF=0,
+        KAFKA_EVENT_PRODUCER_LINGER_SECONDS=0,
+    )
+    def test_send__failed_callback(self):
+        producer = AsyncEventProducer("test", FlakyBackend([], failures=10))
+        reports = []
+        producer.send("topic", [b"1", b"2"], callback=lambda delivered, failed: reports.append((delivered, failed)))
+        producer.close()
+
+        # 异步发送最终失败时通过回调通知调用方
+        self.assertEqual(reports, [(0, 2)])
+        self.assertEqual(producer.backend.pop_messages(), [])
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.test import TestCase
+
+from alarm_backends.core.cluster import get_cluster
+from alarm_backends.core.storage import redis_cluster
+from alarm_backends.core.storage.redis_cluster import (
+    get_node_by_strategy_id,
+    get_pipeline_executor,
+    refresh_strategy_router,
+)
+from bkmonitor.models import CacheNode, CacheRouter
+
+pytestmark = pytest.mark.django_db
+
+
+class TestStrategyRouter(TestCase):
+    databases = {"monitor_api", "default"}
+
+    def setUp(self):
+        cluster_name = get_cluster().name
+        self.nodes = [
+            CacheNode.objects.create(
+                cluster_name=cluster_name, cache_type="RedisCache", host="127.0.0.1", port=6379 + i, node_alias=f"n{i}"
+            )
+            for i in range(3)
+        ]
+        CacheRouter.objects.filter(cluster_name=cluster_name).delete()
+        for score, node in [(100, self.nodes[0]), (200, self.nodes[1]), (1000, self.nodes[2])]:
+            CacheRouter.objects.create(cluster_name=cluster_name, node=node, strategy_score=score)
+        refresh_strategy_router(force=True)
+
+    def tearDown(self):
+        CacheRouter.objects.filter(cluster_name=get_cluster().name).delete()
+        CacheNode.objects.filter(id__in=[node.id for node in self.nodes]).delete()
+        refresh_strategy_router(force=True)
+
+    def test_get_node_by_strategy_id(self):
+        self.assertEqual(get_node_by_strategy_id(1).id, self.nodes[0].id)
+        self.assertEqual(get_node_by_strategy_id(99).id, self.nodes[0].id)
+        self.assertEqual(get_node_by_strategy_id(100).id, self.nodes[1].id)
+        self.assertEqual(get_node_by_strategy_id(999).id, self.nodes[2].id)
+
+        with self.assertRaises(Exception):
+            get_node_by_strategy_id(1000)
+
+    def test_reload_router_when_changed(self):
+        self.assertEqual(get_node_by_strategy_id(150).id, self.nodes[1].id)
+        CacheRouter.objects.filter(strategy_score=200).update(node=self.nodes[2])
+
+        # 未到检查时间，继续使用旧路由
+        with self.settings(CACHE_ROUTER_CHECK_INTERVAL=60):
+            self.assertEqual(get_node_by_strategy_id(150).id, self.nodes[1].id)
+
+            old_router = redis_cluster.STRATEGY_ROUTER
+            redis_cluster.STRATEGY_ROUTER_CHECK_TIME = 0
+            self.assertEqual(get_node_by_strategy_id(150).id, self.nodes[2].id)
+
+        # 新路由表整体替换，旧路由表及其节点缓存保持不变
+        self.assertIsNot(redis_cluster.STRATEGY_ROUTER, old_router)
+        self.assertEqual(old_router.node_map[150].id, self.nodes[1].id)
+        self.assertEqual(redis_cluster.STRATEGY_ROUTER.node_map[150].id, self.nodes[2].id)
+
+    def test_pipeline_executor(self):
+        with self.settings(REDIS_PIPELINE_PARALLEL_WORKERS=1):
+            self.assertIsNone(get_pipeline_executor())
+
+        with self.settings(REDIS_PIPELINE_PARALLEL_WORKERS=4):
+            executor = get_pipeline_executor()
+            self.assertIs(get_pipeline_executor(), executor)
+            self.assertEqual(executor.submit(sum, [1, 2]).result(), 3)
+
+            # 多线程同时获取时只创建一个线程池
+            redis_cluster.PIPELINE_EXECUTOR = None
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                executors = set(pool.map(lambda _: get_pipeline_executor(), range(32)))
+            self.assertEqual(executors, {redis_cluster.PIPELINE_EXECUTOR})
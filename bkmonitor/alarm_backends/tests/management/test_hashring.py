@@ -0,0 +1,70 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from collections import Counter
+
+from alarm_backends.management.base.dispatch import DefaultDispatchMixin
+from alarm_backends.management.hashring import ConsistentHashRing, get_hash_ring
+
+
+class TestConsistentHashRing:
+    def test_get_hash_ring(self):
+        ring = get_hash_ring(["host1", "host2"])
+        # 成员不变时复用已构建的哈希环
+        assert get_hash_ring({"host2": 1, "host1": 1}) is ring
+        assert get_hash_ring(["host1", "host3"]) is not ring
+
+    def test_assign(self):
+        keys = list(range(1000))
+        assignment = ConsistentHashRing({"host1": 1, "host2": 1, "host3": 1, "host4": 1}).assign(keys, 1.25)
+        assert set(assignment) == set(keys)
+        assert max(Counter(assignment.values()).values()) <= 313
+
+        # 与单个目标的分配结果一致
+        ring = ConsistentHashRing({"host1": 1, "host2": 1})
+        assert ring.assign(keys) == {key: ring.get_node(key) for key in keys}
+
+        # 加入节点后只有少量目标迁移
+        new_assignment = ConsistentHashRing(
+            {"host1": 1, "host2": 1, "host3": 1, "host4": 1, "host5": 1}
+        ).assign(keys, 1.25)
+        moved = [key for key in keys if assignment[key] != new_assignment[key]]
+        assert len(moved) < 350
+
+    def test_assign_weighted(self):
+        keys = list(range(1000))
+        counter = Counter(ConsistentHashRing({"host1": 1, "host2": 3}).assign(keys, 1.1).values())
+        assert counter["host2"] > counter["host1"] * 2
+        assert counter["host2"] <= 825
+
+
+class TestDefaultDispatchMixin:
+    def test_dispatch_all_hosts(self):
+        class Dispatcher(DefaultDispatchMixin):
+            def __init__(self, targets):
+                self.targets = targets
+
+            def query_host_targets(self):
+                return self.targets
+
+            def dispatch(self):
+                pass
+
+            def dispatch_status(self):
+                pass
+
+        hosts = ["host1", "host2", "host3"]
+        __, host_targets = Dispatcher(list(range(100))).dispatch_all_hosts(hosts)
+        __, new_host_targets = Dispatcher(list(range(101))).dispatch_all_hosts(hosts)
+
+        # 各主机查询到的目标集合不同时，已有目标的归属不变，避免重复处理或遗漏
+        for host in hosts:
+            assert [target for target in new_host_targets[host] if target != 100] == host_targets[host]
+        assert sum(len(targets) for targets in host_targets.values()) == 100
@@ -15,7 +15,7 @@ import copy
 import fakeredis
 import pytest
 
-from alarm_backends.service.access.data.duplicate import Duplicate
+from alarm_backends.service.access.data.duplicate import Duplicate, FingerprintDuplicate
 
 from .config import STANDARD_DATA
 
@@ -65,3 +65,52 @@ class TestDuplicate(object):
         assert dup.is_duplicate(record_1) is True
         assert dup.is_duplicate(record_2) is True
         assert dup.is_duplicate(record) is False
+
+
+class TestFingerprintDuplicate(object):
+    def setup_method(self, method):
+        redis = fakeredis.FakeRedis(decode_responses=True)
+        redis.flushall()
+        FingerprintDuplicate.local_window.clear()
+
+    def test_duplicate(self):
+        strategy_group_key = "123456789"
+        dup = FingerprintDuplicate(strategy_group_key)
+
+        record_1 = MockRecord(copy.deepcopy(STANDARD_DATA))
+        assert dup.is_duplicate(record_1) is False
+
+        dup.add_record(record_1)
+        assert dup.is_duplicate(record_1) is True
+        assert len(dup.to_member(record_1.record_id)) == FingerprintDuplicate.FINGERPRINT_WIDTH
+
+    def test_refresh_cache(self):
+        strategy_group_key = "123456789"
+        record = MockRecord(STANDARD_DATA)
+
+        record_1 = MockRecord(copy.deepcopy(STANDARD_DATA))
+        record_1.time += 60
+        record_2 = MockRecord(copy.deepcopy(STANDARD_DATA))
+        record_2.time += 120
+
+        dup = FingerprintDuplicate(strategy_group_key)
+        dup.preload_duplicate_cache([{"_time_": record_1.time}, {"_time_": record_2.time}])
+        dup.add_record(record_1)
+        dup.add_record(record_2)
+        dup.refresh_cache()
+
+        # 其他进程追加的数据，通过增量读取获取
+        FingerprintDuplicate.local_window.pop(str(dup.get_dup_key(record_2.time)))
+        dup.client.append(dup.get_dup_key(record_1.time), FingerprintDuplicate.to_member("other_record_id"))
+
+        dup = FingerprintDuplicate(strategy_group_key)
+        assert dup.is_duplicate(record_1) is True
+        assert dup.is_duplicate_by_id("other_record_id", record_1.time) is True
+        assert dup.is_duplicate(record_2) is True
+        assert dup.is_duplicate(record) is False
+
+        # 不使用本地窗口时全量读取
+        FingerprintDuplicate.local_window.clear()
+        dup = FingerprintDuplicate(strategy_group_key)
+        assert dup.is_duplicate_by_id("other_record_id", record_1.time) is True
+        assert dup.is_duplicate(record_2) is True
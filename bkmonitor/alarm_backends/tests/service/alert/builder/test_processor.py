@@ -13,13 +13,14 @@ import time
 
 from unittest import mock
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from elasticsearch.helpers import BulkIndexError
 
 from alarm_backends.core.alert import Alert, Event
-from alarm_backends.core.alert.alert import AlertUIDManager
+from alarm_backends.core.alert.alert import AlertCache, AlertUIDManager
+from alarm_backends.core.alert.codec import AlertCacheCodec
 from alarm_backends.core.cache.key import ALERT_DEDUPE_CONTENT_KEY, ALERT_SNAPSHOT_KEY
-from alarm_backends.service.alert.builder.processor import AlertBuilder
+from alarm_backends.service.alert.builder.processor import AlertBuilder, get_alert_partition
 from api.cmdb.define import Host
 from bkmonitor.models import CacheNode
 from constants.data_source import KubernetesResultTableLabel
@@ -692,7 +693,7 @@ class TestProcessor(TestCase):
         )
         self.assertIsNotNone(result)
 
-        new_alert = json.loads(result)
+        new_alert = AlertCacheCodec.decode(result)
         self.assertEqual(alert.id, new_alert["id"])
 
     def test_update_alert_cache_with_snapshot(self):
@@ -718,9 +719,55 @@ class TestProcessor(TestCase):
         )
         self.assertIsNotNone(result)
 
-        new_alert = json.loads(result)
+        new_alert = AlertCacheCodec.decode(result)
         self.assertEqual(alert.id, new_alert["id"])
 
+    def test_alert_cache_codec(self):
+        alert_data = {"id": "1617504052123", "dedupe_md5": "68e9f0598d72a4b6de2675d491e5b922", "extra": "x" * 100}
+
+        # 默认不编码，写入旧版 json 格式，保证滚动升级期间旧版本进程可以读取
+        value = AlertCacheCodec.encode(alert_data)
+        self.assertEqual(json.loads(value), alert_data)
+
+        with self.settings(ALERT_CACHE_CODEC_ENABLED=True, ALERT_CACHE_COMPRESS_THRESHOLD=0):
+            value = AlertCacheCodec.encode(alert_data)
+            self.assertTrue(value.startswith(AlertCacheCodec.PREFIX))
+            self.assertEqual(AlertCacheCodec.peek_id(value), "1617504052123")
+            self.assertEqual(AlertCacheCodec.decode(value), alert_data)
+
+        with self.settings(ALERT_CACHE_CODEC_ENABLED=True, ALERT_CACHE_COMPRESS_THRESHOLD=10):
+            value = AlertCacheCodec.encode(alert_data)
+            self.assertIn("|z|", value)
+            self.assertEqual(AlertCacheCodec.peek_id(value), "1617504052123")
+            self.assertEqual(AlertCacheCodec.decode(value), alert_data)
+
+        # 兼容旧版 json 格式
+        self.assertEqual(AlertCacheCodec.peek_id(json.dumps(alert_data)), "1617504052123")
+        self.assertEqual(AlertCacheCodec.decode(json.dumps(alert_data)), alert_data)
+
+    def test_save_alerts_check_id(self):
+        alert_data = {
+            "dedupe_md5": "68e9f0598d72a4b6de2675d491e5b922",
+            "end_time": None,
+            "create_time": 1617504020,
+            "begin_time": 1617504052,
+            "first_anomaly_time": 1617504052,
+            "latest_time": 1617504052,
+            "status": "ABNORMAL",
+            "severity": 0,
+            "strategy_id": 125,
+        }
+        cached_alert = Alert(dict(alert_data, id="cached alert"))
+        alert = Alert(dict(alert_data, id="other alert"))
+        self.assertEqual(AlertCache.save_alerts([cached_alert]), (1, 0, 1))
+
+        # 缓存中的告警ID不一致，只更新快照
+        self.assertEqual(AlertCache.save_alerts([alert], check_id=True), (0, 0, 1))
+        content_key = ALERT_DEDUPE_CONTENT_KEY.get_key(strategy_id=alert.strategy_id, dedupe_md5=alert.dedupe_md5)
+        self.assertEqual(AlertCacheCodec.peek_id(ALERT_DEDUPE_CONTENT_KEY.client.get(content_key)), "cached alert")
+        snapshot_key = ALERT_SNAPSHOT_KEY.get_key(strategy_id=alert.strategy_id, alert_id=alert.id)
+        self.assertEqual(AlertCacheCodec.decode(ALERT_SNAPSHOT_KEY.client.get(snapshot_key))["id"], "other alert")
+
     def test_empty_data(self):
         processor = AlertBuilder()
 
@@ -1068,3 +1115,77 @@ class TestProcessor(TestCase):
         alert._is_new = False
         alert = AlertBuilder().alert_qos_handle(alert)
         self.assertEqual(alert.status, "CLOSED")
+
+    @override_settings(ALERT_BUILDER_PARTITION_COUNT=4, ALERT_BUILDER_PARTITION_QUEUE_PREFIX="celery_alert_builder_p")
+    @mock.patch("alarm_backends.service.alert.builder.tasks.dedupe_events_partition.apply_async")
+    def test_dispatch_partitions(self, apply_async):
+        events = [
+            Event(
+                {
+                    "event_id": str(index),
+                    "plugin_id": "fta-test",
+                    "alert_name": "CPU usage high",
+                    "time": 1617504052 + index,
+                    "severity": 1,
+                    "target": target,
+                    "dedupe_keys": ["alert_name", "target"],
+                }
+            )
+            for index, target in enumerate(["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.1", "10.0.0.2"])
+        ]
+        AlertBuilder().dispatch_partitions(events)
+
+        dispatched = {}
+        for call in apply_async.call_args_list:
+            partition, partition_events = call.kwargs["args"]
+            self.assertEqual(call.kwargs["queue"], f"celery_alert_builder_p{partition}")
+            self.assertNotIn(partition, dispatched)
+            dispatched[partition] = partition_events
+
+        # 同一告警的事件总是分到同一个分区，并保持原有顺序
+        self.assertEqual(sum(len(partition_events) for partition_events in dispatched.values()), len(events))
+        for event in events:
+            self.assertIn(event, dispatched[get_alert_partition(event.dedupe_md5)])
+        for partition_events in dispatched.values():
+            self.assertEqual(partition_events, sorted(partition_events, key=lambda e: e.event_id))
+
+    @override_settings(ALERT_BUILDER_PARTITION_COUNT=4, ALERT_BUILDER_PARTITION_RETRY_COUNTDOWN=1)
+    @mock.patch("alarm_backends.service.alert.builder.processor.time.sleep")
+    @mock.patch("alarm_backends.service.alert.builder.tasks.dedupe_events_partition.apply_async")
+    def test_dedupe_partition_events__locked(self, apply_async, sleep):
+        events = [
+            Event(
+                {
+                    "event_id": str(index),
+                    "plugin_id": "fta-test",
+                    "alert_name": "CPU usage high",
+                    "time": 1617504052 + index,
+                    "severity": 1,
+                    "target": "10.0.0.1",
+                    "dedupe_keys": ["alert_name", "target"],
+                }
+            )
+            for index in range(2)
+        ]
+        builder = AlertBuilder()
+        handled = []
+
+        def dedupe_events_to_alerts(dedupe_events, partition=None):
+            # 第一次处理时告警被其他模块加锁
+            self.assertEqual(partition, 1)
+            if handled:
+                handled.append(dedupe_events)
+                return ["alert"]
+            handled.append([])
+            builder.locked_events = dedupe_events
+            return []
+
+        with mock.patch.object(builder, "dedupe_events_to_alerts", side_effect=dedupe_events_to_alerts):
+            alerts = builder.dedupe_partition_events(events, 1)
+
+        # 加锁失败的事件在当前 worker 内等待后按原顺序重试，不会放回分区队列排到更新的事件之后
+        self.assertEqual(alerts, ["alert"])
+        self.assertEqual(handled, [[], events])
+        self.assertEqual(builder.locked_events, [])
+        sleep.assert_called_once_with(1)
+        apply_async.assert_not_called()
@@ -0,0 +1,182 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from unittest import mock
+
+import pytest
+
+from alarm_backends.core.cache.cmdb import (
+    BusinessManager,
+    HostManager,
+    ServiceInstanceManager,
+    TopoManager,
+)
+from alarm_backends.service.alert.enricher.dimension import MonitorTranslateEnricher
+from alarm_backends.service.alert.enricher.translator.base import (
+    TranslationCache,
+    TranslationField,
+)
+from alarm_backends.service.alert.enricher.translator.biz_name import BizNameTranslator
+from alarm_backends.service.alert.enricher.translator.service_instance import (
+    ServiceInstanceTranslator,
+)
+from alarm_backends.service.alert.enricher.translator.topo import TopoNodeTranslator
+from api.cmdb.define import Business, Host, ServiceInstance, TopoNode
+
+pytestmark = pytest.mark.django_db
+
+STRATEGY = {
+    "id": 1,
+    "bk_biz_id": 2,
+    "items": [
+        {
+            "query_configs": [
+                {
+                    "metric_id": "bk_monitor.system.cpu_summary.usage",
+                    "data_type_label": "time_series",
+                    "data_source_label": "bk_monitor",
+                    "result_table_id": "system.cpu_summary",
+                }
+            ],
+        }
+    ],
+}
+
+HOSTS = {"1": Host(bk_host_innerip="127.0.0.1", bk_cloud_id=0, bk_host_id=1, bk_biz_id=2)}
+TOPO_NODES = {
+    ("module", 6): TopoNode(bk_obj_id="module", bk_inst_id=6, bk_obj_name="模块", bk_inst_name="kafka"),
+    ("set", 3): TopoNode(bk_obj_id="set", bk_inst_id=3, bk_obj_name="集群", bk_inst_name="test"),
+}
+SERVICE_INSTANCES = {10: ServiceInstance(service_instance_id=10, name="kafka_9092")}
+BUSINESSES = {"2": Business(bk_biz_id=2, bk_biz_name="蓝鲸")}
+
+
+@pytest.fixture()
+def cmdb_managers():
+    """
+    批量查询返回固定数据，单键查询使用 mock 记录调用
+    """
+    with (
+        mock.patch.object(HostManager, "mget_by_id", return_value=HOSTS) as host_mget,
+        mock.patch.object(TopoManager, "mget", return_value=TOPO_NODES) as topo_mget,
+        mock.patch.object(ServiceInstanceManager, "mget", return_value=SERVICE_INSTANCES) as service_instance_mget,
+        mock.patch.object(BusinessManager, "mget", return_value=BUSINESSES) as business_mget,
+        mock.patch.object(HostManager, "get_by_id") as host_get,
+        mock.patch.object(TopoManager, "get") as topo_get,
+        mock.patch.object(ServiceInstanceManager, "get") as service_instance_get,
+        mock.patch.object(BusinessManager, "get") as business_get,
+    ):
+        yield {
+            "mget": [host_mget, topo_mget, service_instance_mget, business_mget],
+            "get": [host_get, topo_get, service_instance_get, business_get],
+        }
+
+
+def to_fields(dimensions: dict) -> dict:
+    return {name: TranslationField(name, value) for name, value in dimensions.items()}
+
+
+def prepare_and_translate(translator, dimensions_list: list[dict]) -> list[dict]:
+    cache = TranslationCache()
+    translator.cache = cache
+    for dimensions in dimensions_list:
+        translator.prepare(to_fields(dimensions))
+    cache.fetch()
+    return [translator.translate(to_fields(dimensions)) for dimensions in dimensions_list]
+
+
+class TestTranslationCache:
+    def test_topo_translator(self, cmdb_managers):
+        translator = TopoNodeTranslator(item=STRATEGY["items"][0], strategy=STRATEGY)
+        dimensions_list = [
+            {"bk_host_id": 1, "bk_topo_node": ["module|6", "set|3"]},
+            {"bk_host_id": 2, "bk_obj_id": "set", "bk_inst_id": 3, "bk_topo_node": ["module|7"]},
+        ]
+        results = prepare_and_translate(translator, dimensions_list)
+
+        assert results[0]["bk_host_id"].display_value == "127.0.0.1"
+        assert results[0]["bk_topo_node"].display_value == [
+            {"bk_obj_name": "模块", "bk_inst_name": "kafka"},
+            {"bk_obj_name": "集群", "bk_inst_name": "test"},
+        ]
+        assert results[1]["bk_host_id"].display_value == 2
+        assert results[1]["bk_inst_id"].display_value == "test"
+        # 预取中不存在的节点直接使用ID，不再补充查询
+        assert results[1]["bk_topo_node"].display_value == [{"bk_obj_name": "module", "bk_inst_name": 7}]
+
+        # 主机、拓扑节点各批量查询一次，预取后不再单独查询
+        host_mget, topo_mget = cmdb_managers["mget"][:2]
+        host_mget.assert_called_once()
+        assert set(host_mget.call_args.kwargs["bk_host_ids"]) == {"1", "2"}
+        topo_mget.assert_called_once()
+        assert set(topo_mget.call_args.kwargs["topo_nodes"]) == {("module", 6), ("set", 3), ("module", 7)}
+        for getter in cmdb_managers["get"]:
+            getter.assert_not_called()
+
+    def test_service_instance_translator(self, cmdb_managers):
+        translator = ServiceInstanceTranslator(item=STRATEGY["items"][0], strategy=STRATEGY)
+        results = prepare_and_translate(
+            translator, [{"bk_target_service_instance_id": "10"}, {"bk_target_service_instance_id": "11"}]
+        )
+
+        assert results[0]["bk_target_service_instance_id"].display_value == "kafka_9092"
+        assert results[1]["bk_target_service_instance_id"].display_value == "11"
+
+        service_instance_mget = cmdb_managers["mget"][2]
+        service_instance_mget.assert_called_once()
+        assert set(service_instance_mget.call_args.kwargs["service_instance_ids"]) == {10, 11}
+        for getter in cmdb_managers["get"]:
+            getter.assert_not_called()
+
+    def test_biz_name_translator(self, cmdb_managers):
+        translator = BizNameTranslator(item=STRATEGY["items"][0], strategy=STRATEGY)
+        results = prepare_and_translate(translator, [{"bk_biz_id": 2}, {"bk_biz_id": "3"}])
+
+        assert results[0]["bk_biz_id"].display_name == "蓝鲸"
+        assert results[1]["bk_biz_id"].display_name == "bk_biz_id"
+
+        business_mget = cmdb_managers["mget"][3]
+        business_mget.assert_called_once()
+        assert set(business_mget.call_args.args[0]) == {"2", "3"}
+        for getter in cmdb_managers["get"]:
+            getter.assert_not_called()
+
+    def test_monitor_translate_enricher(self, cmdb_managers):
+        alerts = []
+        for index, dimensions in enumerate(
+            [
+                {"bk_host_id": 1, "bk_biz_id": 2, "bk_topo_node": ["module|6"]},
+                {"bk_host_id": 2, "bk_biz_id": 2, "bk_target_service_instance_id": "10"},
+                {"bk_host_id": 1, "bk_biz_id": 3, "bk_obj_id": "set", "bk_inst_id": 3},
+            ]
+        ):
+            extra_info = {"strategy": STRATEGY, "origin_alarm": {"data": {"dimensions": dimensions}}}
+            alert = mock.MagicMock(id=str(index), dimensions=[{"key": "tags.bk_host_id", "value": 1}])
+            alert.is_new.return_value = True
+            alert.get_extra_info.side_effect = extra_info.get
+            alerts.append(alert)
+
+        translators = (TopoNodeTranslator, ServiceInstanceTranslator, BizNameTranslator)
+        with mock.patch("alarm_backends.service.alert.enricher.translator.INSTALLED_TRANSLATORS", translators):
+            MonitorTranslateEnricher(alerts).enrich()
+
+        # 整批告警每类缓存只批量查询一次，翻译时不再单独查询
+        for mget in cmdb_managers["mget"]:
+            mget.assert_called_once()
+        for getter in cmdb_managers["get"]:
+            getter.assert_not_called()
+
+        translation = alerts[0].get_extra_info("origin_alarm")["dimension_translation"]
+        assert translation["bk_host_id"]["display_value"] == "127.0.0.1"
+        assert translation["bk_biz_id"]["display_name"] == "蓝鲸"
+        translation = alerts[1].get_extra_info("origin_alarm")["dimension_translation"]
+        assert translation["bk_target_service_instance_id"]["display_value"] == "kafka_9092"
+        translation = alerts[2].get_extra_info("origin_alarm")["dimension_translation"]
+        assert translation["bk_inst_id"]["display_value"] == "test"
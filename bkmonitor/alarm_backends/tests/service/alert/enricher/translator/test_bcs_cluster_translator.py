@@ -14,7 +14,10 @@ import pytest
 from django.conf import settings
 
 from alarm_backends.core.cache.bcs_cluster import BcsClusterCacheManager
-from alarm_backends.service.alert.enricher.translator.base import TranslationField
+from alarm_backends.service.alert.enricher.translator.base import (
+    TranslationCache,
+    TranslationField,
+)
 from alarm_backends.service.alert.enricher.translator.bcs_cluster import (
     BcsClusterTranslator,
 )
@@ -108,3 +111,30 @@ class TestBcsClusterTranslator:
             "pod": {"display_name": "pod", "display_value": "pod_name", "value": "pod_name"},
         }
         assert actual == expect
+
+    def test_translate_with_cache(self, monkeypatch, monkeypatch_cluster_management_fetch_clusters):
+        monkeypatch.setattr(settings, "BCS_CLUSTER_SOURCE", "cluster-manager")
+        monkeypatch.setattr(FetchK8sClusterListResource, "cache_type", None)
+
+        BcsClusterCacheManager.refresh()
+
+        cache = TranslationCache()
+        translator = BcsClusterTranslator(item=STRATEGY["items"][0], strategy=STRATEGY)
+        translator.cache = cache
+
+        dimensions_list = [{"bcs_cluster_id": "BCS-K8S-00000"}, {"bcs_cluster_id": "BCS-K8S-00001"}]
+        for dimensions in dimensions_list:
+            translator.prepare({name: TranslationField(name, value) for name, value in dimensions.items()})
+        cache.fetch()
+
+        # 预取之后不再单独查询集群缓存
+        def get(bcs_cluster_id):
+            raise AssertionError(f"unexpected get {bcs_cluster_id}")
+
+        monkeypatch.setattr(BcsClusterCacheManager, "get", get)
+
+        display_values = []
+        for dimensions in dimensions_list:
+            data = {name: TranslationField(name, value) for name, value in dimensions.items()}
+            display_values.append(translator.translate(data)["bcs_cluster_id"].display_value)
+        assert display_values == ["BCS-K8S-00000(蓝鲸社区版7.0)", "BCS-K8S-00001"]
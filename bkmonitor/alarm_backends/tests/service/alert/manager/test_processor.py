@@ -9,12 +9,15 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-from django.test import TestCase
+from unittest import mock
+
+from django.test import TestCase, override_settings
 
 from alarm_backends.core.alert import Alert
-from alarm_backends.core.alert.alert import AlertKey
-from alarm_backends.core.cache.key import ALERT_DEDUPE_CONTENT_KEY
+from alarm_backends.core.alert.alert import AlertCache, AlertKey
+from alarm_backends.core.cache.key import ALERT_DEDUPE_CONTENT_KEY, ALERT_USER_CHANGE_KEY
 from alarm_backends.service.alert.manager.processor import AlertManager
+from bkmonitor.documents import AlertDocument
 from bkmonitor.models import CacheNode
 
 
@@ -58,3 +61,90 @@ class TestProcessor(TestCase):
         snapshot_alert = Alert.get_from_snapshot(alert_key)
         self.assertIsNotNone(snapshot_alert)
         self.assertEqual(snapshot_alert.id, alert.id)
+
+    def build_alert(self, alert_id, dedupe_md5, status="ABNORMAL"):
+        return Alert(
+            {
+                "id": alert_id,
+                "dedupe_md5": dedupe_md5,
+                "end_time": None,
+                "create_time": 1617504052,
+                "begin_time": 1617504052,
+                "first_anomaly_time": 1617504052,
+                "latest_time": 1617504052,
+                "status": status,
+                "severity": 1,
+                "event": {"id": "event-1"},
+                "strategy_id": 333,
+                "is_ack": False,
+            }
+        )
+
+    @override_settings(ALERT_USER_CHANGE_JOURNAL_ENABLED=True, ALERT_USER_CHANGE_FULL_SYNC_CYCLES=10)
+    @mock.patch("alarm_backends.service.alert.manager.processor.time.time", return_value=61 * 60)
+    @mock.patch("alarm_backends.service.alert.manager.processor.AlertDocument.mget")
+    def test_fetch_alerts__user_change(self, mget, *args):
+        alerts = [self.build_alert("1617504052000001", "md5-1"), self.build_alert("1617504052000002", "md5-2")]
+        AlertCache.save_alerts(alerts)
+        AlertDocument.record_user_change(
+            [AlertDocument(id="1617504052000002", is_ack=True), AlertDocument(id="1617504052000001", issue_id="1")]
+        )
+        mget.return_value = [AlertDocument(id="1617504052000002", is_ack=True, ack_operator="admin")]
+
+        processor = AlertManager([alert.key for alert in alerts])
+        fetched_alerts = {alert.id: alert for alert in processor.fetch_alerts()}
+
+        # 只有用户字段有变更版本的告警才从 ES 同步
+        self.assertEqual(mget.call_args[1]["ids"], ["1617504052000002"])
+        self.assertTrue(fetched_alerts["1617504052000002"].data["is_ack"])
+        self.assertEqual(fetched_alerts["1617504052000002"].data["ack_operator"], "admin")
+        self.assertFalse(fetched_alerts["1617504052000001"].data["is_ack"])
+        self.assertEqual(processor.user_change_versions, {"1617504052000002": "1"})
+
+        # 同步并写入缓存后才清理变更版本
+        change_key = ALERT_USER_CHANGE_KEY.get_key(alert_id="1617504052000002")
+        self.assertEqual(ALERT_USER_CHANGE_KEY.client.get(change_key), "1")
+        processor.clear_user_changes(list(fetched_alerts.values()))
+        self.assertIsNone(ALERT_USER_CHANGE_KEY.client.get(change_key))
+
+    @override_settings(ALERT_USER_CHANGE_JOURNAL_ENABLED=True, ALERT_USER_CHANGE_FULL_SYNC_CYCLES=10)
+    @mock.patch("alarm_backends.service.alert.manager.processor.time.time", return_value=61 * 60)
+    @mock.patch("alarm_backends.service.alert.manager.processor.AlertDocument.mget")
+    def test_clear_user_changes__changed_during_sync(self, mget, *args):
+        alert = self.build_alert("1617504052000005", "md5-5")
+        AlertCache.save_alerts([alert])
+        AlertDocument.record_user_change([AlertDocument(id=alert.id, is_ack=True)])
+        mget.return_value = [AlertDocument(id=alert.id, is_ack=True)]
+
+        processor = AlertManager([alert.key])
+        fetched_alerts = processor.fetch_alerts()
+
+        # 同步期间用户再次修改，版本不一致时保留变更版本，下一轮继续同步
+        AlertDocument.record_user_change([AlertDocument(id=alert.id, is_handled=True)])
+        processor.clear_user_changes(fetched_alerts)
+        change_key = ALERT_USER_CHANGE_KEY.get_key(alert_id=alert.id)
+        self.assertEqual(ALERT_USER_CHANGE_KEY.client.get(change_key), "2")
+        ALERT_USER_CHANGE_KEY.client.delete(change_key)
+
+    @override_settings(ALERT_USER_CHANGE_JOURNAL_ENABLED=True, ALERT_USER_CHANGE_FULL_SYNC_CYCLES=10)
+    @mock.patch("alarm_backends.service.alert.manager.processor.time.time", return_value=60 * 60)
+    @mock.patch("alarm_backends.service.alert.manager.processor.AlertDocument.mget")
+    def test_fetch_alerts__full_sync(self, mget, *args):
+        alerts = [self.build_alert("1617504052000006", "md5-6"), self.build_alert("1617504052000007", "md5-7")]
+        AlertCache.save_alerts(alerts)
+        mget.return_value = []
+
+        # 到达全量同步周期时，没有变更版本的告警也从 ES 同步
+        AlertManager([alert.key for alert in alerts]).fetch_alerts()
+        self.assertEqual(mget.call_args[1]["ids"], ["1617504052000006", "1617504052000007"])
+
+    def test_filter_alerts__cached_status(self):
+        alerts = [self.build_alert("1617504052000003", "md5-3"), self.build_alert("1617504052000004", "md5-4")]
+        AlertCache.save_alerts([alerts[0], self.build_alert("1617504052000004", "md5-4", status="CLOSED")])
+
+        processor = AlertManager([alert.key for alert in alerts])
+        self.assertEqual(
+            AlertCache.get_cached_status(alerts),
+            {"md5-3": ("1617504052000003", "ABNORMAL"), "md5-4": ("1617504052000004", "CLOSED")},
+        )
+        self.assertEqual([alert.id for alert in processor.filter_alerts(alerts)], ["1617504052000003"])
@@ -16,6 +16,7 @@ from unittest import TestCase
 from unittest import mock
 import pytest
 from django.conf import settings
+from django.test import override_settings
 
 from alarm_backends.core.alert import Alert, Event
 from alarm_backends.core.cache.key import (
@@ -25,7 +26,10 @@ from alarm_backends.core.cache.key import (
 )
 from alarm_backends.core.cache.strategy import StrategyCacheManager
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
-from alarm_backends.service.composite.processor import CompositeProcessor
+from alarm_backends.service.composite.processor import (
+    CompositeBatchProcessor,
+    CompositeProcessor,
+)
 from bkmonitor.models import CacheNode
 from constants.action import ActionSignal
 from constants.alert import EventStatus
@@ -762,6 +766,50 @@ class TestProcessor(TestCase):
         action = processor.process_single_strategy()
         self.assertIsNotNone(action)
 
+    def test_single_strategy_batch(self):
+        def build_event(index, status="ABNORMAL"):
+            return Event(
+                {
+                    "event_id": str(index),
+                    "plugin_id": "fta-test",
+                    "alert_name": "xxx",
+                    "strategy_id": 9,
+                    "time": 1617504052,
+                    "tags": [{"key": "device", "value": f"cpu{index}"}],
+                    "severity": 1,
+                    "target": "10.0.0.1",
+                    "dedupe_keys": ["alert_name", "target", "tags.device"],
+                    "ip": "10.0.0.1",
+                    "bk_cloud_id": 0,
+                    "bk_biz_id": 2,
+                    "status": status,
+                }
+            )
+
+        # 比较并设置及批量加锁(redis 不支持 lua 脚本时同样回退为批量加锁)的检测结果一致
+        for cas_enabled in [True, False]:
+            COMPOSITE_DIMENSION_KEY_LOCK.client.flushall()
+            with override_settings(COMPOSITE_DETECT_CAS_ENABLED=cas_enabled):
+                alerts = [Alert.from_event(build_event(1)), Alert.from_event(build_event(2))]
+                processor = CompositeBatchProcessor([CompositeProcessor(alert) for alert in alerts])
+                actions = processor.process_single_strategies()
+                self.assertEqual({alert.id for alert in alerts}, set(actions))
+                for action in actions.values():
+                    self.assertEqual("abnormal", action["signal"])
+                    self.assertEqual(9, int(action["strategy_id"]))
+                cache_key = ALERT_DETECT_RESULT.get_key(alert_id=alerts[0].id)
+                self.assertEqual("1", ALERT_DETECT_RESULT.client.get(cache_key))
+
+                processor = CompositeBatchProcessor([CompositeProcessor(alert) for alert in alerts])
+                self.assertEqual({}, processor.process_single_strategies())
+
+                alerts[0].update(build_event(1, status="RECOVERED"))
+                processor = CompositeBatchProcessor([CompositeProcessor(alert) for alert in alerts])
+                actions = processor.process_single_strategies()
+                self.assertEqual([alerts[0].id], list(actions))
+                self.assertEqual("recovered", actions[alerts[0].id]["signal"])
+                self.assertIsNone(ALERT_DETECT_RESULT.client.get(cache_key))
+
     def test_qos(self):
         success = failed = 0
         processor = CompositeProcessor(
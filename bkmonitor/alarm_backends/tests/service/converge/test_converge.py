@@ -3,6 +3,8 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from alarm_backends.core.alert import Alert
+from alarm_backends.core.cache.key import FTA_CONVERGE_DIMENSION_KEY
+from alarm_backends.service.converge.dimension import DimensionHandler
 from alarm_backends.service.fta_action.tasks.create_action import CreateActionProcessor
 from alarm_backends.service.converge.processor import ConvergeProcessor
 from bkmonitor.models.fta.action import ConvergeInstance, ConvergeRelation, ActionInstance, ActionPlugin
@@ -468,3 +470,36 @@ class TestActionConverge:
         # 创建了4个action，但成功执行的action只有两个
         assert len(actions) == 4
         assert execute_action_count == 2
+
+
+class TestDimensionHandler:
+    def test_get_by_condition(self, settings):
+        strategy_id = 1
+        now = int(time.time())
+        client = FTA_CONVERGE_DIMENSION_KEY.client
+        dimension_members = {
+            ("alert_name", "cpu"): {"action_1": now - 10, "action_2": now - 10, "action_3": now - 10000},
+            ("alert_name", "mem"): {"action_4": now - 10},
+            ("bk_biz_id", "2"): {"action_1": now - 10, "action_3": now - 10, "action_4": now - 10},
+        }
+        for (dimension, value), members in dimension_members.items():
+            key = FTA_CONVERGE_DIMENSION_KEY.get_key(strategy_id=strategy_id, dimension=dimension, value=value)
+            client.delete(key)
+            client.zadd(key, members)
+
+        handler = DimensionHandler(
+            dimension="converge_dimension",
+            condition={"alert_name": [["cpu", "mem"]], "bk_biz_id": ["2"]},
+            start_timestamp=now - 100,
+            end_timestamp=now,
+            instance_id=1,
+            strategy_id=strategy_id,
+        )
+
+        # 同一维度的多个值取并集，不同维度之间取交集，时间窗口外的成员不参与计算
+        settings.CONVERGE_DIMENSION_SERVER_SIDE_ENABLED = False
+        assert set(handler.get_by_condition()) == {"action_1", "action_4"}
+
+        # redis 计算与进程内计算结果一致，不支持 lua 脚本时回退到进程内计算
+        settings.CONVERGE_DIMENSION_SERVER_SIDE_ENABLED = True
+        assert set(handler.get_by_condition()) == {"action_1", "action_4"}
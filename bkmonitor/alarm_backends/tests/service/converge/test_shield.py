@@ -11,6 +11,7 @@ specific language governing permissions and limitations under the License.
 import copy
 import json
 import time
+from datetime import datetime, timedelta, timezone
 
 from unittest import mock
 import pytest
@@ -20,6 +21,8 @@ from alarm_backends.core.alert import Alert, Event
 from alarm_backends.core.cache.cmdb.host import HostIPManager, HostManager
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
 from alarm_backends.service.alert.enricher import KubernetesCMDBEnricher
+from alarm_backends.service.converge.shield.shield_index import ShieldIndex
+from alarm_backends.service.converge.shield.shield_obj import AlertShieldObj
 from alarm_backends.service.converge.shield.shielder.saas_config import HostShielder
 from alarm_backends.tests.utils.cmdb_data import ALL_HOSTS, TOPO_TREE
 from api.cmdb.define import Business, Host
@@ -344,3 +347,54 @@ class TestHostShielder:
 
         assert shielder.is_matched()
         mock_get_host_without_biz_v2.assert_not_called()
+
+
+def build_shield_config(shield_id, category, dimension_config):
+    return {
+        "id": shield_id,
+        "bk_biz_id": BK_BIZ_ID,
+        "category": category,
+        "scope_type": "instance",
+        "description": "",
+        "begin_time": datetime.now(tz=timezone.utc) - timedelta(minutes=1),
+        "end_time": datetime.now(tz=timezone.utc) + timedelta(hours=1),
+        "cycle_config": {"type": 1, "week_list": [], "day_list": [], "begin_time": "", "end_time": ""},
+        "dimension_config": dimension_config,
+    }
+
+
+class TestShieldIndex:
+    def test_match(self):
+        index = ShieldIndex(
+            [
+                build_shield_config(
+                    1,
+                    "dimension",
+                    {"dimension_conditions": [{"key": "device", "value": ["eth0"], "method": "eq"}]},
+                ),
+                build_shield_config(2, "strategy", {"strategy_id": [1, 3], "level": [1]}),
+                build_shield_config(
+                    3,
+                    "dimension",
+                    {"dimension_conditions": [{"key": "device", "value": ["eth1"], "method": "neq"}]},
+                ),
+            ]
+        )
+        # 按策略屏蔽优先使用策略ID建立索引，不等于条件无法建立索引
+        assert index.unindexed == [2]
+        signature = index.get_field_signature(index.choose_index_condition(index.shield_objs[1]).cond_field)
+        assert signature[0] == "strategy_id"
+        assert set(index.postings[signature]) == {"1", "3"}
+
+        with mock.patch.object(
+            AlertShieldObj, "get_dimension", return_value={"device": "eth0", "strategy_id": 1, "level": 1}
+        ):
+            assert [shield_obj.id for shield_obj in index.match(mock.MagicMock())] == [1, 2, 3]
+
+        index.shield_objs[1].dimension_matcher = mock.MagicMock(return_value=True)
+        with mock.patch.object(
+            AlertShieldObj, "get_dimension", return_value={"device": "eth1", "strategy_id": 2, "level": 1}
+        ):
+            assert index.match(mock.MagicMock()) == []
+        # 策略ID未命中索引，不需要执行完整的维度匹配
+        index.shield_objs[1].dimension_matcher.assert_not_called()
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import pytest
+
+from alarm_backends.core.control.mixins.detect import detector_plan_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_detector_plan_cache():
+    # 不同用例可能使用相同的策略ID和算法配置，避免复用其他用例构建的检测器
+    detector_plan_cache.clear()
+    yield
+    detector_plan_cache.clear()
@@ -14,6 +14,7 @@ import mock
 import pytest
 
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
+from alarm_backends.service.detect.history import HistorySeriesStore
 from alarm_backends.service.detect.strategy.advanced_ring_ratio import AdvancedRingRatio
 from alarm_backends.tests.service.detect import DataPoint
 from alarm_backends.tests.service.detect.mocked_data import mock_datapoint_with_value
@@ -115,6 +116,71 @@ class TestAdvancedRingRatio(object):
         assert len(anomaly_result) == 1
         assert anomaly_result[0].anomaly_message == "avg(测试指标)较前3个时间点的瞬间值(101%)下降超过100.0%, 当前值-1%"
 
+    def test_history_series_cache(self):
+        get_node_by_strategy_id(0)
+        CacheNode.refresh_from_settings()
+
+        algorithms_config = {"floor": 100, "ceil": 100, "ceil_interval": 3, "floor_interval": 3, "fetch_type": "last"}
+        datapoint = mock_datapoint_with_value(500)
+        history_series = HistorySeriesStore(datapoint.item)
+        history_series.client.delete(history_series.get_key(history_series.locate(datapoint.timestamp)[0]))
+        datapoint.item.query_record.reset_mock()
+
+        detect_engine = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        detect_engine.query_history_points([datapoint])
+        assert datapoint.item.query_record.call_count == 1
+        history_points = detect_engine.history_point_fetcher(datapoint, cycles=3)
+        assert [(p.timestamp, p.value) for p in history_points] == [
+            (1569246420, 99),
+            (1569246360, 1),
+            (1569246300, 101),
+        ]
+
+        # 历史周期已经缓存，新的检测器不再查询数据源
+        detect_engine = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        detect_engine.query_history_points([datapoint])
+        assert datapoint.item.query_record.call_count == 1
+        assert [p.value for p in detect_engine.history_point_fetcher(datapoint, cycles=3)] == [99, 1, 101]
+
+        # 修改汇聚周期后使用新的分桶，不沿用旧周期的已查询位图
+        from_timestamp, until_timestamp = 1569246300, datapoint.timestamp
+        history_series.load(history_series.buckets(from_timestamp, until_timestamp))
+        assert any(history_series.covered.values())
+        with mock.patch.dict(datapoint.item.query_configs[0], {"agg_interval": 120}):
+            changed_series = HistorySeriesStore(datapoint.item)
+        assert changed_series.get_key(0) != history_series.get_key(0)
+        changed_series.load(changed_series.buckets(from_timestamp, until_timestamp))
+        assert not any(changed_series.covered.values())
+
+    def test_history_series_publish(self):
+        get_node_by_strategy_id(0)
+        CacheNode.refresh_from_settings()
+
+        datapoint = mock_datapoint_with_value(500)
+        timestamp = datapoint.timestamp
+        with mock.patch("alarm_backends.service.detect.history.time.time", return_value=timestamp + 30):
+            history_series = HistorySeriesStore(datapoint.item)
+        bucket, index = history_series.locate(timestamp)
+        history_key = history_series.get_key(bucket)
+        history_series.client.delete(history_key)
+
+        # 未超过入库延迟且没有查询到数据的周期不标记为已查询
+        history_series.publish([], [timestamp, timestamp - 3600])
+        assert not history_series.covered.get(bucket, 0) >> index & 1
+        assert history_series.covered[history_series.locate(timestamp - 3600)[0]]
+
+        # 只写入变化的周期
+        history_series.publish([("md5", timestamp, 1)], [timestamp])
+        assert history_series.client.hgetall(history_key) == {f"md5.{index}": "1", f"__covered__.{index}": "1"}
+        with mock.patch.object(history_series.client, "pipeline") as pipeline:
+            history_series.publish([("md5", timestamp, 1)], [timestamp])
+        pipeline.assert_not_called()
+        history_series.publish([("md5", timestamp, 1.5)])
+        assert history_series.client.hget(history_key, f"md5.{index}") == "1.5"
+
+        loaded_series = HistorySeriesStore(datapoint.item)
+        assert loaded_series.get("md5", timestamp) == 1.5
+
     def test_detect_with_invalid_datapoint(self):
         algorithms_config = {"floor": 101, "ceil": 100, "ceil_interval": 3, "floor_interval": 3}
         with pytest.raises(InvalidDataPoint):
@@ -11,6 +11,7 @@ specific language governing permissions and limitations under the License.
 import pytest
 
 from alarm_backends.core.control.item import Item
+from alarm_backends.core.control.mixins.detect import detector_plan_cache
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
 from alarm_backends.tests.service.detect import DataPoint
 from bkmonitor.models import CacheNode
@@ -57,3 +58,16 @@ class TestAlgorithmConnector:
         item.algorithm_connectors.update({1: "or", 2: "or"})
         outputs = item.detect(datapoints)
         assert len(outputs) == 7
+
+    def test_detector_plan_reuse(self, item):
+        datapoints = [DataPoint(i, 100000000, "percent", item) for i in range(1, 8)]
+        item.detect(datapoints)
+        plan = detector_plan_cache.get(item)
+        # 相同的算法配置复用已构建的检测器
+        assert len(item.detect(datapoints)) == 3
+        assert detector_plan_cache.get(item) is plan
+
+        # 连接符变更后重新构建
+        item.algorithm_connectors.update({1: "or", 2: "or"})
+        assert len(item.detect(datapoints)) == 7
+        assert detector_plan_cache.get(item) is not plan
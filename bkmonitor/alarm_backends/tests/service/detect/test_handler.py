@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+from unittest import TestCase
+
+import mock
+from django.test import override_settings
+
+from alarm_backends.core.cache import key
+from alarm_backends.service.detect.handler import DetectCeleryHandler
+from alarm_backends.service.detect.tasks import detect_strategy
+
+
+class TestDetectCeleryHandler(TestCase):
+    def setUp(self):
+        self.client = key.DATA_SIGNAL_KEY.client
+        self.data_signal_key = key.DATA_SIGNAL_KEY.get_key()
+        self.client.delete(self.data_signal_key)
+
+    def tearDown(self):
+        self.client.delete(self.data_signal_key)
+
+    @override_settings(DETECT_SIGNAL_BATCH_SIZE=3)
+    def test_pull_strategy_ids(self):
+        # 左进右出，重复信号合并，保持到达顺序
+        self.client.lpush(self.data_signal_key, 1, 2, 1, 3, 2, 4, 5)
+        handler = DetectCeleryHandler()
+        self.assertEqual(handler.pull_strategy_ids(), ["1", "2", "3", "4", "5"])
+        self.assertEqual(self.client.llen(self.data_signal_key), 0)
+
+    @override_settings(DETECT_SIGNAL_BATCH_SIZE=2)
+    def test_pull_strategy_ids__max_input_count(self):
+        self.client.lpush(self.data_signal_key, *range(1, 11))
+        handler = DetectCeleryHandler()
+        handler.max_input_count = 3
+        self.assertEqual(handler.pull_strategy_ids(), ["1", "2", "3", "4"])
+        self.assertEqual(self.client.llen(self.data_signal_key), 6)
+
+    @override_settings(DETECT_SIGNAL_SLOTS=4, DETECT_SIGNAL_SLOT_QUEUE_PREFIX="celery_service_detect_")
+    @mock.patch("alarm_backends.service.detect.handler.run_detect_with_sdk")
+    @mock.patch("alarm_backends.service.detect.handler.run_detect_batch")
+    @mock.patch("alarm_backends.service.detect.handler.run_detect")
+    def test_handle__slot_dispatch(self, run_detect, run_detect_batch, run_detect_with_sdk):
+        self.client.lpush(self.data_signal_key, 1, 5, 2, 5, 9)
+        with mock.patch.object(DetectCeleryHandler, "use_aiops_sdk", side_effect=lambda s: s == "2"):
+            DetectCeleryHandler().handle()
+
+        run_detect.apply_async.assert_not_called()
+        run_detect_with_sdk.apply_async.assert_called_once_with(args=("2",))
+        run_detect_batch.apply_async.assert_called_once_with(args=(["1", "5", "9"],), queue="celery_service_detect_1")
+
+    @mock.patch("alarm_backends.service.detect.handler.run_detect_batch")
+    @mock.patch("alarm_backends.service.detect.handler.run_detect")
+    def test_handle__without_slot(self, run_detect, run_detect_batch):
+        # 未开启槽位，或未配置槽位队列前缀时，每个策略单独下发任务
+        for slot_settings in [
+            {"DETECT_SIGNAL_SLOTS": 0, "DETECT_SIGNAL_SLOT_QUEUE_PREFIX": "celery_service_detect_"},
+            {"DETECT_SIGNAL_SLOTS": 4, "DETECT_SIGNAL_SLOT_QUEUE_PREFIX": ""},
+        ]:
+            run_detect.reset_mock()
+            self.client.lpush(self.data_signal_key, 1, 2, 1)
+            with override_settings(**slot_settings), mock.patch.object(
+                DetectCeleryHandler, "use_aiops_sdk", return_value=False
+            ):
+                DetectCeleryHandler().handle()
+
+            run_detect_batch.apply_async.assert_not_called()
+            self.assertEqual([call[1]["args"] for call in run_detect.apply_async.call_args_list], [("1",), ("2",)])
+
+    @override_settings(DETECT_SIGNAL_SLOTS=4, DETECT_SIGNAL_SLOT_QUEUE_PREFIX="celery_service_detect_")
+    @mock.patch("alarm_backends.service.detect.handler.run_detect_batch")
+    @mock.patch("alarm_backends.service.detect.handler.run_detect")
+    @mock.patch("alarm_backends.service.detect.tasks.DetectProcess")
+    def test_detect_strategy__busy(self, detect_process, run_detect, run_detect_batch):
+        detect_process.return_value.is_busy = True
+        detect_strategy(5)
+
+        # 待检测数据过多时重新投递回策略所在的槽位队列
+        run_detect.apply_async.assert_not_called()
+        run_detect_batch.apply_async.assert_called_once_with(args=([5],), queue="celery_service_detect_1")
@@ -11,6 +11,7 @@ specific language governing permissions and limitations under the License.
 import pytest
 
 from alarm_backends.service.detect import DataPoint
+from alarm_backends.service.detect.strategy import compile_template, filter_batch_candidates
 from alarm_backends.service.detect.strategy.threshold import Threshold
 from alarm_backends.tests.service.detect.mocked_data import (
     Item,
@@ -93,6 +94,16 @@ class TestThreshold(object):
         assert len(anomaly_result) == 1
         assert anomaly_result[0].anomaly_message == "avg(测试指标) = 6.0%, 当前值6%"
 
+    def test_anomaly_message_template_cache(self):
+        algorithms_config = [[{"threshold": 6, "method": "gt"}]]
+        detect_engine = Threshold(config=algorithms_config)
+        compile_template.cache_clear()
+        for data_point in (datapoint99, datapoint50, datapoint99):
+            assert len(detect_engine.detect_records([data_point], 1)) == 1
+        # 相同模板文本只编译一次
+        assert compile_template.cache_info().misses == 1
+        assert compile_template.cache_info().hits == 2
+
     def test_detect_unknown_method(self):
         algorithms_config = [[{"threshold": 50.0, "method": "unknown"}]]
         with pytest.raises(
@@ -143,3 +154,30 @@ class TestThreshold(object):
 
         anomaly_records = detect_engine.detect_records([datapoint], 1)
         assert anomaly_records[0].anomaly_message == "avg(测试指标) >= 1.0KiB, 当前值1.000977KiB"
+
+    def test_batch_candidates(self):
+        algorithms_config = [
+            [{"threshold": 6, "method": "gt"}, {"threshold": 99, "method": "lte"}, {"threshold": 50, "method": "neq"}],
+            [{"threshold": 6, "method": "eq"}],
+        ]
+        detect_engine = Threshold(config=algorithms_config)
+        data_points = [datapoint99, datapoint50, datapoint6]
+        assert filter_batch_candidates(data_points, [detect_engine]) == [datapoint99, datapoint6]
+
+        anomaly_result = detect_engine.detect_records(data_points, 1)
+        assert [ap.data_point for ap in anomaly_result] == [datapoint99, datapoint6]
+        assert anomaly_result[1].anomaly_message == "avg(测试指标) = 6.0%, 当前值6%"
+
+    def test_batch_candidates_with_connector(self):
+        gte_engine = Threshold(config=[[{"threshold": 50.0, "method": "gte"}]])
+        lte_engine = Threshold(config=[[{"threshold": 50.0, "method": "lte"}]])
+        data_points = [datapoint99, datapoint50, datapoint6]
+        assert filter_batch_candidates(data_points, [gte_engine, lte_engine], "and") == [datapoint50]
+        assert filter_batch_candidates(data_points, [gte_engine, lte_engine], "or") == data_points
+
+    def test_batch_disabled(self, settings):
+        settings.DETECT_BATCH_ENABLED = False
+        detect_engine = Threshold(config=[[{"threshold": 50.0, "method": "gt"}]])
+        data_points = [datapoint99, datapoint50, datapoint6]
+        assert filter_batch_candidates(data_points, [detect_engine]) == data_points
+        assert len(detect_engine.detect_records(data_points, 1)) == 1
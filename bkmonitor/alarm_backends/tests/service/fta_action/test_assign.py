@@ -34,6 +34,7 @@ pytestmark = pytest.mark.django_db
 from alarm_backends.core.cache.assign import AssignCacheManager
 from alarm_backends.service.fta_action.tasks.alert_assign import (
     AlertAssigneeManager,
+    AssignRuleIndex,
     AssignRuleMatch,
     BackendAssignMatchManager,
 )
@@ -761,6 +762,44 @@ class TestAlertAssignRule:
         m = BackendAssignMatchManager(alert=alert, notice_users=["admin"])
         assert rule_obj.is_matched(m.get_match_dimensions()) is False
 
+    def test_assign_rule_index(self):
+        rules = [
+            [
+                {"id": 1, "conditions": [{"field": "alert.strategy_id", "value": ["1", "2"], "method": "eq"}]},
+                {
+                    "id": 2,
+                    "conditions": [
+                        {"field": "alert.name", "value": ["cpu"], "method": "include"},
+                        {"field": "labels", "value": ["host"], "method": "eq", "condition": "and"},
+                    ],
+                },
+            ],
+            [
+                {
+                    "id": 3,
+                    "conditions": [
+                        {"field": "alert.strategy_id", "value": ["3"], "method": "eq"},
+                        {"field": "ip", "value": ["127.0.0.1"], "method": "eq", "condition": "or"},
+                    ],
+                },
+                {"id": 4, "conditions": [{"field": "ip", "value": ["127.0.0.1"], "method": "eq"}]},
+            ],
+        ]
+        rule_index = AssignRuleIndex(rules)
+        # 含有 or 条件的规则不建立索引
+        assert rule_index.unindexed == [(1, 0)]
+
+        def candidate_ids(dimensions, snap_rule_ids=()):
+            return [
+                [rule["id"] for rule in group_rules]
+                for group_rules in rule_index.get_candidate_rules(dimensions, snap_rule_ids)
+            ]
+
+        assert candidate_ids({"alert.strategy_id": "2", "labels": ["host"], "ip": "127.0.0.2"}) == [[1, 2], [3]]
+        assert candidate_ids({"alert.strategy_id": "3", "labels": [], "ip": "127.0.0.1"}) == [[], [3, 4]]
+        # 已有快照的规则无论条件是否命中都作为候选规则
+        assert candidate_ids({"alert.strategy_id": "3"}, ["2"]) == [[2], [3]]
+
 
 def get_strategy_dict():
     strategy_dict = copy.deepcopy(STRATEGY_CONFIG_V3)
@@ -4,11 +4,15 @@ from datetime import datetime, timedelta
 import mock as _mock
 import pytz
 from django.conf import settings
-from django.test import TestCase
+from django.db import router
+from django.test import TestCase, override_settings
 from elasticsearch_dsl import AttrDict
 from mock import MagicMock, patch
 
-from alarm_backends.core.cache.key import ALERT_SNAPSHOT_KEY
+from alarm_backends.core.cache.key import (
+    ACTION_CHANGE_JOURNAL_KEY,
+    ALERT_SNAPSHOT_KEY,
+)
 from alarm_backends.service.converge.shield.shield_obj import ShieldObj
 from alarm_backends.service.fta_action.message_queue.processor import (
     ActionProcessor as MessageQueueActionProcessor,
@@ -17,6 +21,7 @@ from alarm_backends.service.fta_action.tasks import (
     create_actions,
     sync_actions_sharding_task,
 )
+from alarm_backends.service.fta_action.tasks.action_tasks import sync_changed_action_instances
 from alarm_backends.service.fta_action.tasks.create_action import CreateActionProcessor
 from alarm_backends.tests.service.fta_action.test_notice_execute import (
     get_strategy_dict,
@@ -24,6 +29,7 @@ from alarm_backends.tests.service.fta_action.test_notice_execute import (
 )
 from bkmonitor.documents import ActionInstanceDocument, AlertDocument, EventDocument
 from bkmonitor.models import ActionInstance, DutyPlan, UserGroup
+from bkmonitor.models.fta.action import record_action_changes
 from bkmonitor.utils import time_tools
 from constants.action import ActionSignal, ActionStatus
 from constants.alert import EventStatus
@@ -337,3 +343,57 @@ class TestActionFakeESProcessor(TestCase):
         sync_actions_sharding_task([last_a.id])
         p_doc = ActionInstanceDocument.get(id=p_action.es_action_id)
         self.assertEqual(p_doc.status, ActionStatus.SUCCESS)
+
+    def test_sync_changed_actions(self):
+        ACTION_CHANGE_JOURNAL_KEY.client.delete(ACTION_CHANGE_JOURNAL_KEY.get_key())
+        alert_info = {"id": str(int(time.time() * 1000)), "event": EventDocument(bk_biz_id=2)}
+        AlertDocument.bulk_create([AlertDocument(**alert_info)])
+
+        with override_settings(ROLE="worker", ACTION_SYNC_JOURNAL_ENABLED=True):
+            journal_key = ACTION_CHANGE_JOURNAL_KEY.get_key()
+            using = router.db_for_write(ActionInstance)
+
+            def record_changes(*args, **kwargs):
+                with self.captureOnCommitCallbacks(using=using, execute=True):
+                    record_action_changes([action.id])
+
+            # 保存处理记录时，事务提交后才记录变更
+            with self.captureOnCommitCallbacks(using=using, execute=True):
+                action = ActionInstance.objects.create(
+                    alerts=[alert_info["id"]],
+                    signal=ActionSignal.ABNORMAL,
+                    strategy_id=1,
+                    alert_level=1,
+                    bk_biz_id=2,
+                    dimensions=[],
+                    action_plugin={"plugin_type": "notice"},
+                    action_config={"plugin_type": "notice"},
+                    status=ActionStatus.SUCCESS,
+                    end_time=datetime.now(tz=pytz.UTC),
+                )
+                self.assertIsNone(ACTION_CHANGE_JOURNAL_KEY.client.zscore(journal_key, str(action.id)))
+            self.assertIsNotNone(ACTION_CHANGE_JOURNAL_KEY.client.zscore(journal_key, str(action.id)))
+
+            sync_changed_action_instances()
+            self.assertEqual(ActionInstanceDocument.get(id=action.es_action_id).status, ActionStatus.SUCCESS)
+            self.assertEqual(0, ACTION_CHANGE_JOURNAL_KEY.client.zcard(journal_key))
+
+            # 内容没有变化的处理记录不再写入ES
+            record_changes()
+            with patch.object(ActionInstanceDocument, "bulk_create") as bulk_create:
+                sync_changed_action_instances()
+                bulk_create.assert_not_called()
+
+            # 批量更新后主动记录变更，只同步变更的处理记录
+            ActionInstance.objects.filter(id=action.id).update(status=ActionStatus.FAILURE)
+            record_changes()
+            sync_changed_action_instances()
+            self.assertEqual(ActionInstanceDocument.get(id=action.es_action_id).status, ActionStatus.FAILURE)
+
+            # 同步期间再次变更的处理记录保留变更记录，下次继续同步
+            record_changes()
+            with patch(
+                "alarm_backends.service.fta_action.tasks.action_tasks.sync_actions", side_effect=record_changes
+            ):
+                sync_changed_action_instances()
+            self.assertIsNotNone(ACTION_CHANGE_JOURNAL_KEY.client.zscore(journal_key, str(action.id)))
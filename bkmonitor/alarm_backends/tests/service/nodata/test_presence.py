@@ -0,0 +1,109 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from alarm_backends.constants import NO_DATA_TAG_DIMENSION
+from alarm_backends.core.cache import key
+from alarm_backends.service.access.data.processor import AccessDataProcess
+from alarm_backends.service.nodata.processor import CheckProcessor
+
+STRATEGY_ID = 1
+ITEM_ID = 2
+
+
+def make_record(timestamp, dimensions):
+    return SimpleNamespace(data={"time": timestamp, "dimensions": dimensions, "value": 1})
+
+
+class TestNodataPresence(TestCase):
+    def setUp(self):
+        self.item = MagicMock(
+            id=ITEM_ID,
+            strategy=SimpleNamespace(strategy_id=STRATEGY_ID),
+            no_data_config={"agg_dimension": ["ip"]},
+            query_configs=[{"agg_interval": 60}],
+        )
+        self.index_key = key.NO_DATA_PRESENCE_INDEX_KEY.get_key(strategy_id=STRATEGY_ID, item_id=ITEM_ID)
+        self.client = key.NO_DATA_PRESENCE_INDEX_KEY.client
+        self.client.delete(self.index_key, *[self.presence_key(timestamp) for timestamp in range(60, 300, 60)])
+
+        with patch("alarm_backends.service.nodata.processor.Strategy"), patch(
+            "alarm_backends.service.nodata.processor.i18n"
+        ):
+            self.processor = CheckProcessor(STRATEGY_ID)
+
+    @staticmethod
+    def presence_key(timestamp):
+        return key.NO_DATA_PRESENCE_KEY.get_key(strategy_id=STRATEGY_ID, item_id=ITEM_ID, timestamp=timestamp)
+
+    def push(self, records):
+        AccessDataProcess("1")._push_nodata_presence(self.item, records)
+
+    def pull(self, check_timestamp):
+        # 每个检测周期 pull_data 会重置已拉取的维度上报记录
+        self.processor.presences[ITEM_ID] = {}
+        return self.processor.pull_presence(self.item, check_timestamp)
+
+    def test_push_and_pull(self):
+        self.push(
+            [
+                make_record(60, {"ip": "127.0.0.1", "device": "eth0"}),
+                make_record(60, {"ip": "127.0.0.1", "device": "eth1"}),
+                make_record(60, {"ip": "127.0.0.2"}),
+                make_record(120, {"ip": "127.0.0.1"}),
+                make_record(180, {"ip": "127.0.0.3"}),
+                # 缺少无数据维度的数据不参与检测
+                make_record(60, {"device": "eth0"}),
+            ]
+        )
+        presence_key = self.presence_key(60)
+        # 同一时间点按无数据维度降维去重
+        self.assertEqual(self.client.hlen(presence_key), 2)
+        self.assertGreater(self.client.ttl(presence_key), 0)
+        self.assertGreater(self.client.ttl(self.index_key), 0)
+
+        presence = self.pull(120)
+        self.assertEqual(
+            sorted(presence.values(), key=lambda p: p[1]["ip"]),
+            [
+                (120, {"ip": "127.0.0.1", NO_DATA_TAG_DIMENSION: True}),
+                (60, {"ip": "127.0.0.2", NO_DATA_TAG_DIMENSION: True}),
+            ],
+        )
+        # 已消费的时间点被清理，未来时间点保留
+        self.assertEqual(self.client.zrange(self.index_key, 0, -1), ["180"])
+        self.assertFalse(self.client.exists(presence_key))
+
+    def test_pull_missing(self):
+        self.assertEqual(self.pull(120), {})
+
+        # 检测点之前没有上报时，取未来最早的时间点
+        self.push([make_record(180, {"ip": "127.0.0.3"}), make_record(240, {"ip": "127.0.0.4"})])
+        presence = self.pull(120)
+        self.assertEqual(list(presence.values()), [(180, {"ip": "127.0.0.3", NO_DATA_TAG_DIMENSION: True})])
+        self.assertEqual(self.client.zrange(self.index_key, 0, -1), ["240"])
+
+    def test_pull_expired(self):
+        self.push([make_record(60, {"ip": "127.0.0.1"}), make_record(120, {"ip": "127.0.0.2"})])
+        # 维度上报记录过期，时间索引仍然存在
+        self.client.delete(self.presence_key(60))
+
+        presence = self.pull(120)
+        self.assertEqual(list(presence.values()), [(120, {"ip": "127.0.0.2", NO_DATA_TAG_DIMENSION: True})])
+        self.assertEqual(self.client.zcard(self.index_key), 0)
+
+        # 时间索引也过期后没有任何上报记录
+        self.push([make_record(180, {"ip": "127.0.0.3"})])
+        self.client.delete(self.index_key)
+        self.assertEqual(self.pull(180), {})
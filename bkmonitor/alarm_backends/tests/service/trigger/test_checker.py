@@ -11,13 +11,14 @@ specific language governing permissions and limitations under the License.
 import copy
 
 import arrow
+import mock
 import pytest
 from django.test import TestCase
 
 from alarm_backends.constants import NO_DATA_TAG_DIMENSION
 from alarm_backends.core.cache.key import CHECK_RESULT_CACHE_KEY
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
-from alarm_backends.service.trigger.checker import AnomalyChecker
+from alarm_backends.service.trigger.checker import AnomalyChecker, BatchAnomalyChecker
 from bkmonitor.models import CacheNode
 from bkmonitor.utils import time_tools
 from core.errors.alarm_backends import StrategyItemNotFound
@@ -473,3 +474,39 @@ class TestChecker(TestCase):
         anomaly_records, event_record = checker.check()
         self.assertEqual(len(anomaly_records), 3)
         self.assertEqual(event_record["trigger"]["level"], "2")
+
+    def test_batch_check_anomaly(self):
+        self.insert_check_result(3)
+        points = []
+        for source_time in [1569246360, 1569246420, 1569246480]:
+            point = copy.deepcopy(POINT)
+            point["data"]["time"] = source_time
+            point["data"]["record_id"] = f"55a76cf628e46c04a052f4e19bdb9dbf.{source_time}"
+            points.append(point)
+
+        expected = [AnomalyChecker(point, STRATEGY, 1).check_anomaly() for point in points]
+
+        checkers = [AnomalyChecker(point, STRATEGY, 1) for point in points]
+        BatchAnomalyChecker(checkers).prefetch()
+        self.assertEqual(set(checkers[0].check_results), {"1", "2", "3"})
+
+        with mock.patch.object(CHECK_RESULT_CACHE_KEY.client, "zrangebyscore") as zrangebyscore:
+            results = [checker.check_anomaly() for checker in checkers]
+            zrangebyscore.assert_not_called()
+
+        self.assertListEqual(results, expected)
+        self.assertEqual(results[-1], (1, [1569246240, 1569246360, 1569246480]))
+
+    def test_batch_check_anomaly_no_data(self):
+        self.insert_check_result(5)
+        strategy = copy.deepcopy(STRATEGY)
+        strategy["no_data_config"] = {"continuous": 5}
+
+        point = copy.deepcopy(POINT)
+        point["data"]["dimensions"][NO_DATA_TAG_DIMENSION] = True
+
+        checker = AnomalyChecker(point, strategy, 1)
+        BatchAnomalyChecker([checker]).prefetch()
+        anomaly_level, anomaly_timestamps = checker.check_anomaly()
+        self.assertEqual(anomaly_level, 1)
+        self.assertListEqual(anomaly_timestamps, [1569246240, 1569246300, 1569246360, 1569246420, 1569246480])
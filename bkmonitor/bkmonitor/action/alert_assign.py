@@ -18,7 +18,12 @@ from django.utils.translation import gettext as _
 
 from bkmonitor.documents import AlertDocument, AlertLog
 from bkmonitor.utils.common_utils import count_md5
-from bkmonitor.utils.range import load_condition_instance
+from bkmonitor.utils.range import (
+    CONDITION_CLASS_MAP,
+    load_condition_matcher,
+    load_field_instance,
+)
+from bkmonitor.utils.range.index import ConditionFieldIndex
 from constants.action import ActionPluginType, AssignMode, UserGroupType
 from constants.alert import EVENT_SEVERITY_DICT
 from core.drf_resource import api
@@ -82,7 +87,7 @@ class AssignRuleMatch:
         """
         self.assign_rule = assign_rule
         self.assign_rule_snap = assign_rule_snap or {}
-        self.dimension_check = None
+        self.dimension_matcher = None
         self.parse_dimension_conditions()
         self.alert = alert
 
@@ -100,7 +105,8 @@ class AssignRuleMatch:
             and_cond.append(condition)
         if and_cond:
             or_cond.append(and_cond)
-        self.dimension_check = load_condition_instance(or_cond, False)
+        # 分派规则会针对每条告警重复构建，编译结果按条件配置缓存复用
+        self.dimension_matcher = load_condition_matcher(or_cond, False)
 
     def assign_group(self):
         return {"group_id": self.assign_rule["assign_group_id"]}
@@ -151,7 +157,7 @@ class AssignRuleMatch:
         """
         if self.is_changed:
             # 如果为新或者发生了变化，需要重新适配
-            return self.dimension_check.is_match(dimensions)
+            return self.dimension_matcher(dimensions)
         return True
 
     @property
@@ -251,6 +257,75 @@ class AssignRuleMatch:
         return self.assign_rule.get("user_type", UserGroupType.MAIN)
 
 
+class AssignRuleIndex(ConditionFieldIndex):
+    """
+    分派规则索引
+
+    规则按优先级从高到低分组，以 (优先级下标, 规则下标) 为条目位置建立条件倒排，优先选择策略ID、告警名称、标签，
+    只有一个条件分支(没有 or)的规则才能建立索引。
+    候选规则仍通过 AssignRuleMatch 完整匹配，优先级及命中规则的顺序与逐条匹配一致
+    """
+
+    PREFERRED_FIELDS = ("alert.strategy_id", "alert.name", "alert.labels", "labels")
+
+    def __init__(self, priority_rules: List[List[dict]]):
+        """
+        :param priority_rules: 按优先级从高到低排列的规则列表
+        """
+        super().__init__()
+        self.priority_rules = priority_rules
+        # 规则ID -> 规则位置，已有快照的规则可能不需要匹配条件，需要作为候选规则
+        self.rule_positions = defaultdict(list)
+
+        for priority_index, rules in enumerate(priority_rules):
+            for rule_index, rule in enumerate(rules):
+                position = (priority_index, rule_index)
+                self.rule_positions[str(rule.get("id", ""))].append(position)
+                self.index_field(position, self.choose_index_field(rule.get("conditions") or []))
+
+    @classmethod
+    def choose_index_field(cls, conditions: List[dict]):
+        """
+        选择用于建立索引的条件字段，与 load_condition_instance 的条件解析保持一致
+        """
+        if any(condition.get("condition") == "or" for condition in conditions[1:]):
+            return None
+
+        candidates = []
+        for condition in conditions:
+            method = condition.get("method", "eq")
+            if method not in CONDITION_CLASS_MAP:
+                method = condition.get("_origin_method", "eq")
+            field_name, field_value = condition.get("field"), condition.get("value")
+            if method != "eq" or not all([field_name, field_value]):
+                continue
+            try:
+                field = load_field_instance(field_name, field_value)
+                values = set(field.to_str_list())
+            except Exception:
+                continue
+            candidates.append((field_name not in cls.PREFERRED_FIELDS, len(values), len(candidates), field))
+
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: c[:3])[3]
+
+    def get_candidate_rules(self, dimensions: dict, snap_rule_ids=()) -> List[List[dict]]:
+        """
+        按优先级返回候选规则
+        :param dimensions: 告警维度
+        :param snap_rule_ids: 告警已有快照的规则ID
+        """
+        positions = self.get_candidates(dimensions)
+        for rule_id in snap_rule_ids:
+            positions.update(self.rule_positions.get(str(rule_id), ()))
+
+        candidate_rules = [[] for _ in self.priority_rules]
+        for priority_index, rule_index in sorted(positions):
+            candidate_rules[priority_index].append(self.priority_rules[priority_index][rule_index])
+        return candidate_rules
+
+
 class AlertAssignMatchManager:
     """
     告警分派管理
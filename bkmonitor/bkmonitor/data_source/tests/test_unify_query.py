@@ -14,6 +14,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from bkmonitor.data_source.unify_query.query import UnifyQuery
+from bkmonitor.data_source.unify_query.result import ColumnarQueryResult
 
 
 @pytest.fixture
@@ -126,6 +127,58 @@ class TestUnifyQuery:
 
         assert series_stat == {(((), "_result_")): {"count": [0, 1]}}
 
+    def test_process_unify_query_columnar_data_matches_records(self):
+        params = {"query_list": [{"reference_name": "a"}]}
+        data = {
+            "series": [
+                {
+                    "columns": ["_time", "_value"],
+                    "types": ["float", "float"],
+                    "group_keys": ["bk_target_ip"],
+                    "group_values": ["127.0.0.1"],
+                    "values": [[1774525980000, 1], [1774526040000, 2], [1774526100000, 3]],
+                },
+                {
+                    "columns": ["_time", "_value"],
+                    "types": ["float", "float"],
+                    "group_keys": ["bk_target_ip"],
+                    "group_values": ["127.0.0.2"],
+                    "values": [[1774525980000, None]],
+                },
+            ]
+        }
+
+        records = UnifyQuery.process_unify_query_data(params, data, end_time=1774526100000)
+        result = UnifyQuery.process_unify_query_data(params, data, end_time=1774526100000, columnar=True)
+
+        assert isinstance(result, ColumnarQueryResult)
+        assert len(result) == len(records) == 3
+        assert result.to_records() == records
+        assert list(reversed(result)) == list(reversed(records))
+        assert result[-1] == records[-1]
+        assert result[1:] == records[1:]
+        assert list(result.iter_times()) == [record["_time_"] for record in records]
+
+    def test_process_unify_query_columnar_data_result_fallback(self):
+        params = {"query_list": [{"reference_name": "a"}]}
+        data = {
+            "series": [
+                {
+                    "columns": ["_time", "a"],
+                    "types": ["float", "float"],
+                    "group_keys": ["bk_target_ip"],
+                    "group_values": ["127.0.0.1"],
+                    "values": [[1774525980000, 1]],
+                }
+            ]
+        }
+
+        result = UnifyQuery.process_unify_query_data(params, data, columnar=True)
+        assert result.to_records() == UnifyQuery.process_unify_query_data(params, data)
+
+        result.map_column("_time_", lambda t: t // 1000)
+        assert result.to_records() == [{"bk_target_ip": "127.0.0.1", "_time_": 1774525980, "a": 1, "_result_": 1}]
+
     def test_query_data_with_stat_returns_series_stat_for_datasource_query(self, mocker, mock_query_metrics):
         query = build_unify_query()
         mocker.patch.object(query, "process_data_sources")
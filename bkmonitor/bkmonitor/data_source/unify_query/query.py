@@ -28,6 +28,7 @@ from bkmonitor.data_source.unify_query.functions import (
     CpAggMethods,
     add_expression_functions,
 )
+from bkmonitor.data_source.unify_query.result import ColumnarQueryResult, SeriesColumns
 from bkmonitor.utils.tenant import bk_biz_id_to_bk_tenant_id
 from bkmonitor.utils.thread_backend import ThreadPool
 from bkmonitor.utils.time_tools import time_interval_align
@@ -144,39 +145,74 @@ class UnifyQuery:
                 data_source.filter_dict[f"{settings.SYSTEM_NET_GROUP_FIELD_NAME}__neq"] = value
 
     @classmethod
-    def process_unify_query_data(cls, params: dict, data: dict, end_time: int = None) -> list[dict[str, Any]]:
+    def process_unify_query_data(
+        cls, params: dict, data: dict, end_time: int = None, columnar: bool = False
+    ) -> list[dict[str, Any]] | ColumnarQueryResult:
         """
         处理统一查询模块返回值
+        :param columnar: 是否返回列式结果，调用方需要兼容 ColumnarQueryResult
         """
-        records = []
+        result = cls.process_unify_query_columnar_data(params, data, end_time=end_time)
+        if columnar:
+            return result
+        return result.to_records()
 
-        rows = data.get("series") or []
-        for row in rows:
-            dimensions = cls.extract_unify_query_series_dimensions(row)
-
-            for value in row["values"]:
-                record = {**dimensions}
-                for column, column_type, v in zip(row["columns"], row["types"], value):
-                    if column_type == "time":
-                        v = arrow.get(v).timestamp * 1000
-
-                    if column == "_time":
-                        column = "_time_"
-                    elif column in ["_result", "_value"]:
-                        column = "_result_"
-
-                    record[column] = v
-
-                # 单指标情况下避免缺少_result_字段
-                if "_result_" not in record:
-                    record["_result_"] = record[params["query_list"][0]["reference_name"]]
+    @classmethod
+    def process_unify_query_columnar_data(cls, params: dict, data: dict, end_time: int = None) -> ColumnarQueryResult:
+        """
+        将统一查询返回值转换为列式结果，每条时序的维度只保存一份
+        """
+        series_list = []
+        # 同一批时序的时间点基本一致，缓存时间转换结果
+        time_cache = {}
 
-                # 如果是最后一条数据，且时间戳等于结束时间，不返回
-                if not params.get("instant") and end_time and record.get("_time_") == end_time:
-                    continue
+        def convert_time(v):
+            if v not in time_cache:
+                time_cache[v] = arrow.get(v).timestamp * 1000
+            return time_cache[v]
 
-                records.append(record)
-        return records
+        for row in data.get("series") or []:
+            dimensions = cls.extract_unify_query_series_dimensions(row)
+            rows = row["values"]
+            row_values = [list(column_values) for column_values in zip(*rows)] if rows else []
+
+            columns = []
+            values = []
+            for index, (column, column_type) in enumerate(zip(row["columns"], row["types"])):
+                column_values = row_values[index] if index < len(row_values) else []
+                if column_type == "time":
+                    column_values = [convert_time(v) for v in column_values]
+
+                if column == "_time":
+                    column = "_time_"
+                elif column in ["_result", "_value"]:
+                    column = "_result_"
+
+                # 字段重名时与逐行处理保持一致，后者覆盖前者
+                if column in columns:
+                    values[columns.index(column)] = column_values
+                else:
+                    columns.append(column)
+                    values.append(column_values)
+
+            # 单指标情况下避免缺少_result_字段
+            if rows and "_result_" not in columns:
+                reference_name = params["query_list"][0]["reference_name"]
+                if reference_name in columns:
+                    values.append(values[columns.index(reference_name)])
+                else:
+                    values.append([dimensions[reference_name]] * len(rows))
+                columns.append("_result_")
+
+            # 如果是最后一条数据，且时间戳等于结束时间，不返回
+            if rows and not params.get("instant") and end_time and "_time_" in columns:
+                times = values[columns.index("_time_")]
+                if end_time in times:
+                    indexes = [i for i, t in enumerate(times) if t != end_time]
+                    values = [[column_values[i] for i in indexes] for column_values in values]
+
+            series_list.append(SeriesColumns(dimensions, columns, values))
+        return ColumnarQueryResult(series_list)
 
     @classmethod
     def extract_unify_query_series_dimensions(cls, row: dict[str, Any]) -> dict[str, Any]:
@@ -221,13 +257,16 @@ class UnifyQuery:
             series_stat[key] = stat
         return series_stat
 
-    def process_data_by_datasource(self, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def need_process_by_datasource(self) -> bool:
         first_ds: DataSource = self.data_sources[0]
-        if (first_ds.data_source_label, first_ds.data_type_label) in [
+        return (first_ds.data_source_label, first_ds.data_type_label) in [
             (DataSourceLabel.CUSTOM, DataTypeLabel.EVENT),
             (DataSourceLabel.BK_MONITOR_COLLECTOR, DataTypeLabel.LOG),
-        ]:
-            records = first_ds.process_unify_query_data(records)
+        ]
+
+    def process_data_by_datasource(self, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self.need_process_by_datasource():
+            records = self.data_sources[0].process_unify_query_data(records)
         return records
 
     def process_log_by_datasource(self, records: list[dict[str, Any]]):
@@ -395,9 +434,11 @@ class UnifyQuery:
         time_alignment: bool = True,
         instant: bool = None,
         not_time_align: bool = False,
-    ) -> tuple[list[dict], bool, dict]:
+        columnar: bool = False,
+    ) -> tuple[list[dict] | ColumnarQueryResult, bool, dict]:
         """
         使用统一查询模块进行查询
+        :param columnar: 返回列式结果，需要数据源二次处理的场景仍返回 list[dict]
         """
         is_partial = False
         params = self.get_unify_query_params(start_time, end_time, time_alignment, not_time_align=not_time_align)
@@ -419,8 +460,11 @@ class UnifyQuery:
             data = api.unify_query.query_data(**params)
             is_partial = data.get("is_partial", False)
             series_stat = self.process_unify_query_series_stat(params, data)
-            records: list[dict[str, Any]] = self.process_unify_query_data(params, data, end_time=end_time)
-            records = self.process_data_by_datasource(records)
+            if columnar and not self.need_process_by_datasource():
+                records = self.process_unify_query_data(params, data, end_time=end_time, columnar=True)
+            else:
+                records = self.process_unify_query_data(params, data, end_time=end_time)
+                records = self.process_data_by_datasource(records)
         return records, is_partial, series_stat
 
     def _query_reference_using_unify_query(
@@ -573,6 +617,9 @@ class UnifyQuery:
         if not self.data_sources:
             return [], {}
 
+        # 列式结果仅对统一查询生效，不透传给数据源查询
+        columnar = kwargs.pop("columnar", False)
+
         self.process_data_sources(self.data_sources)
 
         exc = None
@@ -597,6 +644,7 @@ class UnifyQuery:
                         time_alignment=time_alignment,
                         instant=kwargs.get("instant"),
                         not_time_align=not_time_align,
+                        columnar=columnar,
                     )
                     self.is_partial = is_partial
             except Exception as e:
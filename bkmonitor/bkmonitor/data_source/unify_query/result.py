@@ -0,0 +1,113 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterator
+from typing import Any
+
+
+class SeriesColumns:
+    """
+    单条时序的列式数据
+    维度只保存一份，每个字段保存为一列，行字典在访问时才构造
+    """
+
+    __slots__ = ("dimensions", "columns", "values")
+
+    def __init__(self, dimensions: dict[str, Any], columns: list[str], values: list[list]):
+        """
+        :param dimensions: 维度
+        :param columns: 字段名列表(已完成 _time_/_result_ 等字段名转换)
+        :param values: 与 columns 一一对应的列数据
+        """
+        self.dimensions = dimensions
+        self.columns = columns
+        self.values = values
+
+    def __len__(self):
+        return len(self.values[0]) if self.values else 0
+
+    def get_column(self, column: str) -> list | None:
+        try:
+            return self.values[self.columns.index(column)]
+        except ValueError:
+            return None
+
+    def get_row(self, index: int) -> dict[str, Any]:
+        record = dict(self.dimensions)
+        for column, values in zip(self.columns, self.values):
+            record[column] = values[index]
+        return record
+
+    def iter_rows(self, reverse: bool = False) -> Iterator[dict[str, Any]]:
+        indexes = range(len(self) - 1, -1, -1) if reverse else range(len(self))
+        for index in indexes:
+            yield self.get_row(index)
+
+
+class ColumnarQueryResult:
+    """
+    统一查询列式结果
+    兼容 list[dict] 的只读访问方式(len、迭代、倒序迭代、下标及切片)，行字典按需构造，
+    需要直接处理列数据的调用方可以遍历 series。
+    """
+
+    def __init__(self, series: list[SeriesColumns] | None = None):
+        self.series: list[SeriesColumns] = [s for s in series or [] if len(s)]
+        self._offsets: list[int] = []
+        total = 0
+        for s in self.series:
+            self._offsets.append(total)
+            total += len(s)
+        self._total = total
+
+    def __len__(self):
+        return self._total
+
+    def __bool__(self):
+        return self._total > 0
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for s in self.series:
+            yield from s.iter_rows()
+
+    def __reversed__(self) -> Iterator[dict[str, Any]]:
+        for s in reversed(self.series):
+            yield from s.iter_rows(reverse=True)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._total))]
+        if index < 0:
+            index += self._total
+        if not 0 <= index < self._total:
+            raise IndexError("columnar query result index out of range")
+        series_index = bisect_right(self._offsets, index) - 1
+        return self.series[series_index].get_row(index - self._offsets[series_index])
+
+    def to_records(self) -> list[dict[str, Any]]:
+        return list(self)
+
+    def iter_times(self, column: str = "_time_") -> Iterator[Any]:
+        for s in self.series:
+            values = s.get_column(column)
+            if values is not None:
+                yield from values
+
+    def map_column(self, column: str, func) -> None:
+        """
+        对所有时序的某一列做原地转换，如时间单位换算
+        """
+        for s in self.series:
+            try:
+                index = s.columns.index(column)
+            except ValueError:
+                continue
+            s.values[index] = [func(v) for v in s.values[index]]
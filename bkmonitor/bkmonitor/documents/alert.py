@@ -8,6 +8,7 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import logging
 import time
 
 from django.utils.functional import cached_property
@@ -16,7 +17,7 @@ from django_elasticsearch_dsl.registries import registry
 from elasticsearch_dsl import InnerDoc, Search, field
 
 from bkmonitor.documents import EventDocument
-from bkmonitor.documents.base import BaseDocument, Date
+from bkmonitor.documents.base import BaseDocument, BulkActionType, Date
 from bkmonitor.documents.constants import ES_INDEX_SETTINGS
 from bkmonitor.models import NO_DATA_TAG_DIMENSION
 from constants.alert import (
@@ -28,6 +29,8 @@ from constants.alert import (
 from constants.data_source import DataSourceLabel, DataTypeLabel
 from core.errors.alert import AlertNotFoundError
 
+logger = logging.getLogger("bkmonitor")
+
 
 @registry.register_document
 class AlertDocument(BaseDocument):
@@ -124,9 +127,59 @@ class AlertDocument(BaseDocument):
         name = "bkfta_alert"
         settings = ES_INDEX_SETTINGS.copy()
 
+    # 用户可修改的字段，这些字段以 ES 为准，告警周期管理时需要同步回缓存
+    USER_FIELDS = (
+        "assignee",
+        "is_handled",
+        "handle_stage",
+        "is_ack",
+        "is_ack_noticed",
+        "ack_operator",
+        "appointee",
+        "supervisor",
+        "extra_info",
+    )
+
     def get_index_time(self):
         return self.parse_timestamp_by_id(self.id)
 
+    @classmethod
+    def bulk_create(cls, documents, parallel=False, action=BulkActionType.CREATE, record_user_change=True, **kwargs):
+        """
+        批量写入告警
+        :param record_user_change: 局部更新了用户字段时，是否记录变更，告警周期管理只会同步有变更记录的告警
+        """
+        documents = list(documents)
+        result = super().bulk_create(documents, parallel=parallel, action=action, **kwargs)
+        if record_user_change and action in (BulkActionType.UPDATE, BulkActionType.UPSERT):
+            cls.record_user_change(documents)
+        return result
+
+    @classmethod
+    def record_user_change(cls, documents):
+        """
+        记录用户字段有变更的告警，每次变更递增告警的变更版本，告警周期管理同步后再按版本清理
+        """
+        alert_ids = [
+            doc.id
+            for doc in documents
+            if doc.id and any(field in cls.USER_FIELDS for field in doc.to_dict(skip_empty=False))
+        ]
+        if not alert_ids:
+            return
+
+        from alarm_backends.core.cache.key import ALERT_USER_CHANGE_KEY
+
+        try:
+            pipeline = ALERT_USER_CHANGE_KEY.client.pipeline(transaction=False)
+            for alert_id in alert_ids:
+                change_key = ALERT_USER_CHANGE_KEY.get_key(alert_id=alert_id)
+                pipeline.incr(change_key)
+                pipeline.expire(change_key, ALERT_USER_CHANGE_KEY.ttl)
+            pipeline.execute()
+        except Exception as e:
+            logger.exception("[record alert user change] alerts(%s) error: %s", ",".join(map(str, alert_ids)), e)
+
     @classmethod
     def parse_timestamp_by_id(cls, uuid: str) -> int:
         """
@@ -19,7 +19,9 @@ from typing import Any
 
 import jmespath
 from django.conf import settings
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext as _
 
 from bkm_space.errors import NoRelatedResourceError
@@ -727,6 +729,37 @@ class ActionInstance(AbstractRecordModel):
         return results
 
 
+def record_action_changes(action_ids, using=None):
+    """
+    记录处理记录的变更(处理记录ID及变更版本)，后台按变更记录将处理记录同步至ES
+    变更在数据库事务提交后才记录，避免同步时读到尚未提交的数据
+    仅后台进程具备缓存写入能力，记录失败时由定期扫描兜底
+    """
+    if not action_ids or not settings.ACTION_SYNC_JOURNAL_ENABLED or settings.ROLE not in ("api", "worker"):
+        return
+
+    action_ids = list(action_ids)
+
+    def record():
+        from alarm_backends.core.cache.key import ACTION_CHANGE_JOURNAL_KEY
+
+        version = time.time()
+        try:
+            ACTION_CHANGE_JOURNAL_KEY.client.zadd(
+                ACTION_CHANGE_JOURNAL_KEY.get_key(), {str(action_id): version for action_id in action_ids}
+            )
+        except Exception as e:
+            logger.exception("[record action changes] actions(%s) error: %s", action_ids, e)
+
+    # 不在事务中时立即执行
+    transaction.on_commit(record, using=using or router.db_for_write(ActionInstance))
+
+
+@receiver(post_save, sender=ActionInstance)
+def record_action_change_on_save(sender, instance, using=None, **kwargs):
+    record_action_changes([instance.id], using=using)
+
+
 class ActionInstanceLog(models.Model):
     """
     告警的处理 log 表
@@ -171,6 +171,7 @@ def refresh_strategy_cache_on_issue_config_change(sender, instance, **kwargs):
             if cfg
             else None
         )
-        StrategyCacheManager.cache.set(cache_key, json.dumps(strategy_dict), StrategyCacheManager.CACHE_TIMEOUT)
+        # 通过缓存管理器写入，同步更新策略版本，各进程的策略快照才会刷新
+        StrategyCacheManager.update_strategy(strategy_id, strategy_dict)
     except Exception:
         pass
@@ -8,12 +8,16 @@ Unless required by applicable law or agreed to in writing, software distributed
 an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
+import json
+from functools import lru_cache
+
 from constants.common import DutyType
 
 from . import conditions, fields, period
 
 __all__ = [
     "load_condition_instance",
+    "load_condition_matcher",
     "TIME_MATCH_CLASS_MAP",
     "load_field_instance",
     "load_agg_condition_instance",
@@ -122,3 +126,23 @@ def load_condition_instance(conditions_config, default_value_if_not_exists=True)
 
         or_cond_obj.add(and_cond_obj)
     return or_cond_obj
+
+
+@lru_cache(maxsize=4096)
+def _load_condition_matcher(conditions_key, default_value_if_not_exists):
+    return load_condition_instance(json.loads(conditions_key), default_value_if_not_exists).compile()
+
+
+def load_condition_matcher(conditions_config, default_value_if_not_exists=True):
+    """
+    Load compiled condition matcher by condition model, matcher(data) -> bool
+    相同的条件配置复用同一个编译结果
+    :param conditions_config:
+            [[{"field":"ip", "method":"eq", "value":"111"}, {}], []]
+    :return: matcher function
+    """
+    try:
+        conditions_key = json.dumps(conditions_config, sort_keys=True)
+    except (TypeError, ValueError):
+        return load_condition_instance(conditions_config, default_value_if_not_exists).compile()
+    return _load_condition_matcher(conditions_key, default_value_if_not_exists)
@@ -16,6 +16,13 @@ class Condition:
     def is_match(self, data):
         raise NotImplementedError("You should implement this.")
 
+    def compile(self):
+        """
+        编译为匹配函数 matcher(data) -> bool，与 is_match 结果一致
+        条件值的解析(集合、正则、数值)只在编译时执行一次，适用于同一条件匹配大量数据的场景
+        """
+        return self.is_match
+
 
 class SimpleCondition(Condition):
     """eq / gt / lt / reg ..."""
@@ -34,6 +41,32 @@ class SimpleCondition(Condition):
     def _is_match(self, data_field):
         raise NotImplementedError("You should inherit me and implement this.")
 
+    def compile(self):
+        try:
+            value_matcher = self._compile_value_matcher()
+        except Exception:
+            # 条件值无法预处理(如空列表)，退化为逐次匹配，保持原有的报错时机
+            value_matcher = None
+        if value_matcher is None:
+            return self.is_match
+
+        get_value_from_data = self.cond_field.get_value_from_data
+        default_value_if_not_exists = self.default_value_if_not_exists
+
+        def matcher(data):
+            existed, data_value = get_value_from_data(data)
+            if not existed:
+                return default_value_if_not_exists
+            return value_matcher(data_value)
+
+        return matcher
+
+    def _compile_value_matcher(self):
+        """
+        返回基于数据原始值的匹配函数 value_matcher(data_value) -> bool，返回 None 时退化为 is_match
+        """
+        return None
+
     def get_field(self, data):
         is_exists, data_value = self.cond_field.get_value_from_data(data)
         if is_exists:
@@ -67,6 +100,22 @@ class OrCondition(CompositeCondition):
                 return True
         return False
 
+    def compile(self):
+        if not self.conditions:
+            return lambda data: True
+
+        matchers = tuple(cond.compile() for cond in self.conditions)
+        if len(matchers) == 1:
+            return matchers[0]
+
+        def matcher(data):
+            for m in matchers:
+                if m(data):
+                    return True
+            return False
+
+        return matcher
+
 
 class AndCondition(CompositeCondition):
     def is_match(self, data):
@@ -78,6 +127,22 @@ class AndCondition(CompositeCondition):
                 return False
         return True
 
+    def compile(self):
+        if not self.conditions:
+            return lambda data: True
+
+        matchers = tuple(cond.compile() for cond in self.conditions)
+        if len(matchers) == 1:
+            return matchers[0]
+
+        def matcher(data):
+            for m in matchers:
+                if not m(data):
+                    return False
+            return True
+
+        return matcher
+
 
 class EqualCondition(SimpleCondition):
     def _is_match(self, data_field):
@@ -85,11 +150,20 @@ class EqualCondition(SimpleCondition):
         cond_value = self.cond_field.to_str_list()
         return bool(set(data_value) & set(cond_value))
 
+    def _compile_value_matcher(self):
+        format_str_list = self.cond_field.format_str_list
+        cond_value = frozenset(self.cond_field.to_str_list())
+        return lambda data_value: not cond_value.isdisjoint(format_str_list(data_value))
+
 
 class NotEqualCondition(EqualCondition):
     def _is_match(self, data_field):
         return not super()._is_match(data_field)
 
+    def _compile_value_matcher(self):
+        value_matcher = super()._compile_value_matcher()
+        return lambda data_value: not value_matcher(data_value)
+
 
 class IncludeCondition(SimpleCondition):
     def _is_match(self, data_field):
@@ -104,11 +178,28 @@ class IncludeCondition(SimpleCondition):
                     return True
         return False
 
+    def _compile_value_matcher(self):
+        format_str_list = self.cond_field.format_str_list
+        cond_value = tuple(self.cond_field.to_str_list())
+
+        def value_matcher(data_value):
+            for value in format_str_list(data_value):
+                for v in cond_value:
+                    if v in value:
+                        return True
+            return False
+
+        return value_matcher
+
 
 class ExcludeCondition(IncludeCondition):
     def _is_match(self, data_field):
         return not super()._is_match(data_field)
 
+    def _compile_value_matcher(self):
+        value_matcher = super()._compile_value_matcher()
+        return lambda data_value: not value_matcher(data_value)
+
 
 class GreaterCondition(SimpleCondition):
     def _is_match(self, data_field):
@@ -116,11 +207,20 @@ class GreaterCondition(SimpleCondition):
         cond_value = max(self.cond_field.to_float_list())
         return data_value > cond_value
 
+    def _compile_value_matcher(self):
+        format_float_list = self.cond_field.format_float_list
+        cond_value = max(self.cond_field.to_float_list())
+        return lambda data_value: min(format_float_list(data_value)) > cond_value
+
 
 class LesserOrEqualCondition(GreaterCondition):
     def _is_match(self, data_field):
         return not super()._is_match(data_field)
 
+    def _compile_value_matcher(self):
+        value_matcher = super()._compile_value_matcher()
+        return lambda data_value: not value_matcher(data_value)
+
 
 class LesserCondition(SimpleCondition):
     def _is_match(self, data_field):
@@ -128,11 +228,20 @@ class LesserCondition(SimpleCondition):
         cond_value = min(self.cond_field.to_float_list())
         return data_value < cond_value
 
+    def _compile_value_matcher(self):
+        format_float_list = self.cond_field.format_float_list
+        cond_value = min(self.cond_field.to_float_list())
+        return lambda data_value: max(format_float_list(data_value)) < cond_value
+
 
 class GreaterOrEqualCondition(LesserCondition):
     def _is_match(self, data_field):
         return not super()._is_match(data_field)
 
+    def _compile_value_matcher(self):
+        value_matcher = super()._compile_value_matcher()
+        return lambda data_value: not value_matcher(data_value)
+
 
 class RegularCondition(SimpleCondition):
     def _is_match(self, data_field):
@@ -151,14 +260,49 @@ class RegularCondition(SimpleCondition):
                 return True
         return False
 
+    def _compile_value_matcher(self):
+        format_str_list = self.cond_field.format_str_list
+        regs = []
+        for v in self.cond_field.to_str_list():
+            try:
+                regs.append(re.compile(rf"{v}"))
+            except sre_constants.error:
+                # 与 _is_match 保持一致：遇到非法正则即判定为不匹配，后续正则不再生效
+                regs.append(None)
+                break
+        regs = tuple(regs)
+
+        def value_matcher(data_value):
+            data_value = format_str_list(data_value)
+            if not data_value:
+                return False
+            data_value = data_value[0]
+            for reg in regs:
+                if reg is None:
+                    return False
+                if reg.search(data_value):
+                    return True
+            return False
+
+        return value_matcher
+
 
 class NotRegularCondition(RegularCondition):
     def _is_match(self, data_field):
         return not super()._is_match(data_field)
 
+    def _compile_value_matcher(self):
+        value_matcher = super()._compile_value_matcher()
+        return lambda data_value: not value_matcher(data_value)
+
 
 class IsSuperSetCondition(SimpleCondition):
     def _is_match(self, data_field):
         data_value = data_field.to_str_list()
         cond_value = self.cond_field.to_str_list()
         return set(data_value).issuperset(set(cond_value))
+
+    def _compile_value_matcher(self):
+        format_str_list = self.cond_field.format_str_list
+        cond_value = frozenset(self.cond_field.to_str_list())
+        return lambda data_value: cond_value.issubset(format_str_list(data_value))
@@ -26,14 +26,24 @@ class DimensionField(object):
 
     def to_str_list(self):
         """trans self.value to str list"""
-        val_list = self.value
-        if not isinstance(val_list, (list, tuple)):
-            val_list = [val_list]
-        return [self.strip_str(v) for v in val_list]
+        return self.format_str_list(self.value)
 
     def to_float_list(self):
         """trans self.value to float list"""
-        val_list = self.value
+        return self.format_float_list(self.value)
+
+    @classmethod
+    def format_str_list(cls, value):
+        """trans value to str list"""
+        val_list = value
+        if not isinstance(val_list, (list, tuple)):
+            val_list = [val_list]
+        return [cls.strip_str(v) for v in val_list]
+
+    @classmethod
+    def format_float_list(cls, value):
+        """trans value to float list"""
+        val_list = value
         if not isinstance(val_list, (list, tuple)):
             val_list = [val_list]
 
@@ -74,8 +84,9 @@ class IpDimensionField(DimensionField):
 
         return is_exists, ip_value
 
-    def to_str_list(self):
-        val_list = self.value
+    @classmethod
+    def format_str_list(cls, value):
+        val_list = value
         if not isinstance(val_list, (list, tuple)):
             val_list = [val_list]
 
@@ -84,7 +95,7 @@ class IpDimensionField(DimensionField):
             if isinstance(v, dict):
                 v = to_host_id(v)
             else:
-                v = self.strip_str(v)
+                v = cls.strip_str(v)
             ret.append(v)
 
         return ret
@@ -118,8 +129,9 @@ class BkTargetIpDimensionField(DimensionField):
 
         return is_exists, ip_value
 
-    def to_str_list(self):
-        val_list = self.value
+    @classmethod
+    def format_str_list(cls, value):
+        val_list = value
         if not isinstance(val_list, (list, tuple)):
             val_list = [val_list]
 
@@ -128,7 +140,7 @@ class BkTargetIpDimensionField(DimensionField):
             if isinstance(v, dict):
                 v = f"{v['bk_target_ip']}|{v.get('bk_target_cloud_id', '0')}"
             else:
-                v = self.strip_str(v)
+                v = cls.strip_str(v)
             ret.append(v)
 
         return ret
@@ -165,8 +177,9 @@ class TopoNodeDimensionField(DimensionField):
             return True, [{"bk_obj_id": data["bk_obj_id"], "bk_inst_id": data["bk_inst_id"]}]
         return is_exists, topo_node_value
 
-    def to_str_list(self):
-        val_list = self.value
+    @classmethod
+    def format_str_list(cls, value):
+        val_list = value
         if not isinstance(val_list, (list, tuple)):
             val_list = [val_list]
 
@@ -175,7 +188,7 @@ class TopoNodeDimensionField(DimensionField):
             if isinstance(v, dict):
                 v = f"{v.get('bk_obj_id')}|{v.get('bk_inst_id')}"
             else:
-                v = self.strip_str(v)
+                v = cls.strip_str(v)
             ret.append(v)
 
         return ret
@@ -0,0 +1,66 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from collections import defaultdict
+
+
+class ConditionFieldIndex:
+    """
+    维度条件倒排索引
+
+    每个条目按其中一个精确匹配(eq)条件的字段建立倒排，没有可用字段的条目每次查询都作为候选:
+    - 索引键为 (字段名, 字段类型, 条件值格式)，同一索引键从数据中取值的方式一致，查询时只需取一次值
+    - 索引只用于筛选候选条目，候选条目仍需执行完整的条件匹配
+    """
+
+    def __init__(self):
+        # 索引键 -> 取值用的字段
+        self.probes = {}
+        # 索引键 -> {字段值: [条目位置]}
+        self.postings = defaultdict(lambda: defaultdict(list))
+        # 未建立索引的条目位置
+        self.unindexed = []
+
+    @staticmethod
+    def get_field_signature(field):
+        """
+        索引键，字段从数据中取值的方式由字段类型及条件值格式(如 ip 是否带管控区域)决定
+        """
+        first_value = field.value
+        if first_value and isinstance(first_value, (list, tuple)):
+            first_value = first_value[0]
+        return field.name, type(field), frozenset(first_value) if isinstance(first_value, dict) else None
+
+    def index_field(self, position, field=None):
+        """
+        按字段的条件值为条目建立倒排，字段为空时条目不建立索引
+        """
+        if field is None:
+            self.unindexed.append(position)
+            return
+
+        signature = self.get_field_signature(field)
+        self.probes.setdefault(signature, field)
+        for value in set(field.to_str_list()):
+            self.postings[signature][value].append(position)
+
+    def get_candidates(self, data: dict) -> set:
+        """
+        获取数据可能命中的条目位置
+        """
+        candidates = set(self.unindexed)
+        for signature, field in self.probes.items():
+            is_exists, data_value = field.get_value_from_data(data)
+            if not is_exists:
+                continue
+            postings = self.postings[signature]
+            for value in field.format_str_list(data_value):
+                candidates.update(postings.get(value, ()))
+        return candidates
@@ -15,6 +15,43 @@ from bkmonitor.utils.tenant import bk_biz_id_to_bk_tenant_id
 
 logger = logging.getLogger("service")
 
+# 数据缺少目标信息，所在条件组直接判定为不匹配
+_MISMATCH = object()
+
+
+def _get_host_target_keys(data: dict):
+    target_keys = set()
+    bk_host_id = data.get("bk_host_id")
+    if bk_host_id:
+        target_keys.add(str(bk_host_id))
+
+    ip = data.get("bk_target_ip", data.get("ip"))
+    if ip:
+        bk_cloud_id = data.get("bk_target_cloud_id", data.get("bk_cloud_id", 0))
+        target_keys.add(f"{ip}|{bk_cloud_id}")
+    return target_keys or None
+
+
+def _get_service_instance_target_keys(data: dict):
+    service_instance_id = data.get("bk_target_service_instance_id", data.get("service_instance_id"))
+    if not service_instance_id:
+        return None
+    return {str(service_instance_id)}
+
+
+def _get_topo_node_target_keys(data: dict):
+    if "bk_topo_node" in data:
+        topo_nodes = data["bk_topo_node"]
+    elif "bk_obj_id" in data and "bk_inst_id" in data:
+        topo_nodes = [f"{data['bk_obj_id']}|{data['bk_inst_id']}"]
+    else:
+        return _MISMATCH
+
+    if not topo_nodes:
+        logger.info(f"data target topo_node is empty, {data}")
+        return _MISMATCH
+    return topo_nodes
+
 
 class TargetCondition:
     """
@@ -156,3 +193,47 @@ class TargetCondition:
                 # 所有条件都满足，则返回True
                 return True
         return False
+
+    def compile(self):
+        """
+        编译为匹配函数 matcher(data) -> bool，与 is_match 结果一致
+        字段类型判断与目标值集合在编译时完成
+        """
+        compiled_conditions_list = []
+        for conditions in self.conditions_list:
+            compiled_conditions = []
+            for condition in conditions:
+                field = condition["field"]
+                if field in ["ip", "bk_target_ip"]:
+                    get_target_keys = _get_host_target_keys
+                elif field in ["service_instance_id", "bk_target_service_instance_id"]:
+                    get_target_keys = _get_service_instance_target_keys
+                elif "_" in field and field.split("_", 1)[1] == "topo_node":
+                    get_target_keys = _get_topo_node_target_keys
+                else:
+                    get_target_keys = None
+                compiled_conditions.append(
+                    (get_target_keys, condition["method"] == "eq", frozenset(condition["target_keys"]))
+                )
+            compiled_conditions_list.append(tuple(compiled_conditions))
+        compiled_conditions_list = tuple(compiled_conditions_list)
+
+        def matcher(data: dict):
+            for compiled_conditions in compiled_conditions_list:
+                for get_target_keys, is_eq, values in compiled_conditions:
+                    target_keys = get_target_keys(data) if get_target_keys else ()
+                    if target_keys is None:
+                        # 数据中不存在该字段，跳过该条件
+                        continue
+                    if target_keys is _MISMATCH:
+                        break
+
+                    if is_eq == values.isdisjoint(target_keys):
+                        # 有一个条件不满足，则跳过
+                        break
+                else:
+                    # 所有条件都满足，则返回True
+                    return True
+            return False
+
+        return matcher
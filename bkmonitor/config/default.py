@@ -778,6 +778,82 @@ ACCESS_LATENCY_THRESHOLD_CONSTANT = 180
 # 仅对列表中的策略启用合并处理，为空时对所有静态阈值策略生效
 ACCESS_DETECT_MERGE_STRATEGY_IDS = []
 
+# access 数据拉取去重后端: set(redis集合保存完整record_id) / fingerprint(64位指纹拼接存储，进程内增量读取)
+ACCESS_DUPLICATE_BACKEND = "set"
+
+# access 统一查询数据使用列式结果(每条时序维度只保存一份，行数据按需构造)
+ACCESS_DATA_COLUMNAR_QUERY = True
+
+# access 推送无数据检测数据时只记录各时间点上报的无数据维度(不推送完整数据记录)
+# nodata 同时兼容旧的待检测队列；旧版本 nodata 只读取待检测队列，需所有 nodata 进程升级完成后再开启
+NODATA_PRESENCE_TRACKER_ENABLED = False
+
+# 告警缓存编码开关(带告警ID头部)及 zlib 压缩阈值(字节，0 表示不压缩)
+# 读取时兼容新旧两种格式；旧版本进程只能读取 json 格式，需所有读取方升级完成后的版本再开启编码
+ALERT_CACHE_CODEC_ENABLED = False
+ALERT_CACHE_COMPRESS_THRESHOLD = 4096
+
+# alert.builder 分区模式: 事件按 dedupe_md5 分配的分区数(0 表示不开启)，分区队列前缀(每个分区队列仅部署一个并发为1的 worker)，
+# 分区内告警被其他模块加锁时，worker 原地等待重试的间隔(秒)，重试成功前不消费该分区后续的事件
+ALERT_BUILDER_PARTITION_COUNT = 0
+ALERT_BUILDER_PARTITION_QUEUE_PREFIX = "celery_alert_builder_partition_"
+ALERT_BUILDER_PARTITION_RETRY_COUNTDOWN = 1
+
+# alert.manager 仅同步有用户字段变更版本(确认、分派、处理阶段等)的告警，关闭时每轮都从 ES 同步全部告警的用户字段
+# 开启后每隔 ALERT_USER_CHANGE_FULL_SYNC_CYCLES 个检测周期仍会全量同步一次，兜底未记录到变更版本的修改
+ALERT_USER_CHANGE_JOURNAL_ENABLED = False
+ALERT_USER_CHANGE_FULL_SYNC_CYCLES = 10
+
+# 屏蔽配置索引在进程内的最长复用时间(秒)，缓存的屏蔽配置有变化时立即重建，超时重建用于刷新动态分组等外部数据
+SHIELD_INDEX_MAX_AGE = 60
+
+# 收敛维度匹配是否在 redis 中通过 lua 脚本完成并集与交集计算，redis 不支持时自动回退到进程内计算
+CONVERGE_DIMENSION_SERVER_SIDE_ENABLED = True
+
+# composite 批量检测: 每个任务检测的告警数(0 表示每个告警单独下发任务)
+# 批量检测时单告警检测结果通过 lua 脚本比较并设置代替逐个告警加锁，关闭或 redis 不支持时回退为批量加锁
+COMPOSITE_BATCH_SIZE = 0
+COMPOSITE_DETECT_CAS_ENABLED = True
+
+# 处理记录按变更记录同步至ES: 开关，每批同步数量，按更新时间兜底扫描的间隔(秒)。
+# 变更在数据库事务提交后记录，开启后内容与上次同步一致的处理记录不再重复写入ES
+ACTION_SYNC_JOURNAL_ENABLED = True
+ACTION_SYNC_BATCH_SIZE = 200
+ACTION_SYNC_FULL_SCAN_INTERVAL = 300
+
+# 告警拉取任务(由 leader 统一计算)按一致性哈希分配分区时的负载系数，每个节点最多分配 平均数 * 负载系数 个分区，为 0 时不限制
+HASH_RING_LOAD_FACTOR = 1.25
+
+# detect 批量检测开关
+# 开启后静态阈值、简易环比/同比、振幅类算法先对整批数据点做数值比较，只对可能异常的数据点逐点检测
+DETECT_BATCH_ENABLED = True
+
+# detect 进程内检测计划(已构建的检测器实例)缓存的监控项数量上限，0 表示不缓存
+DETECTOR_PLAN_CACHE_SIZE = 5000
+
+# detect 同环比类算法的历史数据是否使用按周期分桶的列式缓存
+DETECT_HISTORY_SERIES_ENABLED = True
+
+# detect 信号分发: 每轮批量弹出的信号数，策略按 ID 分配的槽位数(小于等于0时每个策略单独下发任务)
+# 槽位任务投递到 "{前缀}{槽位}" 队列，需为每个槽位部署独立 worker 以保持进程内缓存命中，未配置队列前缀时不开启槽位
+DETECT_SIGNAL_BATCH_SIZE = 100
+DETECT_SIGNAL_SLOTS = 0
+DETECT_SIGNAL_SLOT_QUEUE_PREFIX = ""
+
+# 进程内策略快照缓存开关及全局版本号检查间隔(秒)
+STRATEGY_SNAPSHOT_CACHE_ENABLED = True
+STRATEGY_SNAPSHOT_CHECK_INTERVAL = 5
+
+# 本地主机快照(mmap)开关、存放目录(为空时使用系统临时目录)、有效期及文件更新检查间隔(秒)
+HOST_SNAPSHOT_ENABLED = False
+HOST_SNAPSHOT_DIR = ""
+HOST_SNAPSHOT_TTL = 300
+HOST_SNAPSHOT_CHECK_INTERVAL = 10
+
+# 后台缓存集群: 多节点 pipeline 并发执行线程数(小于等于1时串行执行)，缓存路由表变更检查间隔(秒，0 表示不检查)
+REDIS_PIPELINE_PARALLEL_WORKERS = 8
+CACHE_ROUTER_CHECK_INTERVAL = 60
+
 # kafka是否自动提交配置
 KAFKA_AUTO_COMMIT = True
 
@@ -1327,6 +1403,21 @@ AGGREGATION_BIZ_ID = int(os.getenv("BKAPP_AGGREGATION_BIZ_ID", 2))
 PUSH_MONITOR_EVENT_TO_FTA = True
 # 监控推送事件数据给自愈的 kafka topic
 MONITOR_EVENT_KAFKA_TOPIC = os.getenv("BK_MONITOR_EVENT_KAFKA_TOPIC", "0bkmonitor_backend_event")
+# 监控事件是否通过后台线程异步批量推送 kafka
+KAFKA_EVENT_PRODUCER_ENABLED = True
+# 异步推送后端: kafka / memory(进程内，用于测试)
+KAFKA_EVENT_PRODUCER_BACKEND = "kafka"
+# 异步推送队列长度、单批消息数、攒批最长等待时间(秒)、队列满时的等待时间(秒)、发送及退出时的刷新超时(秒)
+KAFKA_EVENT_PRODUCER_QUEUE_SIZE = 50000
+KAFKA_EVENT_PRODUCER_BATCH_SIZE = 1000
+KAFKA_EVENT_PRODUCER_LINGER_SECONDS = 0.2
+KAFKA_EVENT_PRODUCER_BLOCK_TIMEOUT = 1
+KAFKA_EVENT_PRODUCER_FLUSH_TIMEOUT = 10
+# 异步推送失败时的重试次数及首次重试间隔(秒)，之后按指数退避
+KAFKA_EVENT_PRODUCER_RETRIES = 3
+KAFKA_EVENT_PRODUCER_RETRY_BACKOFF = 0.5
+# 异步推送的压缩方式: gzip / snappy / lz4，为空不压缩
+KAFKA_EVENT_PRODUCER_COMPRESSION = "gzip"
 # 监控推送事件数据给自愈的 插件ID
 MONITOR_EVENT_PLUGIN_ID = "bkmonitor"
 # 主机监控获取单个进程支持最多port数
@@ -328,6 +328,31 @@ TRIGGER_EVENT_RATE_LIMIT_DROP = Counter(
     labelnames=("module", "strategy_id", "bk_biz_id", "strategy_name", "redis_node"),
 )
 
+KAFKA_PRODUCER_QUEUE_SIZE = Gauge(
+    name="bkmonitor_kafka_producer_queue_size",
+    documentation="异步 kafka 生产者待发送队列长度",
+    labelnames=("producer",),
+)
+
+KAFKA_PRODUCER_SEND_COUNT = Counter(
+    name="bkmonitor_kafka_producer_send_count",
+    documentation="异步 kafka 生产者发送消息数",
+    labelnames=("producer", "topic", "status"),
+)
+
+KAFKA_PRODUCER_SEND_LATENCY = Histogram(
+    name="bkmonitor_kafka_producer_send_latency",
+    documentation="异步 kafka 生产者单批次发送耗时",
+    labelnames=("producer",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 3, 5, 10, INF),
+)
+
+KAFKA_PRODUCER_BACKPRESSURE_COUNT = Counter(
+    name="bkmonitor_kafka_producer_backpressure_count",
+    documentation="异步 kafka 生产者队列已满转为同步发送的次数",
+    labelnames=("producer",),
+)
+
 DETECT_PROCESS_LATENCY = Histogram(
     name="bkmonitor_detect_process_latency",
     documentation="告警从 access 到 detect 模块的整体处理延迟",
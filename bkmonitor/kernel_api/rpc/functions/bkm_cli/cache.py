@@ -19,6 +19,7 @@ func_name: bkm_cli.read_cache_key
 from __future__ import annotations
 
 import json
+import zlib
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
@@ -201,9 +202,14 @@ def _safe_decode(value: bytes | str | None) -> str | None:
 def _try_json(s: str | None) -> Any:
     if s is None:
         return None
+    from alarm_backends.core.alert.codec import AlertCacheCodec
+
     try:
+        # 告警内容缓存及快照使用 AlertCacheCodec 编码
+        if s.startswith(AlertCacheCodec.PREFIX):
+            return AlertCacheCodec.decode(s)
         return json.loads(s)
-    except (json.JSONDecodeError, TypeError):
+    except (ValueError, TypeError, zlib.error):
         return s
 
 